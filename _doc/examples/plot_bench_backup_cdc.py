@@ -0,0 +1,129 @@
+"""
+=====================================================
+Bytes uploaded by an encrypted backup after small edits
+=====================================================
+
+:class:`EncryptedBackup
+<pyquickhelper.filehelper.encrypted_backup.EncryptedBackup>`
+splits big files into pieces, every piece is compressed, encrypted
+and uploaded. With fixed size pieces, a byte inserted at the beginning
+of a file shifts every piece and the whole file is uploaded again.
+With ``chunking='cdc'``, pieces are defined by their content
+(:func:`iter_cdc_chunks
+<pyquickhelper.filehelper.content_chunking.iter_cdc_chunks>`),
+only the chunks around the modification are uploaded.
+This example measures the number of uploaded bytes
+after small edits on a file of 1 Gb.
+
+.. contents::
+    :local:
+
+Generates a file
+++++++++++++++++
+"""
+import os
+import time
+import random
+import pandas
+import matplotlib.pyplot as plt
+from pyquickhelper.filehelper import EncryptedBackup, FileTreeNode
+from pyquickhelper.filehelper.transfer_api import MockTransferAPI
+
+try:
+    import Crypto as skip_
+    algo = "AES"
+except ImportError:
+    algo = "fernet"
+
+SIZE = 2 ** 30
+dest = os.path.abspath("temp_bench_backup_cdc")
+root = os.path.join(dest, "src")
+name = os.path.join(root, "big.bin")
+if not os.path.exists(root):
+    os.makedirs(root)
+
+BLOCK = 2 ** 24
+
+
+def write_file(edit=None):
+    with open(name, "wb") as f:
+        if edit == "insert":
+            f.write(b"inserted")
+        for i in range(SIZE // BLOCK):
+            data = random.Random(i).getrandbits(BLOCK * 8).to_bytes(
+                BLOCK, "little")
+            if edit == "modify" and i == SIZE // BLOCK // 2:
+                data = data[:1000] + b"modified" + data[1008:]
+            f.write(data)
+        if edit == "append":
+            f.write(b"appended")
+
+
+######################################
+# Counting transfers
+# ++++++++++++++++++
+#
+# The API only keeps the mapping and counts the uploaded bytes.
+
+
+class CountingTransferAPI(MockTransferAPI):
+
+    def __init__(self):
+        MockTransferAPI.__init__(self)
+        self.sent = 0
+
+    def transfer(self, path, data):
+        if path == "__mapping__":
+            return MockTransferAPI.transfer(self, path, data)
+        self.sent += len(data)
+        return True
+
+
+def backup(api, chunking, name):
+    enc = EncryptedBackup(
+        key=b"bench" * 8, file_tree_node=FileTreeNode(root),
+        transfer_api=api, root_local=root,
+        file_status=os.path.join(dest, "status_%s.txt" % name),
+        file_map=os.path.join(dest, "mapping_%s.txt" % name),
+        threshold_size=2 ** 22, chunking=chunking,
+        compression=None, algo=algo)
+    api.sent = 0
+    begin = time.perf_counter()
+    enc.start_transfering()
+    return api.sent, time.perf_counter() - begin
+
+
+######################################
+# Benchmark
+# +++++++++
+#
+# Both modes start from the same initial file,
+# every edit is applied to the initial file.
+
+for f in os.listdir(dest):
+    if f.startswith(("status_", "mapping_")):
+        os.remove(os.path.join(dest, f))
+
+apis = {"fixed": CountingTransferAPI(), "cdc": CountingTransferAPI()}
+obs = []
+for edit in [None, "insert", "modify", "append"]:
+    write_file(edit)
+    for mode, api in apis.items():
+        sent, duration = backup(
+            api, None if mode == "fixed" else "cdc", mode)
+        obs.append(dict(edit=edit or "initial", mode=mode,
+                        uploaded_mb=sent / 2 ** 20, time=duration))
+        print(obs[-1])
+
+df = pandas.DataFrame(obs)
+piv = df.pivot(index="edit", columns="mode", values="uploaded_mb")
+piv = piv.loc[["initial", "insert", "modify", "append"]]
+print(piv)
+
+######################################
+# Graph
+# +++++
+
+ax = piv.plot.bar(title="Uploaded Mb after an edit on a 1 Gb file")
+ax.set_ylabel("Mb")
+plt.show()
@@ -0,0 +1,71 @@
+"""
+=====================================
+Benchmark of the command line startup
+=====================================
+
+``python -m pyquickhelper <command> --help`` builds a parser from
+the signature and the documentation of the function implementing
+the command. The specifications of the parser are stored
+in a cache (:class:`CliParserCache
+<pyquickhelper.cli.cli_parser_cache.CliParserCache>`):
+the next call displays the help without importing the module
+implementing the command nor parsing its documentation.
+This example measures the startup time of a few commands
+with an empty cache (cold) and a filled cache (warm).
+
+.. contents::
+    :local:
+
+Measures
+++++++++
+"""
+import os
+import sys
+import time
+import subprocess
+import pandas
+import matplotlib.pyplot as plt
+
+N_RUNS = 5
+commands = ["clean_files", "ls", "zoom_img", "encrypt"]
+dest = os.path.abspath("temp_bench_cli_startup")
+if not os.path.exists(dest):
+    os.makedirs(dest)
+cache = os.path.join(dest, "cli_parsers.json")
+env = os.environ.copy()
+env["PYQUICKHELPER_CACHE"] = cache
+
+
+def run(args):
+    begin = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "pyquickhelper"] + args, env=env,
+                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return time.perf_counter() - begin
+
+
+obs = []
+for cmd in commands:
+    for i in range(N_RUNS):
+        if os.path.exists(cache):
+            os.remove(cache)
+        cold = run([cmd, "--help"])
+        warm = run([cmd, "--help"])
+        obs.append(dict(command=cmd, run=i, cold=cold, warm=warm))
+
+df = pandas.DataFrame(obs)
+print(df)
+
+#########################################
+# Average time per command.
+
+gr = df.groupby("command")[["cold", "warm"]].mean()
+gr["speedup"] = gr["cold"] / gr["warm"]
+print(gr)
+
+#########################################
+# Plot.
+
+ax = gr[["cold", "warm"]].plot.barh(
+    title="python -m pyquickhelper <command> --help (s)")
+plt.tight_layout()
+plt.show()
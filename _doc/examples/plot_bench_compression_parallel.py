@@ -0,0 +1,98 @@
+"""
+==========================================
+Benchmark of zip and gzip on several cores
+==========================================
+
+:class:`ParallelZipWriter
+<pyquickhelper.filehelper.compression_parallel.ParallelZipWriter>`
+and :class:`ParallelGzipWriter
+<pyquickhelper.filehelper.compression_parallel.ParallelGzipWriter>`
+split the data into blocks compressed on a pool of threads
+(:epkg:`zlib` releases the GIL) and write them in order.
+This example compares them to :mod:`zipfile` and :mod:`gzip`
+on a generated file of 200 Mb for an increasing number of threads.
+
+.. contents::
+    :local:
+
+Generates a file
+++++++++++++++++
+"""
+import os
+import io
+import gzip
+import time
+import zipfile
+import pandas
+import matplotlib.pyplot as plt
+from pyquickhelper.filehelper import ParallelZipWriter, pgzip_file
+
+SIZE = 200 * 2 ** 20
+dest = os.path.abspath("temp_bench_compression_parallel")
+data_file = os.path.join(dest, "data.txt")
+if not os.path.exists(dest):
+    os.makedirs(dest)
+if not os.path.exists(data_file):
+    with open(data_file, "wb") as f:
+        i = 0
+        while f.tell() < SIZE:
+            # half compressible, half random
+            f.write(("row %d,%d,%f\n" % (i, i * 7, i / 3)).encode("ascii") * 100)
+            f.write(os.urandom(2000))
+            i += 1
+
+######################################
+# Measures
+# ++++++++
+
+
+def measure(label, workers, fct):
+    begin = time.perf_counter()
+    fct()
+    duration = time.perf_counter() - begin
+    print("%s - %s: %1.3fs" % (label, workers, duration))
+    return dict(method=label, workers=workers, time=duration)
+
+
+def zipfile_deflate():
+    with zipfile.ZipFile(io.BytesIO(), "w", compression=zipfile.ZIP_DEFLATED,
+                         compresslevel=6) as zf:
+        zf.write(data_file)
+
+
+def parallel_zip(workers):
+    with ParallelZipWriter(io.BytesIO(), compresslevel=6, workers=workers) as zf:
+        zf.write(data_file)
+
+
+def gzip_file():
+    with open(data_file, "rb") as f:
+        with gzip.open(os.path.join(dest, "ref.gz"), "wb") as g:
+            while True:
+                data = f.read(2 ** 20)
+                if not data:
+                    break
+                g.write(data)
+
+
+obs = [measure("zipfile", 1, zipfile_deflate),
+       measure("gzip", 1, gzip_file)]
+for workers in [1, 2, 4, 8]:
+    if workers > 2 * (os.cpu_count() or 1):
+        break
+    obs.append(measure("ParallelZipWriter", workers,
+                       lambda: parallel_zip(workers)))
+    obs.append(measure("pgzip_file", workers, lambda: pgzip_file(
+        data_file, os.path.join(dest, "out.gz"), workers=workers)))
+
+df = pandas.DataFrame(obs)
+print(df)
+
+#########################################
+# Plot.
+
+piv = df.pivot(index="workers", columns="method", values="time")
+ax = piv.plot(title="Compression of %d Mb on %d cores" % (
+    SIZE // 2 ** 20, os.cpu_count() or 1), marker="o")
+ax.set_ylabel("seconds")
+plt.show()
@@ -0,0 +1,102 @@
+"""
+==========================================
+Throughput of the encryption functions
+==========================================
+
+:func:`encrypt_stream <pyquickhelper.filehelper.encryption.encrypt_stream>`
+uses AES in mode CBC: the data is padded, copied into a stream
+and encrypted chunk by chunk.
+:func:`encrypt_aes_stream
+<pyquickhelper.filehelper.encryption.encrypt_aes_stream>`
+uses modes GCM or CTR which do not need any padding,
+it encrypts buffers (:class:`memoryview`, :mod:`mmap`)
+into preallocated buffers without copying them.
+This example compares the throughput of both for in-memory data
+and for files.
+
+.. contents::
+    :local:
+
+Data
+++++
+"""
+import os
+import time
+import tracemalloc
+import pandas
+import matplotlib.pyplot as plt
+from pyquickhelper.filehelper.encryption import (
+    encrypt_stream, decrypt_stream, encrypt_aes_stream, decrypt_aes_stream)
+
+key = b"0123456789abcdef"
+SIZE = 2 ** 26
+data = os.urandom(SIZE)
+dest = os.path.abspath("temp_bench_encryption")
+if not os.path.exists(dest):
+    os.makedirs(dest)
+infile = os.path.join(dest, "data.bin")
+with open(infile, "wb") as f:
+    f.write(data)
+
+
+######################################
+# Functions
+# +++++++++
+
+
+def cbc(source, out):
+    enc = encrypt_stream(key, source, out, algo="AES")
+    dec = os.path.join(dest, "cbc.dec") if out else None
+    decrypt_stream(key, out or enc, dec, algo="AES")
+
+
+def gcm(source, out):
+    enc = encrypt_aes_stream(key, source, out, algo="AES-GCM")
+    dec = os.path.join(dest, "gcm.dec") if out else None
+    decrypt_aes_stream(key, out or enc, dec, algo="AES-GCM")
+
+
+def ctr(source, out):
+    enc = encrypt_aes_stream(key, source, out, algo="AES-CTR")
+    dec = os.path.join(dest, "ctr.dec") if out else None
+    decrypt_aes_stream(key, out or enc, dec, algo="AES-CTR")
+
+
+######################################
+# Benchmark
+# +++++++++
+#
+# Every function encrypts then decrypts, the measure includes both.
+# The peak memory is measured with :mod:`tracemalloc`.
+
+obs = []
+for name, fct in [("CBC", cbc), ("GCM", gcm), ("CTR", ctr)]:
+    for kind in ["memory", "file"]:
+        if kind == "memory":
+            args = (data, None)
+        else:
+            args = (infile, os.path.join(dest, "%s.enc" % name))
+        tracemalloc.start()
+        begin = time.perf_counter()
+        fct(*args)
+        duration = time.perf_counter() - begin
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        obs.append(dict(mode=name, kind=kind, time=duration,
+                        throughput=2 * SIZE / 2 ** 20 / duration,
+                        peak_mb=peak / 2 ** 20))
+        print(obs[-1])
+
+df = pandas.DataFrame(obs)
+print(df)
+
+######################################
+# Graph
+# +++++
+
+fig, ax = plt.subplots(1, 2, figsize=(12, 4))
+df.pivot(index="mode", columns="kind", values="throughput").plot.bar(
+    ax=ax[0], title="Throughput (Mb/s, encryption + decryption)")
+df.pivot(index="mode", columns="kind", values="peak_mb").plot.bar(
+    ax=ax[1], title="Peak memory (Mb)")
+plt.show()
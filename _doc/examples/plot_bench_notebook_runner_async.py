@@ -0,0 +1,69 @@
+"""
+=================================================
+Latency of NotebookRunner on many trivial cells
+=================================================
+
+:class:`NotebookRunner <pyquickhelper.ipythonhelper.NotebookRunner>`
+executes a cell, waits for the shell reply, then reads the iopub
+messages until the kernel is idle. Method :meth:`run_cell_async
+<pyquickhelper.ipythonhelper.NotebookRunner.run_cell_async>`
+waits for both channels at the same time with :epkg:`asyncio`
+and merges consecutive streams. This example runs a notebook
+made of 500 trivial cells with both methods and compares
+the time spent per cell.
+
+.. contents::
+    :local:
+
+Notebook
+++++++++
+"""
+import time
+import pandas
+import matplotlib.pyplot as plt
+from nbformat.v4 import new_notebook, new_code_cell
+from pyquickhelper.ipythonhelper import NotebookRunner
+
+N = 500
+cells = [new_code_cell("x = {0}\nprint(x)\nx + 1".format(i)) for i in range(N)]
+
+######################################
+# Benchmark
+# +++++++++
+#
+# The kernel starts before the measures.
+
+obs = []
+for asynchronous in [False, True]:
+    nb = NotebookRunner(new_notebook(cells=cells), kernel=True)
+    try:
+        begin = time.perf_counter()
+        nb.run_notebook(asynchronous=asynchronous)
+        total = time.perf_counter() - begin
+    finally:
+        nb.shutdown_kernel()
+    name = "asyncio" if asynchronous else "blocking"
+    print(name, "total time", total)
+    for st in nb.cell_stats:
+        obs.append(dict(name=name, cell=st["index_cell"],
+                        time=st["time"], nbytes=st["nbytes"]))
+
+df = pandas.DataFrame(obs)
+summary = df.groupby("name")["time"].describe(percentiles=[0.5, 0.9, 0.99])
+summary["nbytes"] = df.groupby("name")["nbytes"].sum()
+print(summary)
+
+######################################
+# Graph
+# +++++
+
+fig, ax = plt.subplots(1, 1, figsize=(10, 4))
+for name, gr in df.groupby("name"):
+    ax.plot(gr["cell"], gr["time"], ".", label=name)
+ax.set_yscale("log")
+ax.set_xlabel("cell")
+ax.set_ylabel("time (s)")
+ax.set_title("NotebookRunner, time per cell")
+ax.legend()
+
+plt.show()
@@ -0,0 +1,62 @@
+"""
+@brief      test log(time=3s)
+"""
+
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pyquickhelper.pycode import get_temp_folder, ExtTestCase
+from pyquickhelper.benchhelper import BenchMark
+
+
+class ATestBenchMarkP_(BenchMark):
+
+    def init(self):
+        self.offset = 10
+
+    def bench(self, **p):
+        value = p["value"] + self.offset
+        return (dict(value=value, pid=os.getpid(), _btry="b%d" % p["value"]),
+                dict(script="a\nb", _btry="b%d" % p["value"]))
+
+    def end(self):
+        pass
+
+
+class TestBenchMarkParallel(ExtTestCase):
+
+    def test_benchmark_parallel(self):
+        temp = get_temp_folder(__file__, "temp_benchmark_parallel")
+        cache = os.path.join(temp, "cache.pickle")
+        params = [dict(value=i) for i in range(10)]
+
+        bench = ATestBenchMarkP_("TestName", cache_file=cache)
+        metrics, _ = bench.run(params, n_jobs=2)
+        self.assertEqual([m["value"] for m in metrics], list(range(10, 20)))
+        self.assertEqual([m["_i"] for m in metrics], list(range(10)))
+        pids = set(m["pid"] for m in metrics)
+        self.assertNotIn(os.getpid(), pids)
+        self.assertLessEqual(len(pids), 2)
+        self.assertEqual([a["_i"] for a in bench.Appendix], list(range(10)))
+        self.assertExists(cache + ".b3.clean_cache")
+
+        # everything comes from the cache except one experiment
+        os.remove(cache + ".b3.clean_cache")
+        bench = ATestBenchMarkP_("TestName", cache_file=cache)
+        metrics, meta = bench.run(params + [dict(value=10)], n_jobs=2,
+                                  cpu_affinity=True)
+        self.assertEqual(meta[0]["nb_cached"], 9)
+        self.assertEqual([m["value"] for m in metrics], list(range(10, 21)))
+
+    def test_benchmark_executor(self):
+        params = [dict(value=i) for i in range(6)]
+        bench = ATestBenchMarkP_("TestName")
+        with ThreadPoolExecutor(3) as executor:
+            metrics, _ = bench.run(params, executor=executor)
+        self.assertEqual([m["value"] for m in metrics], list(range(10, 16)))
+        self.assertEqual(set(m["pid"] for m in metrics), {os.getpid()})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+@brief      test log(time=2s)
+"""
+import os
+import sys
+import json
+import unittest
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.pycode.clean_helper import clean_files
+from pyquickhelper.cli import create_cli_parser, cli_main_helper, CliParserCache
+from pyquickhelper.cli.cli_helper import (
+    create_cli_parser_spec, create_cli_parser_from_spec)
+
+
+_module = '''
+def mycommand(anint: int, bstring="r", fLOG=print):
+    """
+    {0}
+
+    :param anint: one integer
+    :param bstring: one string
+    """
+    fLOG("## '{{0}}' - '{{1}}' ##".format(anint, bstring))
+'''
+
+
+class TestCliParserCache(ExtTestCase):
+
+    def test_spec_json(self):
+        spec = create_cli_parser_spec(clean_files, prog="clean_files")
+        spec2 = json.loads(json.dumps(spec))
+        self.assertEqual(spec, spec2)
+        self.assertEqual(spec["summary"], clean_files.__doc__.strip().split("\n")[0])
+        help1 = create_cli_parser(clean_files, prog="clean_files").format_help()
+        help2 = create_cli_parser_from_spec(spec2).format_help()
+        self.assertEqual(help1, help2)
+        args = create_cli_parser_from_spec(spec2).parse_args(["-f", "."])
+        self.assertEqual(args.folder, ".")
+
+    def test_cache(self):
+        temp = get_temp_folder(__file__, "temp_cli_parser_cache")
+        name = os.path.join(temp, "parsers.json")
+        cache = CliParserCache(name)
+        help1 = create_cli_parser(clean_files, cache=cache).format_help()
+        self.assertExists(name)
+
+        cache = CliParserCache(name)
+        key = cache.make_key(clean_files, prog=None, skip_parameters=('fLOG',),
+                             cleandoc=("epkg", "link"), positional=None)
+        self.assertEqual(key, cache.make_key(
+            clean_files.__module__ + ".clean_files", prog=None,
+            skip_parameters=('fLOG',), cleandoc=("epkg", "link"),
+            positional=None))
+        spec = cache.get(key, clean_files.__module__)
+        self.assertNotEmpty(spec)
+        help2 = create_cli_parser(clean_files, cache=cache).format_help()
+        self.assertEqual(help1, help2)
+
+        # an entry is discarded when the source changes
+        with open(name, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        data[key]["hash"] = "modified"
+        with open(name, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        self.assertEmpty(CliParserCache(name).get(key, clean_files.__module__))
+
+        # a function cannot be part of a key
+        self.assertEmpty(cache.make_key(clean_files, cleandoc=lambda s: s))
+
+    def test_cli_main_helper_no_import(self):
+        temp = get_temp_folder(__file__, "temp_cli_parser_cache_main")
+        modname = "cli_parser_cache_mod"
+        src = os.path.join(temp, modname + ".py")
+        with open(src, "w", encoding="utf-8") as f:
+            f.write(_module.format("First version."))
+        cache = CliParserCache(os.path.join(temp, "parsers.json"))
+        fcts = dict(mycommand=modname + ".mycommand")
+
+        sys.path.insert(0, temp)
+        try:
+            rows = []
+            cli_main_helper(fcts, ["mycommand", "--help"],
+                            fLOG=rows.append, cache=cache)
+            self.assertIn("First version.", rows[0])
+            self.assertIn(modname, sys.modules)
+
+            # the help comes from the cache, the module is not imported
+            del sys.modules[modname]
+            rows = []
+            cli_main_helper(fcts, ["mycommand", "--help"],
+                            fLOG=rows.append, cache=cache)
+            self.assertIn("First version.", rows[0])
+            rows = []
+            cli_main_helper(fcts, [], fLOG=rows.append, cache=cache)
+            self.assertIn("First version.", rows[-1])
+            self.assertNotIn(modname, sys.modules)
+
+            # the cache is invalidated when the source changes
+            with open(src, "w", encoding="utf-8") as f:
+                f.write(_module.format("Second version."))
+            cache = CliParserCache(os.path.join(temp, "parsers.json"))
+            rows = []
+            cli_main_helper(fcts, ["mycommand", "--help"],
+                            fLOG=rows.append, cache=cache)
+            self.assertIn("Second version.", rows[0])
+
+            rows = []
+            cli_main_helper(fcts, ["mycommand", "-a", "3"],
+                            fLOG=rows.append, cache=cache)
+            self.assertEqual(rows, ["## '3' - 'r' ##"])
+        finally:
+            sys.path.remove(temp)
+            if modname in sys.modules:
+                del sys.modules[modname]
+
+
+if __name__ == "__main__":
+    unittest.main()
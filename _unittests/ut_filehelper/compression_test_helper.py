@@ -0,0 +1,33 @@
+"""
+@brief      helpers shared by the unit tests on compression
+"""
+import os
+
+
+def make_files(folder, sizes, subfolders=0, random=False):
+    """
+    Creates one file per size in *folder*, file *i* repeats
+    the line ``line i`` and ends with random bytes if *random* is True.
+    The files are spread over *subfolders* subfolders if it is not null.
+    """
+    names = []
+    for i, size in enumerate(sizes):
+        sub = (os.path.join(folder, "sub%d" % (i % subfolders))
+               if subfolders else folder)
+        os.makedirs(sub, exist_ok=True)
+        name = os.path.join(sub, "f%d.txt" % i)
+        content = ("line %d\n" % i).encode("ascii") * (size // 7)
+        if random:
+            content += os.urandom(size // 10)
+        with open(name, "wb") as f:
+            f.write(content)
+        names.append(name)
+    return names
+
+
+def read_file(name):
+    """
+    Returns the content of a file.
+    """
+    with open(name, "rb") as f:
+        return f.read()
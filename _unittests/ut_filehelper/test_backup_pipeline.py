@@ -0,0 +1,109 @@
+"""
+@brief      test log(time=2s)
+"""
+
+import os
+import random
+import unittest
+
+from pyquickhelper.loghelper import noLOG
+from pyquickhelper.pycode import get_temp_folder, ExtTestCase
+from pyquickhelper.filehelper import EncryptedBackup, FileTreeNode
+from pyquickhelper.filehelper.transfer_api import MockTransferAPI
+
+
+class FailingTransferAPI(MockTransferAPI):
+
+    def __init__(self, fail):
+        MockTransferAPI.__init__(self)
+        self.fail = fail
+        self.nb = 0
+
+    def transfer(self, path, data):
+        if path == "__mapping__":
+            return MockTransferAPI.transfer(self, path, data)
+        self.nb += 1
+        if self.fail is not None and self.nb % self.fail == 0:
+            return False
+        return MockTransferAPI.transfer(self, path, data)
+
+
+class TestBackupPipeline(ExtTestCase):
+
+    def _algo(self):
+        try:
+            import Crypto as skip_
+            return "AES"
+        except ImportError:
+            return "fernet"
+
+    def _make_files(self, temp, n=10):
+        root = os.path.join(temp, "src")
+        os.makedirs(os.path.join(root, "sub"))
+        rnd = random.Random(0)
+        contents = {}
+        for i in range(n):
+            name = "sub/f%d.bin" % i if i % 2 else "f%d.bin" % i
+            data = bytes(rnd.getrandbits(8) for j in range(rnd.randint(0, 5000)))
+            with open(os.path.join(root, name), "wb") as f:
+                f.write(data)
+            contents[name] = data
+        return root, contents
+
+    def _backup(self, temp, root, api, **kwargs):
+        return EncryptedBackup(
+            key=b"unit" * 8, file_tree_node=FileTreeNode(root),
+            transfer_api=api, root_local=root,
+            file_status=os.path.join(temp, "status.txt"),
+            file_map=os.path.join(temp, "mapping.txt"),
+            threshold_size=1000, fLOG=noLOG,
+            algo=self._algo(), **kwargs)
+
+    def test_backup_pipeline(self):
+        for processes in [False, True]:
+            temp = get_temp_folder(
+                __file__, "temp_backup_pipeline_%d" % processes)
+            root, contents = self._make_files(temp)
+            api = MockTransferAPI()
+            enc = self._backup(temp, root, api)
+            done, issues = enc.start_transfering(
+                workers=2, transfers=3, processes=processes, max_pending=4)
+            self.assertEmpty(issues)
+            self.assertEqual(len(done), len(contents))
+            enc.load_mapping()
+            for name, data in contents.items():
+                self.assertEqual(
+                    len(enc.Mapping[name].pieces), (len(data) + 999) // 1000)
+                self.assertNotIn(None, enc.Mapping[name].pieces)
+                restored = enc.retrieve(
+                    name, filename=os.path.join(temp, "restored", name))
+                with open(restored, "rb") as f:
+                    self.assertEqual(f.read(), data)
+
+            # nothing changed
+            done, issues = enc.start_transfering(workers=2)
+            self.assertEmpty(done)
+
+    def test_backup_pipeline_issues(self):
+        temp = get_temp_folder(__file__, "temp_backup_pipeline_issues")
+        root, contents = self._make_files(temp, n=6)
+        api = FailingTransferAPI(fail=7)
+        enc = self._backup(temp, root, api)
+        done, issues = enc.start_transfering(workers=2, transfers=2)
+        self.assertNotEmpty(issues)
+        failed = set(i[0] for i in issues)
+        self.assertEqual(set(done) | failed, set(contents))
+        enc.load_mapping()
+        self.assertEqual(set(enc.Mapping), set(done))
+        for name in done:
+            self.assertNotIn(None, enc.Mapping[name].pieces)
+
+        # the failed files are transferred again
+        api.fail = None
+        done2, issues = enc.start_transfering(workers=2, transfers=2)
+        self.assertEmpty(issues)
+        self.assertEqual(set(done2), failed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+@brief      test log(time=3s)
+"""
+import os
+import io
+import tarfile
+import unittest
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.loghelper import sys_path_append
+from pyquickhelper.filehelper import (
+    ArchiveMember, ArchiveMembers, zip_files, gzip_files, unzip_files,
+    ungzip_files, untar_files)
+
+with sys_path_append(os.path.dirname(__file__)):
+    from compression_test_helper import make_files, read_file
+
+
+class TestCompressionExtract(ExtTestCase):
+
+    def make_files(self, temp):
+        src = os.path.join(temp, "src")
+        return src, make_files(src, [10, 70000, 300000, 5], subfolders=2)
+
+    def test_unzip_fvalid_workers(self):
+        temp = get_temp_folder(__file__, "temp_compression_extract_unzip")
+        src, names = self.make_files(temp)
+        content = zip_files(None, names, root=src, compresslevel=6)
+        for workers in [None, 3]:
+            dest = os.path.join(temp, "dest%s" % workers)
+            seen = []
+
+            def fvalid(zname, local):
+                # nothing is extracted before every member is checked
+                self.assertFalse(os.path.exists(dest))
+                seen.append(zname)
+                return "f2" not in zname
+
+            files = unzip_files(content, where_to=dest, fvalid=fvalid,
+                                workers=workers, chunk_size=1000)
+            self.assertEqual(len(seen), 4)
+            self.assertEqual([os.path.split(f)[-1] for f in files],
+                             ["f0.txt", "f1.txt", "f3.txt"])
+            for f in files:
+                rel = os.path.relpath(f, dest)
+                self.assertEqual(read_file(f),
+                                 read_file(os.path.join(src, rel)))
+
+        res = unzip_files(content, fvalid=lambda z, local: local is None and "f1" in z,
+                          workers=2)
+        self.assertEqual(len(res), 1)
+        self.assertEqual(res[0][1], read_file(names[1]))
+
+    def test_unzip_lazy(self):
+        temp = get_temp_folder(__file__, "temp_compression_extract_lazy")
+        src, names = self.make_files(temp)
+        content = zip_files(None, names, root=src, workers=2)
+        res = unzip_files(content, lazy=True)
+        self.assertEqual(len(res), 4)
+        name, member = res[2]
+        self.assertIsInstance(member, ArchiveMember)
+        self.assertEqual(member.size, os.stat(names[2]).st_size)
+        self.assertIn("f2.txt", repr(member))
+        with member.open() as f:
+            self.assertEqual(f.readline(), b"line 2\n")
+            self.assertEqual(f.read(), read_file(names[2])[7:])
+        self.assertEqual(res[0][1].read(), read_file(names[0]))
+        self.assertRaise(lambda: unzip_files(content, where_to=temp, lazy=True),
+                         ValueError)
+
+        # the archive stays open until the list is closed
+        zname = os.path.join(temp, "lazy.zip")
+        zip_files(zname, names, root=src)
+        with unzip_files(zname, lazy=True) as res:
+            self.assertIsInstance(res, ArchiveMembers)
+            self.assertEqual(res[1][1].read(), read_file(names[1]))
+            fp = res._owners[-1]
+            self.assertFalse(fp.closed)
+        self.assertTrue(fp.closed)
+        self.assertRaise(lambda: res[1][1].read(), ValueError)
+
+        content = gzip_files(None, names)
+        res = ungzip_files(content, lazy=True, fvalid=lambda z, local: "f3" in z)
+        self.assertEqual(len(res), 1)
+        self.assertEqual(res[0][1].read(), read_file(names[3]))
+        res.close()
+        dest = os.path.join(temp, "dest")
+        files = ungzip_files(content, where_to=dest, workers=2,
+                             fvalid=lambda z, local: "f0" in z)
+        self.assertEqual(len(files), 1)
+        self.assertEqual(read_file(files[0]), read_file(names[0]))
+
+    def test_untar(self):
+        temp = get_temp_folder(__file__, "temp_compression_extract_tar")
+        src, names = self.make_files(temp)
+        for mode in ["w", "w:gz"]:
+            b = io.BytesIO()
+            with tarfile.open(fileobj=b, mode=mode) as tar:
+                tar.add(src, arcname="src")
+            content = b.getvalue()
+
+            res = untar_files(content, fvalid=lambda n, local: "f2" not in n)
+            self.assertEqual(len(res), 3)
+            self.assertEqual(dict(res)["src/sub1/f1.txt"], read_file(names[1]))
+
+            res = untar_files(content, lazy=True)
+            self.assertEqual(len(res), 4)
+            self.assertEqual(dict(res)["src/sub0/f2.txt"].read(),
+                             read_file(names[2]))
+
+            for workers in [None, 3]:
+                dest = os.path.join(temp, "dest%s%s" % (
+                    mode.replace(":", ""), workers))
+                files = untar_files(content, where_to=dest, workers=workers,
+                                    fvalid=lambda n, local: "f3" not in n)
+                self.assertIn(os.path.join(dest, "src", "sub0"), files)
+                self.assertNotIn(os.path.join(dest, "src", "sub1", "f3.txt"),
+                                 files)
+                self.assertEqual(len(files), 6)
+                self.assertNotExists(os.path.join(dest, "src", "sub1", "f3.txt"))
+                self.assertEqual(
+                    read_file(os.path.join(dest, "src", "sub0", "f2.txt")),
+                    read_file(names[2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+@brief      test log(time=3s)
+"""
+import os
+import io
+import gzip
+import zipfile
+import unittest
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.loghelper import sys_path_append
+from pyquickhelper.filehelper import (
+    ParallelZipWriter, ParallelGzipWriter, pgzip_file, zip_files,
+    gzip_files, unzip_files, ungzip_files)
+import pyquickhelper.filehelper.compression_parallel as cp
+
+with sys_path_append(os.path.dirname(__file__)):
+    from compression_test_helper import make_files, read_file
+
+
+class TestCompressionParallel(ExtTestCase):
+
+    def make_files(self, temp):
+        return make_files(temp, [0, 10, 70000, 300000], random=True)
+
+    def test_zip_writer(self):
+        temp = get_temp_folder(__file__, "temp_compression_parallel_zip")
+        names = self.make_files(temp)
+        for workers in [1, 3]:
+            for level in [0, 6]:
+                b = io.BytesIO()
+                with ParallelZipWriter(b, compresslevel=level, workers=workers,
+                                       block_size=2 ** 14) as zf:
+                    for name in names:
+                        zf.write(name, os.path.split(name)[-1])
+                    zf.writestr("dir/été.txt", "ü")
+                with zipfile.ZipFile(io.BytesIO(b.getvalue())) as zf:
+                    self.assertEmpty(zf.testzip())
+                    for name in names:
+                        self.assertEqual(zf.read(os.path.split(name)[-1]),
+                                         read_file(name))
+                    self.assertEqual(zf.read("dir/été.txt"),
+                                     "ü".encode("utf-8"))
+        self.assertRaise(lambda: ParallelZipWriter(io.BytesIO()).write(temp),
+                         ValueError)
+
+    def test_zip_writer_zip64(self):
+        limit = cp._ZIP64_LIMIT
+        try:
+            cp._ZIP64_LIMIT = 1000
+            b = io.BytesIO()
+            with ParallelZipWriter(b, workers=2, block_size=500) as zf:
+                for i in range(3):
+                    zf.writestr("f%d" % i, bytes(range(256)) * 20)
+        finally:
+            cp._ZIP64_LIMIT = limit
+        with zipfile.ZipFile(b) as zf:
+            self.assertEmpty(zf.testzip())
+            self.assertEqual(zf.read("f2"), bytes(range(256)) * 20)
+
+    def test_gzip_writer(self):
+        temp = get_temp_folder(__file__, "temp_compression_parallel_gzip")
+        names = self.make_files(temp)
+        for workers in [1, 3]:
+            dest = pgzip_file(names[-1], os.path.join(temp, "out%d.gz" % workers),
+                              workers=workers, block_size=2 ** 14)
+            with gzip.open(dest, "rb") as f:
+                self.assertEqual(f.read(), read_file(names[-1]))
+        b = io.BytesIO()
+        with ParallelGzipWriter(b, workers=2, block_size=100) as g:
+            g.write(b"abc")
+            g.write(b"d" * 1000)
+        self.assertEqual(gzip.decompress(b.getvalue()), b"abc" + b"d" * 1000)
+        b = io.BytesIO()
+        with ParallelGzipWriter(b, workers=2):
+            pass
+        self.assertEqual(gzip.decompress(b.getvalue()), b"")
+
+    def test_zip_gzip_files(self):
+        temp = get_temp_folder(__file__, "temp_compression_parallel_files")
+        names = self.make_files(temp)
+        for workers in [None, 2]:
+            content = zip_files(None, names, root=temp, workers=workers,
+                                compresslevel=6)
+            res = dict(unzip_files(content))
+            self.assertEqual(res["f3.txt"], read_file(names[-1]))
+            content = gzip_files(None, names, workers=workers)
+            res = ungzip_files(content)
+            self.assertEqual(len(res), 4)
+            self.assertEqual(res[-1][1], read_file(names[-1]))
+        dest = os.path.join(temp, "out.zip.gz")
+        gzip_files(dest, names, workers=2)
+        files = ungzip_files(read_file(dest), where_to=temp)
+        self.assertEqual(len(files), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+@brief      test tree node (time=2s)
+"""
+
+import os
+import random
+import unittest
+from io import BytesIO
+
+from pyquickhelper.loghelper import noLOG
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.filehelper import EncryptedBackup, FileTreeNode
+from pyquickhelper.filehelper.content_chunking import (
+    iter_cdc_chunks, cdc_parameters)
+from pyquickhelper.filehelper.transfer_api import (
+    MockTransferAPI, TransferAPI_FileInfo, TransferAPI)
+
+
+class CountingTransferAPI(MockTransferAPI):
+
+    def __init__(self):
+        MockTransferAPI.__init__(self)
+        self.sent = 0
+
+    def transfer(self, path, data):
+        if path != "__mapping__":
+            self.sent += len(data)
+        return MockTransferAPI.transfer(self, path, data)
+
+
+class TestContentChunking(ExtTestCase):
+
+    def _data(self, size, seed=0):
+        rnd = random.Random(seed)
+        return bytes(rnd.getrandbits(8) for i in range(size))
+
+    def test_chunks(self):
+        data = self._data(200000)
+        params = cdc_parameters(4096)
+        chunks = list(iter_cdc_chunks(BytesIO(data), avg_size=4096))
+        self.assertEqual(b"".join(chunks), data)
+        for c in chunks[:-1]:
+            self.assertGreaterEqual(len(c), params["min_size"])
+            self.assertLessEqual(len(c), params["max_size"])
+        self.assertGreater(len(chunks), 20)
+        self.assertEqual(list(iter_cdc_chunks(BytesIO(b""))), [])
+        self.assertRaise(lambda: cdc_parameters(10), ValueError)
+
+        # a constant sequence is cut every max_size bytes
+        chunks = list(iter_cdc_chunks(BytesIO(b"\x00" * 5000), avg_size=256))
+        self.assertEqual([len(c) for c in chunks], [1024] * 4 + [904])
+
+    def test_chunks_insertion(self):
+        data = self._data(200000)
+        before = set(iter_cdc_chunks(BytesIO(data), avg_size=4096))
+        modified = data[:100000] + b"inserted" + data[100000:]
+        after = list(iter_cdc_chunks(BytesIO(modified), avg_size=4096))
+        self.assertEqual(b"".join(after), modified)
+        new = [c for c in after if c not in before]
+        self.assertLess(len(new), 3)
+        self.assertLess(sum(map(len, new)), 4096 * 8)
+
+    def test_file_info_chunks(self):
+        info = TransferAPI_FileInfo("a", [], None, chunks=[])
+        info.add_piece("p1", "c1")
+        self.assertEqual(info.chunks, ["c1"])
+        info2 = TransferAPI_FileInfo("b", ["p2"], None)
+        info2.add_piece("p3", "c3")
+        self.assertEqual(info2.chunks, None)
+        import datetime
+        info.last_update = info2.last_update = datetime.datetime(2020, 1, 2)
+        mapping = TransferAPI.bytes2mapping(
+            TransferAPI.mapping2bytes({"a": info, "b": info2}))
+        self.assertEqual(mapping["a"].chunks, ["c1"])
+        self.assertEqual(mapping["b"].chunks, None)
+        self.assertEqual(mapping["b"].pieces, ["p2", "p3"])
+
+    def test_backup_cdc(self):
+        try:
+            import Crypto as skip_
+            algo = "AES"
+        except ImportError:
+            algo = "fernet"
+
+        temp = get_temp_folder(__file__, "temp_backup_cdc")
+        root = os.path.join(temp, "src")
+        os.makedirs(root)
+        name = os.path.join(root, "data.bin")
+        data = self._data(100000)
+        with open(name, "wb") as f:
+            f.write(data)
+
+        api = CountingTransferAPI()
+
+        def backup():
+            enc = EncryptedBackup(
+                key=b"unit" * 8, file_tree_node=FileTreeNode(root),
+                transfer_api=api, root_local=root,
+                file_status=os.path.join(temp, "status.txt"),
+                file_map=os.path.join(temp, "mapping.txt"),
+                threshold_size=4096, chunking="cdc", compression=None,
+                fLOG=noLOG, algo=algo)
+            api.sent = 0
+            done, issue = enc.start_transfering()
+            self.assertEqual(done, ["data.bin"])
+            self.assertEmpty(issue)
+            return enc
+
+        backup()
+        self.assertGreater(api.sent, len(data))
+
+        modified = b"new" + data
+        with open(name, "wb") as f:
+            f.write(modified)
+        enc = backup()
+        self.assertLess(api.sent, 4096 * 8)
+        enc.load_mapping()
+        self.assertEqual(len(enc.Mapping["data.bin"].chunks),
+                         len(enc.Mapping["data.bin"].pieces))
+        restored = enc.retrieve("data.bin", filename=os.path.join(temp, "r.bin"))
+        with open(restored, "rb") as f:
+            self.assertEqual(f.read(), modified)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,14 +7,17 @@ import sys
 import os
 import unittest
 import warnings
+import mmap
 
 from pyquickhelper.loghelper import fLOG
-from pyquickhelper.pycode import get_temp_folder
+from pyquickhelper.pycode import get_temp_folder, ExtTestCase
 from pyquickhelper.filehelper import encrypt_stream, decrypt_stream
+from pyquickhelper.filehelper.encryption import (
+    encrypt_aes_stream, decrypt_aes_stream, encrypted_size, EncryptionError)
 from io import BytesIO as StreamIO
 
 
-class TestEncryption(unittest.TestCase):
+class TestEncryption(ExtTestCase):
 
     def test_encryption_file(self):
         fLOG(
@@ -203,6 +206,71 @@ class TestEncryption(unittest.TestCase):
         assert r3 is None
         self.assertNotEqual(infile.getvalue(), outdec2.getvalue())
 
+    def test_encryption_aes_stream(self):
+        try:
+            import Cryptodome as skip___
+        except ImportError:
+            warnings.warn("pycryptodomex is not installed")
+            return
+
+        temp = get_temp_folder(__file__, "temp_encryption_aes_stream")
+        key = b"key0" * 4
+        data = bytes(list(i % 251 for i in range(0, 10000)))
+        infile = os.path.join(temp, "data.bin")
+        with open(infile, "wb") as f:
+            f.write(data)
+
+        for algo in ["AES-GCM", "AES-CTR"]:
+            size = encrypted_size(len(data), algo)
+            # bytes, memoryview, file, stream
+            enc = encrypt_aes_stream(key, data, algo=algo)
+            self.assertEqual(len(enc), size)
+            self.assertEqual(
+                decrypt_aes_stream(key, memoryview(enc), algo=algo), data)
+            outfile = os.path.join(temp, "data.%s.enc" % algo)
+            self.assertIsNone(encrypt_aes_stream(
+                key, infile, outfile, algo=algo, chunksize=999))
+            self.assertEqual(os.path.getsize(outfile), size)
+            outdec = StreamIO()
+            with open(outfile, "rb") as f:
+                self.assertIsNone(decrypt_aes_stream(
+                    key, f, outdec, algo=algo, chunksize=1000))
+            self.assertEqual(outdec.getvalue(), data)
+
+            # mmap input, preallocated output
+            buffer = bytearray(size + 10)
+            with open(infile, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    n = encrypt_aes_stream(key, m, buffer, algo=algo)
+            self.assertEqual(n, size)
+            dec = bytearray(len(data))
+            self.assertEqual(decrypt_aes_stream(
+                key, memoryview(buffer)[:n], dec, algo=algo), len(data))
+            self.assertEqual(dec, data)
+            self.assertRaise(lambda: encrypt_aes_stream(
+                key, data, bytearray(10), algo=algo), EncryptionError)
+
+            # through encrypt_stream
+            enc = encrypt_stream(key, data, algo=algo, chunksize=None)
+            self.assertEqual(decrypt_stream(key, enc, algo=algo), data)
+            self.assertEqual(decrypt_aes_stream(
+                key, encrypt_aes_stream(key, b"", algo=algo), algo=algo), b"")
+
+        # modified data
+        enc = encrypt_aes_stream(key, data)
+        enc[100] ^= 1
+        self.assertRaise(lambda: decrypt_aes_stream(key, enc), EncryptionError)
+        self.assertRaise(lambda: decrypt_aes_stream(key, enc[:-1]),
+                         EncryptionError)
+        decfile = os.path.join(temp, "modified.dec")
+        self.assertRaise(lambda: decrypt_aes_stream(key, enc, decfile),
+                         EncryptionError)
+        self.assertFalse(os.path.exists(decfile))
+        self.assertRaise(lambda: decrypt_aes_stream(
+            b"key1" * 4, encrypt_aes_stream(key, data)), EncryptionError)
+        self.assertRaise(lambda: encrypt_aes_stream(
+            key, data, algo="AES-ECB"), ValueError)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,139 @@
+"""
+@brief      test tree node (time=1s)
+"""
+
+import os
+import hashlib
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pyquickhelper.loghelper import noLOG
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.filehelper import (
+    FileHasher, FileTreeNode, checksum_md5, synchronize_folder,
+    TransferAPIFile, TransferAPIFtp)
+from pyquickhelper.filehelper.file_hash import hash_file, hash_bytes
+from pyquickhelper.filehelper.files_status import FilesStatus
+from pyquickhelper.filehelper.transfer_api import MockTransferAPI
+
+
+class TestFileHash(ExtTestCase):
+
+    def _write(self, name, data):
+        with open(name, "wb") as f:
+            f.write(data)
+        return name
+
+    def test_hash_file(self):
+        temp = get_temp_folder(__file__, "temp_hash_file")
+        data = bytes(range(256)) * 5000
+        name = self._write(os.path.join(temp, "data.bin"), data)
+        empty = self._write(os.path.join(temp, "empty.bin"), b"")
+        for algo in ["md5", "sha256", "blake2b"]:
+            exp = hashlib.new(algo, data).hexdigest()
+            self.assertEqual(hash_file(name, algo), exp)
+            self.assertEqual(hash_file(name, algo, mmap_threshold=1000), exp)
+            self.assertEqual(hash_file(name, algo, block_size=777), exp)
+            self.assertEqual(hash_bytes(data, algo), exp)
+            self.assertEqual(hash_file(empty, algo), hashlib.new(algo).hexdigest())
+        self.assertEqual(checksum_md5(name), hashlib.md5(data).hexdigest())
+        self.assertRaise(lambda: hash_file(name, "unknown"), ValueError)
+
+    def test_file_hasher(self):
+        temp = get_temp_folder(__file__, "temp_file_hasher")
+        data = bytes(range(256)) * 5000
+        n1 = self._write(os.path.join(temp, "a.bin"), data)
+        n2 = self._write(os.path.join(temp, "b.bin"), data)
+        n3 = self._write(os.path.join(temp, "c.bin"),
+                         data[:-1] + b"\x00")
+        n4 = self._write(os.path.join(temp, "d.bin"),
+                         data[:600000] + b"\x00" + data[600001:])
+
+        hasher = FileHasher("blake2b", prefilter_size=1024)
+        self.assertTrue(hasher.same_content(n1, n2))
+        self.assertEqual(hasher.nb_hashed, 2)
+        self.assertFalse(hasher.same_content(n1, n3))
+        # the signatures are different, files are not hashed
+        self.assertEqual(hasher.nb_hashed, 2)
+        self.assertFalse(hasher.same_content(n1, n4))
+        self.assertEqual(hasher.nb_hashed, 3)
+        self.assertTrue(hasher.same_content(n1, n2))
+        self.assertEqual(hasher.nb_hashed, 3)
+
+        ch = hasher.checksum(n1)
+        self.assertTrue(ch.startswith("blake2b:"))
+        self.assertEqual(FileHasher.split_checksum(ch)[1],
+                         hashlib.blake2b(data).hexdigest())
+        md5 = hasher.checksum(n1, algo="md5")
+        self.assertEqual(md5, hashlib.md5(data).hexdigest())
+        self.assertEqual(hasher.checksum_like(n2, md5), md5)
+
+    def test_file_hasher_threads(self):
+        temp = get_temp_folder(__file__, "temp_file_hasher_threads")
+        names = [self._write(os.path.join(temp, "f%d.bin" % i), b"%d" % i * 1000)
+                 for i in range(20)]
+        hasher = FileHasher(memo_size=5)
+        with ThreadPoolExecutor(4) as executor:
+            res = list(executor.map(hasher.hash_file, names * 3))
+        self.assertEqual(res[:20], [hashlib.md5(b"%d" % i * 1000).hexdigest()
+                                    for i in range(20)])
+        self.assertEqual(len(hasher), 5)
+        self.assertGreaterEqual(hasher.nb_hashed, 20)
+        nb = hasher.nb_hashed
+        hasher.hash_file(names[-1])
+        self.assertEqual(hasher.nb_hashed, nb)
+        hasher.hash_file(names[0])
+        self.assertEqual(hasher.nb_hashed, nb + 1)
+        hasher.clear()
+        self.assertEqual(len(hasher), 0)
+
+    def test_file_status_hasher(self):
+        temp = get_temp_folder(__file__, "temp_file_status_hasher")
+        name = self._write(os.path.join(temp, "a.bin"), b"abc" * 100)
+        status = os.path.join(temp, "status.txt")
+        st = FilesStatus(status)
+        st.update_copied_file(name)
+        st.save_dates()
+
+        # md5 checksums are still read with another algorithm
+        hasher = FileHasher("sha256")
+        st = FilesStatus(status, hasher=hasher)
+        os.utime(name, (0, 0))
+        self.assertFalse(st.has_been_modified_and_reason(name)[0])
+        info = st.update_copied_file(name)
+        self.assertTrue(info.checksum.startswith("sha256:"))
+        self.assertEqual(hasher.nb_hashed, 2)
+
+    def test_synchronize_hash_algo(self):
+        temp = get_temp_folder(__file__, "temp_synchronize_hash_algo")
+        src = os.path.join(temp, "src")
+        dest = os.path.join(temp, "dest")
+        os.makedirs(src)
+        os.makedirs(dest)
+        self._write(os.path.join(src, "a.bin"), b"a" * 100)
+        self._write(os.path.join(dest, "a.bin"), b"a" * 100)
+        self._write(os.path.join(src, "b.bin"), b"b" * 100)
+        os.utime(os.path.join(dest, "a.bin"), (0, 0))
+        a = synchronize_folder(src, dest, hash_algo="sha256",
+                               fLOG=noLOG)
+        self.assertEqual(len(a), 1)
+        n1 = FileTreeNode(src)
+        n2 = FileTreeNode(dest)
+        diff = n1.difference(n2, hasher=FileHasher("sha256"))
+        self.assertEqual([d[0] for d in diff], ["==", "=="])
+
+    def test_transfer_api_hash(self):
+        api = MockTransferAPI()
+        self.assertEqual(api.checksum(b"a"), hashlib.md5(b"a").hexdigest())
+        api = MockTransferAPI(hash_algo="sha256")
+        self.assertEqual(api.get_remote_path(b"a", "n").split("_")[1],
+                         hashlib.sha256(b"a").hexdigest())
+        api = TransferAPIFile(get_temp_folder(__file__, "temp_transfer_api_hash"),
+                              hash_algo="sha256")
+        self.assertEqual(api.checksum(b"a"), hashlib.sha256(b"a").hexdigest())
+        api = TransferAPIFtp(None, None, None, hash_algo="sha256")
+        self.assertEqual(api.checksum(b"a"), hashlib.sha256(b"a").hexdigest())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+@brief      test tree node (time=1s)
+"""
+
+import os
+import time
+import unittest
+
+from pyquickhelper.loghelper import noLOG
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.filehelper import FileTreeNode, FileScanIndex, synchronize_folder
+
+TREE = [os.path.join(sub, "f%d.txt" % i)
+        for sub in ["a", os.path.join("a", "b"), "c"] for i in range(3)]
+
+
+class TestFileScanIndex(ExtTestCase):
+
+    def _make_tree(self, temp):
+        src = os.path.join(temp, "src")
+        for name in TREE:
+            os.makedirs(os.path.dirname(os.path.join(src, name)), exist_ok=True)
+            with open(os.path.join(src, name), "w") as f:
+                f.write("content " + name)
+        return src
+
+    def test_scan_index(self):
+        temp = get_temp_folder(__file__, "temp_scan_index")
+        src = self._make_tree(temp)
+        name = os.path.join(temp, "index.pkl")
+
+        index = FileScanIndex(name)
+        node = FileTreeNode(src, scan_index=index)
+        index.save()
+        self.assertExists(name)
+        self.assertEqual(index.nb_listed, 4)
+        self.assertEqual(index.nb_reused, 0)
+        files = sorted(n.name for n in node if n.isfile())
+        self.assertEqual(len(files), 9)
+        hashes = {n.name: n.hash_md5_readfile() for n in node if n.isfile()}
+        index.save()
+
+        index2 = FileScanIndex(name)
+        self.assertEqual(len(index2), 4)
+        node2 = FileTreeNode(src, scan_index=index2)
+        self.assertEqual(index2.nb_listed, 0)
+        self.assertEqual(index2.nb_reused, 4)
+        files2 = sorted(n.name for n in node2 if n.isfile())
+        self.assertEqual(files, files2)
+        d1 = node.get_dict()
+        d2 = node2.get_dict()
+        for k, v in d1.items():
+            self.assertEqual(v.size, d2[k].size)
+            self.assertEqual(v.date, d2[k].date)
+            self.assertEqual(v.type, d2[k].type)
+        for n in node2:
+            if n.isfile():
+                self.assertEqual(n._entry.hash, hashes[n.name])
+
+        # a new file in a subfolder
+        time.sleep(0.01)
+        with open(os.path.join(src, "a", "b", "new.txt"), "w") as f:
+            f.write("new")
+        index3 = FileScanIndex(name)
+        node3 = FileTreeNode(src, scan_index=name)
+        self.assertEqual(len(node3), len(node) + 1)
+        node4 = FileTreeNode(src, scan_index=index3)
+        self.assertEqual(index3.nb_listed, 1)
+        self.assertEqual(index3.nb_reused, 3)
+        self.assertIn(os.path.join("a", "b", "new.txt"), node4.get_dict())
+
+    def test_scan_index_no_trust(self):
+        temp = get_temp_folder(__file__, "temp_scan_index_no_trust")
+        src = self._make_tree(temp)
+        name = os.path.join(temp, "index.pkl")
+        FileTreeNode(src, scan_index=name)
+
+        modified = os.path.join(src, "c", "f1.txt")
+        with open(modified, "w") as f:
+            f.write("modified content")
+        index = FileScanIndex(name, trust_mtime=False)
+        node = FileTreeNode(src, scan_index=index)
+        self.assertEqual(index.nb_listed, 0)
+        self.assertEqual(node.get_dict()[os.path.join("c", "f1.txt")].size,
+                         len("modified content"))
+
+    def test_synchronize_scan_index(self):
+        temp = get_temp_folder(__file__, "temp_synchronize_scan_index")
+        src = self._make_tree(temp)
+        dest = os.path.join(temp, "dest")
+        os.makedirs(dest)
+        name1 = os.path.join(temp, "index1.pkl")
+        name2 = os.path.join(temp, "index2.pkl")
+        a = synchronize_folder(src, dest, scan_index1=name1,
+                               scan_index2=name2, fLOG=noLOG)
+        self.assertEqual(len(a), 9)
+        self.assertExists(name1)
+        self.assertExists(name2)
+        self.assertExists(os.path.join(dest, "a", "b", "f2.txt"))
+        b = synchronize_folder(src, dest, scan_index1=name1,
+                               scan_index2=name2, fLOG=noLOG)
+        self.assertEqual(len(b), 0)
+
+        # a file modified in place leaves the modification time
+        # of its folder unchanged
+        modified = os.path.join("c", "f1.txt")
+        with open(os.path.join(src, modified), "w") as f:
+            f.write("modified in place")
+        c = synchronize_folder(src, dest, scan_index1=name1,
+                               scan_index2=name2, fLOG=noLOG)
+        self.assertEqual(len(c), 1)
+        with open(os.path.join(dest, modified), "r") as f:
+            self.assertEqual(f.read(), "modified in place")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+@brief      test tree node (time=1s)
+"""
+
+import os
+import unittest
+
+from pyquickhelper.loghelper import noLOG
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.filehelper import synchronize_folder
+from pyquickhelper.filehelper.files_status import FilesStatus
+from pyquickhelper.filehelper.files_status_storage import (
+    JournalFilesStatusStorage, SqliteFilesStatusStorage)
+
+
+class TestFilesStatusStorage(ExtTestCase):
+
+    def _check(self, st, names):
+        self.assertEqual(len(st.copyFiles), len(names))
+        for name in names:
+            self.assertFalse(st.has_been_modified_and_reason(name)[0])
+        self.assertEqual(sorted(a for a, _ in st), sorted(names))
+
+    def test_storage(self):
+        temp = get_temp_folder(__file__, "temp_files_status_storage")
+        names = [os.path.join(temp, "f%d.txt" % i) for i in range(10)]
+        for i, name in enumerate(names):
+            with open(name, "w") as f:
+                f.write("content %d" % i)
+        for storage in ['text', 'journal', 'sqlite']:
+            status = os.path.join(temp, "status_%s.txt" % storage)
+            st = FilesStatus(status, storage=storage)
+            for name in names:
+                self.assertTrue(st.has_been_modified_and_reason(name)[0])
+                st.update_copied_file(name)
+                st.save_dates()
+            st.update_copied_file(names[0], delete=True)
+            st.save_dates()
+            st.close()
+            st = FilesStatus(status, storage=storage)
+            self._check(st, names[1:])
+            self.assertEqual(len(list(st.difference([], u4=True))), 9)
+            st.close()
+
+    def test_storage_migration(self):
+        temp = get_temp_folder(__file__, "temp_files_status_migration")
+        names = [os.path.join(temp, "f%d.txt" % i) for i in range(10)]
+        for i, name in enumerate(names):
+            with open(name, "w") as f:
+                f.write("content %d" % i)
+        status = os.path.join(temp, "status.txt")
+        st = FilesStatus(status)
+        for name in names:
+            st.update_copied_file(name)
+        st.save_dates()
+
+        st = FilesStatus(status, storage='journal')
+        self._check(st, names)
+        st.update_copied_file(names[2], delete=True)
+        st.save_dates()
+        st.close()
+        self.assertExists(status + ".journal")
+        st = FilesStatus(status, storage='journal')
+        self._check(st, names[:2] + names[3:])
+        st.copyFiles.compact()
+        self.assertNotExists(status + ".journal")
+        st = FilesStatus(status)
+        self._check(st, names[:2] + names[3:])
+
+        st = FilesStatus(status, storage='sqlite')
+        self._check(st, names[:2] + names[3:])
+        st.close()
+        self.assertExists(status + ".bak")
+        self.assertTrue(SqliteFilesStatusStorage.is_sqlite(status))
+
+    def test_journal_torn_line(self):
+        temp = get_temp_folder(__file__, "temp_files_status_torn_line")
+        names = [os.path.join(temp, "f%d.txt" % i) for i in range(3)]
+        for i, name in enumerate(names):
+            with open(name, "w") as f:
+                f.write("content %d" % i)
+        status = os.path.join(temp, "status.txt")
+        st = FilesStatus(status, storage='journal')
+        st.update_copied_file(names[0])
+        st.save_dates()
+        st.close()
+
+        # a process was interrupted while writing a record
+        with open(status + ".journal", "a", encoding="utf8") as f:
+            f.write("+\t%s\t9\t2020-01-" % names[1])
+        st = FilesStatus(status, storage='journal')
+        self._check(st, names[:1])
+        st.update_copied_file(names[2])
+        st.save_dates()
+        st.close()
+        st = FilesStatus(status, storage='journal')
+        self._check(st, [names[0], names[2]])
+        st.close()
+
+    def test_journal_compaction(self):
+        temp = get_temp_folder(__file__, "temp_files_status_compaction")
+        names = [os.path.join(temp, "f%d.txt" % i) for i in range(10)]
+        for i, name in enumerate(names):
+            with open(name, "w") as f:
+                f.write("content %d" % i)
+        status = os.path.join(temp, "status.txt")
+        storage = JournalFilesStatusStorage(status, compact_min=5)
+        st = FilesStatus(status, storage=storage)
+        for name in names:
+            st.update_copied_file(name)
+            st.save_dates()
+        self.assertLess(storage._journal_size, 6)
+        st.close()
+        st = FilesStatus(status, storage='journal')
+        self._check(st, names)
+        st.close()
+
+        # a journal left too big is compacted when it is opened
+        storage = JournalFilesStatusStorage(status, compact_min=1000)
+        st = FilesStatus(status, storage=storage)
+        for name in names:
+            st.update_copied_file(name, delete=True)
+            st.update_copied_file(name)
+            st.save_dates()
+        st.close()
+        self.assertGreater(storage._journal_size, 20)
+        storage = JournalFilesStatusStorage(status, compact_min=5)
+        self.assertEqual(storage._journal_size, 0)
+        self.assertNotExists(status + ".journal")
+        st = FilesStatus(status, storage=storage)
+        self._check(st, names)
+        st.close()
+
+    def test_synchronize_sqlite(self):
+        temp = get_temp_folder(__file__, "temp_files_status_sync_sqlite")
+        src = os.path.join(temp, "src")
+        dest = os.path.join(temp, "dest")
+        os.makedirs(src)
+        os.makedirs(dest)
+        for i in range(10):
+            with open(os.path.join(src, "f%d.txt" % i), "w") as f:
+                f.write("content %d" % i)
+        status = FilesStatus(os.path.join(temp, "status.db"), storage='sqlite')
+        a = synchronize_folder(src, dest, file_date=status, fLOG=noLOG)
+        self.assertEqual(len(a), 10)
+        b = synchronize_folder(src, dest, file_date=status, fLOG=noLOG)
+        self.assertEqual(len(b), 0)
+        status.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+@brief      test log(time=2s)
+"""
+
+import os
+import unittest
+
+from pyquickhelper.pycode import get_temp_folder, ExtTestCase
+from pyquickhelper.filehelper import FileTreeNode, FolderTransferFTP
+from pyquickhelper.filehelper.ftp_transfer_mock import MockTransferFTP
+from pyquickhelper.filehelper.ftp_transfer_pool import TransferFTPPool
+
+
+class TestFolderTransferParallel(ExtTestCase):
+
+    def _make_files(self, temp):
+        root = os.path.join(temp, "src")
+        contents = {}
+        for i in range(12):
+            name = "sub%d/f%d.bin" % (i % 3, i)
+            os.makedirs(os.path.join(root, "sub%d" % (i % 3)), exist_ok=True)
+            data = bytes([i]) * (100 * (i + 1))
+            with open(os.path.join(root, name), "wb") as f:
+                f.write(data)
+            contents["/www/" + name] = data
+        return root, contents
+
+    def test_folder_transfer_parallel(self):
+        temp = get_temp_folder(__file__, "temp_folder_transfer_parallel")
+        root, contents = self._make_files(temp)
+        store = {}
+        created = []
+
+        def factory():
+            ftp = MockTransferFTP("site", "login", "password")
+            ftp.store = store
+            created.append(ftp)
+            return ftp
+
+        fftp = FolderTransferFTP(FileTreeNode(root), factory(),
+                                 os.path.join(temp, "status.txt"),
+                                 root_web="/www")
+        done = fftp.start_transfering(workers=3, ftp_factory=factory,
+                                      batch_size=2)
+        self.assertEqual(len(done), len(contents))
+        self.assertEqual(store, contents)
+        self.assertEqual(sum(c.sent for c in created),
+                         sum(map(len, contents.values())))
+        self.assertGreater(len(created), 1)
+        self.assertLess(len(created), 5)
+        self.assertExists(os.path.join(temp, "status.txt"))
+        self.assertFalse(os.path.exists(
+            os.path.join(temp, "status.txt.partial")))
+
+        done = fftp.start_transfering(workers=3, ftp_factory=factory)
+        self.assertEmpty(done)
+
+        self.assertRaise(
+            lambda: FolderTransferFTP(
+                FileTreeNode(root), factory(),
+                os.path.join(temp, "status2.txt")).start_transfering(workers=2),
+            ValueError)
+
+    def test_folder_transfer_resume(self):
+        temp = get_temp_folder(__file__, "temp_folder_transfer_resume")
+        root, contents = self._make_files(temp)
+        big = os.path.join(root, "sub2", "f11.bin")
+        status = os.path.join(temp, "status.txt")
+        st = os.stat(big)
+        with open(status + ".partial", "w", encoding="utf8") as f:
+            f.write("{0}\t{1}\t{2}\n".format(big, st.st_size, st.st_mtime_ns))
+
+        ftp = MockTransferFTP("site", "login", "password")
+        # an interrupted transfer
+        ftp.store["/www/sub2/f11.bin"] = contents["/www/sub2/f11.bin"][:500]
+        pool = TransferFTPPool(lambda: ftp, size=1)
+        fftp = FolderTransferFTP(FileTreeNode(root), pool, status,
+                                 root_web="/www")
+        done = fftp.start_transfering(workers=1, resume_size=1000)
+        self.assertEqual(len(done), len(contents))
+        self.assertEqual(ftp.store, contents)
+        self.assertEqual(ftp.sent, sum(map(len, contents.values())) - 500)
+        self.assertFalse(os.path.exists(status + ".partial"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+@brief      test tree node (time=1s)
+"""
+
+import os
+import unittest
+
+from pyquickhelper.loghelper import noLOG
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.filehelper import FileTreeNode, synchronize_folder
+from pyquickhelper.filehelper.files_status import FilesStatus
+
+
+class TestSynchoWorkers(ExtTestCase):
+
+    def _make_tree(self, temp, n=120):
+        for i in range(n):
+            fold = os.path.join(temp, "d%d" % (i % 7))
+            if not os.path.exists(fold):
+                os.makedirs(fold)
+            with open(os.path.join(fold, "f%03d.txt" % i), "w") as f:
+                f.write("content %d" % i)
+
+    def test_difference_workers(self):
+        temp = get_temp_folder(__file__, "temp_difference_workers")
+        src = os.path.join(temp, "src")
+        dest = os.path.join(temp, "dest")
+        self._make_tree(src)
+        self._make_tree(dest, 60)
+        with open(os.path.join(dest, "d3", "f010.txt"), "w") as f:
+            f.write("content 11")
+        n1 = FileTreeNode(src)
+        n2 = FileTreeNode(dest)
+        exp = n1.difference(n2, hash_size=2 ** 20)
+        got = n1.difference(n2, hash_size=2 ** 20, workers=4)
+        self.assertEqual([r[:2] for r in exp], [r[:2] for r in got])
+        self.assertEqual([r[2:] for r in exp], [r[2:] for r in got])
+
+    def test_synchronize_workers(self):
+        temp = get_temp_folder(__file__, "temp_synchronize_workers")
+        src = os.path.join(temp, "src")
+        dest1 = os.path.join(temp, "dest1")
+        dest2 = os.path.join(temp, "dest2")
+        self._make_tree(src)
+        os.makedirs(dest1)
+        os.makedirs(dest2)
+        status1 = os.path.join(temp, "status1.txt")
+        status2 = os.path.join(temp, "status2.txt")
+
+        a = synchronize_folder(src, dest1, file_date=status1,
+                               fLOG=noLOG)
+        b = synchronize_folder(src, dest2, file_date=status2, workers=4,
+                               fLOG=noLOG)
+        self.assertEqual([(op, n.fullname) for op, n, _ in a],
+                         [(op, n.fullname) for op, n, _ in b])
+        self.assertEqual(len(b), 120)
+        for op, n, _ in b:
+            self.assertExists(os.path.join(dest2, n.name))
+        st = FilesStatus(status2)
+        self.assertEqual(len(list(st)), 120)
+        for _, info in st:
+            self.assertNotEmpty(info.checksum)
+
+        c = synchronize_folder(src, dest2, file_date=status2, workers=4,
+                               fLOG=noLOG)
+        self.assertEqual(len(c), 0)
+
+    def test_synchronize_workers_no_status(self):
+        temp = get_temp_folder(__file__, "temp_synchronize_workers_ns")
+        src = os.path.join(temp, "src")
+        dest = os.path.join(temp, "dest")
+        self._make_tree(src)
+        os.makedirs(dest)
+        a = synchronize_folder(src, dest, workers=3, fLOG=noLOG)
+        self.assertEqual(len(a), 120)
+        self.assertExists(os.path.join(dest, "d6", "f118.txt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
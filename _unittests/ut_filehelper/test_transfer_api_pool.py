@@ -0,0 +1,192 @@
+"""
+@brief      test log(time=2s)
+"""
+
+import io
+import os
+import time
+import asyncio
+import threading
+import unittest
+
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.filehelper import (
+    TransferAPIFtp, TransferAPIFile, AsyncTransferAPI)
+from pyquickhelper.filehelper.ftp_mock import MockTransferFTP
+from pyquickhelper.filehelper.ftp_transfer_pool import TransferFTPPool
+from pyquickhelper.filehelper.transfer_api import MockTransferAPI
+from pyquickhelper.filehelper.transfer_api_file import copy_file_fast
+
+
+class SlowTransferAPI(MockTransferAPI):
+
+    def __init__(self):
+        MockTransferAPI.__init__(self)
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def transfer(self, path, data):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+        return MockTransferAPI.transfer(self, path, data)
+
+
+class TestTransferAPIPool(ExtTestCase):
+
+    def test_transfer_many(self):
+        api = SlowTransferAPI()
+        items = [("f%d" % i, b"data%d" % i) for i in range(8)]
+        self.assertEqual(api.transfer_many(items, workers=4), [True] * 8)
+        self.assertGreater(api.max_running, 1)
+        self.assertEqual(api.retrieve_many(["f1", "f3"]), [b"data1", b"data3"])
+        self.assertEqual(api.retrieve_many(["f1", "none"], exc=False, workers=2),
+                         [b"data1", None])
+        self.assertRaise(lambda: api.retrieve_many(["none"]), KeyError)
+
+    def test_async(self):
+        api = SlowTransferAPI()
+        items = [("f%d" % i, b"data%d" % i) for i in range(8)]
+
+        async def main():
+            async with AsyncTransferAPI(api, max_workers=4) as aapi:
+                res = await aapi.transfer_many(items)
+                data = await aapi.retrieve_many([p for p, _ in items])
+                one = await aapi.retrieve("f2")
+            return res, data, one
+
+        res, data, one = asyncio.run(main())
+        self.assertEqual(res, [True] * 8)
+        self.assertEqual(data, [d for _, d in items])
+        self.assertEqual(one, b"data2")
+        self.assertGreater(api.max_running, 1)
+        self.assertLess(api.max_running, 5)
+
+    def test_ftp_pool(self):
+        api = TransferAPIFtp(None, None, None, pool_size=3)
+        self.assertEqual(len(api._pool), 1)
+        # the mock returns None
+        res = api.transfer_many([("setup.py", b"# ee")] * 6)
+        self.assertEqual(len(res), 6)
+        self.assertLess(len(api._pool), 4)
+        api.close()
+        self.assertEqual(len(api._pool), 0)
+
+        api = TransferAPIFtp(None, None, None)
+        self.assertEqual(len(api.transfer_many([("setup.py", b"# ee")])), 1)
+        self.assertEqual(api.retrieve_many(["setup.py"]), [b"# ee"])
+
+    def test_pool_keepalive(self):
+        created = []
+
+        class BrokenFTP(MockTransferFTP):
+            def noop(self):
+                raise ConnectionError("closed")
+
+        def factory():
+            created.append(MockTransferFTP() if len(created) == 0 else BrokenFTP())
+            return created[-1]
+
+        pool = TransferFTPPool(factory, size=2, keepalive=0.05)
+        with pool.connection() as c1:
+            with pool.connection() as c2:
+                self.assertNotEqual(id(c1), id(c2))
+        self.assertEqual(len(pool), 2)
+        time.sleep(0.3)
+        # the broken connection was closed, the other one is alive
+        self.assertEqual(len(pool), 1)
+        with pool.connection() as c3:
+            self.assertIs(c3, created[0])
+        self.assertEqual(pool.ping(), 0)
+        pool.close()
+        self.assertEqual(len(pool), 0)
+
+    def test_pool_discard_on_error(self):
+        created = []
+
+        def factory():
+            created.append(MockTransferFTP())
+            return created[-1]
+
+        pool = TransferFTPPool(factory, size=1)
+
+        def fail():
+            with pool.connection():
+                raise ConnectionError("broken transfer")
+
+        self.assertRaise(fail, ConnectionError)
+        self.assertEqual(len(pool), 0)
+        with pool.connection() as c:
+            self.assertIs(c, created[-1])
+        self.assertEqual(len(created), 2)
+        self.assertEqual(len(pool), 1)
+        pool.close()
+
+    def test_pool_discard_broken_session(self):
+        created = []
+
+        class LostFTP(MockTransferFTP):
+            def run_command(self, command, *args, **kwargs):
+                if command == self._ftp.storbinary:
+                    self.nb_stor = getattr(self, "nb_stor", 0) + 1
+                    if self.nb_stor == 2:
+                        raise EOFError("connection lost")
+                return MockTransferFTP.run_command(self, command, *args, **kwargs)
+
+        def factory():
+            created.append(LostFTP())
+            return created[-1]
+
+        pool = TransferFTPPool(factory, size=1)
+        files = [(io.BytesIO(b"# ee"), "setup.py", False) for i in range(3)]
+        with pool.connection() as ftp:
+            res = ftp.transfer_files(files, "")
+        self.assertEqual(res[0], (0, None))
+        self.assertIsInstance(res[1][1], EOFError)
+        self.assertIs(res[2][1], res[1][1])
+        self.assertEqual(ftp.nb_stor, 2)
+        self.assertTrue(ftp.broken)
+        # the session was closed instead of going back to the pool
+        self.assertEqual(len(pool), 0)
+        with pool.connection() as ftp:
+            res = ftp.transfer_files(files[:1], "")
+        self.assertEqual(res, [(0, None)])
+        self.assertEqual(len(created), 2)
+        self.assertEqual(len(pool), 1)
+        pool.close()
+
+    def test_transfer_api_file(self):
+        temp = get_temp_folder(__file__, "temp_transfer_api_file_fast")
+        src = os.path.join(temp, "src.bin")
+        data = bytes(range(256)) * 10000
+        with open(src, "wb") as f:
+            f.write(data)
+        self.assertIn(copy_file_fast(src, os.path.join(temp, "copy.bin")),
+                      {"copy_file_range", "sendfile", "copyfileobj"})
+        with open(os.path.join(temp, "copy.bin"), "rb") as f:
+            self.assertEqual(f.read(), data)
+
+        api = TransferAPIFile(os.path.join(temp, "remote"))
+        self.assertTrue(api.transfer_file("sub/a.bin", src))
+        self.assertEqual(api.retrieve("sub/a.bin"), data)
+        dest = os.path.join(temp, "back.bin")
+        self.assertTrue(api.retrieve_file("sub/a.bin", dest))
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertFalse(api.retrieve_file("sub/none.bin", dest, exc=False))
+        self.assertRaise(lambda: api.retrieve_file("sub/none.bin", dest),
+                         FileNotFoundError)
+
+        # generic implementation
+        mock = MockTransferAPI()
+        self.assertTrue(mock.transfer_file("a", src))
+        self.assertTrue(mock.retrieve_file("a", dest))
+        self.assertFalse(mock.retrieve_file("b", dest, exc=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+@brief      test log(time=30s)
+"""
+
+import os
+import unittest
+
+from pyquickhelper.helpgen.process_notebooks import process_notebooks
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+
+
+class TestNoteBooksParallel(ExtTestCase):
+
+    def test_notebooks_parallel_cache(self):
+        path = os.path.abspath(os.path.split(__file__)[0])
+        fold = os.path.normpath(os.path.join(path, "notebooks_python"))
+        nbs = [os.path.join(fold, _)
+               for _ in sorted(os.listdir(fold)) if ".ipynb" in _]
+        temp = get_temp_folder(__file__, "temp_notebooks_parallel")
+        formats = ["python", "html"]
+
+        res = process_notebooks(nbs, temp, temp, formats=formats, n_jobs=2,
+                                cache=True)
+        created = set(f for f, new in res if new)
+        for name in ["seance5_approche_fonctionnelle_correction",
+                     "td1a_cenonce_session1"]:
+            for ext in [".py", "2html.html"]:
+                self.assertIn(os.path.join(temp, name + ext), created)
+        self.assertExists(os.path.join(temp, "notebooks_cache.json"))
+        py = os.path.join(temp, "td1a_cenonce_session1.py")
+        mtime = os.stat(py).st_mtime
+
+        # nothing changed, nothing is converted
+        res = process_notebooks(nbs, temp, temp, formats=formats, n_jobs=2,
+                                cache=True)
+        again = set(f for f, new in res if not new)
+        self.assertIn(py, again)
+        self.assertNotIn(py, set(f for f, new in res if new))
+        self.assertEqual(mtime, os.stat(py).st_mtime)
+        self.assertEqual(
+            len(set(f for f, _ in res if f.endswith("2html.html"))), 2)
+
+        # without cache, the notebook is converted again
+        res = process_notebooks(nbs[:1], temp, temp, formats=["python"],
+                                cache=False)
+        self.assertIn(
+            os.path.join(temp, "seance5_approche_fonctionnelle_correction.py"),
+            set(f for f, new in res if new))
+
+
+if __name__ == "__main__":
+    unittest.main()
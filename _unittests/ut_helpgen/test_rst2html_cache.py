@@ -0,0 +1,81 @@
+"""
+@brief      test log(time=3s)
+"""
+
+import os
+import time
+import unittest
+
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.helpgen.rst_converters_cache import Rst2HtmlCache
+
+
+class TestRst2HtmlCache(ExtTestCase):
+
+    def test_cache_key(self):
+        k1 = Rst2HtmlCache.make_key("a", writer="html", layout="sphinx",
+                                    options=dict(html_theme="basic"))
+        k2 = Rst2HtmlCache.make_key("a", writer="html", layout="sphinx",
+                                    options=dict(html_theme="basic"))
+        k3 = Rst2HtmlCache.make_key("a", writer="html", layout="docutils",
+                                    options=dict(html_theme="basic"))
+        k4 = Rst2HtmlCache.make_key("b", writer="html", layout="sphinx",
+                                    options=dict(html_theme="basic"))
+        k5 = Rst2HtmlCache.make_key("a", writer="html", layout="sphinx",
+                                    directives=[("dir", ExtTestCase)])
+        self.assertEqual(k1, k2)
+        self.assertEqual(len(set([k1, k3, k4, k5])), 4)
+        self.assertEqual(
+            k5, Rst2HtmlCache.make_key("a", writer="html", layout="sphinx",
+                                       directives=[("dir", ExtTestCase)]))
+
+    def test_cache_memory(self):
+        cache = Rst2HtmlCache(max_memory=2)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", "A")
+        cache.set("b", "B")
+        self.assertEqual(cache.get("a"), "A")
+        cache.set("c", "C")
+        # b is the least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "C")
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        self.assertEqual(len(cache), 2)
+
+    def test_cache_disk(self):
+        temp = get_temp_folder(__file__, "temp_rst2html_cache_disk")
+        cache = Rst2HtmlCache(max_memory=1, cache_dir=temp, max_disk_size=250)
+        for k in "abc":
+            cache.set(k, k * 100)
+            time.sleep(0.02)
+        # a was removed
+        self.assertEqual(sorted(os.listdir(temp)), ["b.cache", "c.cache"])
+        self.assertEqual(cache.get("b"), "b" * 100)
+        self.assertEqual(cache.disk_hits, 1)
+        time.sleep(0.02)
+        cache.set("d", "d" * 100)
+        # c was not used recently
+        self.assertEqual(sorted(os.listdir(temp)), ["b.cache", "d.cache"])
+
+        cache2 = Rst2HtmlCache(cache_dir=temp, max_disk_size=250)
+        self.assertEqual(cache2.get("d"), "d" * 100)
+        self.assertIsNone(cache2.get("a"))
+        self.assertEqual((cache2.hits, cache2.disk_hits, cache2.misses),
+                         (1, 1, 1))
+        cache2.clear(disk=True)
+        self.assertEqual(os.listdir(temp), [])
+
+    def test_rst2html_cache(self):
+        from pyquickhelper.helpgen import rst2html
+        cache = Rst2HtmlCache()
+        content = "title\n=====\n\nsome *text*\n"
+        html = rst2html(content, layout="sphinx_body", cache=cache)
+        html2 = rst2html(content, layout="sphinx_body", cache=cache)
+        self.assertEqual(html, html2)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        rst2html(content, layout="sphinx", cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
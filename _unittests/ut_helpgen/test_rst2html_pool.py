@@ -0,0 +1,79 @@
+"""
+@brief      test log(time=8s)
+"""
+
+import unittest
+
+from pyquickhelper.pycode import ExtTestCase
+from pyquickhelper.helpgen import rst2html, docstring2html
+from pyquickhelper.helpgen.sphinxm_app_pool import MockSphinxAppPool
+
+try:
+    import sphinx.application  # pylint: disable=W0611
+    sphinx_issue = None
+except ImportError as e:
+    sphinx_issue = "Sphinx cannot be imported: %s" % e
+
+
+@unittest.skipIf(sphinx_issue is not None, sphinx_issue)
+class TestRst2HtmlPool(ExtTestCase):
+
+    docs = ["""
+            title{0}
+            ======
+
+            .. _l-label{0}:
+
+            paragraph *number{0}*, see :ref:`l-label{0}`.
+
+            .. exref::
+                :title: example{0}
+
+                content{0}
+            """.replace("            ", "").format(i) for i in range(3)]
+
+    def test_rst2html_pool(self):
+        for writer, layout in [("html", "sphinx_body"), ("rst", "sphinx"),
+                               ("md", "sphinx")]:
+            pool = MockSphinxAppPool()
+            for i, doc in enumerate(self.docs):
+                expected = rst2html(doc, writer=writer, layout=layout)
+                got = rst2html(doc, writer=writer, layout=layout,
+                               app_pool=pool)
+                self.assertEqual(expected, got)
+                self.assertIn("number%d" % i, got)
+                if i > 0:
+                    self.assertNotIn("number%d" % (i - 1), got)
+                    self.assertNotIn("example%d" % (i - 1), got)
+            self.assertEqual(pool.created, 1)
+            self.assertEqual(pool.reused, 2)
+            self.assertEqual(len(pool), 1)
+
+    def test_rst2html_pool_key(self):
+        pool = MockSphinxAppPool(max_size=1)
+        rst2html(self.docs[0], writer="rst", layout="sphinx", app_pool=pool)
+        rst2html(self.docs[0], writer="md", layout="sphinx", app_pool=pool)
+        rst2html(self.docs[0], writer="rst", layout="sphinx", app_pool=pool)
+        self.assertEqual(pool.created, 3)
+        self.assertEqual(len(pool), 1)
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+
+    def test_docstring2html_pool(self):
+        def fct():
+            """
+            Converts something.
+
+            @param      a       first parameter
+            @return             nothing
+            """
+            pass
+
+        html = docstring2html(fct, format="rawhtml", app_pool=True)
+        html2 = docstring2html(fct, format="rawhtml", app_pool=True)
+        self.assertEqual(html, html2)
+        self.assertIn("first parameter", html2)
+
+
+if __name__ == "__main__":
+    unittest.main()
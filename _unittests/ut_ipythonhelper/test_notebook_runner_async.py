@@ -0,0 +1,69 @@
+"""
+@brief      test log(time=10s)
+"""
+
+import os
+import unittest
+
+from nbformat import NotebookNode
+from nbformat.v4 import new_code_cell
+from pyquickhelper.pycode import get_temp_folder, ExtTestCase
+from pyquickhelper.ipythonhelper import NotebookRunner, run_notebook
+from pyquickhelper.ipythonhelper.notebook_runner import NotebookKernelError
+from pyquickhelper.ipythonhelper.notebook_helper import read_nb
+
+
+class TestNotebookRunnerAsync(ExtTestCase):
+
+    def test_output_size(self):
+        out = NotebookNode(output_type="stream", name="stdout", text="abcé")
+        self.assertEqual(NotebookRunner._output_size(out), 5)
+        out = NotebookNode(output_type="execute_result",
+                           data={"text/plain": "12", "image/png": "AAAA"})
+        self.assertEqual(NotebookRunner._output_size(out), 6)
+
+    def test_notebook_runner_async(self):
+        temp = get_temp_folder(__file__, "temp_notebook_runner_async")
+        nbfile = os.path.join(os.path.dirname(__file__), "data",
+                              "simple_example.ipynb")
+        outputs = []
+        for asynchronous in [False, True]:
+            nb = read_nb(nbfile, working_dir=temp, kernel=True)
+            try:
+                stat = nb.run_notebook(asynchronous=asynchronous)
+            finally:
+                nb.shutdown_kernel()
+            self.assertGreater(stat["nbrun"], 0)
+            self.assertEqual(len(nb.cell_stats), stat["nbrun"])
+            for st in nb.cell_stats:
+                self.assertEqual(st["status"], "ok")
+                self.assertGreater(st["time"], 0)
+                self.assertGreater(st["nbytes"] + 1, 0)
+            # consecutive streams are merged by the asynchronous version
+            outputs.append(
+                ["".join(str(o.get("text", o.get("data", None))) for o in cell.outputs)
+                 for cell in nb.iter_code_cells()])
+        self.assertEqual(outputs[0], outputs[1])
+
+        outfile = os.path.join(temp, "out.ipynb")
+        stat, _ = run_notebook(nbfile, working_dir=temp, outfilename=outfile,
+                               asynchronous=True)
+        self.assertExists(outfile)
+
+    def test_run_cell_async_timeout(self):
+        temp = get_temp_folder(__file__, "temp_notebook_runner_async_timeout")
+        nbfile = os.path.join(os.path.dirname(__file__), "data",
+                              "simple_example.ipynb")
+        nb = read_nb(nbfile, working_dir=temp, kernel=True)
+        try:
+            cell = new_code_cell("import time\ntime.sleep(30)")
+            self.assertRaise(
+                lambda: nb._run_cell_in_loop(0, cell, timeout=2),
+                NotebookKernelError)
+        finally:
+            nb.shutdown_kernel()
+            nb._close_async_client()
+
+
+if __name__ == "__main__":
+    unittest.main()
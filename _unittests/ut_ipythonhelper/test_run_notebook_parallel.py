@@ -0,0 +1,71 @@
+"""
+@brief      test log(time=20s)
+
+notebook test
+"""
+
+import os
+import unittest
+
+from pyquickhelper.pycode import get_temp_folder, ExtTestCase
+from pyquickhelper.ipythonhelper import execute_notebook_list, NotebookKernelPool
+
+
+class FakeKernel:
+
+    def __init__(self):
+        self.stopped = False
+        self.shutdown = False
+
+    def stop_channels(self):
+        self.stopped = True
+
+    def shutdown_kernel(self, now=False):
+        self.shutdown = now
+
+
+class TestRunNotebookParallel(ExtTestCase):
+
+    def test_kernel_pool(self):
+        pool = NotebookKernelPool()
+        key = NotebookKernelPool.make_key(extended_args=["--a=b"])
+        self.assertEqual(key, ("python", None, "30", ("--a=b",)))
+        self.assertTrue(pool.acquire(key))
+        kernel = FakeKernel(), FakeKernel()
+        pool.release(key, kernel)
+        self.assertEqual(len(pool), 1)
+        self.assertTrue(pool.acquire(NotebookKernelPool.make_key()))
+        self.assertIs(pool.acquire(key), kernel)
+        self.assertEqual(len(pool), 0)
+        self.assertEqual((pool.created, pool.reused), (2, 1))
+        pool.release(key, kernel)
+        pool.shutdown()
+        self.assertEqual(len(pool), 0)
+        self.assertTrue(kernel[0].shutdown)
+        self.assertTrue(kernel[1].stopped)
+
+    def test_execute_notebook_list_parallel(self):
+        temp = get_temp_folder(__file__, "temp_run_notebook_parallel")
+        data = os.path.join(os.path.dirname(__file__), "data")
+        keepnote = [os.path.join(data, "simple_example.ipynb"),
+                    os.path.join(data, "simple_example_bis.ipynb"),
+                    os.path.join(data, "simple_example_exc.ipynb")]
+        addpaths = [os.path.normpath(os.path.join(
+            os.path.abspath(os.path.dirname(__file__)), "..", "..", "src"))]
+
+        for n_jobs, reuse_kernel in [(2, False), (2, True), (None, True)]:
+            with self.subTest(n_jobs=n_jobs, reuse_kernel=reuse_kernel):
+                res = execute_notebook_list(
+                    temp, keepnote, additional_path=addpaths, n_jobs=n_jobs,
+                    reuse_kernel=reuse_kernel,
+                    dump=os.path.join(data, "dump.notebook.pyquickhelper.txt"))
+                self.assertEqual(list(res), keepnote)
+                self.assertEqual([v["success"] for v in res.values()],
+                                 [True, True, False])
+                for v in res.values():
+                    self.assertIn("etime", v)
+                    self.assertIn("date", v)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+@brief      test log(time=3s)
+"""
+
+import os
+import unittest
+
+from pyquickhelper.loghelper import run_cmd
+from pyquickhelper.loghelper.repositories.pygit_helper import (
+    get_file_last_modification, repo_ls, GitException)
+from pyquickhelper.loghelper.repositories.git_index import (
+    GitMetadataIndex, get_git_index, find_git_root)
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+
+
+class TestGitIndex(ExtTestCase):
+
+    def git(self, folder, cmd):
+        out, err = run_cmd("git -c user.name=pqh -c user.email=pqh@example.com " + cmd,
+                           wait=True, change_path=folder)
+        return out, err
+
+    def commit(self, folder, files, message):
+        for name, content in files.items():
+            full = os.path.join(folder, name)
+            if not os.path.exists(os.path.dirname(full)):
+                os.makedirs(os.path.dirname(full))
+            with open(full, "w") as f:
+                f.write(content)
+        self.git(folder, "add -A")
+        self.git(folder, "commit -q -m " + message)
+
+    def test_git_index(self):
+        temp = get_temp_folder(__file__, "temp_git_index")
+        repo = os.path.join(temp, "repo")
+        os.mkdir(repo)
+        self.git(repo, "init -q")
+        self.commit(repo, {"a.txt": "a", "sub/b.txt": "b", "sub/c.txt": "c"}, "first")
+        self.commit(repo, {"sub/b.txt": "bb"}, "second")
+        self.assertEqual(find_git_root(os.path.join(repo, "sub", "b.txt")),
+                         os.path.realpath(repo))
+
+        index = GitMetadataIndex(repo)
+        self.assertTrue(index.refresh())
+        self.assertFalse(index.refresh())
+        nb = index.nb_commands
+        for name in ["a.txt", "sub/b.txt", "sub"]:
+            full = os.path.join(repo, name)
+            exp = get_file_last_modification(full).strip('"')
+            self.assertEqual(index.last_modification(full), exp)
+        first = index.get(os.path.join(repo, "a.txt"))
+        second = index.get(os.path.join(repo, "sub", "b.txt"))
+        self.assertEqual(first["author"], "pqh")
+        self.assertNotEqual(first["commit"], second["commit"])
+        self.assertEqual(index.get(os.path.join(repo, "sub")), second)
+        self.assertEmpty(index.get(os.path.join(repo, "none.txt")))
+        self.assertRaise(lambda: index.get(temp), GitException)
+
+        exp = sorted(str(r) for r in repo_ls(os.path.join(repo, "sub")))
+        got = sorted(str(r) for r in index.ls(os.path.join(repo, "sub")))
+        self.assertEqual(got, exp)
+        self.assertEqual(len(index.ls(repo)), 3)
+
+        # incremental update
+        self.commit(repo, {"sub/d.txt": "d"}, "third")
+        self.assertTrue(index.refresh())
+        third = index.get(os.path.join(repo, "sub", "d.txt"))
+        self.assertEqual(index.get(os.path.join(repo, "sub")), third)
+        self.assertEqual(index.get(os.path.join(repo, "a.txt")), first)
+        self.assertEqual(len(index.ls(repo)), 4)
+        # merge-base, log, ls-tree
+        self.assertEqual(index.nb_commands, nb + 3)
+
+        # rewritten history
+        self.git(repo, "reset -q --hard HEAD~1")
+        self.assertTrue(index.refresh())
+        self.assertEmpty(index.get(os.path.join(repo, "sub", "d.txt")))
+        self.assertEqual(index.get(os.path.join(repo, "sub")), second)
+
+        # shared index
+        shared = get_git_index(os.path.join(repo, "a.txt"))
+        self.assertIs(shared, get_git_index(os.path.join(repo, "sub")))
+        self.assertEqual(get_file_last_modification(os.path.join(repo, "a.txt"), index=True),
+                         first["date"])
+        self.assertEqual(len(repo_ls(repo, index=True)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+@brief      test log(time=3s)
+"""
+
+import os
+import subprocess
+import unittest
+
+from pyquickhelper.loghelper.repositories.pygit_helper import (
+    iter_repo_log, iter_file_details_all, GitException)
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+
+
+class TestGitLogStream(ExtTestCase):
+
+    def git(self, folder, cmd, date=None):
+        env = os.environ.copy()
+        if date is not None:
+            env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = date
+        subprocess.run(["git", "-c", "user.name=pqh", "-c", "user.email=pqh@example.com"] +
+                       cmd.split(), cwd=folder, env=env, check=True)
+
+    def test_git_log_stream(self):
+        temp = get_temp_folder(__file__, "temp_git_log_stream")
+        repo = os.path.join(temp, "repo")
+        os.mkdir(repo)
+        self.git(repo, "init -q")
+        for i, (name, date) in enumerate([("a.txt", "2015-01-01T10:00:00"),
+                                          ("sub/b.txt", "2016-01-01T10:00:00"),
+                                          ("a.txt", "2017-01-01T10:00:00")]):
+            full = os.path.join(repo, name)
+            if not os.path.exists(os.path.dirname(full)):
+                os.makedirs(os.path.dirname(full))
+            with open(full, "a") as f:
+                f.write("line %d\n" % i)
+            self.git(repo, "add -A")
+            self.git(repo, "commit -q -m c%d" % i, date=date)
+
+        rows = list(iter_repo_log(repo))
+        self.assertEqual([r[3] for r in rows], ["c2", "c1", "c0"])
+        self.assertEqual(rows[0][0], "pqh")
+        self.assertEqual(rows[0][2].year, 2017)
+        self.assertEqual(rows[0][1], rows[0][4][:len(rows[0][1])])
+
+        rows = list(iter_repo_log(repo, since="2016-06-01"))
+        self.assertEqual([r[3] for r in rows], ["c2"])
+        rows = list(iter_repo_log(repo, paths=["sub"]))
+        self.assertEqual([r[3] for r in rows], ["c1"])
+
+        rows = list(iter_repo_log(repo, file_detail=True))
+        self.assertEqual([(r[3], r[6], r[7]) for r in rows],
+                         [("c2", "a.txt", 1), ("c1", "sub/b.txt", 1), ("c0", "a.txt", 1)])
+
+        details = list(iter_file_details_all(repo))
+        self.assertEqual([d[1:] for d in details],
+                         [("a.txt", 1, 0), ("sub/b.txt", 1, 0), ("a.txt", 1, 0)])
+
+        # the iteration can stop early
+        it = iter_repo_log(repo)
+        self.assertEqual(next(it)[3], "c2")
+        it.close()
+
+        self.assertRaise(lambda: list(iter_repo_log(repo, paths=[":(bad)x"])),
+                         GitException)
+
+
+if __name__ == "__main__":
+    unittest.main()
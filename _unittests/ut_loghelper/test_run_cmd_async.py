@@ -0,0 +1,93 @@
+"""
+@brief      test log(time=4s)
+"""
+import sys
+import time
+import asyncio
+import unittest
+import subprocess
+from pyquickhelper.pycode import ExtTestCase
+from pyquickhelper.loghelper import run_cmd, run_cmd_async, RunCmdException
+from pyquickhelper.loghelper.run_cmd import _LineSplitter
+
+
+class TestRunCmdAsync(ExtTestCase):
+
+    def script(self, code):
+        return [sys.executable, "-c", code]
+
+    def test_line_splitter(self):
+        sp = _LineSplitter()
+        self.assertEqual(sp.feed(b"a"), [])
+        self.assertEqual(sp.feed(b"b\nc\r\nd"), [b"ab\n", b"c\r\n"])
+        self.assertEqual(sp.flush(), [b"d"])
+        self.assertEqual(sp.flush(), [])
+
+    def test_run_cmd_selector(self):
+        code = ("import sys\nprint('a')\nprint('e', file=sys.stderr)\n"
+                "sys.stdout.write('last')")
+        out, err = run_cmd(self.script(code), wait=True, communicate=False,
+                           shell=False, preprocess=False)
+        self.assertEqual(out, "a\nlast")
+        self.assertEqual(err, "e")
+
+    def test_run_cmd_selector_timeout(self):
+        code = "import time\nprint('a', flush=True)\ntime.sleep(30)"
+        logs = []
+        begin = time.perf_counter()
+        out, err = run_cmd(self.script(code), wait=True, communicate=False,
+                           shell=False, preprocess=False, timeout=1,
+                           tell_if_no_output=0.3,
+                           fLOG=lambda *args: logs.append(args))
+        self.assertLess(time.perf_counter() - begin, 10)
+        self.assertIn("killing process", out)
+        self.assertEqual(err, "Process killed.")
+        self.assertTrue(any("No update" in a[0] for a in logs))
+
+    def test_run_cmd_async_gather(self):
+        code = "import time\ntime.sleep(1)\nprint('{0}')"
+
+        async def main():
+            return await asyncio.gather(
+                *[run_cmd_async(self.script(code.format(i)), preprocess=False)
+                  for i in range(4)])
+
+        begin = time.perf_counter()
+        res = asyncio.run(main())
+        self.assertLess(time.perf_counter() - begin, 3.5)
+        self.assertEqual(res, [(str(i), "") for i in range(4)])
+
+    def test_run_cmd_async_stop(self):
+        code = "import time\nfor i in range(100):\n  print(i, flush=True)\n  time.sleep(0.1)"
+        seen = []
+
+        def stop(out, err):
+            seen.append(out)
+            return out is not None and out.strip() == "2"
+
+        out, err = asyncio.run(run_cmd_async(
+            self.script(code), preprocess=False, stop_running_if=stop))
+        self.assertEqual(out, "0\n1\n2\n[run_cmd] killing process.")
+        self.assertEqual(err, "Process killed.")
+
+    def test_run_cmd_async_error(self):
+        code = "import sys\nprint('bad', file=sys.stderr)\nsys.exit(3)"
+        self.assertRaise(
+            lambda: asyncio.run(run_cmd_async(self.script(code), preprocess=False)),
+            subprocess.CalledProcessError)
+        try:
+            asyncio.run(run_cmd_async(self.script(code), preprocess=False,
+                                      catch_exit=True))
+        except RunCmdException as e:
+            self.assertIn("bad", str(e))
+
+    def test_run_cmd_async_stdin(self):
+        code = "import sys\nprint(sys.stdin.read().upper())"
+        out, err = asyncio.run(run_cmd_async(
+            self.script(code), preprocess=False, sin="abc"))
+        self.assertEqual(out, "ABC")
+        self.assertEqual(err, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+@brief      test log(time=10s)
+"""
+import os
+import sys
+import unittest
+import subprocess
+from pyquickhelper.pycode import ExtTestCase
+
+
+class TestImportTime(ExtTestCase):
+
+    # cumulative import time (in microseconds) of a subpackage,
+    # it is usually below 5 ms, the subpackages import nothing
+    # until one of their attributes is used
+    budget = 50000
+
+    heavy = ["sphinx", "docutils", "ftplib", "pandas", "nbformat",
+             "jupyter_client", "matplotlib", "numpy", "fire",
+             "urllib.request", "cryptography", "PIL"]
+
+    packages = ["benchhelper", "cli", "filehelper", "helpgen", "imghelper",
+                "ipythonhelper", "jenkinshelper", "loghelper", "pandashelper",
+                "pycode", "serverdoc", "sphinxext", "texthelper"]
+
+    def run_python(self, args):
+        src = os.path.normpath(os.path.join(
+            os.path.dirname(__file__), "..", "..", "src"))
+        env = os.environ.copy()
+        env["PYTHONPATH"] = src + os.pathsep + env.get("PYTHONPATH", "")
+        res = subprocess.run([sys.executable] + args, env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             check=True)
+        return res.stdout.decode("utf-8"), res.stderr.decode("utf-8")
+
+    def test_no_heavy_import(self):
+        code = "\n".join([
+            "import sys",
+            "import pyquickhelper",
+            "import " + ", ".join("pyquickhelper." + p for p in self.packages),
+            "heavy = {0}".format(self.heavy),
+            "print(','.join(h for h in heavy if h in sys.modules))"])
+        out, _ = self.run_python(["-c", code])
+        self.assertEqual(out.strip(), "")
+
+    def test_import_time_budget(self):
+        for pkg in self.packages:
+            name = "pyquickhelper." + pkg
+            _, err = self.run_python(["-X", "importtime", "-c", "import " + name])
+            times = {}
+            for line in err.split("\n"):
+                spl = line.split("|")
+                if len(spl) == 3 and spl[1].strip().isdigit():
+                    times[spl[2].strip()] = int(spl[1])
+            self.assertIn(name, times)
+            if times[name] > self.budget:
+                raise AssertionError(
+                    "Importing '{0}' takes {1} us > {2} us\n{3}".format(
+                        name, times[name], self.budget, err))
+
+    def test_lazy_attributes(self):
+        import pyquickhelper.loghelper as lh
+        from pyquickhelper.loghelper.run_cmd import run_cmd
+        self.assertIs(lh.run_cmd, run_cmd)
+        self.assertIn("run_cmd_async", dir(lh))
+        self.assertRaise(lambda: lh.not_an_attribute, AttributeError)
+        # submodules remain reachable as before
+        self.assertEqual(lh.flog.__name__, "pyquickhelper.loghelper.flog")
+
+    def test_cli_commands(self):
+        from pyquickhelper.__main__ import _commands
+        # the mapping must point to existing modules
+        src = os.path.join(os.path.dirname(__file__), "..", "..", "src",
+                           "pyquickhelper")
+        for cmd, path in _commands.items():
+            mod = path.rsplit(".", 1)[0]
+            name = os.path.join(src, *mod.split(".")) + ".py"
+            self.assertExists(name)
+            with open(name, "r", encoding="utf-8") as f:
+                content = f.read()
+            self.assertIn("def " + path.rsplit(".", 1)[-1] + "(", content)
+
+
+if __name__ == "__main__":
+    unittest.main()
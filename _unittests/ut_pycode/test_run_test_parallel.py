@@ -0,0 +1,143 @@
+"""
+@brief      test log(time=6s)
+"""
+import os
+import json
+import pickle
+import unittest
+import warnings
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.pycode.utils_tests_private import (
+    main_run_test, ProcessTestResult, _picklable_warning, _report_test_file,
+    _run_test_file_process)
+
+
+_template = '''"""
+@brief      test log(time={hint}s)
+"""
+import time
+import unittest
+import warnings
+
+
+class MyWarning(UserWarning):
+    pass
+
+
+class TestParallel{name}(unittest.TestCase):
+
+    def test_{name}(self):
+        time.sleep({sleep})
+        print("print {name}")
+        warnings.warn("warn {name}", MyWarning)
+        self.assertEqual({value}, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
+'''
+
+
+class TestRunTestParallel(ExtTestCase):
+
+    def write_tests(self, temp, specs):
+        folder = os.path.join(temp, "_unittests", "ut_parallel")
+        os.makedirs(folder, exist_ok=True)
+        for name, hint, sleep, value in specs:
+            with open(os.path.join(folder, "test_parallel_%s.py" % name), "w") as f:
+                f.write(_template.format(name=name, hint=hint,
+                                         sleep=sleep, value=value))
+
+    def test_process_test_result(self):
+        r = ProcessTestResult(3, 0, 1)
+        self.assertFalse(r.wasSuccessful())
+        self.assertIn("errors=0", str(r))
+        self.assertIn("failures=1", str(r))
+        r = pickle.loads(pickle.dumps(ProcessTestResult(3, 0, 0)))
+        self.assertTrue(r.wasSuccessful())
+
+    def test_report_test_file(self):
+        temp = get_temp_folder(__file__, "temp_report_test_file")
+        name = os.path.join(temp, "test_fail.py")
+        allwarn = []
+        fail = _report_test_file(ProcessTestResult(2, 0, 1), "out", "", [], name,
+                                 0, "test_fail.py", StringIO(), StringIO(),
+                                 allwarn, lambda w: True)
+        self.assertEqual(fail, 1)
+        self.assertExists(name + ".err")
+        fail = _report_test_file(ProcessTestResult(2, 0, 0), "out", "", [], name,
+                                 0, "test_fail.py", StringIO(), StringIO(),
+                                 allwarn, lambda w: True)
+        self.assertEqual(fail, 0)
+
+    def test_picklable_warning(self):
+        class LocalWarning(DeprecationWarning):
+            pass
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            warnings.warn("local", LocalWarning)
+        ww = pickle.loads(pickle.dumps(_picklable_warning(w[0])))
+        self.assertIsInstance(ww.message, DeprecationWarning)
+        self.assertEqual(str(ww.message), "local")
+
+    def test_run_test_file_process(self):
+        temp = get_temp_folder(__file__, "temp_run_test_file_process")
+        self.write_tests(temp, [("ee", 1, 0, 2)])
+        name = os.path.join(temp, "_unittests", "ut_parallel",
+                            "test_parallel_ee.py")
+        console = StringIO()
+        with redirect_stdout(console):
+            res = _run_test_file_process(name)
+        self.assertEqual(console.getvalue(), "")
+        self.assertFalse(res["result"].wasSuccessful())
+        self.assertIn("print ee", res["out"])
+        self.assertIn("Ran 1 test", res["out"])
+
+    def test_main_run_test_processes(self):
+        temp = get_temp_folder(__file__, "temp_run_test_parallel")
+        self.write_tests(temp, [("aa", 1, 0.1, 1), ("bb", 1, 1.5, 1),
+                                ("cc", 5, 0.1, 1), ("dd", 1, 0.1, 2)])
+        durations = os.path.join(temp, "durations.json")
+        runner = unittest.TextTestRunner(verbosity=0, stream=StringIO())
+        out = StringIO()
+        # a failure keeps the temporary files
+        with mock.patch("pyquickhelper.pycode.utils_tests_private.clean") as clean:
+            res = main_run_test(runner, path_test=temp, processes=2,
+                                durations=durations, stdout=out,
+                                stderr=StringIO(), filter_warning=lambda w: True)
+            clean.assert_not_called()
+        self.assertEqual(len(res["tests"]), 4)
+        status = {os.path.split(name)[-1]: r.wasSuccessful()
+                  for name, r in res["tests"]}
+        self.assertEqual(status, {"test_parallel_aa.py": True, "test_parallel_bb.py": True,
+                                  "test_parallel_cc.py": True, "test_parallel_dd.py": False})
+        self.assertIn("AssertionError", res["err"])
+        self.assertIn("print dd", res["err"])
+        self.assertIn("ran 1 tests in", out.getvalue())
+        self.assertExists(os.path.join(
+            temp, "_unittests", "ut_parallel", "test_parallel_dd.py.err"))
+
+        # the history replaces the hints
+        with open(durations, "r", encoding="utf-8") as f:
+            measured = json.load(f)
+        self.assertEqual(set(measured), {"ut_parallel/test_parallel_%s.py" % n
+                                         for n in ["aa", "bb", "cc", "dd"]})
+        self.assertGreater(measured["ut_parallel/test_parallel_bb.py"],
+                           measured["ut_parallel/test_parallel_cc.py"])
+
+        out = StringIO()
+        main_run_test(runner, path_test=temp, processes=2,
+                      durations=durations, stdout=out, stderr=StringIO(),
+                      skip_function=lambda name, content, duration: "_dd" in name)
+        lines = [line for line in out.getvalue().split("\n")
+                 if line.startswith("test ")]
+        self.assertEqual(len(lines), 3)
+        self.assertIn("test_parallel_bb.py", lines[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+@brief      test log(time=4s)
+"""
+
+import os
+import time
+import unittest
+
+from pyquickhelper.helpgen import rst2html
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from pyquickhelper.sphinxext.sphinx_runpython_cache import (
+    RunPythonCache, sources_fingerprint, default_source_roots)
+
+
+class TestRunPythonCache(ExtTestCase):
+
+    def test_cache_fingerprint(self):
+        temp = get_temp_folder(__file__, "temp_runpython_cache_fingerprint")
+        src = os.path.join(temp, "src")
+        os.makedirs(os.path.join(src, "pkg"))
+        name = os.path.join(src, "pkg", "__init__.py")
+        with open(name, "w") as f:
+            f.write("a = 1\n")
+        fp = sources_fingerprint([src])
+        self.assertEqual(fp, sources_fingerprint([src]))
+        time.sleep(0.01)
+        with open(name, "w") as f:
+            f.write("a = 2\n")
+        self.assertNotEqual(fp, sources_fingerprint([src]))
+        self.assertIsInstance(default_source_roots(), list)
+        self.assertIn(os.path.dirname(os.path.abspath(unittest.__file__)),
+                      default_source_roots(["unittest"]))
+
+        cache = RunPythonCache(os.path.join(temp, "cache"))
+        key = cache.make_key("print(1)", dict(process=False), fingerprint=fp)
+        self.assertNotEqual(
+            key, cache.make_key("print(1)", dict(process=True), fingerprint=fp))
+        self.assertEmpty(cache.make_key(
+            "print(1)", {}, context=dict(f=lambda x: x)))
+        self.assertEmpty(cache.get(key))
+        self.assertTrue(cache.set(key, ("1", "", {"x": 1})))
+        self.assertEqual(cache.get(key), ("1", "", {"x": 1}))
+        self.assertFalse(cache.set(key, ("1", "", {"f": lambda x: x})))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.clear()
+        self.assertEmpty(cache.get(key))
+
+    def test_runpython_cache(self):
+        temp = get_temp_folder(__file__, "temp_runpython_cache")
+        counter = os.path.join(temp, "counter.txt").replace("\\", "/")
+        content = """
+                    test a directive
+                    ================
+
+                    .. runpython::
+                        :showcode:__OPTION__
+
+                        with open("__COUNTER__", "a") as f:
+                            f.write("x")
+                        print("run" + "python")
+                    """.replace("                    ", "").replace("__COUNTER__", counter)
+
+        cache_dir = os.path.join(temp, "cache")
+        for option, expected in [("", "x"), ("\n    :nocache:", "xxx")]:
+            for _ in range(2):
+                html = rst2html(content.replace("__OPTION__", option),
+                                writer="rst", runpython_cache=cache_dir)
+                self.assertIn("runpython", html)
+            with open(counter, "r") as f:
+                self.assertEqual(f.read(), expected)
+        self.assertNotEmpty(os.listdir(cache_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
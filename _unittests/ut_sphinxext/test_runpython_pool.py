@@ -0,0 +1,96 @@
+"""
+@brief      test log(time=8s)
+"""
+
+import os
+import sys
+import unittest
+
+from pyquickhelper.pycode import get_temp_folder, ExtTestCase
+from pyquickhelper.sphinxext.sphinx_runpython_pool import RunPythonWorkerPool
+
+
+class TestRunPythonPool(ExtTestCase):
+
+    def test_runpython_pool(self):
+        temp = get_temp_folder(__file__, "temp_runpython_pool")
+        pool = RunPythonWorkerPool(size=1, max_tasks=3)
+        try:
+            out, err = pool.run(
+                "import sys\nsys.runpython_var = True\nprint('hello')\n"
+                "print('warn', file=sys.stderr)")
+            self.assertEqual(out.strip(), "hello")
+            self.assertEqual(err.strip(), "warn")
+
+            # isolated namespace, fd level capture
+            out, err = pool.run(
+                "import os, sys\nprint(hasattr(sys, 'runpython_var'), 'x' in globals())\n"
+                "x = 1\nos.write(1, b'fd\\n')")
+            self.assertEqual(out.split(), ["False", "False", "fd"])
+            self.assertEqual(err, "")
+
+            out, err = pool.run("import os\nprint(os.getcwd())", chdir=temp)
+            self.assertEqual(os.path.realpath(out.strip()), os.path.realpath(temp))
+            self.assertNotEqual(os.path.realpath(os.getcwd()),
+                                os.path.realpath(temp))
+            self.assertEqual(pool.created, 1)
+            # the process was replaced after 3 scripts
+            self.assertEqual(len(pool), 0)
+
+            out, err = pool.run("print(1)\n1/0", filename="script.py")
+            self.assertEqual(out.strip(), "1")
+            self.assertIn("Traceback", err)
+            self.assertIn('File "script.py", line 2', err)
+            self.assertIn("ZeroDivisionError", err)
+            self.assertNotIn("sphinx_runpython_pool", err)
+            self.assertEqual(pool.created, 2)
+
+            # a crash
+            out, err = pool.run(
+                "import os, sys\nprint('before')\nsys.stdout.flush()\nos._exit(3)")
+            self.assertEqual(out.strip(), "before")
+            self.assertIn("exit code 3", err)
+            out, err = pool.run("import sys\nsys.exit(0)\nprint('no')")
+            self.assertEqual((out, err), ("", ""))
+            self.assertEqual(pool.created, 3)
+        finally:
+            pool.close()
+        self.assertEqual(len(pool), 0)
+
+    def test_runpython_pool_state(self):
+        pool = RunPythonWorkerPool(size=1)
+        try:
+            pool.run("import os, warnings\nos.environ['RUNPYTHON_VAR'] = '1'\n"
+                     "warnings.simplefilter('error')")
+            out, err = pool.run(
+                "import os, warnings\nprint(os.environ.get('RUNPYTHON_VAR'))\n"
+                "warnings.warn('still a warning')")
+            self.assertEqual(out.strip(), "None")
+            self.assertIn("still a warning", err)
+            self.assertNotIn("Traceback", err)
+            try:
+                import numpy  # pylint: disable=W0611
+            except ImportError:
+                return
+            pool.run("import numpy\nnumpy.set_printoptions(precision=2)")
+            out, err = pool.run("import numpy\nprint(numpy.array([1/3]))")
+            self.assertEqual(out.strip(), "[0.33333333]")
+            self.assertEqual(pool.created, 1)
+        finally:
+            pool.close()
+
+    def test_run_python_script_pool(self):
+        from pyquickhelper.sphinxext.sphinx_runpython_extension import run_python_script
+        pool = RunPythonWorkerPool(size=1)
+        try:
+            out, err, _ = run_python_script(
+                "import sys\nprint(sys.executable == %r)" % sys.executable,
+                process=True, process_pool=pool)
+            self.assertEqual(out.strip(), "True")
+            self.assertEqual(err, "")
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,54 +8,44 @@
 import sys
 
 
+_commands = dict(
+    synchronize_folder="cli.pyq_sync_cli.pyq_sync",
+    encrypt_file="cli.encryption_file_cli.encrypt_file",
+    decrypt_file="cli.encryption_file_cli.decrypt_file",
+    encrypt="cli.encryption_cli.encrypt",
+    decrypt="cli.encryption_cli.decrypt",
+    df2rst="pandashelper.tblformat.df2rst",
+    clean_files="pycode.clean_helper.clean_files",
+    convert_notebook="cli.notebook.convert_notebook",
+    visual_diff="filehelper.visual_sync.create_visual_diff_through_html_files",
+    ls="filehelper.synchelper.explore_folder",
+    run_test_function="pycode.pytest_helper.run_test_function",
+    sphinx_rst="cli.simplified_fct.sphinx_rst",
+    run_notebook="cli.notebook.run_notebook",
+    zoom_img="imghelper.img_helper.zoom_img",
+    images2pdf="imghelper.img_export.images2pdf",
+    repeat_script="cli.script_exec.repeat_script",
+    ftp_upload="cli.ftp_cli.ftp_upload")
+
+
 def main(args, fLOG=print):
     """
     Implements ``python -m pyquickhelper <command> <args>``.
 
     @param      args        command line arguments
     @param      fLOG        logging function
+
+    .. versionchanged:: 1.9
+        Only the module implementing the selected command is imported.
     """
     try:
-        from .cli.pyq_sync_cli import pyq_sync
-        from .cli.encryption_file_cli import encrypt_file, decrypt_file
-        from .cli.encryption_cli import encrypt, decrypt
-        from .pandashelper import df2rst
-        from .pycode import clean_files, run_test_function
-        from .cli import cli_main_helper
-        from .filehelper import create_visual_diff_through_html_files
-        from .filehelper import explore_folder
-        from .cli.simplified_fct import sphinx_rst
-        from .imghelper.img_helper import zoom_img
-        from .imghelper.img_export import images2pdf
-        from .script_exec import repeat_script
-        from .ftp_cli import ftp_upload
-        from .cli.notebook import run_notebook, convert_notebook
+        from .cli.cli_helper import cli_main_helper
     except ImportError:  # pragma: no cover
-        from pyquickhelper.cli.pyq_sync_cli import pyq_sync
-        from pyquickhelper.cli.encryption_file_cli import encrypt_file, decrypt_file
-        from pyquickhelper.cli.encryption_cli import encrypt, decrypt
-        from pyquickhelper.pandashelper import df2rst
-        from pyquickhelper.pycode import clean_files, run_test_function
-        from pyquickhelper.cli import cli_main_helper
-        from pyquickhelper.filehelper import create_visual_diff_through_html_files
-        from pyquickhelper.filehelper import explore_folder
-        from pyquickhelper.cli.simplified_fct import sphinx_rst
-        from pyquickhelper.imghelper.img_helper import zoom_img
-        from pyquickhelper.imghelper.img_export import images2pdf
-        from pyquickhelper.cli.script_exec import repeat_script
-        from pyquickhelper.cli.ftp_cli import ftp_upload
-        from pyquickhelper.cli.notebook import run_notebook, convert_notebook
-
-    fcts = dict(synchronize_folder=pyq_sync, encrypt_file=encrypt_file,
-                decrypt_file=decrypt_file, encrypt=encrypt,
-                decrypt=decrypt, df2rst=df2rst, clean_files=clean_files,
-                convert_notebook=convert_notebook,
-                visual_diff=create_visual_diff_through_html_files,
-                ls=explore_folder, run_test_function=run_test_function,
-                sphinx_rst=sphinx_rst, run_notebook=run_notebook,
-                zoom_img=zoom_img, images2pdf=images2pdf,
-                repeat_script=repeat_script,
-                ftp_upload=ftp_upload)
+        from pyquickhelper.cli.cli_helper import cli_main_helper
+
+    # only the selected command is imported
+    fcts = {k: (__package__ or "pyquickhelper") + "." + v
+            for k, v in _commands.items()}
     return cli_main_helper(fcts, args=args, fLOG=fLOG)
 
 
@@ -0,0 +1,69 @@
+"""
+@file
+@brief Delays the import of the submodules of a package
+until one of its attributes is used (:pep:`562`).
+"""
+import sys
+import importlib
+import importlib.util
+from types import ModuleType
+
+
+class _LazyModule(ModuleType):
+    """
+    Module type of the packages using @see fn lazy_import_attributes.
+    The import system binds a submodule to its package once it is
+    imported, it must not hide the function of the same name
+    (``loghelper.run_cmd`` is a function, not module ``run_cmd.py``).
+    """
+
+    def __setattr__(self, name, value):
+        lazy = self.__dict__.get("__lazy_attributes__", None)
+        if (lazy is not None and name in lazy and isinstance(value, ModuleType) and
+                value.__name__ == self.__name__ + "." + name):
+            return
+        super().__setattr__(name, value)
+
+
+def lazy_import_attributes(name, attributes):
+    """
+    Makes every attribute of package *name* listed in *attributes*
+    imported the first time it is used. The package ``__init__.py``
+    declares where the attributes come from instead of importing them::
+
+        from pyquickhelper._lazy_import import lazy_import_attributes
+
+        __getattr__, __dir__ = lazy_import_attributes(__name__, {
+            'zip_files': '.compression_helper',
+            'git_clone': ('.repositories.pygit_helper', 'clone'),
+        })
+
+    @param      name        name of the package (``__name__``)
+    @param      attributes  dictionary ``{ attribute: submodule }``
+                            or ``{ attribute: (submodule, name in submodule) }``,
+                            the submodule is relative to the package
+    @return                 functions ``__getattr__``, ``__dir__``
+    """
+    module = sys.modules[name]
+    module.__lazy_attributes__ = attributes
+    module.__class__ = _LazyModule
+
+    def __getattr__(attr):
+        spec = attributes.get(attr, None)
+        if spec is None:
+            # a submodule imported as a side effect
+            # of the former eager imports
+            if not attr.startswith("__") and importlib.util.find_spec(
+                    "." + attr, name) is not None:
+                return importlib.import_module("." + attr, name)
+            raise AttributeError(
+                "module '{0}' has no attribute '{1}'".format(name, attr))
+        sub, orig = (spec, attr) if isinstance(spec, str) else spec
+        value = getattr(importlib.import_module(sub, name), orig)
+        setattr(module, attr, value)
+        return value
+
+    def __dir__():
+        return sorted(set(module.__dict__) | set(attributes))
+
+    return __getattr__, __dir__
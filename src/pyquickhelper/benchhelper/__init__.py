@@ -3,5 +3,9 @@
 @brief Shortcuts to benchhelper
 """
 
-from .benchmark import BenchMark
-from .grid_benchmark import GridBenchMark
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'BenchMark': '.benchmark',
+    'GridBenchMark': '.grid_benchmark',
+})
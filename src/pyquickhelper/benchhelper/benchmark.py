@@ -12,6 +12,41 @@ from ..pandashelper import df2rst
 from ..texthelper import apply_template
 
 
+# benchmark used by the processes created by BenchMark.run
+_process_bench = None
+
+
+def _bench_process_init(bench, cpus):
+    """
+    Initializes a process created by @see me run,
+    it keeps the benchmark and pins the process to one CPU
+    taken from queue *cpus* if it is not None.
+    """
+    global _process_bench  # pylint: disable=W0603
+    _process_bench = bench
+    if cpus is not None:
+        cpu = cpus.get()
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {cpu})
+
+
+def _bench_process_run(bench, di):
+    """
+    Runs one benchmark in a process created by @see me run,
+    *bench* is None if the process was initialized with
+    @see fn _bench_process_init.
+
+    @return     date, duration, time span, results of method *bench*
+    """
+    if bench is None:
+        bench = _process_bench
+    dt = datetime.now()
+    cl = perf_counter()
+    tu = bench.bench(**di)
+    cl = perf_counter() - cl
+    return dt, cl, datetime.now() - dt, tu
+
+
 class BenchMark:
     """
     Class to help benchmarking. You should overwrite method
@@ -222,6 +257,19 @@ class BenchMark:
         """
         return self._name
 
+    def __getstate__(self):
+        """
+        Removes the logging functions and the progress bars
+        before pickling (see @see me run with *n_jobs*).
+        """
+        state = self.__dict__.copy()
+        state["_clog"] = None
+        state["_fLOG"] = noLOG
+        state["_progressbar"] = None
+        state["_progressbars"] = None
+        state["_tracelogs"] = []
+        return state
+
     def fLOG(self, *args, **kwargs):
         """
         Logs something.
@@ -237,11 +285,31 @@ class BenchMark:
                 "\n", *args, **kwargs).strip("\n").split("\n")[0])
             br.refresh()
 
-    def run(self, params_list):
+    def run(self, params_list, n_jobs=None, executor=None, cpu_affinity=False):
         """
         Runs the benchmark.
 
         @param      params_list     list of dictionaries
+        @param      n_jobs          None to run every experiment in this process,
+                                    otherwise the number of processes running
+                                    the experiments not retrieved from the cache
+        @param      executor        an existing executor
+                                    (:epkg:`*py:concurrent.futures`) used instead
+                                    of a new process pool, it overwrites *n_jobs*
+        @param      cpu_affinity    only if *n_jobs* is not None, pins every process
+                                    to one CPU (Linux only), True for the first
+                                    *n_jobs* CPUs available or a list of CPUs,
+                                    CPUs are shared if there are not enough
+        @return                     metrics, metadata
+
+        When the experiments run in other processes, the instance
+        is copied into every process after method *init* was called,
+        it must be pickable if processes are not forked.
+        Logging functions and progress bars are not copied.
+        The metrics and the cache stay in the order of *params_list*.
+
+        .. versionchanged:: 1.9
+            Parameters *n_jobs*, *executor*, *cpu_affinity* were added.
         """
         if not isinstance(params_list, list):
             raise TypeError("params_list must be a list")  # pragma: no cover
@@ -287,10 +355,10 @@ class BenchMark:
             self.fLOG("[BenchMark.run] init {0} done".format(self.Name))
             self.fLOG("[BenchMark.run] start {0}".format(self.Name))
 
-            for i in pgbar:
-                di = params_list[i]
-
-                # check the cache
+            # check the cache
+            is_cached = []
+            for i, di in enumerate(params_list):
+                can = False
                 if i < len(cached["params_list"]) and cached["params_list"][i] == di:
                     can = True
                     for v in cached.values():
@@ -307,25 +375,40 @@ class BenchMark:
                             can = False
                             self.fLOG(
                                 "[BenchMark.run] file '{0}' was not found --> run again.".format(look))
-                    if can:
-                        self._metrics.append(cached["metrics"][i])
-                        self._appendix.append(cached["appendix"][i])
-                        self.fLOG(
-                            "[BenchMark.run] retrieved cached {0}/{1}: {2}".format(i + 1, len(params_list), di))
-                        self.fLOG(
-                            "[BenchMark.run] file '{0}' was found.".format(look))
-                        nb_cached += 1
-                        continue
+                        else:
+                            self.fLOG(
+                                "[BenchMark.run] file '{0}' was found.".format(look))
+                is_cached.append(can)
+
+            # run the experiments in other processes
+            results = {}
+            if n_jobs is not None or executor is not None:
+                todo = [i for i, c in enumerate(is_cached) if not c]
+                if len(todo) > 0:
+                    results = run_parallel_(todo)
+
+            for i in pgbar:
+                di = params_list[i]
 
-                    # cache is available
+                if is_cached[i]:
+                    self._metrics.append(cached["metrics"][i])
+                    self._appendix.append(cached["appendix"][i])
+                    self.fLOG(
+                        "[BenchMark.run] retrieved cached {0}/{1}: {2}".format(i + 1, len(params_list), di))
+                    nb_cached += 1
+                    continue
 
                 # no cache
-                self.fLOG(
-                    "[BenchMark.run] {0}/{1}: {2}".format(i + 1, len(params_list), di))
-                dt = datetime.now()
-                cl = perf_counter()
-                tu = self.bench(**di)
-                cl = perf_counter() - cl
+                if i in results:
+                    dt, cl, span, tu = results[i]
+                else:
+                    self.fLOG(
+                        "[BenchMark.run] {0}/{1}: {2}".format(i + 1, len(params_list), di))
+                    dt = datetime.now()
+                    cl = perf_counter()
+                    tu = self.bench(**di)
+                    cl = perf_counter() - cl
+                    span = None
 
                 if isinstance(tu, tuple):
                     tus = [tu]
@@ -350,7 +433,7 @@ class BenchMark:
 
                 for met, app in tus:
                     met["_date"] = dt
-                    dt = datetime.now() - dt
+                    dt = datetime.now() - dt if span is None else span
                     if not isinstance(met, dict):
                         raise TypeError(  # pragma: no cover
                             "metrics should be a dictionary")
@@ -376,6 +459,35 @@ class BenchMark:
                     self.fLOG(
                         "[BenchMark.run] {0}/{1} end {2}".format(i + 1, len(params_list), met))
 
+        def run_parallel_(todo):
+            "local function"
+            from concurrent.futures import ProcessPoolExecutor
+            self.fLOG("[BenchMark.run] run {0} experiments in parallel".format(
+                len(todo)))
+            if executor is None:
+                cpus = None
+                nb = min(n_jobs, len(todo))
+                if cpu_affinity:
+                    import multiprocessing
+                    if cpu_affinity is True:
+                        if hasattr(os, "sched_getaffinity"):
+                            available = sorted(os.sched_getaffinity(0))
+                        else:
+                            available = list(range(os.cpu_count()))
+                    else:
+                        available = list(cpu_affinity)
+                    cpus = multiprocessing.Queue()
+                    for k in range(nb):
+                        cpus.put(available[k % len(available)])
+                with ProcessPoolExecutor(max_workers=nb, initializer=_bench_process_init,
+                                         initargs=(self, cpus)) as pool:
+                    futures = {i: pool.submit(_bench_process_run, None, params_list[i])
+                               for i in todo}
+                    return {i: f.result() for i, f in futures.items()}
+            futures = {i: executor.submit(_bench_process_run, self, params_list[i])
+                       for i in todo}
+            return {i: f.result() for i, f in futures.items()}
+
         def graph_():
             "local function"
             self.fLOG("[BenchMark.run] graph {0} do".format(self.Name))
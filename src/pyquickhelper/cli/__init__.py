@@ -3,4 +3,11 @@
 @brief Shortcuts to cli.
 """
 
-from .cli_helper import create_cli_parser, call_cli_function, cli_main_helper
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'create_cli_parser': '.cli_helper',
+    'call_cli_function': '.cli_helper',
+    'cli_main_helper': '.cli_helper',
+    'CliParserCache': '.cli_parser_cache',
+})
@@ -6,7 +6,7 @@ from __future__ import print_function
 import argparse
 import inspect
 import re
-from fire.docstrings import parse
+import importlib
 
 
 def clean_documentation_for_cli(doc, cleandoc):
@@ -55,7 +55,8 @@ def clean_documentation_for_cli(doc, cleandoc):
 
 
 def create_cli_parser(f, prog=None, layout="sphinx", skip_parameters=('fLOG',),
-                      cleandoc=("epkg", "link"), positional=None, cls=None, **options):
+                      cleandoc=("epkg", "link"), positional=None, cls=None,
+                      cache=None, **options):
     """
     Automatically creates a parser based on a function,
     its signature with annotation and its documentation (assuming
@@ -72,16 +73,56 @@ def create_cli_parser(f, prog=None, layout="sphinx", skip_parameters=('fLOG',),
     @param      positional      positional argument
     @param      cls             parser class, :epkg:`*py:argparse:ArgumentParser`
                                 by default
+    @param      cache           None or @see cl CliParserCache, the specifications
+                                of the parser are stored in the cache and
+                                the documentation is not parsed again until
+                                the source file of the function changes,
+                                the cache is ignored if *cleandoc* is a function
     @return                     :epkg:`*py:argparse:ArgumentParser`
 
     If an annotation offers mutiple types,
     the first one will be used for the command line.
 
     .. versionchanged:: 1.9
-        Parameters *cls*, *positional* were added.
+        Parameters *cls*, *positional*, *cache* were added.
+    """
+    spec = None
+    key = None
+    if cache is not None:
+        key = cache.make_key(f, prog=prog, skip_parameters=skip_parameters,
+                             cleandoc=cleandoc, positional=positional)
+        if key is not None:
+            spec = cache.get(key, f.__module__)
+    if spec is None:
+        spec = create_cli_parser_spec(
+            f, prog=prog, skip_parameters=skip_parameters,
+            cleandoc=cleandoc, positional=positional)
+        if key is not None:
+            cache.set(key, f.__module__, spec)
+    return create_cli_parser_from_spec(spec, cls=cls)
+
+
+def create_cli_parser_spec(f, prog=None, skip_parameters=('fLOG',),
+                           cleandoc=("epkg", "link"), positional=None):
+    """
+    Extracts from the signature and the documentation of a function
+    everything needed to build its parser
+    (see @see fn create_cli_parser_from_spec).
+    The result only contains strings, numbers, lists and dictionaries.
+
+    @param      f               function
+    @param      prog            to give the parser a different name than the function name
+    @param      skip_parameters do not expose these parameters
+    @param      cleandoc        cleans the documentation before converting it into text,
+                                @see fn clean_documentation_for_cli
+    @param      positional      positional argument
+    @return                     dictionary
+
+    .. versionadded:: 1.9
     """
     # delayed import to speed up import.
     # from ..helpgen import docstring2html
+    from fire.docstrings import parse
     if "@param" in f.__doc__:
         raise RuntimeError(  # pragma: no cover
             "@param is not allowed in documentation for function '{}' in '{}'.".format(
@@ -99,26 +140,74 @@ def create_cli_parser(f, prog=None, layout="sphinx", skip_parameters=('fLOG',),
     # add arguments with the signature
     signature = inspect.signature(f)
     parameters = signature.parameters
-    if cls is None:
-        cls = argparse.ArgumentParser
-    parser = cls(prog=prog or f.__name__, description=fulldocinfo.summary,
-                 formatter_class=argparse.ArgumentDefaultsHelpFormatter)
 
     if skip_parameters is None:
         skip_parameters = []
     names = {"h": "already taken"}
+    arguments = []
     for k, p in parameters.items():
         if k in skip_parameters:
             continue
         if k not in docparams:
             raise ValueError(  # pragma: no cover
                 "Parameter '{0}' is not documented in\n{1}.".format(k, docf))
-        create_cli_argument(parser, p, docparams[k], names, positional)
+        arguments.append(_cli_argument_spec(
+            p, docparams[k], names, positional))
+
+    return dict(prog=prog or f.__name__, description=fulldocinfo.summary,
+                summary=f.__doc__.strip("\r\n ").split("\n")[0],
+                arguments=arguments)
 
-    # end
+
+def create_cli_parser_from_spec(spec, cls=None):
+    """
+    Creates a parser from the specifications
+    returned by @see fn create_cli_parser_spec.
+
+    @param      spec        dictionary
+    @param      cls         parser class, :epkg:`*py:argparse:ArgumentParser`
+                            by default
+    @return                 :epkg:`*py:argparse:ArgumentParser`
+
+    .. versionadded:: 1.9
+    """
+    if cls is None:
+        cls = argparse.ArgumentParser
+    parser = cls(prog=spec["prog"], description=spec["description"],
+                 formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    for arg in spec["arguments"]:
+        _add_cli_argument(parser, arg)
     return parser
 
 
+def _cli_bool(s):
+    # see https://stackoverflow.com/questions/15008758/parsing-boolean-values-with-argparse
+    return s.lower() in {'true', 't', 'yes', '1'}
+
+
+_cli_types = {'int': int, 'str': str, 'float': float, 'bool': _cli_bool}
+
+
+def _add_cli_argument(parser, arg):
+    """
+    Adds an argument described by @see fn _cli_argument_spec.
+    """
+    typ = arg["type"]
+    if typ in _cli_types:
+        if "default" in arg:
+            parser.add_argument(*arg["names"], type=_cli_types[typ],
+                                help=arg["help"], default=arg["default"])
+        else:
+            parser.add_argument(
+                *arg["names"], type=_cli_types[typ], help=arg["help"])
+    elif typ == "none":
+        parser.add_argument(*arg["names"], type=str,
+                            help=arg["help"], default="")
+    else:
+        # Positional argument
+        parser.add_argument(*arg["names"], help=arg["help"])
+
+
 def create_cli_argument(parser, param, doc, names, positional):
     """
     Adds an argument for :epkg:`*py:argparse:ArgumentParser`.
@@ -135,6 +224,14 @@ def create_cli_argument(parser, param, doc, names, positional):
     .. versionchanged:: 1.9
         Parameter *positional* was added.
     """
+    _add_cli_argument(parser, _cli_argument_spec(param, doc, names, positional))
+
+
+def _cli_argument_spec(param, doc, names, positional):
+    """
+    Returns the description of an argument as a dictionary,
+    see @see fn create_cli_argument.
+    """
     p = param
     if p.annotation and p.annotation != inspect._empty:
         typ = p.annotation
@@ -172,30 +269,24 @@ def create_cli_argument(parser, param, doc, names, positional):
         typ = typ[0]
 
     if typ in (int, str, float, bool):
+        res = dict(names=pnames, type=typ.__name__, help=doc)
         default = None if p.default == inspect._empty else p.default
-        if typ == bool:
-            # see https://stackoverflow.com/questions/15008758/parsing-boolean-values-with-argparse
-            def typ_(s):
-                return s.lower() in {'true', 't', 'yes', '1'}
-            typ = typ_
         if default is not None:
-            parser.add_argument(*pnames, type=typ, help=doc, default=default)
-        else:
-            parser.add_argument(*pnames, type=typ, help=doc)
-    elif typ is None or str(typ) == "<class 'NoneType'>":
-        parser.add_argument(*pnames, type=str, help=doc, default="")
-    elif str(typ) == "<class 'type'>":
+            res["default"] = default
+        return res
+    if typ is None or str(typ) == "<class 'NoneType'>":
+        return dict(names=pnames, type="none", help=doc)
+    if str(typ) == "<class 'type'>":
         # Positional argument
-        parser.add_argument(*pnames, help=doc)
-    else:
-        raise NotImplementedError(  # pragma: no cover
-            "typ='{0}' not supported (parameter '{1}'). \n"
-            "None should be replaced by an empty string \n"
-            "as empty value are received that way.".format(typ, p))
+        return dict(names=pnames, type="positional", help=doc)
+    raise NotImplementedError(  # pragma: no cover
+        "typ='{0}' not supported (parameter '{1}'). \n"
+        "None should be replaced by an empty string \n"
+        "as empty value are received that way.".format(typ, p))
 
 
 def call_cli_function(f, args=None, parser=None, fLOG=print, skip_parameters=('fLOG',),
-                      cleandoc=("epkg", 'link'), prog=None, **options):
+                      cleandoc=("epkg", 'link'), prog=None, cache=None, **options):
     """
     Calls a function *f* given parsed arguments.
 
@@ -208,6 +299,7 @@ def call_cli_function(f, args=None, parser=None, fLOG=print, skip_parameters=('f
     @param      cleandoc        cleans the documentation before converting it into text,
                                 @see fn clean_documentation_for_cli
     @param      prog            to give the parser a different name than the function name
+    @param      cache           see @see fn create_cli_parser
     @param      options         additional :epkg:`Sphinx` options
     @return                     the output of the wrapped function
 
@@ -235,10 +327,13 @@ def call_cli_function(f, args=None, parser=None, fLOG=print, skip_parameters=('f
                 r = rows[0][0]
                 if not r.startswith("usage: mycommand_line ..."):
                     raise Exception(r)
+
+    .. versionchanged:: 1.9
+        Parameter *cache* was added.
     """
     if parser is None:
         parser = create_cli_parser(f, prog=prog, skip_parameters=skip_parameters,
-                                   cleandoc=cleandoc, **options)
+                                   cleandoc=cleandoc, cache=cache, **options)
     if args is not None and (args == ['--help'] or args == ['-h']):  # pylint: disable=R1714
         fLOG(parser.format_help())
     else:
@@ -283,14 +378,30 @@ def call_cli_function(f, args=None, parser=None, fLOG=print, skip_parameters=('f
     return None
 
 
+def resolve_cli_function(fct):
+    """
+    Returns the function a command refers to, it imports it
+    if *fct* is a string ``'module.function'``.
+
+    @param      fct     function or string
+    @return             function
+
+    .. versionadded:: 1.9
+    """
+    if isinstance(fct, str):
+        mod, name = fct.rsplit('.', 1)
+        return getattr(importlib.import_module(mod), name)
+    return fct
+
+
 def guess_module_name(fct):
     """
     Guesses the module name based on a function.
 
-    @param      fct     function
+    @param      fct     function or string ``'module.function'``
     @return             module name
     """
-    mod = fct.__module__
+    mod = fct.rsplit('.', 1)[0] if isinstance(fct, str) else fct.__module__
     spl = mod.split('.')
     name = spl[0]
     if name == 'src':
@@ -298,13 +409,18 @@ def guess_module_name(fct):
     return spl[0]
 
 
-def cli_main_helper(dfct, args, fLOG=print):
+def cli_main_helper(dfct, args, fLOG=print, cache=True):
     """
     Implements the main commmand line for a module.
 
-    @param      dfct        dictionary ``{ key: fct }``
+    @param      dfct        dictionary ``{ key: fct }``, *fct* can be a string
+                            ``'module.function'``, the module is only imported
+                            if the command is called
     @param      args        arguments
     @param      fLOG        logging function
+    @param      cache       True to use the default @see cl CliParserCache,
+                            False or None to disable it, or an instance
+                            of @see cl CliParserCache
     @return                 the output of the wrapped function
 
     The function makes it quite simple to write a file
@@ -362,7 +478,20 @@ def cli_main_helper(dfct, args, fLOG=print):
     ::
 
         python -u -m <module> --GUI
+
+    The specifications of the parsers are cached
+    (see @see cl CliParserCache). The list of commands and the
+    help of a command are displayed without importing the modules
+    implementing the commands if the cache is up to date.
+
+    .. versionchanged:: 1.9
+        Parameter *cache* was added.
     """
+    if cache is True:
+        from .cli_parser_cache import CliParserCache
+        cache = CliParserCache()
+    elif cache is False:
+        cache = None
     if fLOG is None:
         raise ValueError("fLOG must be defined.")  # pragma: no cover
     first = None
@@ -372,12 +501,25 @@ def cli_main_helper(dfct, args, fLOG=print):
     if not first:
         raise ValueError("dictionary must not be empty.")  # pragma: no cover
 
+    def cached_spec(cmd, fct):
+        # only commands given as strings can avoid the import
+        if cache is None or not isinstance(fct, str):
+            return None
+        key = cache.make_key(fct, prog=cmd, skip_parameters=('fLOG', ),
+                             cleandoc=("epkg", 'link'), positional=None)
+        return cache.get(key, fct.rsplit('.', 1)[0])
+
     def print_available():
         maxlen = max(map(len, dfct)) + 3
         fLOG("Available commands:")
         fLOG("")
         for a, fct in sorted(dfct.items()):
-            doc = fct.__doc__.strip("\r\n ").split("\n")[0]
+            spec = cached_spec(a, fct)
+            if spec is None:
+                fct = resolve_cli_function(fct)
+                doc = fct.__doc__.strip("\r\n ").split("\n")[0]
+            else:
+                doc = spec["summary"]
             fLOG("    " + a + " " * (maxlen - len(a)) + doc)
 
     modname = guess_module_name(first)
@@ -397,14 +539,21 @@ def cli_main_helper(dfct, args, fLOG=print):
         cp = args.copy()
         del cp[0]
         if cmd in dfct:
-            fct = dfct[cmd]
+            if cp == ['--help'] or cp == ['-h']:  # pylint: disable=R1714
+                spec = cached_spec(cmd, dfct[cmd])
+                if spec is not None:
+                    fLOG(create_cli_parser_from_spec(spec).format_help())
+                    return None
+            fct = resolve_cli_function(dfct[cmd])
             sig = inspect.signature(fct)
             if 'args' not in sig.parameters or 'fLOG' not in sig.parameters:
                 return call_cli_function(fct, prog=cmd, args=cp, fLOG=fLOG,
-                                         skip_parameters=('fLOG', ))
+                                         skip_parameters=('fLOG', ),
+                                         cache=cache)
             else:
                 return fct(args=cp, fLOG=fLOG)
         elif cmd in ('--GUI', '-G', "--GUITEST"):
+            dfct = {k: resolve_cli_function(v) for k, v in dfct.items()}
             return call_gui_function(dfct, fLOG=fLOG, utest=cmd == "--GUITEST")
         else:
             fLOG("Command not found: '{0}'.".format(cmd))
@@ -0,0 +1,172 @@
+"""
+@file
+@brief Stores the specifications of the parsers created by
+@see fn create_cli_parser to avoid parsing the documentation
+of every command each time the command line starts.
+
+.. versionadded:: 1.9
+"""
+import os
+import sys
+import json
+import hashlib
+import importlib.util
+
+
+class CliParserCache:
+    """
+    Caches the specifications returned by @see fn create_cli_parser_spec
+    into a :epkg:`json` file. An entry is keyed by the qualified name
+    of the function and the options used to build the parser,
+    it is discarded as soon as the source file of the function changes.
+    The cache does not need to import the function to check
+    an entry is still valid, a command line can display its help
+    without importing the module implementing the command.
+
+    .. exref::
+        :title: Build a parser from the cache
+
+        ::
+
+            from pyquickhelper.cli.cli_helper import create_cli_parser
+            from pyquickhelper.cli.cli_parser_cache import CliParserCache
+            from pyquickhelper.pycode import clean_files
+
+            cache = CliParserCache("parsers.json")
+            # the first call parses the documentation,
+            # the second one reads the cache
+            parser = create_cli_parser(clean_files, cache=cache)
+            parser = create_cli_parser(clean_files, cache=cache)
+    """
+
+    #: changed every time the format of the specifications changes
+    version = 1
+
+    def __init__(self, filename=None):
+        """
+        @param      filename        cache file, if None, it uses the
+                                    environment variable ``PYQUICKHELPER_CACHE``
+                                    or ``~/.cache/pyquickhelper/cli_parsers.json``
+        """
+        if filename is None:
+            filename = CliParserCache.default_filename()
+        self.filename = filename
+        self._data = None
+        self._hashes = {}
+
+    @staticmethod
+    def default_filename():
+        """
+        Returns the default location of the cache.
+        """
+        name = os.environ.get("PYQUICKHELPER_CACHE", None)
+        if name:
+            return name
+        return os.path.join(os.path.expanduser("~"), ".cache",
+                            "pyquickhelper", "cli_parsers.json")
+
+    def _load(self):
+        if self._data is None:
+            try:
+                with open(self.filename, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+                if not isinstance(self._data, dict):
+                    self._data = {}
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def _save(self):
+        tmp = "{0}.{1}.tmp".format(self.filename, os.getpid())
+        try:
+            folder = os.path.dirname(self.filename)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+            # another process may read the file at the same time
+            os.replace(tmp, self.filename)
+        except OSError:  # pragma: no cover
+            # the cache is an optimisation, a read-only
+            # location must not break the command line
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def source_hash(self, module):
+        """
+        Returns the :epkg:`sha256` of the source file of a module
+        without importing it, None if it cannot be found.
+
+        @param      module      module name
+        @return                 string or None
+        """
+        if module in self._hashes:
+            return self._hashes[module]
+        name = None
+        if module in sys.modules:
+            name = getattr(sys.modules[module], "__file__", None)
+        else:
+            try:
+                spec = importlib.util.find_spec(module)
+            except (ImportError, ValueError):  # pragma: no cover
+                spec = None
+            if spec is not None:
+                name = spec.origin
+        res = None
+        if name and os.path.isfile(name):
+            with open(name, "rb") as f:
+                res = hashlib.sha256(f.read()).hexdigest()
+        self._hashes[module] = res
+        return res
+
+    def make_key(self, f, **options):
+        """
+        Returns the key of a parser.
+
+        @param      f           function or string ``'module.function'``
+        @param      options     options given to @see fn create_cli_parser_spec
+        @return                 string or None if the options cannot be cached
+        """
+        if isinstance(f, str):
+            module, name = f.rsplit('.', 1)
+        else:
+            module, name = f.__module__, f.__qualname__
+        if callable(options.get("cleandoc", None)):
+            # a function cannot be part of the key
+            return None
+        try:
+            opts = json.dumps(options, sort_keys=True)
+        except TypeError:
+            return None
+        return "{0}:{1}.{2}:{3}".format(self.version, module, name, opts)
+
+    def get(self, key, module):
+        """
+        Returns the specifications stored for *key*
+        if the source of *module* did not change.
+
+        @param      key         key returned by @see me make_key
+        @param      module      module name of the function
+        @return                 dictionary or None
+        """
+        entry = self._load().get(key, None)
+        if entry is None:
+            return None
+        if entry.get("hash", None) != self.source_hash(module):
+            return None
+        return entry["spec"]
+
+    def set(self, key, module, spec):
+        """
+        Stores new specifications and saves the cache.
+
+        @param      key         key returned by @see me make_key
+        @param      module      module name of the function
+        @param      spec        specifications
+        """
+        h = self.source_hash(module)
+        if h is None:
+            return
+        data = self._load()
+        data[key] = dict(hash=h, spec=spec)
+        self._save()
@@ -3,25 +3,54 @@
 @brief Shortcuts to filehelper
 """
 import os
-from .anyfhelper import change_file_status, read_content_ufs
-from .compression_helper import (
-    zip_files, gzip_files, zip7_files, unzip_files, ungzip_files,
-    un7zip_files, unrar_files, untar_files
-)
-from .download_helper import get_url_content_timeout, InternetException
-from .encrypted_backup import EncryptedBackup
-from .encryption import decrypt_stream, encrypt_stream
-from .file_info import FileInfo, is_file_string, checksum_md5, is_url_string
-from .ftp_transfer import TransferFTP
-from .ftp_transfer_files import FolderTransferFTP
-from .file_tree_node import FileTreeNode
-from .internet_helper import download, read_url
-from .synchelper import explore_folder, synchronize_folder, has_been_updated, remove_folder
-from .synchelper import explore_folder_iterfile, explore_folder_iterfile_repo, walk
-from .transfer_api import TransferAPI
-from .transfer_api_ftp import TransferAPIFtp
-from .transfer_api_file import TransferAPIFile
-from .visual_sync import create_visual_diff_through_html, create_visual_diff_through_html_files
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'change_file_status': '.anyfhelper',
+    'read_content_ufs': '.anyfhelper',
+    'zip_files': '.compression_helper',
+    'gzip_files': '.compression_helper',
+    'zip7_files': '.compression_helper',
+    'unzip_files': '.compression_helper',
+    'ungzip_files': '.compression_helper',
+    'un7zip_files': '.compression_helper',
+    'unrar_files': '.compression_helper',
+    'untar_files': '.compression_helper',
+    'ArchiveMember': '.compression_parallel',
+    'ArchiveMembers': '.compression_parallel',
+    'ParallelGzipWriter': '.compression_parallel',
+    'ParallelZipWriter': '.compression_parallel',
+    'pgzip_file': '.compression_parallel',
+    'get_url_content_timeout': '.download_helper',
+    'InternetException': '.download_helper',
+    'EncryptedBackup': '.encrypted_backup',
+    'decrypt_stream': '.encryption',
+    'encrypt_stream': '.encryption',
+    'FileHasher': '.file_hash',
+    'FileInfo': '.file_info',
+    'is_file_string': '.file_info',
+    'checksum_md5': '.file_info',
+    'is_url_string': '.file_info',
+    'TransferFTP': '.ftp_transfer',
+    'FolderTransferFTP': '.ftp_transfer_files',
+    'FileScanIndex': '.file_scan_index',
+    'FileTreeNode': '.file_tree_node',
+    'download': '.internet_helper',
+    'read_url': '.internet_helper',
+    'explore_folder': '.synchelper',
+    'synchronize_folder': '.synchelper',
+    'has_been_updated': '.synchelper',
+    'remove_folder': '.synchelper',
+    'explore_folder_iterfile': '.synchelper',
+    'explore_folder_iterfile_repo': '.synchelper',
+    'walk': '.synchelper',
+    'TransferAPI': '.transfer_api',
+    'AsyncTransferAPI': '.transfer_api_async',
+    'TransferAPIFtp': '.transfer_api_ftp',
+    'TransferAPIFile': '.transfer_api_file',
+    'create_visual_diff_through_html': '.visual_sync',
+    'create_visual_diff_through_html_files': '.visual_sync',
+})
 
 
 def check():
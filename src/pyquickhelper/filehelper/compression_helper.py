@@ -6,8 +6,12 @@
 import os
 import zipfile
 import datetime
+import functools
 import gzip
+import shutil
 import sys
+import tempfile
+import threading
 import warnings
 import tarfile
 from io import BytesIO
@@ -16,26 +20,49 @@ from ..loghelper.flog import noLOG, run_cmd
 from .fexceptions import FileException
 from ..texthelper.diacritic_helper import remove_diacritics
 from .synchelper import explore_folder
+from .compression_parallel import (
+    ParallelZipWriter, ParallelGzipWriter, ArchiveMember, ArchiveMembers,
+    copy_stream, map_in_order)
 
 
-def zip_files(filename, file_set, root=None, fLOG=noLOG):
+def zip_files(filename, file_set, root=None, fLOG=noLOG, workers=None,
+              compresslevel=None):
     """
     Zips all files from an iterator.
 
-    @param      filename        final zip file (can be None)
+    @param      filename        final zip file (can be None or a stream)
     @param      file_set        iterator on file to add
     @param      root            if not None, all path are relative to this path
     @param      fLOG            logging function
+    @param      workers         None to use :epkg:`*py:zipfile:ZipFile`,
+                                otherwise the number of threads compressing
+                                the files (see @see cl ParallelZipWriter)
+    @param      compresslevel   None or 0 to store the files without compression
+                                if *workers* is None, 6 otherwise,
+                                compression level (1 to 9)
     @return                     number of added files (or content if filename is None)
 
     *filename* can be None, the function compresses
     into bytes without saving the results.
+    The zip file is written in order into *filename* if *workers*
+    is specified, it does not need to be seekable.
+
+    .. versionchanged:: 1.9
+        Parameters *workers*, *compresslevel* were added.
     """
     nb = 0
     a1980 = datetime.datetime(1980, 1, 1)
     if filename is None:
         filename = BytesIO()
-    with zipfile.ZipFile(filename, 'w') as myzip:
+    if workers is None:
+        myzip = zipfile.ZipFile(
+            filename, 'w', compresslevel=compresslevel or None,
+            compression=zipfile.ZIP_DEFLATED if compresslevel else zipfile.ZIP_STORED)
+    else:
+        myzip = ParallelZipWriter(
+            filename, compresslevel=6 if compresslevel is None else compresslevel,
+            workers=workers)
+    with myzip:
         for file in file_set:
             if not os.path.exists(file):
                 continue
@@ -60,7 +87,7 @@ def zip_files(filename, file_set, root=None, fLOG=noLOG):
 
 
 def unzip_files(zipf, where_to=None, fLOG=noLOG, fvalid=None, remove_space=True,
-                fail_if_error=True):
+                fail_if_error=True, workers=None, lazy=False, chunk_size=2 ** 20):
     """
     Unzips files from a zip archive.
 
@@ -68,106 +95,169 @@ def unzip_files(zipf, where_to=None, fLOG=noLOG, fvalid=None, remove_space=True,
     @param      where_to        destination folder (can be None, the result is a list of tuple)
     @param      fLOG            logging function
     @param      fvalid          function which takes two paths (zip name, local name) and return True if the file
-                                must be unzipped, False otherwise, if None, the default answer is True
+                                must be unzipped, False otherwise, if None, the default answer is True,
+                                the local name is None if *where_to* is None
     @param      remove_space    remove spaces in created local path (+ ``',()``)
     @param      fail_if_error   fails if an error is encountered
                                 (typically a weird character in a filename),
                                 otherwise a warning is thrown.
+    @param      workers         None or a number of threads, if > 1,
+                                the members are extracted in parallel
+    @param      lazy            if True, *where_to* must be None, the function
+                                returns a @see cl ArchiveMembers, a list of tuple
+                                ``(name, member)`` where *member* is a @see cl ArchiveMember,
+                                nothing is decompressed before the member is opened,
+                                the archive stays open until the list is closed
+    @param      chunk_size      the members are copied into the destination
+                                by chunks of this size
     @return                     list of unzipped files
+
+    .. versionchanged:: 1.9
+        *fvalid* is applied on the list of members before any of them
+        is extracted, even if *where_to* is None. The members are
+        copied into the destination by chunks instead of being loaded
+        in memory. Parameters *workers*, *lazy*, *chunk_size* were added.
     """
     if isinstance(zipf, bytes):
         zipf = BytesIO(zipf)
+    if lazy and where_to is not None:
+        raise ValueError("where_to must be None if lazy is True.")
 
+    # ZipFile does not close a file it receives, the threads can share it
+    fp = open(zipf, "rb") if isinstance(zipf, str) else zipf
     try:
-        with zipfile.ZipFile(zipf, "r"):
-            pass
+        file = zipfile.ZipFile(fp, "r")
     except zipfile.BadZipFile as e:  # pragma: no cover
+        if fp is not zipf:
+            fp.close()
         if isinstance(zipf, BytesIO):
             raise e
         raise IOError("Unable to read file '{0}'".format(zipf)) from e
 
-    files = []
-    with zipfile.ZipFile(zipf, "r") as file:
-        for info in file.infolist():
-            if fLOG:
-                fLOG("[unzip_files] unzip '{0}'".format(info.filename))
-            if where_to is None:
+    if lazy:
+        # the archive remains open until the list is closed
+        return ArchiveMembers(
+            [(info.filename,
+              ArchiveMember(info.filename, info.file_size,
+                            functools.partial(_open_zip_member, file, info)))
+             for info in file.infolist()
+             if not fvalid or fvalid(info.filename, None)],
+            [file] if fp is zipf else [file, fp])
+
+    def extract_error(info, e):
+        if fail_if_error:
+            raise zipfile.BadZipFile(
+                "Unable to extract '{0}' due to {1}".format(info.filename, e)) from e
+        warnings.warn(
+            "Unable to extract '{0}' due to {1}".format(info.filename, e), UserWarning)
+
+    try:
+        if where_to is None:
+            infos = [info for info in file.infolist()
+                     if not fvalid or fvalid(info.filename, None)]
+            for info in infos:
+                if fLOG:
+                    fLOG("[unzip_files] unzip '{0}'".format(info.filename))
+
+            def read(info):
                 try:
-                    content = file.read(info.filename)
+                    return info.filename, file.read(info)
                 except zipfile.BadZipFile as e:  # pragma: no cover
-                    if fail_if_error:
-                        raise zipfile.BadZipFile(
-                            "Unable to extract '{0}' due to {1}".format(info.filename, e)) from e
-                    warnings.warn(
-                        "Unable to extract '{0}' due to {1}".format(info.filename, e), UserWarning)
-                    continue
-                files.append((info.filename, content))
-            else:
-                clean = remove_diacritics(info.filename)
-                if remove_space:
-                    clean = clean.replace(" ", "").replace("'", "").replace(",", "_") \
-                                 .replace("(", "_").replace(")", "_")
-                tos = os.path.join(where_to, clean)
-                if not os.path.exists(tos):
-                    if fvalid and not fvalid(info.filename, tos):
-                        fLOG("[unzip_files]    skipping", info.filename)
-                        continue
-                    try:
-                        data = file.read(info.filename)
-                    except zipfile.BadZipFile as e:  # pragma: no cover
-                        if fail_if_error:
-                            raise zipfile.BadZipFile(
-                                "Unable to extract '{0}' due to {1}".format(info.filename, e)) from e
-                        warnings.warn(
-                            "Unable to extract '{0}' due to {1}".format(info.filename, e), UserWarning)
-                        continue
-                    # check encoding to avoid characters not allowed in paths
-                    if not os.path.exists(tos):
-                        if sys.platform.startswith("win"):
-                            tos = tos.replace("/", "\\")
-                        finalfolder = os.path.split(tos)[0]
-                        if not os.path.exists(finalfolder):
-                            fLOG("[unzip_files]    creating folder (zip)",
-                                 os.path.abspath(finalfolder))
-                            try:
-                                os.makedirs(finalfolder)
-                            except FileNotFoundError as e:
-                                mes = "Unexpected error\ninfo.filename={0}\ntos={1}\nfinalfolder={2}\nlen(nfinalfolder)={3}".format(
-                                    info.filename, tos, finalfolder, len(finalfolder))
-                                raise FileNotFoundError(mes) from e
-                        if not info.filename.endswith("/"):
-                            try:
-                                with open(tos, "wb") as u:
-                                    u.write(data)
-                            except FileNotFoundError as e:  # pragma: no cover
-                                # probably an issue in the path name
-                                # the next lines are just here to distinguish
-                                # between the two cases
-                                if not os.path.exists(finalfolder):
-                                    raise e
-                                newname = info.filename.replace(
-                                    " ", "_").replace(",", "_")
-                                if sys.platform.startswith("win"):
-                                    newname = newname.replace("/", "\\")
-                                tos = os.path.join(where_to, newname)
-                                finalfolder = os.path.split(tos)[0]
-                                if not os.path.exists(finalfolder):
-                                    fLOG("[unzip_files]    creating folder (zip)",
-                                         os.path.abspath(finalfolder))
-                                    os.makedirs(finalfolder)
-                                with open(tos, "wb") as u:
-                                    u.write(data)
-                            files.append(tos)
-                            fLOG("[unzip_files]    unzipped ",
-                                 info.filename, " to ", tos)
-                    elif not tos.endswith("/"):
-                        files.append(tos)
-                elif not info.filename.endswith("/"):
-                    files.append(tos)
-    return files
+                    extract_error(info, e)
+                    return None
 
+            return [r for r in map_in_order(read, infos, workers) if r is not None]
 
-def gzip_files(filename, file_set, encoding=None, fLOG=noLOG):
+        # fvalid is applied on every member before any extraction
+        files = []
+        tasks = []
+        folders = {}
+        planned = set()
+        for info in file.infolist():
+            if fLOG:
+                fLOG("[unzip_files] unzip '{0}'".format(info.filename))
+            clean = remove_diacritics(info.filename)
+            if remove_space:
+                clean = clean.replace(" ", "").replace("'", "").replace(",", "_") \
+                             .replace("(", "_").replace(")", "_")
+            tos = os.path.join(where_to, clean)
+            if os.path.exists(tos) or tos in planned:
+                if not info.filename.endswith("/"):
+                    files.append(tos)
+                continue
+            if fvalid and not fvalid(info.filename, tos):
+                fLOG("[unzip_files]    skipping", info.filename)
+                continue
+            planned.add(tos)
+            # check encoding to avoid characters not allowed in paths
+            if sys.platform.startswith("win"):
+                tos = tos.replace("/", "\\")
+            finalfolder = os.path.split(tos)[0]
+            if finalfolder not in folders:
+                folders[finalfolder] = (info, tos)
+            if not info.filename.endswith("/"):
+                tasks.append((len(files), info, tos))
+                files.append(tos)
+
+        # folders are created before the threads start
+        for finalfolder, (info, tos) in folders.items():
+            if not os.path.exists(finalfolder):
+                fLOG("[unzip_files]    creating folder (zip)",
+                     os.path.abspath(finalfolder))
+                try:
+                    os.makedirs(finalfolder, exist_ok=True)
+                except FileNotFoundError as e:
+                    mes = "Unexpected error\ninfo.filename={0}\ntos={1}\nfinalfolder={2}\nlen(nfinalfolder)={3}".format(
+                        info.filename, tos, finalfolder, len(finalfolder))
+                    raise FileNotFoundError(mes) from e
+
+        def extract(task):
+            index, info, tos = task
+            try:
+                try:
+                    copy_stream(file.open(info), tos, chunk_size)
+                except FileNotFoundError as e:  # pragma: no cover
+                    # probably an issue in the path name
+                    # the next lines are just here to distinguish
+                    # between the two cases
+                    finalfolder = os.path.split(tos)[0]
+                    if not os.path.exists(finalfolder):
+                        raise e
+                    newname = info.filename.replace(
+                        " ", "_").replace(",", "_")
+                    if sys.platform.startswith("win"):
+                        newname = newname.replace("/", "\\")
+                    tos = os.path.join(where_to, newname)
+                    finalfolder = os.path.split(tos)[0]
+                    if not os.path.exists(finalfolder):
+                        fLOG("[unzip_files]    creating folder (zip)",
+                             os.path.abspath(finalfolder))
+                        os.makedirs(finalfolder, exist_ok=True)
+                    copy_stream(file.open(info), tos, chunk_size)
+            except zipfile.BadZipFile as e:  # pragma: no cover
+                # the error may be detected once the file is written
+                if os.path.exists(tos):
+                    os.remove(tos)
+                extract_error(info, e)
+                return index, None
+            fLOG("[unzip_files]    unzipped ", info.filename, " to ", tos)
+            return index, tos
+
+        for index, tos in map_in_order(extract, tasks, workers):
+            files[index] = tos
+    finally:
+        file.close()
+        if fp is not zipf:
+            fp.close()
+    return [f for f in files if f is not None]
+
+
+def _open_zip_member(file, info):
+    # the archive is shared by all the members, it is not closed
+    return file.open(info), None
+
+
+def gzip_files(filename, file_set, encoding=None, fLOG=noLOG, workers=None):
     """
     Compresses all files from an iterator in a zip file
     and then in a gzip file.
@@ -176,15 +266,26 @@ def gzip_files(filename, file_set, encoding=None, fLOG=noLOG):
     @param      file_set        iterator on file to add
     @param      encoding        encoding of input files (no double compression then)
     @param      fLOG            logging function
+    @param      workers         None to use :epkg:`*py:gzip:GzipFile`,
+                                otherwise the number of threads compressing
+                                the gzip stream (see @see cl ParallelGzipWriter)
     @return                     bytes (if filename is None) or None
+
+    .. versionchanged:: 1.9
+        The zip file is streamed into the gzip file instead of being
+        created in memory first. Parameter *workers* was added.
     """
     if filename is None:
         filename = BytesIO()
     if encoding is None:
-        content = zip_files(None, file_set, fLOG=fLOG)
-        f = gzip.open(filename, 'wb')
-        f.write(content)
-        f.close()
+        if workers is None:
+            f = gzip.open(filename, 'wb')
+        else:
+            f = ParallelGzipWriter(filename, workers=workers)
+        with f:
+            # the zip file is not compressed (it is stored),
+            # the gzip stream compresses it
+            zip_files(f, file_set, fLOG=fLOG, workers=1, compresslevel=0)
         return filename.getvalue() if isinstance(filename, BytesIO) else None
     f = gzip.open(filename, 'wt', encoding="utf-8")
     for name in file_set:
@@ -196,7 +297,7 @@ def gzip_files(filename, file_set, encoding=None, fLOG=noLOG):
 
 
 def ungzip_files(filename, where_to=None, fLOG=noLOG, fvalid=None, remove_space=True,
-                 unzip=True, encoding=None):
+                 unzip=True, encoding=None, workers=None, lazy=False, chunk_size=2 ** 20):
     """
     Uncompresses files from a gzip file.
 
@@ -208,31 +309,66 @@ def ungzip_files(filename, where_to=None, fLOG=noLOG, fvalid=None, remove_space=
     @param      remove_space    remove spaces in created local path (+ ``',()``)
     @param      unzip           unzip file after gzip
     @param      encoding        encoding
+    @param      workers         see @see fn unzip_files
+    @param      lazy            if True, *where_to* must be None, the function returns
+                                @see cl ArchiveMember instead of the content,
+                                a @see cl ArchiveMembers if *unzip* is True
+                                (see @see fn unzip_files)
+    @param      chunk_size      the file is decompressed by chunks of this size
     @return                     list of unzipped files
+
+    .. versionchanged:: 1.9
+        The gzip file is decompressed by chunks into a temporary file
+        before it is unzipped. Parameters *fvalid*, *remove_space* are
+        given to @see fn unzip_files. Parameters *workers*, *lazy*,
+        *chunk_size* were added.
     """
     if isinstance(filename, bytes):
         is_file = False
+        data = filename
         filename = BytesIO(filename)
     else:
         is_file = True
+        data = None
 
     if encoding is None:
-        f = gzip.open(filename, 'rb')
-        content = f.read()
-        f.close()
+        if lazy and where_to is not None:
+            raise ValueError("where_to must be None if lazy is True.")
         if unzip:
+            # a zip file needs random access, it cannot be read from
+            # the gzip stream, the temporary file stays in memory if small
+            tmp = tempfile.SpooledTemporaryFile(max_size=chunk_size * 16)
             try:
-                return unzip_files(content, where_to=where_to, fLOG=fLOG)
+                with gzip.open(filename, 'rb') as f:
+                    shutil.copyfileobj(f, tmp, chunk_size)
+                tmp.seek(0)
+                res = unzip_files(tmp, where_to=where_to, fLOG=fLOG, fvalid=fvalid,
+                                  remove_space=remove_space, workers=workers,
+                                  lazy=lazy, chunk_size=chunk_size)
             except Exception as e:  # pragma: no cover
+                tmp.close()
                 raise IOError(
                     "Unable to unzip file '{0}'".format(filename)) from e
+            if lazy:
+                # the temporary file is closed with the archive
+                res._owners.append(tmp)
+            else:
+                tmp.close()
+            return res
         elif where_to is not None:
-            filename = os.path.split(filename)[-1].replace(".gz", "")
-            filename = os.path.join(where_to, filename)
-            with open(filename, "wb") as f:
-                f.write(content)
-            return filename
-        return content
+            dest = os.path.split(filename)[-1].replace(".gz", "")
+            dest = os.path.join(where_to, dest)
+            copy_stream(gzip.open(filename, 'rb'), dest, chunk_size)
+            return dest
+        elif lazy:
+            if data is None:
+                name = os.path.split(filename)[-1].replace(".gz", "")
+                return ArchiveMember(
+                    name, None, functools.partial(_open_gzip, filename))
+            return ArchiveMember(
+                None, None, functools.partial(_open_gzip, data))
+        with gzip.open(filename, 'rb') as f:
+            return f.read()
     else:
         f = gzip.open(filename, 'rt', encoding="utf-8")
         content = f.read()
@@ -245,6 +381,12 @@ def ungzip_files(filename, where_to=None, fLOG=noLOG, fvalid=None, remove_space=
         return content
 
 
+def _open_gzip(source):
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    return gzip.open(source, 'rb'), None
+
+
 def zip7_files(filename_7z, file_set, fLOG=noLOG, temp_folder="."):
     """
     If :epkg:`7z` is installed, the function uses it
@@ -479,7 +621,8 @@ def unrar_files(zipf, where_to=None, fLOG=noLOG, fvalid=None, remove_space=True)
         return explore_folder(where_to)[1]
 
 
-def untar_files(filename, where_to=None, fLOG=noLOG, encoding=None):
+def untar_files(filename, where_to=None, fLOG=noLOG, encoding=None, fvalid=None,
+                workers=None, lazy=False):
     """
     Uncompresses files from a tar file.
 
@@ -487,29 +630,119 @@ def untar_files(filename, where_to=None, fLOG=noLOG, encoding=None):
     @param      where_to        destination folder (can be None, the result is a list of tuple)
     @param      fLOG            logging function
     @param      encoding        encoding
+    @param      fvalid          function which takes two paths (tar name, local name) and return True if the file
+                                must be extracted, False otherwise, if None, the default answer is True,
+                                the local name is None if *where_to* is None
+    @param      workers         None or a number of threads, if > 1, the members
+                                of an uncompressed tar file are extracted in parallel,
+                                a compressed tar file is read once sequentially
+    @param      lazy            if True, *where_to* must be None, the function
+                                returns a @see cl ArchiveMembers, a list of tuple
+                                ``(name, member)`` where *member* is a @see cl ArchiveMember,
+                                every member opens the archive again,
+                                opening a member of a compressed tar file
+                                decompresses the archive up to that member
     @return                     list of unzipped files
+
+    .. versionchanged:: 1.9
+        The archive is read once, *fvalid* is applied on every member
+        before it is extracted. Parameters *fvalid*, *workers*, *lazy*
+        were added. The function returns the content of the files
+        if *where_to* is None.
     """
+    if lazy and where_to is not None:
+        raise ValueError("where_to must be None if lazy is True.")
     if isinstance(filename, bytes):
-        fileobj = filename
+        data = filename
         name = None
-        targz = True
+        head = data[:6]
     else:
+        data = None
         name = filename
-        fileobj = None
-        targz = name.endswith(".tar.gz")
-
-    if targz:
-        tar = tarfile.open(name=name, fileobj=fileobj,
-                           mode="r:gz", encoding=encoding)
-        names = tar.getnames()
-        tar.extractall(where_to)
-        tar.close()
+        with open(name, "rb") as f:
+            head = f.read(6)
+    # gzip, bz2, xz
+    compressed = head[:2] == b"\x1f\x8b" or head[:3] == b"BZh" or \
+        head == b"\xfd7zXZ\x00"
+
+    def open_tar(mode):
+        return tarfile.open(name=name, fileobj=None if data is None else BytesIO(data),
+                            mode=mode, encoding=encoding)
+
+    if lazy:
+        with open_tar("r:*") as tar:
+            members = [m for m in tar.getmembers()
+                       if m.isfile() and (not fvalid or fvalid(m.name, None))]
+        return ArchiveMembers([(m.name, ArchiveMember(
+            m.name, m.size, functools.partial(_open_tar_member, open_tar, m.name)))
+            for m in members])
+
+    if where_to is None:
+        res = []
+        with open_tar("r|*") as tar:
+            for m in tar:
+                if m.isfile() and (not fvalid or fvalid(m.name, None)):
+                    res.append((m.name, tar.extractfile(m).read()))
+        return res
+
+    selected = []
+    if compressed or workers is None or workers <= 1:
+        # a compressed file is read only once, sequentially,
+        # folders attributes are set at the end as extractall does
+        folders = []
+        with open_tar("r|*") as tar:
+            for m in tar:
+                if fvalid and not fvalid(m.name, os.path.join(where_to, m.name)):
+                    fLOG("[untar_files]    skipping", m.name)
+                    continue
+                selected.append(m)
+                if m.isdir():
+                    folders.append(m)
+                else:
+                    tar.extract(m, where_to)
+            for m in folders:
+                tar.extract(m, where_to)
     else:
-        tar = tarfile.open(name=name, fileobj=fileobj,
-                           mode="r:", encoding=encoding)
-        names = tar.getnames()
-        tar.extractall(where_to)
-        tar.close()
-    if where_to is not None:
-        return [os.path.join(where_to, name) for name in names]
-    return names
+        with open_tar("r:") as tar:
+            members = tar.getmembers()
+        for m in members:
+            if fvalid and not fvalid(m.name, os.path.join(where_to, m.name)):
+                fLOG("[untar_files]    skipping", m.name)
+                continue
+            selected.append(m)
+        # folders are created before the threads start
+        files = [m for m in selected if m.isfile()]
+        for m in files:
+            os.makedirs(os.path.dirname(os.path.join(where_to, m.name)),
+                        exist_ok=True)
+
+        # every thread reads the archive with its own file
+        local = threading.local()
+        tars = []
+
+        def extract(m):
+            tar = getattr(local, "tar", None)
+            if tar is None:
+                tar = local.tar = open_tar("r:")
+                tars.append(tar)
+            tar.extract(m, where_to)
+
+        try:
+            map_in_order(extract, files, workers)
+        finally:
+            for tar in tars:
+                tar.close()
+        # links may point to the files, folders attributes are set at the end
+        with open_tar("r:") as tar:
+            for m in selected:
+                if not m.isfile() and not m.isdir():
+                    tar.extract(m, where_to)
+            for m in selected:
+                if m.isdir():
+                    tar.extract(m, where_to)
+    return [os.path.join(where_to, m.name) for m in selected]
+
+
+def _open_tar_member(open_tar, name):
+    tar = open_tar("r:*")
+    return tar.extractfile(name), tar
@@ -0,0 +1,630 @@
+"""
+@file
+@brief Streaming archive writers compressing on several threads.
+:epkg:`zlib` releases the GIL while it compresses, the data is split
+into blocks compressed in parallel and written in order, every block
+is primed with the last 32 Kb of the previous one as
+:epkg:`pigz` does. The memory used only depends on the block size
+and the number of pending blocks, not on the size of the archive.
+The module also implements the pieces used to extract archives
+on several threads without loading the members in memory.
+
+.. versionadded:: 1.9
+"""
+import os
+import io
+import time
+import zlib
+import shutil
+import struct
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# zip format constants, see the zip specification (APPNOTE.TXT)
+_ZIP64_LIMIT = (1 << 31) - 1
+_ZIP_FILECOUNT_LIMIT = (1 << 16) - 1
+_ZIP64_VERSION = 45
+_DATA_DESCRIPTOR_FLAG = 0x08
+_UTF8_FLAG = 0x800
+_struct_central_dir = "<4s4B4HL2L5H2L"
+_struct_end_archive = "<4s4H2LH"
+_struct_end_archive64 = "<4sQ2H2L4Q"
+_struct_end_archive64_locator = "<4sLQL"
+_dict_size = 32768
+
+
+def _deflate_block(data, compresslevel, zdict, last):
+    """
+    Compresses a block into a raw deflate stream which can be
+    concatenated to the previous block.
+
+    @param      data            bytes
+    @param      compresslevel   compression level
+    @param      zdict           end of the previous block (or None)
+    @param      last            last block, closes the deflate stream
+    @return                     bytes
+    """
+    if zdict:
+        comp = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS,
+                                zlib.DEF_MEM_LEVEL, zlib.Z_DEFAULT_STRATEGY, zdict)
+    else:
+        comp = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+    # Z_SYNC_FLUSH aligns the stream on a byte boundary
+    # without ending it, the next block continues it
+    return comp.compress(data) + comp.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class _OrderedPipeline:
+    """
+    Compresses blocks on a pool of threads and returns them
+    in the order they were submitted. At most *max_pending*
+    blocks are waiting to be written.
+    """
+
+    def __init__(self, write, workers=None, max_pending=None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+        self.write = write
+        self._queue = deque()
+        self._nb_blocks = 0
+        self._executor = (ThreadPoolExecutor(max_workers=workers)
+                          if workers > 1 else None)
+
+    def push(self, fct, *args):
+        """
+        Adds a block to compress, *fct(*args)* returns the compressed block.
+        """
+        if self._executor is None:
+            self.write(fct(*args))
+            return
+        self._queue.append((True, self._executor.submit(fct, *args)))
+        self._nb_blocks += 1
+        self.drain(self.max_pending)
+
+    def push_callback(self, fct):
+        """
+        Adds a function called once every previous block is written.
+        """
+        if self._executor is None:
+            fct()
+        else:
+            self._queue.append((False, fct))
+
+    def drain(self, limit=0):
+        """
+        Writes blocks until at most *limit* are pending.
+        """
+        while self._queue and (self._nb_blocks > limit or not self._queue[0][0]):
+            is_block, item = self._queue.popleft()
+            if is_block:
+                self._nb_blocks -= 1
+                self.write(item.result())
+            else:
+                item()
+
+    def close(self, cancel=False):
+        """
+        Writes all the pending blocks and stops the threads.
+        """
+        if cancel:
+            self._queue.clear()
+        else:
+            self.drain()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class _CountingWriter:
+    """
+    Writes into a stream and counts the written bytes,
+    the stream does not need to be seekable.
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.offset = 0
+
+    def write(self, data):
+        self.fileobj.write(data)
+        self.offset += len(data)
+
+
+class ParallelGzipWriter(io.RawIOBase):
+    """
+    Writable stream compressing into :epkg:`gzip` format
+    with several threads. The result can be read by
+    :func:`gzip.open` or any *gunzip* tool.
+
+    .. exref::
+        :title: Compress a large file with gzip on several threads
+
+        ::
+
+            import shutil
+            from pyquickhelper.filehelper.compression_parallel import ParallelGzipWriter
+
+            with open("big.csv", "rb") as f:
+                with ParallelGzipWriter("big.csv.gz", workers=4) as g:
+                    shutil.copyfileobj(f, g, 2 ** 20)
+    """
+
+    def __init__(self, filename, compresslevel=9, workers=None,
+                 block_size=2 ** 20, max_pending=None, mtime=None):
+        """
+        @param      filename        filename or writable stream,
+                                    a stream is not closed by the writer
+        @param      compresslevel   compression level (0 to 9)
+        @param      workers         number of threads (None for the number of cores)
+        @param      block_size      size of the blocks compressed independently
+        @param      max_pending     maximum number of blocks waiting to be written,
+                                    None for twice the number of threads
+        @param      mtime           modification time stored in the header,
+                                    None for the current time
+        """
+        io.RawIOBase.__init__(self)
+        if isinstance(filename, str):
+            self._fileobj = open(filename, "wb")
+            self._own = True
+            name = os.path.split(filename)[-1]
+            if name.endswith(".gz"):
+                name = name[:-3]
+        else:
+            self._fileobj = filename
+            self._own = False
+            name = ""
+        self.compresslevel = compresslevel
+        self.block_size = block_size
+        self._buffer = bytearray()
+        self._prev = None
+        self._crc = 0
+        self._size = 0
+        self._pipeline = _OrderedPipeline(self._fileobj.write, workers=workers,
+                                          max_pending=max_pending)
+        self._write_header(name, time.time() if mtime is None else mtime)
+
+    def _write_header(self, name, mtime):
+        fname = name.encode("latin-1", errors="replace") if name else b""
+        flags = 0x08 if fname else 0
+        xfl = 2 if self.compresslevel == 9 else (
+            4 if self.compresslevel == 1 else 0)
+        header = b"\x1f\x8b\x08" + struct.pack("<BLBB", flags, int(mtime), xfl, 255)
+        if fname:
+            header += fname + b"\x00"
+        self._fileobj.write(header)
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed file")
+        data = memoryview(data).cast("B")
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        self._buffer += data
+        bs = self.block_size
+        if len(self._buffer) > bs:
+            pos = 0
+            # the last block is kept until close or the next write,
+            # it may be the final one
+            while len(self._buffer) - pos > bs:
+                self._push(bytes(self._buffer[pos:pos + bs]), False)
+                pos += bs
+            del self._buffer[:pos]
+        return len(data)
+
+    def _push(self, block, last):
+        self._pipeline.push(_deflate_block, block, self.compresslevel,
+                            self._prev, last)
+        self._prev = block[-_dict_size:]
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._push(bytes(self._buffer), True)
+            self._buffer = bytearray()
+            self._pipeline.close()
+            self._fileobj.write(struct.pack(
+                "<LL", self._crc, self._size & 0xffffffff))
+        finally:
+            self._pipeline.close(cancel=True)
+            if self._own:
+                self._fileobj.close()
+            io.RawIOBase.close(self)
+
+
+class ParallelZipWriter:
+    """
+    Creates a zip file, members are read by blocks
+    and compressed with several threads, the archive is written
+    in order into a stream which does not need to be seekable.
+    Members use a data descriptor
+    (sizes and :epkg:`CRC` are written after the data).
+    The writer is not thread safe, a single thread adds the files.
+
+    .. exref::
+        :title: Zip files on several threads
+
+        ::
+
+            from pyquickhelper.filehelper.compression_parallel import ParallelZipWriter
+
+            with ParallelZipWriter("archive.zip", workers=4) as zf:
+                for name in ["a.txt", "b.txt"]:
+                    zf.write(name)
+    """
+
+    def __init__(self, filename, compresslevel=6, workers=None,
+                 block_size=2 ** 20, max_pending=None):
+        """
+        @param      filename        filename or writable stream,
+                                    a stream is not closed by the writer
+        @param      compresslevel   compression level (1 to 9),
+                                    0 stores the files without compression
+        @param      workers         number of threads (None for the number of cores)
+        @param      block_size      size of the blocks compressed independently
+        @param      max_pending     maximum number of blocks waiting to be written,
+                                    None for twice the number of threads
+        """
+        if isinstance(filename, str):
+            self._fileobj = open(filename, "wb")
+            self._own = True
+        else:
+            self._fileobj = filename
+            self._own = False
+        self.compresslevel = compresslevel
+        self.block_size = block_size
+        self.filelist = []
+        self._out = _CountingWriter(self._fileobj)
+        self._pipeline = _OrderedPipeline(
+            self._write_data, workers=workers if compresslevel > 0 else 1,
+            max_pending=max_pending)
+        self._compress_size = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
+
+    def _write_data(self, data):
+        self._compress_size += len(data)
+        self._out.write(data)
+
+    def _write_header(self, zinfo, zip64):
+        zinfo.header_offset = self._out.offset
+        self._compress_size = 0
+        self._out.write(zinfo.FileHeader(zip64))
+
+    def _write_descriptor(self, zinfo, crc, size, zip64):
+        zinfo.CRC = crc
+        zinfo.file_size = size
+        zinfo.compress_size = self._compress_size
+        fmt = "<LLQQ" if zip64 else "<LLLL"
+        self._out.write(struct.pack(fmt, 0x08074b50, crc,
+                                    zinfo.compress_size, size))
+        self.filelist.append(zinfo)
+
+    def write(self, filename, arcname=None):
+        """
+        Adds a file to the archive.
+
+        @param      filename        file to add
+        @param      arcname         name in the archive, the name of the file
+                                    without the drive letter if None
+        """
+        zinfo = zipfile.ZipInfo.from_file(filename, arcname)
+        if zinfo.is_dir():
+            raise ValueError(
+                "'{0}' is a folder, only files can be added.".format(filename))
+        with open(filename, "rb") as f:
+            self._add(zinfo, f)
+
+    def writestr(self, arcname, data):
+        """
+        Adds bytes to the archive.
+
+        @param      arcname         name in the archive
+        @param      data            bytes or str (encoded in utf-8)
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        zinfo = zipfile.ZipInfo(arcname, time.localtime(time.time())[:6])
+        zinfo.external_attr = 0o600 << 16
+        zinfo.file_size = len(data)
+        self._add(zinfo, io.BytesIO(data))
+
+    def _add(self, zinfo, f):
+        if self._closed:
+            raise ValueError("Attempt to write to a closed archive.")
+        zinfo.compress_type = (zipfile.ZIP_DEFLATED if self.compresslevel > 0
+                               else zipfile.ZIP_STORED)
+        zinfo.flag_bits |= _DATA_DESCRIPTOR_FLAG
+        # deflate may slightly expand incompressible data
+        zip64 = zinfo.file_size * 1.05 + 1024 > _ZIP64_LIMIT
+        self._pipeline.push_callback(
+            lambda: self._write_header(zinfo, zip64))
+
+        bs = self.block_size
+        crc = 0
+        size = 0
+        prev = None
+        block = f.read(bs)
+        while True:
+            following = f.read(bs) if block else b""
+            crc = zlib.crc32(block, crc)
+            size += len(block)
+            if self.compresslevel > 0:
+                self._pipeline.push(_deflate_block, block, self.compresslevel,
+                                    prev, not following)
+                prev = block[-_dict_size:]
+            elif block:
+                self._pipeline.push(bytes, block)
+            if not following:
+                break
+            block = following
+
+        if size > _ZIP64_LIMIT and not zip64:
+            raise zipfile.LargeZipFile(  # pragma: no cover
+                "'{0}' was modified while it was compressed.".format(zinfo.filename))
+        self._pipeline.push_callback(
+            lambda: self._write_descriptor(zinfo, crc, size, zip64))
+
+    def _abort(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._pipeline.close(cancel=True)
+        if self._own:
+            self._fileobj.close()
+
+    def close(self):
+        """
+        Writes the pending blocks and the central directory.
+        """
+        if self._closed:
+            return
+        try:
+            self._pipeline.close()
+            self._write_central_directory()
+        finally:
+            self._abort()
+
+    def _write_central_directory(self):
+        out = self._out
+        start = out.offset
+        for zinfo in self.filelist:
+            dt = zinfo.date_time
+            dosdate = (dt[0] - 1980) << 9 | dt[1] << 5 | dt[2]
+            dostime = dt[3] << 11 | dt[4] << 5 | (dt[5] // 2)
+            extra = []
+            if zinfo.file_size > _ZIP64_LIMIT or zinfo.compress_size > _ZIP64_LIMIT:
+                extra.extend([zinfo.file_size, zinfo.compress_size])
+                file_size = compress_size = 0xffffffff
+            else:
+                file_size = zinfo.file_size
+                compress_size = zinfo.compress_size
+            if zinfo.header_offset > _ZIP64_LIMIT:
+                extra.append(zinfo.header_offset)
+                header_offset = 0xffffffff
+            else:
+                header_offset = zinfo.header_offset
+            extra_data = zinfo.extra
+            min_version = 0
+            if extra:
+                extra_data = struct.pack(
+                    "<HH" + "Q" * len(extra), 1, 8 * len(extra), *extra) + extra_data
+                min_version = _ZIP64_VERSION
+            try:
+                name = zinfo.filename.encode("ascii")
+                flag_bits = zinfo.flag_bits
+            except UnicodeEncodeError:
+                name = zinfo.filename.encode("utf-8")
+                flag_bits = zinfo.flag_bits | _UTF8_FLAG
+            centdir = struct.pack(
+                _struct_central_dir, b"PK\001\002",
+                max(min_version, zinfo.create_version), zinfo.create_system,
+                max(min_version, zinfo.extract_version), zinfo.reserved,
+                flag_bits, zinfo.compress_type, dostime, dosdate, zinfo.CRC,
+                compress_size, file_size, len(name), len(extra_data),
+                len(zinfo.comment), 0, zinfo.internal_attr,
+                zinfo.external_attr, header_offset)
+            out.write(centdir + name + extra_data + zinfo.comment)
+
+        end = out.offset
+        count = len(self.filelist)
+        size = end - start
+        offset = start
+        if count > _ZIP_FILECOUNT_LIMIT or offset > _ZIP64_LIMIT or size > _ZIP64_LIMIT:
+            out.write(struct.pack(
+                _struct_end_archive64, b"PK\x06\x06", 44, _ZIP64_VERSION,
+                _ZIP64_VERSION, 0, 0, count, count, size, offset))
+            out.write(struct.pack(
+                _struct_end_archive64_locator, b"PK\x06\x07", 0, end, 1))
+            count = min(count, _ZIP_FILECOUNT_LIMIT)
+            size = min(size, 0xffffffff)
+            offset = min(offset, 0xffffffff)
+        out.write(struct.pack(_struct_end_archive, b"PK\005\006",
+                              0, 0, count, count, size, offset, 0))
+
+
+def pgzip_file(filename, dest=None, compresslevel=9, workers=None,
+               block_size=2 ** 20, max_pending=None):
+    """
+    Compresses a file into :epkg:`gzip` format with several threads
+    as :epkg:`pigz` does.
+
+    @param      filename        file to compress
+    @param      dest            destination, *filename* + ``.gz`` if None,
+                                can be a writable stream
+    @param      compresslevel   compression level (0 to 9)
+    @param      workers         number of threads (None for the number of cores)
+    @param      block_size      size of the blocks compressed independently
+    @param      max_pending     maximum number of blocks waiting to be written,
+                                None for twice the number of threads
+    @return                     *dest*
+    """
+    if dest is None:
+        dest = filename + ".gz"
+    mtime = os.stat(filename).st_mtime
+    with open(filename, "rb") as f:
+        with ParallelGzipWriter(dest, compresslevel=compresslevel, workers=workers,
+                                block_size=block_size, max_pending=max_pending,
+                                mtime=mtime) as g:
+            while True:
+                data = f.read(block_size)
+                if not data:
+                    break
+                g.write(data)
+    return dest
+
+
+class _MemberReader(io.RawIOBase):
+    """
+    Reads a member of an archive and closes the archive
+    when it is closed.
+    """
+
+    def __init__(self, stream, owner):
+        io.RawIOBase.__init__(self)
+        self._stream = stream
+        self._owner = owner
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._stream.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+            if self._owner is not None:
+                self._owner.close()
+        io.RawIOBase.close(self)
+
+
+class ArchiveMember:
+    """
+    Lazy handle on a member of an archive returned by
+    @see fn unzip_files, @see fn ungzip_files, @see fn untar_files
+    when *lazy* is True. Nothing is decompressed until
+    the member is opened, the content is then read as a stream.
+
+    .. exref::
+        :title: Process the members of a large archive
+
+        ::
+
+            from pyquickhelper.filehelper import unzip_files
+
+            with unzip_files("big.zip", lazy=True) as members:
+                for name, member in members:
+                    with member.open() as f:
+                        for line in f:
+                            ...
+    """
+
+    def __init__(self, name, size, opener):
+        """
+        @param      name        name of the member in the archive
+        @param      size        uncompressed size (None if unknown)
+        @param      opener      function returning a stream on the member
+                                and the object to close with it (or None),
+                                it keeps the archive alive
+        """
+        self.name = name
+        self.size = size
+        self._opener = opener
+
+    def __repr__(self):
+        return "{0}({1!r}, {2!r})".format(
+            self.__class__.__name__, self.name, self.size)
+
+    def open(self):
+        """
+        Returns a binary stream on the member, it must be closed.
+        """
+        stream, owner = self._opener()
+        return io.BufferedReader(_MemberReader(stream, owner))
+
+    def read(self):
+        """
+        Returns the whole content of the member.
+        """
+        with self.open() as f:
+            return f.read()
+
+
+class ArchiveMembers(list):
+    """
+    List of tuple ``(name, member)`` returned by @see fn unzip_files,
+    @see fn ungzip_files, @see fn untar_files when *lazy* is True.
+    It keeps the archive open until @see me close is called,
+    the members cannot be opened after that. It is a context manager.
+    """
+
+    def __init__(self, members, owners=None):
+        """
+        @param      members     list of tuple ``(name, member)``
+        @param      owners      objects to close with the list
+        """
+        list.__init__(self, members)
+        self._owners = list(owners or [])
+
+    def close(self):
+        """
+        Closes the archive, the streams already opened
+        on the members must be closed before.
+        """
+        owners = self._owners
+        self._owners = []
+        for owner in owners:
+            owner.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def copy_stream(stream, dest, chunk_size=2 ** 20):
+    """
+    Copies a stream into a file by chunks.
+
+    @param      stream      readable stream (closed by the function)
+    @param      dest        destination file
+    @param      chunk_size  size of the chunks
+    """
+    with stream:
+        with open(dest, "wb") as f:
+            shutil.copyfileobj(stream, f, chunk_size)
+
+
+def map_in_order(fct, tasks, workers=None):
+    """
+    Calls *fct* on every task and returns the results in the same order,
+    the tasks are run on a pool of threads if *workers* > 1.
+
+    @param      fct         function
+    @param      tasks       list of arguments
+    @param      workers     None or a number of threads
+    @return                 list of results
+    """
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        return [fct(t) for t in tasks]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fct, tasks))
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+@file
+@brief Content-defined chunking: a file is split where its content
+says so and not at fixed offsets. Inserting or removing a few bytes
+only changes the chunks around the modification.
+
+A rolling hash such as the one used by :epkg:`FastCDC` requires
+one python instruction per byte and is too slow in pure python.
+The module follows the same idea but every byte is first mapped
+to one bit (``'0'`` or ``'1'``) with ``bytes.translate``,
+a boundary is the end of the first occurrence of a fixed
+pattern of *k* bits found with ``bytes.find``.
+The boundary only depends on the last *k* bytes, both functions
+run at C speed. As :epkg:`FastCDC`, the chunking is normalized:
+the pattern is longer (boundaries are less likely) before
+the average size and shorter after.
+"""
+import hashlib
+
+
+def _build_table():
+    # must never change, chunk boundaries depend on it
+    return bytes(0x30 + (hashlib.md5(bytes([i])).digest()[0] & 1)
+                 for i in range(256))
+
+
+def _build_pattern(size=64):
+    # must never change, chunk boundaries depend on it,
+    # it contains both symbols, a constant sequence never matches
+    seq = hashlib.sha256(b"content_chunking").digest()
+    return bytes(0x30 + ((seq[i // 8] >> (i % 8)) & 1) for i in range(size))
+
+
+_TABLE = _build_table()
+_PATTERN = _build_pattern()
+
+
+def cdc_parameters(avg_size):
+    """
+    Returns the parameters used by @see fn cdc_cut
+    for an average chunk size.
+
+    @param      avg_size    expected average size
+    @return                 dictionary *min_size, avg_size, max_size, pattern_s, pattern_l*
+    """
+    if avg_size < 64:
+        raise ValueError("avg_size must be >= 64 not {0}".format(avg_size))
+    bits = avg_size.bit_length() - 1
+    if bits + 2 > len(_PATTERN):
+        raise ValueError(  # pragma: no cover
+            "avg_size is too big: {0}".format(avg_size))
+    return dict(min_size=avg_size // 4, avg_size=avg_size, max_size=avg_size * 4,
+                pattern_s=_PATTERN[:bits + 2], pattern_l=_PATTERN[:bits - 2])
+
+
+def cdc_translate(data):
+    """
+    Maps every byte to ``'0'`` or ``'1'``,
+    the result is given to @see fn cdc_cut.
+    """
+    return data.translate(_TABLE)
+
+
+def cdc_cut(translated, start, end, min_size, avg_size, max_size,
+            pattern_s, pattern_l):
+    """
+    Returns the end of the chunk starting at *start*.
+
+    @param      translated  bytes returned by @see fn cdc_translate
+    @param      start       beginning of the chunk
+    @param      end         end of the available data
+    @param      min_size    no boundary before *start + min_size*
+    @param      avg_size    the function looks for *pattern_s* before this size,
+                            *pattern_l* after
+    @param      max_size    a chunk is never bigger than this size
+    @param      pattern_s   longer pattern
+    @param      pattern_l   shorter pattern
+    @return                 position of the boundary
+    """
+    if end - start <= min_size:
+        return end
+    normal = min(end, start + avg_size)
+    last = min(end, start + max_size)
+    i = translated.find(pattern_s, start + min_size - len(pattern_s), normal)
+    if i >= 0:
+        return i + len(pattern_s)
+    i = translated.find(pattern_l, normal - len(pattern_l), last)
+    if i >= 0:
+        return i + len(pattern_l)
+    return last
+
+
+def iter_cdc_chunks(stream, avg_size=2 ** 20):
+    """
+    Splits a stream into chunks defined by their content.
+
+    @param      stream      binary stream (method *read*)
+    @param      avg_size    expected average size of a chunk,
+                            a chunk is between ``avg_size / 4``
+                            and ``avg_size * 4``
+    @return                 iterator on bytes
+
+    .. exref::
+        :title: Split a file into chunks defined by their content
+
+        ::
+
+            from pyquickhelper.filehelper.content_chunking import iter_cdc_chunks
+
+            with open("big_file.bin", "rb") as f:
+                for chunk in iter_cdc_chunks(f, avg_size=2 ** 20):
+                    print(len(chunk))
+    """
+    params = cdc_parameters(avg_size)
+    max_size = params["max_size"]
+    buffer = b""
+    translated = b""
+    pos = 0
+    eof = False
+    while True:
+        if not eof and len(buffer) - pos < max_size:
+            data = stream.read(max_size * 2)
+            if data:
+                buffer = buffer[pos:] + data
+                translated = translated[pos:] + cdc_translate(data)
+                pos = 0
+            else:
+                eof = True
+            continue
+        if pos >= len(buffer):
+            break
+        cut = cdc_cut(translated, pos, len(buffer), **params)
+        yield buffer[pos:cut]
+        pos = cut
@@ -6,11 +6,14 @@ import re
 import os
 import datetime
 import zlib
+import hmac
+import threading
 from io import BytesIO as StreamIO
 from .files_status import FilesStatus
 from ..loghelper.flog import noLOG
 from .transfer_api import TransferAPI_FileInfo
 from .encryption import encrypt_stream, decrypt_stream
+from .content_chunking import iter_cdc_chunks
 
 
 class EncryptedBackupError(Exception):
@@ -20,6 +23,47 @@ class EncryptedBackupError(Exception):
     pass
 
 
+def _compress(data, compression):
+    if compression == "zip":
+        return zlib.compress(data)
+    elif compression == "lzma":
+        # delay import
+        try:
+            import lzma
+        except ImportError:
+            import pylzma as lzma
+        return lzma.compress(data)
+    elif compression is None:
+        return data
+    else:
+        raise ValueError(
+            "unexpected compression algorithm {0}".format(compression))
+
+
+def _compress_encrypt(key, algo, compression, data):
+    # called in another process, see EncryptedBackup.start_transfering
+    data = _compress(data, compression)
+    return encrypt_stream(key, data, chunksize=None, algo=algo)
+
+
+class _PipelinedFile:
+    """
+    A file being transferred by method *start_transfering*
+    of @see cl EncryptedBackup when it runs with several workers.
+    """
+
+    def __init__(self, fullname, relp, path, maps):
+        self.fullname = fullname
+        self.relp = relp
+        self.path = path
+        self.maps = maps
+        # pieces being encrypted or transferred
+        self.remaining = 0
+        # all pieces were read
+        self.closed = False
+        self.err = None
+
+
 class EncryptedBackup:
 
     """
@@ -81,27 +125,40 @@ class EncryptedBackup:
 
                 dest=os.path.join(this, "_temp")
                 enc.retrieve_all(dest)
+
+    With ``chunking='cdc'``, files are split into chunks defined by
+    their content (see @see fn iter_cdc_chunks). The mapping remembers
+    an identifier for every chunk (a :epkg:`*py:hmac` of its content
+    with the key), a chunk already stored is neither encrypted
+    nor transferred again, even if it belongs to another file
+    or if bytes were inserted before it.
     """
 
     def __init__(self, key, file_tree_node, transfer_api,
                  file_status, file_map, root_local=None,
                  root_remote=None, filter_out=None,
                  threshold_size=2 ** 24, algo="AES",
-                 compression="lzma", fLOG=noLOG):
+                 compression="lzma", chunking=None, fLOG=noLOG):
         """
         constructor
 
         @param      key                 key for encryption
         @param      file_tree_node      @see cl FileTreeNode
         @param      transfer_api        @see cl TransferFTP
-        @param      file_status         file keeping the status for each file (date, hash of the content for the last upload)
+        @param      file_status         file keeping the status for each file (date, hash of the content for the last upload),
+                                        or an instance of @see cl FilesStatus to use another storage
         @param      file_map            keep track of local filename and remote location
         @param      root_local          local root
         @param      root_remote         remote root
         @param      filter_out          regular expression to exclude some files, it can also be a function.
-        @param      threshold_size      above that size, big files are split
-        @param      algo                encrypting algorithm
+        @param      threshold_size      above that size, big files are split,
+                                        average chunk size if *chunking* is ``'cdc'``
+        @param      algo                encrypting algorithm, see @see fn encrypt_stream,
+                                        ``'AES-GCM'`` avoids padding and authenticates the pieces
         @param      compression         kind of compression ``'lzma'`` or ``'zip'``
+        @param      chunking            None to split files every *threshold_size* bytes,
+                                        ``'cdc'`` to split them where the content says so
+                                        and to avoid transferring the same chunk twice
         @param      fLOG                logging function
         """
         self._key = key
@@ -113,6 +170,11 @@ class EncryptedBackup:
         self._mapping = None
         self._compress = compression
         self._threshold_size = threshold_size
+        if chunking not in (None, "cdc"):
+            raise ValueError(
+                "unexpected chunking method {0}".format(chunking))
+        self._chunking = chunking
+        self._chunk_index = None
         self._root_local = root_local if root_local is not None else (
             file_tree_node.root if file_tree_node else None)
         self._root_remote = root_remote if root_remote is not None else ""
@@ -124,7 +186,10 @@ class EncryptedBackup:
             self._filter_out = (lambda f: False) if filter_out is None else (
                 lambda f: self._filter_out_reg.search(f) is not None)
 
-        self._ft = FilesStatus(file_status) if file_status else None
+        if isinstance(file_status, FilesStatus):
+            self._ft = file_status
+        else:
+            self._ft = FilesStatus(file_status) if file_status else None
 
     def iter_eligible_files(self):
         """
@@ -187,14 +252,23 @@ class EncryptedBackup:
         """
         return self._mapping
 
-    def enumerate_read_encrypt(self, fullname):
+    def enumerate_read_chunks(self, fullname):
         """
-        enumerate pieces of files as bytes
+        enumerate pieces of files as bytes (not compressed, not encrypted),
+        pieces are defined by parameters *threshold_size* and *chunking*
 
         @param      fullname        fullname
-        @return                     iterator on chunk of data
+        @return                     iterator on chunk of data,
+                                    an exception if the file cannot be read
         """
         with open(fullname, "rb") as f:
+            if self._chunking == "cdc":
+                try:
+                    for data in iter_cdc_chunks(f, self._threshold_size):
+                        yield data
+                except PermissionError as e:
+                    yield e
+                return
             try:
                 data = f.read(self._threshold_size)
                 cont = True
@@ -203,16 +277,65 @@ class EncryptedBackup:
                 cont = False
             if cont:
                 while data and cont:
-                    data = self.compress(data)
-                    enc = encrypt_stream(
-                        self._key, data, chunksize=None, algo=self._algo)
-                    yield enc
+                    yield data
                     try:
                         data = f.read(self._threshold_size)
                     except PermissionError as e:
                         yield e
                         cont = False
 
+    def enumerate_read_encrypt(self, fullname):
+        """
+        enumerate pieces of files as bytes
+
+        @param      fullname        fullname
+        @return                     iterator on chunk of data
+        """
+        for data in self.enumerate_read_chunks(fullname):
+            if isinstance(data, Exception):
+                yield data
+                break
+            yield self.encrypt(data)
+
+    def encrypt(self, data):
+        """
+        compress and encrypt data
+
+        @param      data        binary data
+        @return                 binary data
+        """
+        data = self.compress(data)
+        return encrypt_stream(self._key, data, chunksize=None, algo=self._algo)
+
+    def chunk_id(self, data):
+        """
+        returns the identifier of a chunk, it is a :epkg:`*py:hmac`
+        of the content and the key, the mapping does not tell
+        anything about the content
+
+        @param      data        binary data (not encrypted)
+        @return                 string
+        """
+        key = self._key.encode() if isinstance(self._key, str) else self._key
+        return hmac.new(key, data, "sha256").hexdigest()
+
+    def build_chunk_index(self):
+        """
+        builds the index ``{ chunk identifier: remote path }``
+        from the mapping
+
+        @return                 dictionary
+        """
+        index = {}
+        for info in self.Mapping.values():
+            if info.chunks is None:
+                continue
+            for piece, cid in zip(info.pieces, info.chunks):
+                if cid is not None:
+                    index[cid] = piece
+        self._chunk_index = index
+        return index
+
     def compress(self, data):
         """
         compress data
@@ -220,20 +343,7 @@ class EncryptedBackup:
         @param      data        binary data
         @return                 binary data
         """
-        if self._compress == "zip":
-            return zlib.compress(data)
-        elif self._compress == "lzma":
-            # delay import
-            try:
-                import lzma
-            except ImportError:
-                import pylzma as lzma
-            return lzma.compress(data)
-        elif self._compress is None:
-            return data
-        else:
-            raise ValueError(
-                "unexpected compression algorithm {0}".format(self._compress))
+        return _compress(data, self._compress)
 
     def decompress(self, data):
         """
@@ -257,56 +367,122 @@ class EncryptedBackup:
             raise ValueError(
                 "unexpected compression algorithm {0}".format(self._compress))
 
-    def start_transfering(self):
+    def _remote_folder(self, file):
+        """
+        returns the relative path of a file and the remote folder
+        it goes to, logs the upload
+
+        @param      file        @see cl FileTreeNode
+        @return                 relative path, remote folder
+        """
+        relp = os.path.relpath(file.fullname, self._root_local)
+        if ".." in relp:
+            raise ValueError("the local root is not accurate:\n{0}\nFILE:\n{1}\nRELPATH:\n{2}".format(
+                self, file.fullname, relp))
+
+        path = self._root_remote + "/" + os.path.split(relp)[0]
+        path = path.replace("\\", "/")
+
+        size = os.stat(file.fullname).st_size
+        self.fLOG("[upload % 8d bytes name=%s -- fullname=%s -- to=%s]" % (
+            size,
+            os.path.split(file.fullname)[-1],
+            file.fullname,
+            path))
+        return relp, path
+
+    def _remote_piece(self, data, relp, path, ii):
+        """
+        returns the remote path of an encrypted piece
+        """
+        to = self._api.get_remote_path(data, relp, ii)
+        to = path + "/" + to
+        return to.lstrip("/")
+
+    def start_transfering(self, workers=None, transfers=1, processes=False,
+                          max_pending=None):
         """
         starts transfering files to the remote website
 
+        :param workers: None to read, compress, encrypt and transfer
+            every piece one after the other, otherwise the number of
+            workers compressing and encrypting pieces while others
+            are read or transferred
+        :param transfers: number of concurrent calls to the transfer API
+            if *workers* is not None, a value greater than 1 requires
+            an API accepting concurrent calls
+        :param processes: compress and encrypt in processes instead of threads
+            (only if *workers* is not None)
+        :param max_pending: maximum number of pieces read but not
+            transferred yet, it caps the memory,
+            ``2 * (workers + transfers)`` by default
         :return: list of transferred @see cl FileInfo
         :raises FolderTransferFTPException: The class raises an
             exception (@see cl FolderTransferFTPException)
             if more than 5 issues happened.
+
+        .. versionchanged:: 1.9
+            Parameters *workers*, *transfers*, *processes*, *max_pending*
+            were added.
         """
         self.load_mapping()
+        if self._chunking == "cdc":
+            self.build_chunk_index()
 
-        issues = []
         total = list(self.iter_eligible_files())
+        if workers is None:
+            done, issues = self._start_transfering_sequential(total)
+        else:
+            done, issues = self._start_transfering_pipeline(
+                total, workers, transfers, processes,
+                max_pending or 2 * (workers + transfers))
+        self.transfer_mapping()
+        return done, issues
+
+    def _check_issues(self, issues):
+        if len(issues) >= 5:
+            raise EncryptedBackupError("too many issues:\n{0}".format(
+                "\n".join("{0} -- {1}".format(a, b) for a, b in issues)))
+
+    def _start_transfering_sequential(self, total):
+        issues = []
         sum_bytes = 0
+        sum_reused = 0
         done = []
         for i, file in enumerate(total):
             if i % 20 == 0:
-                self.fLOG("#### transfering %d/%d (so far %d bytes)" %
-                          (i, len(total), sum_bytes))
-            relp = os.path.relpath(file.fullname, self._root_local)
-            if ".." in relp:
-                raise ValueError("the local root is not accurate:\n{0}\nFILE:\n{1}\nRELPATH:\n{2}".format(
-                    self, file.fullname, relp))
-
-            path = self._root_remote + "/" + os.path.split(relp)[0]
-            path = path.replace("\\", "/")
-
-            size = os.stat(file.fullname).st_size
-            self.fLOG("[upload % 8d bytes name=%s -- fullname=%s -- to=%s]" % (
-                size,
-                os.path.split(file.fullname)[-1],
-                file.fullname,
-                path))
-
-            maps = TransferAPI_FileInfo(relp, [], datetime.datetime.now())
+                self.fLOG("#### transfering %d/%d (so far %d bytes, %d reused bytes)" %
+                          (i, len(total), sum_bytes, sum_reused))
+            relp, path = self._remote_folder(file)
+
+            index = self._chunk_index
+            maps = TransferAPI_FileInfo(relp, [], datetime.datetime.now(),
+                                        chunks=None if index is None else [])
             r = True
-            for ii, data in enumerate(self.enumerate_read_encrypt(file.fullname)):
+            for ii, data in enumerate(self.enumerate_read_chunks(file.fullname)):
                 if data is None or isinstance(data, Exception):
                     # it means something went wrong
                     r = False
                     err = data
                     break
-                to = self._api.get_remote_path(data, relp, ii)
-                to = path + "/" + to
-                to = to.lstrip("/")
+                cid = None
+                if index is not None:
+                    cid = self.chunk_id(data)
+                    if cid in index:
+                        maps.add_piece(index[cid], cid)
+                        sum_reused += len(data)
+                        continue
+                data = self.encrypt(data)
+                to = self._remote_piece(data, relp, path, ii)
                 r &= self.transfer(to, data)
-                maps.add_piece(to)
+                maps.add_piece(to, cid)
                 sum_bytes += len(data)
                 if not r:
+                    err = EncryptedBackupError(
+                        "unable to transfer '{0}'".format(to))
                     break
+                if cid is not None:
+                    index[cid] = to
 
             if r:
                 self.update_status(file.fullname)
@@ -315,12 +491,133 @@ class EncryptedBackup:
             else:
                 self.fLOG("   issue", err)
                 issues.append((relp, err))
+            self._check_issues(issues)
+        return done, issues
 
-            if len(issues) >= 5:
-                raise EncryptedBackupError("too many issues:\n{0}".format(
-                    "\n".join("{0} -- {1}".format(a, b) for a, b in issues)))
-
-        self.transfer_mapping()
+    def _start_transfering_pipeline(self, total, workers, transfers,
+                                    processes, max_pending):
+        """
+        A thread reads the files, *workers* threads or processes
+        compress and encrypt the pieces, *transfers* threads
+        transfer them. A file is added to the mapping once
+        all its pieces were transferred.
+        """
+        from concurrent.futures import (
+            ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED)
+        issues = []
+        done = []
+        sum_bytes = 0
+        sum_reused = 0
+        index = self._chunk_index
+        # future -> (stage, file, piece index, chunk id, remote path)
+        pending = {}
+        mapping_lock = threading.Lock()
+        mapping_upload = None
+        executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        encrypters = executor(max_workers=workers)
+        transferers = ThreadPoolExecutor(max_workers=transfers)
+
+        def upload_mapping():
+            with mapping_lock:
+                self.transfer_mapping()
+
+        def finish(state):
+            nonlocal mapping_upload
+            if state.err is None:
+                self.update_status(state.fullname)
+                with mapping_lock:
+                    self.Mapping[state.relp] = state.maps
+                # the mapping is uploaded by the threads transferring
+                # the pieces, only one upload is scheduled at a time,
+                # the last one happens after the pipeline ends
+                if mapping_upload is None or mapping_upload.done():
+                    mapping_upload = transferers.submit(upload_mapping)
+                done.append(state.relp)
+            else:
+                self.fLOG("   issue", state.err)
+                issues.append((state.relp, state.err))
+                self._check_issues(issues)
+
+        def piece_done(state, err=None):
+            if err is not None and state.err is None:
+                state.err = err
+            state.remaining -= 1
+            if state.remaining == 0 and state.closed:
+                finish(state)
+
+        def pump(block):
+            nonlocal sum_bytes
+            if block:
+                wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in [f for f in pending if f.done()]:
+                stage, state, ii, cid, to = pending.pop(fut)
+                err = fut.exception()
+                if err is not None:
+                    piece_done(state, err)
+                elif stage == "encrypt":
+                    if state.err is not None:
+                        # another piece failed, the file is not transferred
+                        piece_done(state)
+                        continue
+                    data = fut.result()
+                    to = self._remote_piece(data, state.relp, state.path, ii)
+                    sum_bytes += len(data)
+                    pending[transferers.submit(self.transfer, to, data)] = (
+                        "transfer", state, ii, cid, to)
+                elif fut.result():
+                    state.maps.pieces[ii] = to
+                    if cid is not None:
+                        index[cid] = to
+                    piece_done(state)
+                else:
+                    piece_done(state, EncryptedBackupError(
+                        "unable to transfer '{0}'".format(to)))
+
+        try:
+            for i, file in enumerate(total):
+                if i % 20 == 0:
+                    self.fLOG("#### transfering %d/%d (so far %d bytes, %d reused bytes)" %
+                              (i, len(total), sum_bytes, sum_reused))
+                relp, path = self._remote_folder(file)
+                maps = TransferAPI_FileInfo(relp, [], datetime.datetime.now(),
+                                            chunks=None if index is None else [])
+                state = _PipelinedFile(file.fullname, relp, path, maps)
+                for ii, data in enumerate(self.enumerate_read_chunks(file.fullname)):
+                    if data is None or isinstance(data, Exception):
+                        # it means something went wrong
+                        state.err = data
+                        break
+                    cid = None
+                    if index is not None:
+                        cid = self.chunk_id(data)
+                        # a chunk still being transferred is transferred again
+                        if cid in index:
+                            maps.add_piece(index[cid], cid)
+                            sum_reused += len(data)
+                            continue
+                    while len(pending) >= max_pending:
+                        pump(True)
+                    if processes:
+                        fut = encrypters.submit(
+                            _compress_encrypt, self._key, self._algo,
+                            self._compress, data)
+                    else:
+                        fut = encrypters.submit(self.encrypt, data)
+                    # the remote path is known once the piece is transferred
+                    maps.add_piece(None, cid)
+                    pending[fut] = ("encrypt", state, ii, cid, None)
+                    state.remaining += 1
+                state.closed = True
+                if state.remaining == 0:
+                    finish(state)
+                pump(False)
+            while pending:
+                pump(True)
+        finally:
+            for fut in pending:
+                fut.cancel()
+            encrypters.shutdown()
+            transferers.shutdown()
         return done, issues
 
     def transfer(self, to, data):
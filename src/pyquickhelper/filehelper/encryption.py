@@ -9,6 +9,7 @@ import random
 import os
 import struct
 import base64
+import mmap
 from io import BytesIO as StreamIO
 
 
@@ -38,7 +39,10 @@ def open_input_output(filename, out_filename=None):
     elif isinstance(filename, StreamIO):
         st = filename
         close = False
-        filesize = len(st.getvalue())
+        # getvalue would copy the buffer
+        pos = st.tell()
+        filesize = st.seek(0, 2)
+        st.seek(pos)
     else:
         st = StreamIO(filename)
         close = False
@@ -153,10 +157,17 @@ def encrypt_stream(key, filename, out_filename=None, chunksize=2 ** 18, algo="AE
                                 sizes can be faster for some files and machines.
                                 chunksize must be divisible by 16.
 
-    @param      algo            AES (PyCryptodomex) of or fernet (cryptography)
+    @param      algo            AES (PyCryptodomex) of or fernet (cryptography),
+                                ``'AES-GCM'`` or ``'AES-CTR'`` (see @see fn encrypt_aes_stream)
 
     @return                     filename or bytes
+
+    .. versionchanged:: 1.9
+        Algorithms ``'AES-GCM'`` and ``'AES-CTR'`` were added.
     """
+    if algo in _AES_STREAM_MODES:
+        return encrypt_aes_stream(key, filename, out_filename, algo=algo,
+                                  chunksize=chunksize or 2 ** 20)
 
     in_size, in_close, in_stream, out_close, out_return, out_stream = open_input_output(
         filename, out_filename)
@@ -196,10 +207,17 @@ def decrypt_stream(key, filename, out_filename=None, chunksize=3 * 2 ** 13, algo
                                 sizes can be faster for some files and machines.
                                 chunksize must be divisible by 16.
 
-    @param      algo            AES (:epkg:`pycryptodomex`) of or fernet (cryptography)
+    @param      algo            AES (:epkg:`pycryptodomex`) of or fernet (cryptography),
+                                ``'AES-GCM'`` or ``'AES-CTR'`` (see @see fn decrypt_aes_stream)
 
     @return                     filename or bytes
+
+    .. versionchanged:: 1.9
+        Algorithms ``'AES-GCM'`` and ``'AES-CTR'`` were added.
     """
+    if algo in _AES_STREAM_MODES:
+        return decrypt_aes_stream(key, filename, out_filename, algo=algo,
+                                  chunksize=chunksize or 2 ** 20)
     in_size, in_close, in_stream, out_close, out_return, out_stream = open_input_output(
         filename, out_filename)
 
@@ -211,6 +229,253 @@ def decrypt_stream(key, filename, out_filename=None, chunksize=3 * 2 ** 13, algo
         if len(chunk) == 0:
             break
         out_stream.write(decryptor.decrypt(chunk))
+    if origsize is not None:
+        # removes the padding
         out_stream.truncate(origsize)
 
     return close_input_output(in_size, in_close, in_stream, out_close, out_return, out_stream)
+
+
+# nonce size, tag size
+_AES_STREAM_MODES = {"AES-GCM": (12, 16), "AES-CTR": (8, 0)}
+_AES_STREAM_HEADER = struct.Struct("<Q")
+
+
+def _aes_stream_cipher(key, algo, nonce):
+    from Cryptodome.Cipher import AES
+    if len(key) not in (16, 24, 32):
+        raise EncryptionError(
+            "len(key)=={0} should be 16, 24 or 32".format(len(key)))
+    mode = AES.MODE_GCM if algo == "AES-GCM" else AES.MODE_CTR
+    return AES.new(key, mode, nonce=nonce)
+
+
+def _aes_stream_mode(algo):
+    if algo not in _AES_STREAM_MODES:
+        raise ValueError("unknown algorithm: {0}, should be in {1}".format(
+            algo, list(sorted(_AES_STREAM_MODES))))
+    return _AES_STREAM_MODES[algo]
+
+
+def encrypted_size(size, algo="AES-GCM"):
+    """
+    Returns the size of the data produced by @see fn encrypt_aes_stream.
+
+    @param      size        size of the data to encrypt
+    @param      algo        ``'AES-GCM'`` or ``'AES-CTR'``
+    @return                 size
+    """
+    nonce_size, tag_size = _aes_stream_mode(algo)
+    return _AES_STREAM_HEADER.size + nonce_size + size + tag_size
+
+
+def _open_aes_input(data):
+    """
+    Returns *(view, stream, size, close)*, *view* is None
+    if the data is read from a stream.
+    """
+    if isinstance(data, str):
+        st = open(data, "rb")
+        return None, st, os.fstat(st.fileno()).st_size, True
+    if isinstance(data, (bytes, bytearray, memoryview, mmap.mmap)):
+        view = memoryview(data).cast("B")
+        return view, None, len(view), False
+    pos = data.tell()
+    size = data.seek(0, 2) - pos
+    data.seek(pos)
+    return None, data, size, False
+
+
+def _open_aes_output(out, size):
+    """
+    Returns *(view, stream, close, returned value)*, *view* is None
+    if the data is written in a stream.
+    """
+    if out is None:
+        buffer = bytearray(size)
+        return memoryview(buffer), None, False, buffer
+    if isinstance(out, (bytearray, memoryview, mmap.mmap)):
+        view = memoryview(out).cast("B")
+        if len(view) < size:
+            raise EncryptionError(
+                "output buffer is too small {0} < {1}".format(len(view), size))
+        return view, None, False, size
+    if isinstance(out, str):
+        return None, open(out, "wb"), True, None
+    return None, out, False, None
+
+
+def _read_exactly(view, stream, pos, size):
+    if view is not None:
+        return view[pos:pos + size]
+    data = stream.read(size)
+    if len(data) != size:
+        raise EncryptionError("unexpected end of data")
+    return data
+
+
+def _write_at(view, stream, pos, data):
+    if view is not None:
+        view[pos:pos + len(data)] = data
+    else:
+        stream.write(data)
+
+
+def _apply_cipher(fct, size, src_view, src_stream, dst_view, dst_stream, chunksize):
+    """
+    Calls ``fct(input, output)`` on every chunk, *input* and *output*
+    are slices of the given buffers or of buffers allocated once.
+    """
+    if src_view is not None and dst_view is not None:
+        if size > 0:
+            fct(src_view[:size], dst_view[:size])
+        return
+    chunksize = max(1, min(chunksize, size))
+    buf_in = None if src_view is not None else memoryview(bytearray(chunksize))
+    buf_out = None if dst_view is not None else memoryview(
+        bytearray(chunksize))
+    pos = 0
+    while pos < size:
+        n = min(chunksize, size - pos)
+        if src_view is not None:
+            chunk = src_view[pos:pos + n]
+        else:
+            chunk = buf_in[:n]
+            got = 0
+            while got < n:
+                r = src_stream.readinto(chunk[got:])
+                if not r:
+                    raise EncryptionError("unexpected end of data")
+                got += r
+        if dst_view is not None:
+            fct(chunk, dst_view[pos:pos + n])
+        else:
+            fct(chunk, buf_out[:n])
+            dst_stream.write(buf_out[:n])
+        pos += n
+
+
+def encrypt_aes_stream(key, data, out=None, algo="AES-GCM", chunksize=2 ** 20):
+    """
+    Encrypts data with :epkg:`pycryptodomex`, algorithm
+    `AES <https://fr.wikipedia.org/wiki/Advanced_Encryption_Standard>`_
+    in mode `GCM <https://en.wikipedia.org/wiki/Galois/Counter_Mode>`_
+    (encryption and authentication) or
+    `CTR <https://en.wikipedia.org/wiki/Block_cipher_mode_of_operation#Counter_(CTR)>`_
+    (encryption only). Unlike the CBC mode used by @see fn encrypt_stream,
+    these modes do not need any padding. Buffers are never copied,
+    the data is encrypted chunk by chunk when it comes from a stream
+    or goes to a stream, memory stays constant.
+    The output contains the size of the data (8 bytes), a random nonce,
+    the encrypted data and the tag (``'AES-GCM'`` only),
+    its size is returned by @see fn encrypted_size.
+
+    @param      key             key, 16, 24 or 32 bytes
+    @param      data            bytes, bytearray, memoryview, :epkg:`*py:mmap`,
+                                filename or binary stream
+    @param      out             None to return a new bytearray, a preallocated buffer
+                                (bytearray, memoryview, :epkg:`*py:mmap`), a filename
+                                or a binary stream
+    @param      algo            ``'AES-GCM'`` or ``'AES-CTR'``
+    @param      chunksize       size of the chunks when the data is read from
+                                or written to a stream
+    @return                     bytearray if *out* is None, the number of written
+                                bytes if *out* is a buffer, None otherwise
+
+    .. exref::
+        :title: Encrypt a big file without loading it
+
+        ::
+
+            from pyquickhelper.filehelper.encryption import (
+                encrypt_aes_stream, decrypt_aes_stream)
+
+            key = b"0123456789abcdef"
+            encrypt_aes_stream(key, "big_file.bin", "big_file.enc")
+            decrypt_aes_stream(key, "big_file.enc", "big_file.dec")
+    """
+    nonce_size, tag_size = _aes_stream_mode(algo)
+    nonce = os.urandom(nonce_size)
+    cipher = _aes_stream_cipher(key, algo, nonce)
+    src_view, src_stream, size, in_close = _open_aes_input(data)
+    try:
+        header = _AES_STREAM_HEADER.pack(size) + nonce
+        total = len(header) + size + tag_size
+        dst_view, dst_stream, out_close, ret = _open_aes_output(out, total)
+        try:
+            _write_at(dst_view, dst_stream, 0, header)
+            _apply_cipher(
+                lambda i, o: cipher.encrypt(i, output=o), size,
+                src_view, src_stream,
+                None if dst_view is None else dst_view[len(header):],
+                dst_stream, chunksize)
+            if tag_size > 0:
+                _write_at(dst_view, dst_stream,
+                          len(header) + size, cipher.digest())
+        finally:
+            if out_close:
+                dst_stream.close()
+    finally:
+        if in_close:
+            src_stream.close()
+    return ret
+
+
+def decrypt_aes_stream(key, data, out=None, algo="AES-GCM", chunksize=2 ** 20):
+    """
+    Decrypts data encrypted by @see fn encrypt_aes_stream.
+    With ``'AES-GCM'``, the function raises an exception
+    if the data was modified, the output is then incomplete.
+
+    @param      key             key, 16, 24 or 32 bytes
+    @param      data            bytes, bytearray, memoryview, :epkg:`*py:mmap`,
+                                filename or binary stream
+    @param      out             None to return a new bytearray, a preallocated buffer
+                                (bytearray, memoryview, :epkg:`*py:mmap`), a filename
+                                (removed if the authentication fails)
+                                or a binary stream
+    @param      algo            ``'AES-GCM'`` or ``'AES-CTR'``
+    @param      chunksize       size of the chunks when the data is read from
+                                or written to a stream
+    @return                     bytearray if *out* is None, the number of written
+                                bytes if *out* is a buffer, None otherwise
+    """
+    nonce_size, tag_size = _aes_stream_mode(algo)
+    src_view, src_stream, in_size, in_close = _open_aes_input(data)
+    try:
+        hsize = _AES_STREAM_HEADER.size
+        if in_size < hsize + nonce_size + tag_size:
+            raise EncryptionError("data is too short to be decrypted")
+        size = _AES_STREAM_HEADER.unpack(
+            _read_exactly(src_view, src_stream, 0, hsize))[0]
+        if in_size != hsize + nonce_size + size + tag_size:
+            raise EncryptionError("unexpected size {0}, expected {1}".format(
+                in_size, hsize + nonce_size + size + tag_size))
+        nonce = bytes(_read_exactly(src_view, src_stream, hsize, nonce_size))
+        cipher = _aes_stream_cipher(key, algo, nonce)
+        start = hsize + nonce_size
+        dst_view, dst_stream, out_close, ret = _open_aes_output(out, size)
+        try:
+            _apply_cipher(
+                lambda i, o: cipher.decrypt(i, output=o), size,
+                None if src_view is None else src_view[start:],
+                src_stream, dst_view, dst_stream, chunksize)
+            if tag_size > 0:
+                tag = _read_exactly(src_view, src_stream,
+                                    start + size, tag_size)
+                try:
+                    cipher.verify(bytes(tag))
+                except ValueError as e:
+                    if out_close:
+                        dst_stream.close()
+                        out_close = False
+                        os.remove(out)
+                    raise EncryptionError(
+                        "the data was modified, authentication failed") from e
+        finally:
+            if out_close:
+                dst_stream.close()
+    finally:
+        if in_close:
+            src_stream.close()
+    return ret
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+@file
+@brief Hashes files and bytes with a selectable algorithm.
+"""
+import os
+import hashlib
+import mmap
+import threading
+from collections import OrderedDict
+
+
+def get_hash_constructor(algo="md5"):
+    """
+    Returns a function which creates a hash object
+    for algorithm *algo*.
+
+    @param      algo        ``'md5'``, ``'sha256'``, ``'blake2b'``, ``'xxhash'``
+                            (if :epkg:`xxhash` is installed) or any name
+                            :epkg:`*py:hashlib:new` accepts
+    @return                 function
+    """
+    if algo == "md5":
+        return hashlib.md5
+    if algo == "sha256":
+        return hashlib.sha256
+    if algo == "blake2b":
+        return hashlib.blake2b
+    if algo == "xxhash":
+        try:
+            import xxhash
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(
+                "Algorithm 'xxhash' requires module xxhash.") from e
+        return getattr(xxhash, "xxh3_128", xxhash.xxh64)
+    if algo not in hashlib.algorithms_available:
+        raise ValueError("Unknown hash algorithm '{0}'.".format(algo))
+    return lambda: hashlib.new(algo)
+
+
+def hash_bytes(data, algo="md5"):
+    """
+    Computes the hash of some data.
+
+    @param      data        bytes, bytearray or memoryview
+    @param      algo        see @see fn get_hash_constructor
+    @return                 string (hexadecimal digest)
+    """
+    h = get_hash_constructor(algo)()
+    h.update(data)
+    return h.hexdigest()
+
+
+def _update_from_file(h, filename, size, block_size, mmap_threshold):
+    with open(filename, "rb") as f:
+        if size >= mmap_threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                # hashlib releases the GIL for big buffers
+                h.update(m)
+            return
+        buffer = bytearray(min(block_size, max(size, 1)))
+        view = memoryview(buffer)
+        while True:
+            n = f.readinto(buffer)
+            if n == 0:
+                break
+            h.update(view[:n])
+
+
+def hash_file(filename, algo="md5", block_size=2 ** 20, mmap_threshold=2 ** 24):
+    """
+    Computes the hash of a file.
+
+    @param      filename        filename
+    @param      algo            see @see fn get_hash_constructor
+    @param      block_size      size of the buffer used to read the file
+    @param      mmap_threshold  files bigger than this size are
+                                mapped in memory (:epkg:`*py:mmap`)
+                                instead of being read
+    @return                     string (hexadecimal digest)
+    """
+    h = get_hash_constructor(algo)()
+    _update_from_file(h, filename, os.stat(filename).st_size,
+                      block_size, mmap_threshold)
+    return h.hexdigest()
+
+
+class FileHasher:
+    """
+    Hashes files. It remembers the last *memo_size* computed hashes
+    with the key *(device, inode, size, modification time)*:
+    a file is not hashed twice as long as it is not modified.
+    An instance can be shared by several threads.
+    It also computes a cheap signature (size, first and last bytes)
+    which tells two files are different without reading them entirely.
+
+    A checksum returned by @see me checksum is the hexadecimal digest
+    for ``'md5'`` (the format used by @see cl FilesStatus)
+    and ``'<algo>:<hexadecimal digest>'`` for the other algorithms.
+
+    .. exref::
+        :title: Compare two files
+
+        ::
+
+            from pyquickhelper.filehelper.file_hash import FileHasher
+
+            hasher = FileHasher("blake2b")
+            print(hasher.same_content("file1.bin", "file2.bin"))
+    """
+
+    def __init__(self, algo="md5", memo=True, prefilter_size=2 ** 16,
+                 block_size=2 ** 20, mmap_threshold=2 ** 24, memo_size=2 ** 17):
+        """
+        @param      algo            see @see fn get_hash_constructor
+        @param      memo            remembers the computed hashes
+        @param      memo_size       maximum number of remembered hashes,
+                                    the oldest ones are forgotten first
+        @param      prefilter_size  number of bytes taken at the beginning
+                                    and at the end of a file for the signature
+                                    (see @see me prefilter)
+        @param      block_size      see @see fn hash_file
+        @param      mmap_threshold  see @see fn hash_file
+        """
+        self.algo = algo
+        self.prefilter_size = prefilter_size
+        self.block_size = block_size
+        self.mmap_threshold = mmap_threshold
+        self.memo_size = memo_size
+        self._memo = OrderedDict() if memo else None
+        self._lock = threading.Lock()
+        self.nb_hashed = 0
+        # raises an exception if the algorithm does not exist
+        get_hash_constructor(algo)
+
+    def __len__(self):
+        """
+        Returns the number of remembered hashes.
+        """
+        return 0 if self._memo is None else len(self._memo)
+
+    def clear(self):
+        """
+        Forgets every remembered hash.
+        """
+        if self._memo is not None:
+            with self._lock:
+                self._memo.clear()
+
+    @staticmethod
+    def split_checksum(checksum):
+        """
+        Splits a checksum into *(algo, hexadecimal digest)*.
+        """
+        if ":" in checksum:
+            return tuple(checksum.split(":", 1))
+        return "md5", checksum
+
+    def _hash(self, kind, filename, st, algo, fct):
+        if st is None:
+            st = os.stat(filename)
+        if self._memo is None:
+            return fct(st)
+        key = (kind, algo, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            res = self._memo.get(key, None)
+            if res is not None:
+                self._memo.move_to_end(key)
+                return res
+        res = fct(st)
+        with self._lock:
+            self._memo[key] = res
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return res
+
+    def hash_file(self, filename, st=None, algo=None):
+        """
+        Computes the hash of a file.
+
+        @param      filename        filename
+        @param      st              result of :epkg:`*py:os:stat` if known
+        @param      algo            overwrites the default algorithm
+        @return                     string (hexadecimal digest)
+        """
+        algo = algo or self.algo
+
+        def fct(st):
+            with self._lock:
+                self.nb_hashed += 1
+            h = get_hash_constructor(algo)()
+            _update_from_file(h, filename, st.st_size,
+                              self.block_size, self.mmap_threshold)
+            return h.hexdigest()
+
+        return self._hash("full", filename, st, algo, fct)
+
+    def checksum(self, filename, st=None, algo=None):
+        """
+        Returns the checksum of a file,
+        the algorithm name is added if it is not ``'md5'``.
+
+        @param      filename        filename
+        @param      st              result of :epkg:`*py:os:stat` if known
+        @param      algo            overwrites the default algorithm
+        @return                     string
+        """
+        algo = algo or self.algo
+        h = self.hash_file(filename, st=st, algo=algo)
+        return h if algo == "md5" else "{0}:{1}".format(algo, h)
+
+    def checksum_like(self, filename, checksum, st=None):
+        """
+        Returns the checksum of a file computed
+        with the algorithm used to compute *checksum*.
+        """
+        algo = FileHasher.split_checksum(checksum)[0]
+        return self.checksum(filename, st=st, algo=algo)
+
+    def prefilter(self, filename, st=None):
+        """
+        Returns a cheap signature of a file: its size and the hash
+        of its first and last *prefilter_size* bytes. Two files
+        with different signatures are different.
+
+        @param      filename        filename
+        @param      st              result of :epkg:`*py:os:stat` if known
+        @return                     string
+        """
+        def fct(st):
+            h = get_hash_constructor(self.algo)()
+            size = st.st_size
+            n = self.prefilter_size
+            with open(filename, "rb") as f:
+                if size <= 2 * n:
+                    h.update(f.read())
+                else:
+                    h.update(f.read(n))
+                    f.seek(size - n)
+                    h.update(f.read(n))
+            return "%d-%s" % (size, h.hexdigest())
+
+        return self._hash("prefilter", filename, st, self.algo, fct)
+
+    def same_content(self, file1, file2, st1=None, st2=None):
+        """
+        Tells if two files have the same content.
+        It compares sizes, then signatures (see @see me prefilter)
+        and finally the hashes of the whole files.
+
+        @param      file1       first file
+        @param      file2       second file
+        @param      st1         result of :epkg:`*py:os:stat` for the first file if known
+        @param      st2         result of :epkg:`*py:os:stat` for the second file if known
+        @return                 boolean
+        """
+        if st1 is None:
+            st1 = os.stat(file1)
+        if st2 is None:
+            st2 = os.stat(file2)
+        if st1.st_size != st2.st_size:
+            return False
+        if st1.st_size > 2 * self.prefilter_size:
+            if self.prefilter(file1, st1) != self.prefilter(file2, st2):
+                return False
+        return self.hash_file(file1, st1) == self.hash_file(file2, st2)
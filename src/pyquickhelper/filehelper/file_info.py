@@ -4,9 +4,9 @@
 @brief      Defines class @see cl FileInfo
 """
 import datetime
-import hashlib
 import re
 import urllib.parse as urlparse
+from .file_hash import hash_file
 
 
 def convert_st_date_to_datetime(t):
@@ -17,6 +17,11 @@ def convert_st_date_to_datetime(t):
     @return             datetime
     """
     if isinstance(t, str):
+        try:
+            # much faster than strptime
+            return datetime.datetime.fromisoformat(t)
+        except ValueError:
+            pass
         if "." in t:
             return datetime.datetime.strptime(t, "%Y-%m-%d %H:%M:%S.%f")
         else:
@@ -31,17 +36,10 @@ def checksum_md5(filename):
 
     @param      filename        filename
     @return                     string
+
+    See @see cl FileHasher to use another algorithm.
     """
-    fname = filename
-    block_size = 0x10000
-    zero = hashlib.md5()
-    with open(fname, "rb") as fd:
-        block = [fd.read(block_size)]
-        while len(block[-1]) > 0:
-            block.append(fd.read(block_size))
-        for el in block:
-            zero.update(el)
-        return zero.hexdigest()
+    return hash_file(filename, "md5")
 
 
 _allowed = re.compile("^([a-zA-Z]:)?[^:*?\"<>|]+$")
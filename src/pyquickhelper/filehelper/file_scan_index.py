@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+@file
+@brief Scans folders with :epkg:`*py:os:scandir` and keeps
+a persistent index of the scan to speed up the next one.
+"""
+import os
+import pickle
+from ..loghelper.flog import noLOG
+
+
+class ScanEntry:
+    """
+    Describes one entry of a folder as returned by
+    @see cl FileScanIndex, it is the only information
+    @see cl FileTreeNode needs to build a node without
+    calling :epkg:`*py:os:stat` again.
+    """
+    __slots__ = ['name', 'isdir', 'size', 'mtime', 'mtime_ns', 'inode', 'hash']
+
+    def __init__(self, name, isdir, size, mtime, mtime_ns, inode, hash=None):
+        """
+        @param      name        file name (no folder)
+        @param      isdir       is it a folder
+        @param      size        size in bytes
+        @param      mtime       modification time (*st_mtime*)
+        @param      mtime_ns    modification time (*st_mtime_ns*)
+        @param      inode       inode (*st_ino*)
+        @param      hash        hash of the content if known
+        """
+        self.name = name
+        self.isdir = isdir
+        self.size = size
+        self.mtime = mtime
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+        self.hash = hash
+
+    @staticmethod
+    def from_stat(name, isdir, st):
+        """
+        Builds an entry from the result of :epkg:`*py:os:stat`.
+        """
+        return ScanEntry(name, isdir, st.st_size, st.st_mtime,
+                         st.st_mtime_ns, st.st_ino)
+
+    @staticmethod
+    def from_dir_entry(entry):
+        """
+        Builds an entry from a :epkg:`*py:os:DirEntry`,
+        the stat information cached by :epkg:`*py:os:scandir`
+        is reused whenever the system provides it.
+        """
+        return ScanEntry.from_stat(entry.name, entry.is_dir(), entry.stat())
+
+    def same_content(self, other):
+        """
+        Tells if *other* describes the same unmodified file
+        (same size, modification time and inode).
+        """
+        return (self.size == other.size and self.mtime_ns == other.mtime_ns and
+                self.inode == other.inode)
+
+    def to_tuple(self):
+        """
+        Serializes the entry.
+        """
+        return (self.name, self.isdir, self.size, self.mtime,
+                self.mtime_ns, self.inode, self.hash)
+
+    def __repr__(self):
+        "usual"
+        return "ScanEntry(%r, %r, %r, %r, %r, %r, %r)" % self.to_tuple()
+
+
+def scan_folder(folder):
+    """
+    Returns the list of @see cl ScanEntry for every file or folder
+    included in *folder* (no recursion). Entries which disappear
+    while scanning are skipped.
+
+    @param      folder      folder
+    @return                 list of @see cl ScanEntry
+    """
+    res = []
+    with os.scandir(folder) as it:
+        for entry in it:
+            try:
+                res.append(ScanEntry.from_dir_entry(entry))
+            except FileNotFoundError:
+                continue
+    return res
+
+
+class FileScanIndex:
+    """
+    Keeps the result of a folder scan on disk: for every folder,
+    its modification time and its content (name, size, modification time,
+    inode, hash). Creating, removing or renaming a file updates the modification
+    time of the folder which contains it. When it did not change since the
+    previous scan, the index returns the stored content
+    instead of listing the folder again.
+
+    .. exref::
+        :title: Scan a folder twice
+
+        ::
+
+            from pyquickhelper.filehelper import FileTreeNode, FileScanIndex
+
+            index = FileScanIndex("scan_index.pkl")
+            node = FileTreeNode("c:/mydata", scan_index=index)
+            index.save()
+
+    The second scan only lists the folders which were modified.
+    A file modified in place does not change the modification time of
+    its folder, the index calls :epkg:`*py:os:stat` on every file
+    of an unmodified folder and only reuses the listing and the hashes.
+    *trust_mtime=True* skips these calls and misses such modifications.
+    """
+
+    _version = 1
+
+    def __init__(self, filename=None, trust_mtime=False, fLOG=noLOG):
+        """
+        @param      filename        file storing the index, None to keep it in memory,
+                                    it is loaded if it exists
+        @param      trust_mtime     skip every unmodified folder (True) or
+                                    stat every file of an unmodified folder (False)
+        @param      fLOG            logging function
+        """
+        self.filename = filename
+        self.trust_mtime = trust_mtime
+        self.fLOG = fLOG
+        self._dirs = {}
+        self._visited = {}
+        self.nb_listed = 0
+        self.nb_reused = 0
+        if filename is not None and os.path.exists(filename):
+            self.load()
+
+    def __len__(self):
+        """
+        Returns the number of indexed folders.
+        """
+        return len(self._dirs)
+
+    def load(self, filename=None):
+        """
+        Loads the index.
+
+        @param      filename        file to load, *self.filename* if None
+        """
+        if filename is None:
+            filename = self.filename
+        with open(filename, "rb") as f:
+            data = pickle.load(f)
+        if not isinstance(data, dict) or data.get("version", None) != FileScanIndex._version:
+            self.fLOG("[FileScanIndex] ignores index '{0}', unexpected version".format(
+                filename))
+            self._dirs = {}
+            return
+        self._dirs = {}
+        for rel, (mtime_ns, entries) in data["dirs"].items():
+            self._dirs[rel] = (mtime_ns, [ScanEntry(*e) for e in entries])
+
+    def save(self, filename=None):
+        """
+        Saves the index, only folders seen by the last scans are kept.
+
+        @param      filename        destination, *self.filename* if None
+        """
+        if filename is None:
+            filename = self.filename
+        if filename is None:
+            raise ValueError("filename cannot be None")
+        dirs = {rel: (mtime_ns, [e.to_tuple() for e in entries])
+                for rel, (mtime_ns, entries) in self._visited.items()}
+        data = {"version": FileScanIndex._version, "dirs": dirs}
+        temp = filename + ".tmp"
+        with open(temp, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, filename)
+        self._dirs = dict(self._visited)
+
+    def scan(self, full, rel, mtime_ns=None):
+        """
+        Returns the content of folder *full*.
+
+        @param      full        full path of the folder
+        @param      rel         path relative to the scanned root,
+                                it is the key in the index
+        @param      mtime_ns    modification time of the folder (*st_mtime_ns*),
+                                it is retrieved if None
+        @return                 list of @see cl ScanEntry
+        """
+        if mtime_ns is None:
+            mtime_ns = os.stat(full).st_mtime_ns
+        rel = rel.replace("\\", "/")
+        cached = self._dirs.get(rel, None)
+        if cached is not None and cached[0] == mtime_ns:
+            self.nb_reused += 1
+            entries = self._refresh(full, cached[1])
+        else:
+            self.nb_listed += 1
+            entries = scan_folder(full)
+            if cached is not None:
+                old = {e.name: e for e in cached[1]}
+                for e in entries:
+                    o = old.get(e.name, None)
+                    if o is not None and not e.isdir and e.same_content(o):
+                        e.hash = o.hash
+        self._visited[rel] = (mtime_ns, entries)
+        return entries
+
+    def _refresh(self, full, entries):
+        """
+        Updates the stored entries of an unmodified folder.
+        Subfolders are always checked because their modification time
+        tells if they must be listed again. Files are checked only
+        if *trust_mtime* is False.
+        """
+        res = []
+        for e in entries:
+            if not e.isdir and self.trust_mtime:
+                res.append(e)
+                continue
+            try:
+                st = os.stat(os.path.join(full, e.name))
+            except FileNotFoundError:
+                continue
+            n = ScanEntry.from_stat(e.name, e.isdir, st)
+            if not e.isdir and n.same_content(e):
+                n.hash = e.hash
+            res.append(n)
+        return res
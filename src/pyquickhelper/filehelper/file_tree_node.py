@@ -8,11 +8,15 @@ import re
 import datetime
 import time
 import shutil
-import hashlib
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from ..loghelper.pqh_exception import PQHException
 from ..loghelper.flog import noLOG
 from ..loghelper.pyrepo_helper import SourceRepository
+from ..loghelper.repositories.pygit_helper import repo_ls
+from ..loghelper.repositories.git_index import find_git_root
+from .file_scan_index import FileScanIndex, ScanEntry, scan_folder
+from .file_hash import FileHasher, hash_file
 
 
 class FileTreeNode:
@@ -75,7 +79,8 @@ class FileTreeNode:
         return ".*[.]" + "|".join(["(%s$)" % e for e in ext])
 
     def __init__(self, root, file=None, filter=None, level=0, parent=None,
-                 repository=False, log=False, log1=False, fLOG=noLOG):
+                 repository=False, log=False, log1=False, fLOG=noLOG,
+                 scan_index=None, entry=None):
         """
         Defines a file, relative to a root.
         @param      root            root (it must exist)
@@ -90,6 +95,16 @@ class FileTreeNode:
         @param      log             log every explored folder
         @param      log1            intermediate logs (first level)
         @param      fLOG            logging function to use
+        @param      scan_index      None, a filename or a @see cl FileScanIndex,
+                                    it stores the result of the scan to
+                                    speed up the next one (a filename is loaded and
+                                    the index saved once the scan is complete)
+        @param      entry           @see cl ScanEntry, the node uses the information
+                                    it contains instead of calling :epkg:`*py:os:stat`
+
+        Folders are listed with :epkg:`*py:os:scandir`, the node
+        caches the type, the size and the modification date
+        of the file.
         """
         if root is None:
             raise ValueError("root cannot be None")
@@ -105,16 +120,24 @@ class FileTreeNode:
         self._log1 = log1
         self.module = None
         self.fLOG = fLOG
+        self._entry = entry
+
+        save_index = False
+        if isinstance(scan_index, str):
+            scan_index = FileScanIndex(scan_index, fLOG=fLOG)
+            save_index = True
+        self.scan_index = scan_index
 
-        if not os.path.exists(root):
-            raise PQHException("path '%s' does not exist" % root)
-        if not os.path.isdir(root):
-            raise PQHException("path '%s' is not a folder" % root)
+        if entry is None:
+            if not os.path.exists(root):
+                raise PQHException("path '%s' does not exist" % root)
+            if not os.path.isdir(root):
+                raise PQHException("path '%s' is not a folder" % root)
 
-        if self._file is not None:
-            if not self.exists():
-                raise PQHException(
-                    "%s does not exist [%s,%s]" % (self.get_fullname(), root, file))
+            if self._file is not None:
+                if not self.exists():
+                    raise PQHException(
+                        "%s does not exist [%s,%s]" % (self.get_fullname(), root, file))
 
         self._fillstat()
         if self.isdir():
@@ -129,6 +152,8 @@ class FileTreeNode:
                 self._fill(fil, repository=repository)
             else:
                 self._fill(filter, repository=repository)
+            if save_index:
+                scan_index.save()
 
     @property
     def name(self):
@@ -172,24 +197,28 @@ class FileTreeNode:
         """
         return self.get_fullname()
 
-    def hash_md5_readfile(self):
+    def hash_md5_readfile(self, hasher=None):
         """
-        Computes a hash of a file.
+        Computes a hash of a file. The hash is stored in the
+        scan index if the node was created with one, it is not
+        computed again as long as the file is not modified.
 
-        @return     string
+        @param      hasher  @see cl FileHasher, None for MD5,
+                            it describes the returned format
+        @return             string
         """
-        filename = self.get_fullname()
-        f = open(filename, 'rb')
-        m = hashlib.md5()
-        readBytes = 1024 ** 2  # read 1024 bytes per time
-        totalBytes = 0
-        while readBytes:
-            readString = f.read(readBytes)
-            m.update(readString)
-            readBytes = len(readString)
-            totalBytes += readBytes
-        f.close()
-        return m.hexdigest()
+        algo = "md5" if hasher is None else hasher.algo
+        entry = self._entry
+        if (entry is not None and entry.hash is not None and
+                FileHasher.split_checksum(entry.hash)[0] == algo):
+            return entry.hash
+        if hasher is None:
+            res = hash_file(self.get_fullname(), "md5")
+        else:
+            res = hasher.checksum(self.get_fullname())
+        if entry is not None:
+            entry.hash = res
+        return res
 
     def get_content(self, encoding="utf8"):
         """
@@ -222,16 +251,16 @@ class FileTreeNode:
         """
         private: fill _type, _size
         """
-        full = self.get_fullname()
-        if os.path.isfile(full):
-            self._type = "file"
-        else:
-            self._type = "folder"
-
-        stat = os.stat(self.get_fullname())
-        self._size = stat.st_size
-        temp = datetime.datetime.utcfromtimestamp(stat.st_mtime)
-        self._date = temp
+        if self._entry is None:
+            full = self.get_fullname()
+            stat = os.stat(full)
+            isdir = not os.path.isfile(full)
+            self._entry = ScanEntry.from_stat(
+                os.path.split(full)[-1], isdir, stat)
+        entry = self._entry
+        self._type = "folder" if entry.isdir else "file"
+        self._size = entry.size
+        self._date = datetime.datetime.utcfromtimestamp(entry.mtime)
 
     def isdir(self):
         """
@@ -239,7 +268,7 @@ class FileTreeNode:
 
         @return     boolean
         """
-        return os.path.isdir(self.get_fullname())
+        return self._type == "folder"
 
     def isfile(self):
         """
@@ -247,7 +276,7 @@ class FileTreeNode:
 
         @return     boolean
         """
-        return os.path.isfile(self.get_fullname())
+        return self._type == "file"
 
     def __str__(self):
         """
@@ -265,8 +294,12 @@ class FileTreeNode:
 
     def repo_ls(self, path):
         """
-        call ls of an instance of @see cl SourceRepository
+        call ls of an instance of @see cl SourceRepository,
+        the files of a :epkg:`git` repository come from the index
+        shared by all nodes (see @see cl GitMetadataIndex)
         """
+        if find_git_root(path) is not None:
+            return repo_ls(path, index=True)
         if "_repo_" not in self.__dict__:
             self._repo_ = SourceRepository(True)
         return self._repo_.ls(path)
@@ -280,26 +313,27 @@ class FileTreeNode:
             raise PQHException(
                 "unable to look into a file %s full %s" % (self._file, self.get_fullname()))
 
+        full = self.get_fullname()
+        fi = "" if self._file is None else self._file
         if repository:
             opt = "repo_ls"
-            full = self.get_fullname()
-            fi = "" if self._file is None else self._file
             entry = self.repo_ls(full)
-            temp = [os.path.relpath(p.name, full) for p in entry]
-            all = []
-            for s in temp:
-                all.append(s)
+            all = [(os.path.relpath(p.name, full), None) for p in entry]
         else:
-            opt = "listdir"
-            full = self.get_fullname()
-            fi = "" if self._file is None else self._file
-            all = [a for a in os.listdir(full) if a not in [".", ".."]]
+            opt = "scandir"
+            if self.scan_index is not None:
+                entries = self.scan_index.scan(full, fi, self._entry.mtime_ns)
+            else:
+                entries = scan_folder(full)
+            all = [(e.name, e) for e in entries]
 
-        all.sort()
+        all.sort(key=lambda t: t[0])
         self._children = []
-        for a in all:
-            fu = os.path.join(full, a)
-            isd = os.path.isdir(fu)
+        for a, e in all:
+            if e is None:
+                isd = os.path.isdir(os.path.join(full, a))
+            else:
+                isd = e.isdir
             if self._log and isd:
                 self.fLOG("[FileTreeNode], entering", a)
             elif self._log1 and self._level <= 0:
@@ -308,12 +342,13 @@ class FileTreeNode:
                 try:
                     n = FileTreeNode(self._root, os.path.join(fi, a), filter, level=self._level + 1,
                                      parent=self, repository=repository, log=self._log,
-                                     log1=self._log1 or self._log, fLOG=self.fLOG)
-                except PQHException as e:
-                    if "does not exist" in str(e):
+                                     log1=self._log1 or self._log, fLOG=self.fLOG,
+                                     scan_index=self.scan_index, entry=e)
+                except PQHException as exc:
+                    if "does not exist" in str(exc):
                         self.fLOG(
                             "a folder should exist, but is it is not, it continues [opt=%s]" % opt)
-                        self.fLOG(e)
+                        self.fLOG(exc)
                         continue
                 if n.isdir() and len(n._children) == 0:
                     continue
@@ -389,44 +424,42 @@ class FileTreeNode:
                     res[node._file] = node
         return res
 
-    def sign(self, node, hash_size):
+    def sign(self, node, hash_size, hasher=None):
         """
         Returns ``==``, ``<`` or ``>`` according the dates
         if the size is not too big, if the sign is ``<`` or ``>``,
         applies the hash method.
+
+        @param      node        other node
+        @param      hash_size   above this size, it does not compute the hash key
+        @param      hasher      @see cl FileHasher, None for MD5, if specified,
+                                the signatures (@see me prefilter) of big files
+                                are compared before hashing the whole files
+        @return                 ``==``, ``<`` or ``>``
         """
         if self._date == node._date:
             return "=="
-        elif self._date < node._date:
-            if self.isdir(
-            ) or self._size != node._size or node._size > hash_size:
-                return "<"
-            else:
-                h1 = self.hash_md5_readfile()
-                h2 = node.hash_md5_readfile()
-                if h1 != h2:
-                    return "<"
-                else:
-                    return "=="
-        else:
-            if self.isdir(
-            ) or self._size != node._size or node._size > hash_size:
-                return ">"
-            else:
-                h1 = self.hash_md5_readfile()
-                h2 = node.hash_md5_readfile()
-                if h1 != h2:
-                    return ">"
-                else:
-                    return "=="
+        res = "<" if self._date < node._date else ">"
+        if self.isdir() or self._size != node._size or node._size > hash_size:
+            return res
+        if (hasher is not None and self._size > 2 * hasher.prefilter_size and
+                hasher.prefilter(self.get_fullname()) != hasher.prefilter(node.get_fullname())):
+            return res
+        h1 = self.hash_md5_readfile(hasher)
+        h2 = node.hash_md5_readfile(hasher)
+        return res if h1 != h2 else "=="
 
-    def difference(self, node, hash_size=1024 ** 2 * 2, lower=False):
+    def difference(self, node, hash_size=1024 ** 2 * 2, lower=False, workers=None,
+                   hasher=None):
         """
         Returns the differences with another folder.
 
         @param      node        other node
         @param      hash_size   above this size, it does not compute the hash key
         @param      lower       if True, every filename is converted into lower case
+        @param      workers     None or a number of threads, if > 1, the files present
+                                in both folders are compared (and hashed) in parallel
+        @param      hasher      @see cl FileHasher, None for MD5 (see @see me sign)
         @return                 list of [ (``?``, self._file, node (in self), node (in node)) ], see below for the choice of ``?``
 
         The question mark ``?`` means:
@@ -442,6 +475,14 @@ class FileTreeNode:
         d2 = node.get_dict(lower=lower)
         res = []
         nb = 0
+        if workers is not None and workers > 1:
+            both = [(v, d2[k]) for k, v in d1.items() if k in d2]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                signs = executor.map(
+                    lambda vv: vv[0].sign(vv[1], hash_size, hasher), both)
+                signs = iter(list(signs))
+        else:
+            signs = None
         for k, v in d1.items():
             ti2 = time.perf_counter()
             if ti2 - ti > 10:
@@ -450,7 +491,9 @@ class FileTreeNode:
             if k not in d2:
                 res.append((k, ">+", v, None))
             else:
-                res.append((k, v.sign(d2[k], hash_size), v, d2[k]))
+                sign = v.sign(d2[k], hash_size,
+                              hasher) if signs is None else next(signs)
+                res.append((k, sign, v, d2[k]))
             nb += 1
 
         for k, v in d2.items():
@@ -504,7 +547,8 @@ class FileTreeNode:
         fina = dest  # os.path.split (dest) [0]
         if not os.path.exists(fina):
             self.fLOG("creating directory: ", fina)
-            os.makedirs(fina)
+            # exist_ok: another thread may create it at the same time
+            os.makedirs(fina, exist_ok=True)
         try:
             # if 1 :
             self.fLOG("+ copy ", full, " to ", dest)
@@ -5,8 +5,13 @@
 """
 import os
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from ..loghelper.flog import noLOG
-from .file_info import convert_st_date_to_datetime, checksum_md5, FileInfo
+from .file_info import convert_st_date_to_datetime, FileInfo
+from .file_hash import FileHasher
+from .files_status_storage import (
+    FilesStatusStorage, TextFilesStatusStorage, JournalFilesStatusStorage,
+    SqliteFilesStatusStorage)
 
 
 class FilesStatus:
@@ -14,44 +19,50 @@ class FilesStatus:
     This class maintains a list of files
     and does some verifications in order to check if a file
     was modified or not (if yes, then it will be updated to the website).
+
+    The status is kept by a storage (see @see cl FilesStatusStorage).
+    The default one is a text file entirely rewritten by @see me save_dates.
+    Storage ``'journal'`` (@see cl JournalFilesStatusStorage) appends every
+    modification to a journal and storage ``'sqlite'``
+    (@see cl SqliteFilesStatusStorage) keeps the status in a database
+    and only loads the requested files. Both of them can start
+    from an existing text status file.
     """
 
-    def __init__(self, file, fLOG=noLOG):
+    _storages = {
+        'text': TextFilesStatusStorage,
+        'journal': JournalFilesStatusStorage,
+        'sqlite': SqliteFilesStatusStorage,
+    }
+
+    def __init__(self, file, fLOG=noLOG, storage=None, hasher=None):
         """
         file which will contains the status
         @param      file            file, if None, fill _children
         @param      fLOG            logging function
+        @param      storage         None or ``'text'`` for the default storage,
+                                    ``'journal'``, ``'sqlite'`` or an instance of
+                                    @see cl FilesStatusStorage
+        @param      hasher          @see cl FileHasher which computes the checksums,
+                                    None for MD5, a stored checksum is always compared
+                                    to a checksum computed with the same algorithm
         """
         self._file = file
-        self.copyFiles = {}
         self.fileKeep = file
         self.LOG = fLOG
+        self.hasher = FileHasher() if hasher is None else hasher
 
-        if os.path.exists(self.fileKeep):
-            with open(self.fileKeep, "r", encoding="utf8") as f:
-                for ni, _ in enumerate(f.readlines()):
-                    if ni == 0 and _.startswith("\ufeff"):
-                        _ = _[len("\ufeff"):]
-                    spl = _.strip("\r\n ").split("\t")
-                    try:
-                        if len(spl) >= 2:
-                            a, b = spl[:2]
-                            obj = FileInfo(a, int(b), None, None, None)
-                            if len(spl) > 2 and len(spl[2]) > 0:
-                                obj.set_date(
-                                    convert_st_date_to_datetime(spl[2]))
-                            if len(spl) > 3 and len(spl[3]) > 0:
-                                obj.set_mdate(
-                                    convert_st_date_to_datetime(spl[3]))
-                            if len(spl) > 4 and len(spl[4]) > 0:
-                                obj.set_md5(spl[4])
-                            self.copyFiles[a] = obj
-                        else:
-                            raise ValueError(
-                                "expecting a filename and a date on this line: " + _)
-                    except Exception as e:
-                        raise Exception(
-                            "issue with line:\n  {0} -- {1}".format(_, spl)) from e
+        if storage is None:
+            storage = 'text'
+        if isinstance(storage, str):
+            if storage not in FilesStatus._storages:
+                raise ValueError("Unknown storage '{0}', it should be in {1}.".format(
+                    storage, list(sorted(FilesStatus._storages))))
+            storage = FilesStatus._storages[storage](file)
+        elif not isinstance(storage, FilesStatusStorage):
+            raise TypeError(
+                "Unexpected type for storage: {0}".format(type(storage)))
+        self.copyFiles = storage
 
         # contains all file to update
         self.modifiedFile = {}
@@ -78,37 +89,30 @@ class FilesStatus:
 
         @param      checkfile       check the status for file checkfile
         """
-        typstr = str
         if checkfile is None:
             checkfile = []
-        rows = []
-        for k in sorted(self.copyFiles):
-            obj = self.copyFiles[k]
-            da = "" if obj.date is None else str(obj.date)
-            mda = "" if obj.mdate is None else str(obj.mdate)
-            sum5 = "" if obj.checksum is None else str(obj.checksum)
-
-            if k in checkfile and len(da) == 0:
+        elif isinstance(checkfile, str):
+            checkfile = [checkfile]
+        for k in checkfile:
+            obj = self.copyFiles.get(k, None)
+            if obj is None:
+                continue
+            if obj.date is None:
                 raise ValueError(
                     "there should be a date for file " + k + "\n" + str(obj))
-            if k in checkfile and len(mda) == 0:
+            if obj.mdate is None:
                 raise ValueError(
                     "there should be a mdate for file " + k + "\n" + str(obj))
-            if k in checkfile and len(sum5) <= 10:
+            if obj.checksum is None or len(obj.checksum) <= 10:
                 raise ValueError(
                     "there should be a checksum( for file " + k + "\n" + str(obj))
+        self.copyFiles.save()
 
-            values = [k, typstr(obj.size), da, mda, sum5]
-            sval = "%s\n" % "\t".join(values)
-            if "\tNone" in sval:
-                raise AssertionError(
-                    "this case should happen " + sval + "\n" + str(obj))
-
-            rows.append(sval)
-
-        with open(self.fileKeep, "w", encoding="utf8") as f:
-            for r in rows:
-                f.write(r)
+    def close(self):
+        """
+        Releases the resources held by the storage, it does not save.
+        """
+        self.copyFiles.close()
 
     def has_been_modified_and_reason(self, file):
         """
@@ -120,11 +124,11 @@ class FilesStatus:
         reason = None
         typstr = str
 
-        if file not in self.copyFiles:
+        obj = self.copyFiles.get(file, None)
+        if obj is None:
             reason = "new"
             res = True
         else:
-            obj = self.copyFiles[file]
             st = os.stat(file)
             if st.st_size != obj.size:
                 reason = "size %s != old size %s" % (
@@ -137,7 +141,8 @@ class FilesStatus:
                 if d != ld:
                     # dates are different but files might be the same
                     if obj.checksum is not None:
-                        ch = checksum_md5(file)
+                        ch = self.hasher.checksum_like(
+                            file, obj.checksum, st=st)
                         if ch != obj.checksum:
                             reason = "date/md5 %s != old date %s  md5 %s != %s" % (
                                 typstr(ld), typstr(d), obj.checksum, ch)
@@ -175,28 +180,49 @@ class FilesStatus:
             self.add_modified_file(res, reason)
         return res
 
-    def difference(self, files, u4=False, nlog=None):
+    def _iter_modified_and_reason(self, files, workers=None, chunk=1000):
+        """
+        Iterates on *(file, (modified, reason))* for every file in *files* (a list).
+        Files are checked by *workers* threads if *workers* > 1,
+        the order is preserved.
+        """
+        if workers is None or workers <= 1:
+            for file in files:
+                yield file, self.has_been_modified_and_reason(file.fullname)
+        else:
+            def check(file):
+                return self.has_been_modified_and_reason(file.fullname)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for i in range(0, len(files), chunk):
+                    batch = files[i:i + chunk]
+                    yield from zip(batch, executor.map(check, batch))
+
+    def difference(self, files, u4=False, nlog=None, workers=None):
         """
         Goes through the list of files and tells which one has changed.
 
         @param      files           @see cl FileTreeNode
         @param      u4              @see cl FileTreeNode (changes the output)
         @param      nlog            if not None, print something every ``nlog`` processed files
+        @param      workers         None or a number of threads, if > 1, files
+                                    are checked (and hashed) in parallel (only if *u4* is True)
         @return                     iterator on files which changed
         """
         memo = {}
         if u4:
             nb = 0
+            nodes = []
             for file in files:
                 memo[file.fullname] = True
                 if file._file is None:
                     continue
+                nodes.append(file)
+            for file, (r, reason) in self._iter_modified_and_reason(nodes, workers):
                 nb += 1
                 if nlog is not None and nb % nlog == 0:
                     self.LOG("[FileTreeStatus], processed", nb, "files")
 
-                full = file.fullname
-                r, reason = self.has_been_modified_and_reason(full)
                 if r:
                     if reason == "new":
                         r = (">+", file._file, file, None)
@@ -222,11 +248,13 @@ class FilesStatus:
             if file.filename not in memo:
                 yield ("<+", file.filename, None, None)
 
-    def update_copied_file(self, file, delete=False):
+    def update_copied_file(self, file, delete=False, info=None):
         """
         Updates the file in copyFiles (before saving), update all fields.
         @param      file        filename
         @param      delete      to remove this file
+        @param      info        @see cl FileInfo if it was already computed
+                                by @see me get_file_info
         @return                 file object
         """
         if delete:
@@ -236,11 +264,22 @@ class FilesStatus:
             del self.copyFiles[file]
             return None
         else:
-            st = os.stat(file)
-            size = st.st_size
-            mdate = convert_st_date_to_datetime(st.st_mtime)
-            date = datetime.datetime.now()
-            md = checksum_md5(file)
-            obj = FileInfo(file, size, date, mdate, md)
+            obj = self.get_file_info(file) if info is None else info
             self.copyFiles[file] = obj
             return obj
+
+    def get_file_info(self, file):
+        """
+        Builds the @see cl FileInfo which describes a file once it was copied,
+        it does not modify the status. The function can be called
+        from another thread, @see me update_copied_file stores the result.
+
+        @param      file        filename
+        @return                 @see cl FileInfo
+        """
+        st = os.stat(file)
+        size = st.st_size
+        mdate = convert_st_date_to_datetime(st.st_mtime)
+        date = datetime.datetime.now()
+        md = self.hasher.checksum(file, st=st)
+        return FileInfo(file, size, date, mdate, md)
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+@file
+@brief Storages for @see cl FilesStatus, they behave like a dictionary
+``{ filename: FileInfo }``.
+"""
+import os
+import threading
+from collections.abc import MutableMapping
+from .file_info import convert_st_date_to_datetime, FileInfo
+
+
+def status_row_to_file_info(spl):
+    """
+    Converts a row of a status file into a @see cl FileInfo.
+
+    @param      spl     list of strings *(filename, size, date, mdate, checksum)*,
+                        the last three are optional
+    @return             @see cl FileInfo
+    """
+    if len(spl) < 2:
+        raise ValueError(
+            "expecting a filename and a date on this line: {0}".format(spl))
+    a, b = spl[:2]
+    obj = FileInfo(a, int(b), None, None, None)
+    if len(spl) > 2 and spl[2]:
+        obj.set_date(convert_st_date_to_datetime(spl[2]))
+    if len(spl) > 3 and spl[3]:
+        obj.set_mdate(convert_st_date_to_datetime(spl[3]))
+    if len(spl) > 4 and spl[4]:
+        obj.set_md5(spl[4])
+    return obj
+
+
+def file_info_to_status_row(obj):
+    """
+    Converts a @see cl FileInfo into a list of strings
+    *(filename, size, date, mdate, checksum)*.
+    """
+    da = "" if obj.date is None else str(obj.date)
+    mda = "" if obj.mdate is None else str(obj.mdate)
+    sum5 = "" if obj.checksum is None else str(obj.checksum)
+    return [obj.filename, str(obj.size), da, mda, sum5]
+
+
+def _row_to_line(values):
+    sval = "%s\n" % "\t".join(values)
+    if "\tNone" in sval:
+        raise AssertionError("this case should happen " + sval)
+    return sval
+
+
+def _read_status_lines(filename):
+    """
+    Reads a text status file and yields every non empty line
+    as a list of strings.
+    """
+    with open(filename, "r", encoding="utf8") as f:
+        for ni, _ in enumerate(f):
+            if ni == 0 and _.startswith("\ufeff"):
+                _ = _[len("\ufeff"):]
+            line = _.strip("\r\n ")
+            if not line:
+                continue
+            yield _, line.split("\t")
+
+
+class FilesStatusStorage(MutableMapping):
+    """
+    Base class for the storage of a @see cl FilesStatus.
+    It behaves like a dictionary ``{ filename: FileInfo }``,
+    method @see me save makes the modifications persistent.
+    """
+
+    def save(self):
+        """
+        Makes the modifications persistent.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Releases the resources, does not save.
+        """
+        pass
+
+
+class TextFilesStatusStorage(FilesStatusStorage):
+    """
+    Default storage: a text file, one line per file,
+    columns are separated by tabulations. The file is entirely
+    loaded in memory and entirely written by @see me save.
+    """
+
+    def __init__(self, filename):
+        """
+        @param      filename        status file, loaded if it exists
+        """
+        self.filename = filename
+        self._data = {}
+        if os.path.exists(filename):
+            self._load(filename)
+
+    def _load(self, filename):
+        for line, spl in _read_status_lines(filename):
+            try:
+                obj = status_row_to_file_info(spl)
+            except Exception as e:
+                raise Exception(
+                    "issue with line:\n  {0} -- {1}".format(line, spl)) from e
+            self._data[obj.filename] = obj
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def values(self):
+        return self._data.values()
+
+    def items(self):
+        return self._data.items()
+
+    def _write(self, filename):
+        rows = [_row_to_line(file_info_to_status_row(self._data[k]))
+                for k in sorted(self._data)]
+        with open(filename, "w", encoding="utf8") as f:
+            f.write("".join(rows))
+
+    def save(self):
+        """
+        Writes the whole status file.
+        """
+        self._write(self.filename)
+
+
+class JournalFilesStatusStorage(TextFilesStatusStorage):
+    """
+    The status is stored in a text file (same format as
+    @see cl TextFilesStatusStorage) and every modification
+    is appended to a journal (``<filename>.journal``).
+    Every update costs one written line, the journal is merged
+    into the text file when it becomes too big
+    (see @see me compact). An existing text status
+    file is used as it is.
+
+    The status file and the journal are entirely read when the storage
+    is created. The journal is compacted by @see me save and by the
+    constructor as soon as it contains more than
+    ``max(compact_min, compact_ratio * len(self))`` lines,
+    reading it never costs more than reading the status file
+    *compact_ratio* times or *compact_min* lines.
+    The last line of the journal is removed if it is incomplete
+    (the process writing it was interrupted).
+    """
+
+    def __init__(self, filename, compact_ratio=0.5, compact_min=10000):
+        """
+        @param      filename        status file
+        @param      compact_ratio   the journal is merged into the status file
+                                    when it contains more than
+                                    ``max(compact_min, compact_ratio * len(self))`` lines
+        @param      compact_min     see *compact_ratio*
+        """
+        TextFilesStatusStorage.__init__(self, filename)
+        self.journal = filename + ".journal"
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self._journal_size = 0
+        self._stream = None
+        if os.path.exists(self.journal):
+            self._replay()
+            if self._too_big():
+                # a previous process did not compact it
+                self.compact()
+
+    def _replay(self):
+        # offset of the end of the last complete line
+        offset = 0
+        torn = False
+        with open(self.journal, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # interrupted while writing the last line
+                    torn = True
+                    break
+                offset += len(raw)
+                line = raw.decode("utf8")
+                spl = line.rstrip("\r\n").split("\t")
+                if spl[0] == "+":
+                    obj = status_row_to_file_info(spl[1:])
+                    self._data[obj.filename] = obj
+                elif spl[0] == "-":
+                    self._data.pop(spl[1], None)
+                else:
+                    raise ValueError(
+                        "unexpected line in '{0}': {1}".format(self.journal, line))
+                self._journal_size += 1
+        if torn:
+            # the next record must not be appended to the torn line
+            with open(self.journal, "r+b") as f:
+                f.truncate(offset)
+
+    def _append(self, line):
+        if self._stream is None:
+            self._stream = open(self.journal, "a", encoding="utf8")
+        self._stream.write(line)
+        self._journal_size += 1
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._append(_row_to_line(["+"] + file_info_to_status_row(value)))
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._append("-\t%s\n" % key)
+
+    def _too_big(self):
+        return self._journal_size > max(self.compact_min,
+                                        self.compact_ratio * len(self._data))
+
+    def save(self):
+        """
+        Flushes the journal, merges it into the status file
+        if it is too big.
+        """
+        if self._too_big():
+            self.compact()
+        elif self._stream is not None:
+            self._stream.flush()
+
+    def compact(self):
+        """
+        Writes the whole status file and removes the journal.
+        """
+        self.close()
+        temp = self.filename + ".tmp"
+        self._write(temp)
+        os.replace(temp, self.filename)
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+        self._journal_size = 0
+
+    def close(self):
+        """
+        Closes the journal.
+        """
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+class SqliteFilesStatusStorage(FilesStatusStorage):
+    """
+    Stores the status in a :epkg:`SQLite` database,
+    files are loaded only when they are requested,
+    every update is one statement, @see me save commits.
+    If the file is a text status file, it is imported
+    and renamed into ``<filename>.bak``.
+    """
+
+    _create = ("CREATE TABLE IF NOT EXISTS files (filename TEXT PRIMARY KEY, "
+               "size INTEGER, date TEXT, mdate TEXT, checksum TEXT)")
+
+    def __init__(self, filename):
+        """
+        @param      filename        database
+        """
+        import sqlite3
+        self.filename = filename
+        rows = None
+        if os.path.exists(filename) and not SqliteFilesStatusStorage.is_sqlite(filename):
+            rows = [file_info_to_status_row(status_row_to_file_info(spl))
+                    for _, spl in _read_status_lines(filename)]
+            os.replace(filename, filename + ".bak")
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(filename, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute(SqliteFilesStatusStorage._create)
+        if rows:
+            self._con.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?,?,?,?,?)", rows)
+        self._con.commit()
+
+    @staticmethod
+    def is_sqlite(filename):
+        """
+        Tells if a file is a :epkg:`SQLite` database.
+        """
+        with open(filename, "rb") as f:
+            return f.read(16) == b"SQLite format 3\x00"
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._con.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_info(row):
+        return status_row_to_file_info([row[0], str(row[1])] + [
+            "" if r is None else r for r in row[2:]])
+
+    def __getitem__(self, key):
+        rows = self._execute("SELECT * FROM files WHERE filename=?", (key,))
+        if len(rows) == 0:
+            raise KeyError(key)
+        return SqliteFilesStatusStorage._to_info(rows[0])
+
+    def __setitem__(self, key, value):
+        row = file_info_to_status_row(value)
+        row[0] = key
+        self._execute("INSERT OR REPLACE INTO files VALUES (?,?,?,?,?)", row)
+
+    def __delitem__(self, key):
+        with self._lock:
+            cur = self._con.execute(
+                "DELETE FROM files WHERE filename=?", (key,))
+            if cur.rowcount == 0:
+                raise KeyError(key)
+
+    def __contains__(self, key):
+        return len(self._execute(
+            "SELECT 1 FROM files WHERE filename=?", (key,))) > 0
+
+    def __iter__(self):
+        for row in self._execute("SELECT filename FROM files ORDER BY filename"):
+            yield row[0]
+
+    def __len__(self):
+        return self._execute("SELECT COUNT(*) FROM files")[0][0]
+
+    def values(self):
+        return [SqliteFilesStatusStorage._to_info(row)
+                for row in self._execute("SELECT * FROM files ORDER BY filename")]
+
+    def items(self):
+        return [(v.filename, v) for v in self.values()]
+
+    def save(self):
+        """
+        Commits the modifications.
+        """
+        with self._lock:
+            self._con.commit()
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        with self._lock:
+            self._con.close()
@@ -29,6 +29,8 @@ class MockTransferFTP(TransferFTP):
             return None
         elif command == self._ftp.pwd and len(args) == 0:
             return "."
+        elif command == self._ftp.voidcmd and args == ('NOOP',):
+            return "200 NOOP ok."
         elif command == self._ftp.cwd and args == ('..',):
             return None
         elif command == self._ftp.storbinary and args[0] == 'STOR test_transfer_ftp.py':
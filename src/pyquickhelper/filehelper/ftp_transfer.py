@@ -2,7 +2,7 @@
 @file
 @brief provides some functionalities to upload file to a website
 """
-from ftplib import FTP, FTP_TLS, error_perm
+from ftplib import FTP, FTP_TLS, error_perm, error_temp
 import os
 import sys
 import time
@@ -120,6 +120,7 @@ class TransferFTP:
             self.is_sftp = False
         self.LOG = fLOG
         self._atts = dict(site=site, login=login, password=password)
+        self.broken = False
 
     def _check_can_logged(self):
         if self.is_sftp and not hasattr(self, '_ftp'):
@@ -417,6 +418,89 @@ class TransferFTP:
         else:
             return r
 
+    def _remote_size(self, name):
+        """
+        Returns the size of a remote file in the current directory,
+        None if it does not exist or if the server does not tell.
+        """
+        try:
+            if self.is_sftp:
+                return self._ftp.stat(name).st_size
+            self._ftp.voidcmd("TYPE I")
+            return self._ftp.size(name)
+        except Exception:
+            return None
+
+    def transfer_files(self, files, to, blocksize=None, callback=None):
+        """
+        Transfers files into the same remote folder,
+        the folder is entered only once.
+
+        @param      files       list of *(file, name, resume)*, *file* is a
+                                binary stream, *name* the remote name,
+                                if *resume* is True and the remote file is
+                                smaller than the stream, the transfer continues
+                                from the end of the remote file
+                                (command ``REST``, it must be the beginning
+                                of the same file, not available with :epkg:`SFTP`)
+        @param      to          destination (a folder)
+        @param      blocksize   see :tpl:`py,m='ftplib',o='FTP.storbinary'`
+        @param      callback    see :tpl:`py,m='ftplib',o='FTP.storbinary'`
+        @return                 list of *(offset, exception)*, *offset* is the
+                                position the transfer started from,
+                                *exception* is None if the transfer succeeded
+
+        If the session is lost (:epkg:`*py:ftplib:error_temp`,
+        :epkg:`*py:EOFError`, :epkg:`*py:OSError`), the remaining files
+        are not transferred, they receive the same exception,
+        and attribute *broken* is set to True:
+        @see cl TransferFTPPool closes the session instead of reusing it.
+
+        .. versionadded:: 1.9
+        """
+        self._check_can_logged()
+        path = [_ for _ in to.split("/") if len(_) > 0]
+        cpwd = self.pwd()
+        for i, p in enumerate(path):
+            p_ = ('/' + '/'.join(path[:i + 1])) if self.is_sftp else p
+            self.cwd(p_, True)
+
+        bs = blocksize if blocksize else TransferFTP.blockSize
+        res = []
+        lost = None
+        try:
+            for f, name, resume in files:
+                if lost is not None:
+                    res.append((0, lost))
+                    continue
+                rest = None
+                if resume and not self.is_sftp:
+                    remote = self._remote_size(name)
+                    pos = f.tell()
+                    local = f.seek(0, 2)
+                    f.seek(pos)
+                    if remote and remote < local:
+                        rest = remote
+                        f.seek(remote)
+                try:
+                    if self.is_sftp:
+                        self.run_command(self._ftp.putfo, remotepath=name, flo=f,
+                                         file_size=bs, callback=None)
+                    else:
+                        self.run_command(self._ftp.storbinary, 'STOR ' + name,
+                                         f, bs, callback, rest)
+                    res.append((rest or 0, None))
+                except Exception as e:
+                    res.append((rest or 0, e))
+                    if (isinstance(e, (error_temp, EOFError, OSError)) and
+                            not isinstance(e, FileNotFoundError)):
+                        self.broken = True
+                        lost = e
+        finally:
+            if lost is None:
+                self.cwd(cpwd)
+        return res
+
     def retrieve(self, fold, name, file=None, debug=False):
         """
         Downloads a file.
@@ -493,6 +577,22 @@ class TransferFTP:
 
         return r
 
+    def noop(self):
+        """
+        Sends a command which does nothing to keep the connection alive,
+        the class logs in again if the connection was closed.
+
+        @return         True
+
+        .. versionadded:: 1.9
+        """
+        self._check_can_logged()
+        if self.is_sftp:
+            self.run_command(self._ftp.getcwd)
+        else:
+            self.run_command(self._ftp.voidcmd, "NOOP")
+        return True
+
     def close(self):
         """
         Closes the connection.
@@ -8,12 +8,14 @@ import os
 import warnings
 import sys
 import ftplib
+import threading
 from io import BytesIO
 from time import sleep
 from random import random
 from .files_status import FilesStatus
 from ..loghelper.flog import noLOG
 from .ftp_transfer import CannotCompleteWithoutNewLoginException
+from .ftp_transfer_pool import TransferFTPPool
 
 
 class FolderTransferFTPException(Exception):
@@ -24,6 +26,29 @@ class FolderTransferFTPException(Exception):
     pass
 
 
+def _transfer_exception_reason(e):
+    """
+    Returns a short description of an exception raised
+    while transferring a file, None if the exception is not
+    expected and must be raised again.
+    """
+    if isinstance(e, FileNotFoundError):
+        return "not found"
+    if isinstance(e, (ftplib.error_perm, ftplib.error_temp)):
+        return str(e)
+    for cl in (TimeoutError, EOFError, ConnectionAbortedError,
+               ConnectionResetError, CannotCompleteWithoutNewLoginException):
+        if isinstance(e, cl):
+            return cl.__name__
+    try:
+        import paramiko
+    except ImportError:
+        return None
+    if isinstance(e, paramiko.sftp.SFTPError):
+        return "ConnectionResetError"
+    return None
+
+
 _text_extensions = {".ipynb", ".html", ".py", ".cpp", ".h", ".hpp", ".c",
                     ".cs", ".txt", ".csv", ".xml", ".css", ".js", ".r", ".doc",
                     ".ind", ".buildinfo", ".rst", ".aux", ".out", ".log",
@@ -115,7 +140,8 @@ class FolderTransferFTP:
         """
         @param      file_tree_node      @see cl FileTreeNode
         @param      ftp_transfer        @see cl TransferFTP
-        @param      file_status         file keeping the status for each file (date, hash of the content for the last upload)
+        @param      file_status         file keeping the status for each file (date, hash of the content for the last upload),
+                                        or an instance of @see cl FilesStatus to use another storage
         @param      root_local          local root
         @param      root_web            remote root on the website
         @param      footer_html         append  this HTML code to any uploaded page (such a javascript code to count the audience)
@@ -161,7 +187,10 @@ class FolderTransferFTP:
             self._filter_out = (lambda f: False) if filter_out is None else (
                 lambda f: self._filter_out_reg.search(f) is not None)
 
-        self._ft = FilesStatus(file_status)
+        if isinstance(file_status, FilesStatus):
+            self._ft = file_status
+        else:
+            self._ft = FilesStatus(file_status)
         self._text_transform = text_transform
 
     def __str__(self):
@@ -286,12 +315,211 @@ class FolderTransferFTP:
         else:
             stream.close()
 
-    def start_transfering(self, max_errors=20, delay=None):
+    def _remote_folder(self, file):
+        """
+        Returns the remote folder a file goes to.
+        """
+        relp = os.path.relpath(file.fullname, self._root_local)
+        if ".." in relp:
+            raise ValueError("the local root is not accurate:\n{0}\nFILE:\n{1}\nRELPATH:\n{2}".format(
+                self, file.fullname, relp))
+        path = self._root_web + "/" + os.path.split(relp)[0]
+        return path.replace("\\", "/")
+
+    def _raise_too_many_issues(self, issues):
+        raise FolderTransferFTPException("Too many issues:\n{0}".format(
+            "\n".join("{0} -- {1} --- {2}".format(a, b,
+                                                  str(c).replace('\n', ' ')) for a, b, c in issues)))
+
+    def _partial_file(self, resume_file):
+        if resume_file is not None:
+            return resume_file
+        name = self._ft._file
+        return None if name is None else name + ".partial"
+
+    @staticmethod
+    def _load_partial(resume_file):
+        """
+        Loads the list of big files being transferred,
+        a dictionary *{ filename: (size, mtime_ns) }*.
+        """
+        if resume_file is None or not os.path.exists(resume_file):
+            return {}
+        res = {}
+        with open(resume_file, "r", encoding="utf8") as f:
+            for line in f:
+                spl = line.rstrip("\r\n").split("\t")
+                if len(spl) == 3:
+                    res[spl[0]] = (int(spl[1]), int(spl[2]))
+        return res
+
+    @staticmethod
+    def _save_partial(resume_file, partial):
+        if resume_file is None:
+            return
+        if len(partial) == 0:
+            if os.path.exists(resume_file):
+                os.remove(resume_file)
+            return
+        with open(resume_file, "w", encoding="utf8") as f:
+            for k, (size, mtime) in sorted(partial.items()):
+                f.write("{0}\t{1}\t{2}\n".format(k, size, mtime))
+
+    def _start_transfering_parallel(self, total, max_errors, delay, workers,
+                                    ftp_factory, batch_size, resume_size,
+                                    resume_file):
+        """
+        Implements @see me start_transfering when *workers* is not None.
+        Files are grouped by remote folder, every batch is transferred
+        by one session (method *transfer_files* of @see cl TransferFTP),
+        the status is saved after every batch. Big files are recorded
+        in a second file before being transferred, a file still
+        recorded in this file the next time with the same size and
+        the same modification time is resumed.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        if isinstance(self._ftp, TransferFTPPool):
+            pool = self._ftp
+            own_pool = False
+        else:
+            if ftp_factory is None and workers > 1:
+                raise ValueError(
+                    "ftp_factory cannot be None if workers > 1")
+            pool = TransferFTPPool(ftp_factory, size=workers, fLOG=self.fLOG)
+            pool.add(self._ftp)
+            own_pool = True
+
+        # batches of files going to the same folder
+        folders = {}
+        for file in total:
+            folders.setdefault(self._remote_folder(file), []).append(file)
+        batches = []
+        for path in sorted(folders):
+            files = folders[path]
+            for i in range(0, len(files), batch_size):
+                batches.append((path, files[i:i + batch_size]))
+
+        resume_file = self._partial_file(resume_file)
+        partial = FolderTransferFTP._load_partial(resume_file)
+        lock = threading.Lock()
+        issues = []
+        done = []
+
+        def transfer_batch(path, files):
+            "transfers a batch, returns the number of bytes"
+            streams = []
+            batch_issues = []
+            for file in files:
+                try:
+                    data, size = self.preprocess_before_transfering(
+                        file.fullname, force_allow=self._force_allow)
+                except FolderTransferFTPException as ex:
+                    if self._exc:
+                        raise
+                    stex = "\n    ".join(str(ex).split("\n"))
+                    warnings.warn(
+                        "Unable to transfer '{0}' due to [{1}].".format(file.fullname, stex), ResourceWarning)
+                    batch_issues.append(
+                        (file.fullname, "FolderTransferFTPException", ex))
+                    continue
+                resume = False
+                if size >= resume_size and not isinstance(data, BytesIO):
+                    st = os.stat(file.fullname)
+                    key = (st.st_size, st.st_mtime_ns)
+                    with lock:
+                        resume = partial.get(file.fullname, None) == key
+                        if not resume:
+                            partial[file.fullname] = key
+                            FolderTransferFTP._save_partial(
+                                resume_file, partial)
+                streams.append((file, data, size, resume))
+
+            self.fLOG("[FolderTransferFTP] upload %d files to '%s'" % (
+                len(streams), path))
+            try:
+                with pool.connection() as ftp:
+                    res = ftp.transfer_files(
+                        [(data, os.path.split(file.fullname)[-1], resume)
+                         for file, data, size, resume in streams], path)
+            except Exception as e:
+                if self._exc or _transfer_exception_reason(e) is None:
+                    raise
+                res = [(0, e) for _ in streams]
+            finally:
+                for _, data, __, ___ in streams:
+                    self.close_stream(data)
+
+            nbytes = 0
+            with lock:
+                for (file, _, size, __), (offset, e) in zip(streams, res):
+                    if e is None:
+                        done.append(self._ft.update_copied_file(file.fullname))
+                        partial.pop(file.fullname, None)
+                        nbytes += size - offset
+                        continue
+                    if self._exc:
+                        raise e
+                    reason = _transfer_exception_reason(e)
+                    if reason is None:
+                        raise e
+                    batch_issues.append((file.fullname, reason, e))
+                    self.fLOG("[FolderTransferFTP] - issue", e)
+                self._ft.save_dates()
+                FolderTransferFTP._save_partial(resume_file, partial)
+                issues.extend(batch_issues)
+            return nbytes
+
+        self.fLOG("#### transfering %d files in %d batches with %d sessions" % (
+            len(total), len(batches), workers))
+        sum_bytes = 0
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = []
+                for path, files in batches:
+                    futures.append(executor.submit(transfer_batch, path, files))
+                    if delay is not None and delay > 0:
+                        h = random()
+                        sleep(delay + (h - 0.5) * delay * 0.1)
+                try:
+                    for i, fut in enumerate(as_completed(futures)):
+                        sum_bytes += fut.result()
+                        self.fLOG("#### transfered %d/%d batches (so far %d bytes)" % (
+                            i + 1, len(batches), sum_bytes))
+                        if len(issues) >= max_errors:
+                            self._raise_too_many_issues(issues)
+                except BaseException:
+                    for fut in futures:
+                        fut.cancel()
+                    raise
+        finally:
+            if own_pool:
+                pool.close(keep=self._ftp)
+        return done
+
+    def start_transfering(self, max_errors=20, delay=None, workers=None,
+                          ftp_factory=None, batch_size=100, resume_size=2 ** 24,
+                          resume_file=None):
         """
         Starts transfering files to a remote :epkg:`FTP` website.
 
         :param max_errors: stops after this number of errors
         :param delay: delay between two files
+            (between two batches if *workers* is not None)
+        :param workers: None to transfer files one by one, otherwise
+            the number of :epkg:`FTP` or :epkg:`SFTP` sessions transferring
+            files at the same time, files are grouped by remote folder
+            into batches, a session enters a folder once per batch,
+            the status is saved after every batch
+        :param ftp_factory: function creating a new session
+            (@see cl TransferFTP), needed if *workers* > 1 unless
+            *ftp_transfer* is a @see cl TransferFTPPool
+        :param batch_size: maximum number of files in a batch
+        :param resume_size: if *workers* is not None, a file bigger than this size
+            whose transfer was interrupted is resumed (command ``REST``),
+            it is uploaded again if the file was modified
+        :param resume_file: file keeping the list of big files being transferred,
+            ``<file_status>.partial`` by default
         :return: list of transferred @see cl FileInfo
         :raises FolderTransferFTPException: the class raises
             an exception (@see cl FolderTransferFTPException)
@@ -299,21 +527,25 @@ class FolderTransferFTP:
 
         .. versionchanged:: 1.8
             Parameter *delay* was added.
+
+        .. versionchanged:: 1.9
+            Parameters *workers*, *ftp_factory*, *batch_size*, *resume_size*,
+            *resume_file* were added.
         """
+        total = list(self.iter_eligible_files())
+        if workers is not None:
+            return self._start_transfering_parallel(
+                total, max_errors, delay, workers, ftp_factory, batch_size,
+                resume_size, resume_file)
+
         issues = []
         done = []
-        total = list(self.iter_eligible_files())
         sum_bytes = 0
         for i, file in enumerate(total):
             if i % 20 == 0:
                 self.fLOG("#### transfering %d/%d (so far %d bytes)" %
                           (i, len(total), sum_bytes))
-            relp = os.path.relpath(file.fullname, self._root_local)
-            if ".." in relp:
-                raise ValueError("the local root is not accurate:\n{0}\nFILE:\n{1}\nRELPATH:\n{2}".format(
-                    self, file.fullname, relp))
-            path = self._root_web + "/" + os.path.split(relp)[0]
-            path = path.replace("\\", "/")
+            path = self._remote_folder(file)
 
             size = os.stat(file.fullname).st_size
             self.fLOG("[upload % 8d bytes name=%s -- fullname=%s -- to=%s]" % (
@@ -363,49 +595,13 @@ class FolderTransferFTP:
                 try:
                     r = self._ftp.transfer(
                         data, path, os.path.split(file.fullname)[-1], blocksize=blocksize, callback=cb)
-                except FileNotFoundError as e:
+                except Exception as e:
+                    reason = _transfer_exception_reason(e)
+                    if reason is None:
+                        raise e
                     r = False
-                    issues.append((file.fullname, "not found", e))
+                    issues.append((file.fullname, reason, e))
                     self.fLOG("[FolderTransferFTP] - issue", e)
-                except ftplib.error_perm as ee:
-                    r = False
-                    issues.append((file.fullname, str(ee), ee))
-                    self.fLOG("[FolderTransferFTP] - issue", ee)
-                except TimeoutError as eee:
-                    r = False
-                    issues.append((file.fullname, "TimeoutError", eee))
-                    self.fLOG("[FolderTransferFTP] - issue", eee)
-                except EOFError as eeee:
-                    r = False
-                    issues.append((file.fullname, "EOFError", eeee))
-                    self.fLOG("[FolderTransferFTP] - issue", eeee)
-                except ConnectionAbortedError as eeeee:
-                    r = False
-                    issues.append(
-                        (file.fullname, "ConnectionAbortedError", eeeee))
-                    self.fLOG("    issue", eeeee)
-                except ConnectionResetError as eeeeee:
-                    r = False
-                    issues.append(
-                        (file.fullname, "ConnectionResetError", eeeeee))
-                    self.fLOG("[FolderTransferFTP] - issue", eeeeee)
-                except CannotCompleteWithoutNewLoginException as e8:
-                    r = False
-                    issues.append(
-                        (file.fullname, "CannotCompleteWithoutNewLoginException", e8))
-                    self.fLOG("[FolderTransferFTP] - issue", e8)
-                except Exception as e7:
-                    try:
-                        import paramiko
-                    except ImportError:
-                        raise e7
-                    if isinstance(e7, paramiko.sftp.SFTPError):
-                        r = False
-                        issues.append(
-                            (file.fullname, "ConnectionResetError", e7))
-                        self.fLOG("[FolderTransferFTP] - issue", e7)
-                    else:
-                        raise e7
 
             self.close_stream(data)
 
@@ -416,9 +612,7 @@ class FolderTransferFTP:
                 done.append(fi)
 
             if len(issues) >= max_errors:
-                raise FolderTransferFTPException("Too many issues:\n{0}".format(
-                    "\n".join("{0} -- {1} --- {2}".format(a, b,
-                                                          str(c).replace('\n', ' ')) for a, b, c in issues)))
+                self._raise_too_many_issues(issues)
 
             if delay is not None and delay > 0:
                 h = random()
@@ -22,6 +22,10 @@ class MockTransferFTP (TransferFTP):
         self.LOG = fLOG
         self._atts = dict(site=site, login=login, password=password)
         self.ftps = ftps
+        # files stored by transfer_files, bytes sent by transfer_files
+        self.store = {}
+        self.sent = 0
+        self.broken = False
 
     def transfer(self, file, to, name, debug=False, blocksize=None, callback=None):
         """
@@ -29,6 +33,28 @@ class MockTransferFTP (TransferFTP):
         """
         return True
 
+    def transfer_files(self, files, to, blocksize=None, callback=None):
+        """
+        stores the files in attribute *store*, resumes a transfer
+        as method *transfer_files* of @see cl TransferFTP
+        """
+        res = []
+        for f, name, resume in files:
+            key = to.rstrip("/") + "/" + name
+            rest = 0
+            if resume and key in self.store:
+                pos = f.tell()
+                local = f.seek(0, 2)
+                f.seek(pos)
+                if 0 < len(self.store[key]) < local:
+                    rest = len(self.store[key])
+                    f.seek(rest)
+            data = f.read()
+            self.store[key] = (self.store[key][:rest] if rest else b"") + data
+            self.sent += len(data)
+            res.append((rest, None))
+        return res
+
     def close(self):
         """
         does noting
@@ -0,0 +1,192 @@
+"""
+@file
+@brief Pool of @see cl TransferFTP connections.
+"""
+import time
+import threading
+from contextlib import contextmanager
+from ..loghelper.flog import noLOG
+
+
+class TransferFTPPool:
+    """
+    Keeps up to *size* connections (usually @see cl TransferFTP),
+    a thread borrows one with @see me connection and gives it back
+    when it is done. Connections are created when they are needed.
+    If *keepalive* is specified, a thread sends a command
+    (method *noop*) on every connection unused for *keepalive* seconds,
+    a connection failing to answer is closed and replaced
+    by a new one the next time it is needed.
+
+    .. exref::
+        :title: Transfer files with several FTP connections
+
+        ::
+
+            from pyquickhelper.filehelper import TransferFTP
+            from pyquickhelper.filehelper.ftp_transfer_pool import TransferFTPPool
+
+            pool = TransferFTPPool(
+                lambda: TransferFTP("ftp.website.fr", "login", "password"),
+                size=4, keepalive=60)
+            with pool.connection() as ftp:
+                ftp.transfer("file.txt", "/www/folder", "file.txt")
+            pool.close()
+    """
+
+    def __init__(self, factory, size=4, keepalive=None, fLOG=noLOG):
+        """
+        @param      factory     function creating a new connection
+        @param      size        maximum number of connections
+        @param      keepalive   None or a delay in seconds
+        @param      fLOG        logging function
+        """
+        if size < 1:
+            raise ValueError("size must be >= 1 not {0}".format(size))
+        self.factory = factory
+        self.size = size
+        self.keepalive = keepalive
+        self.fLOG = fLOG
+        # list of (last time used, connection), the last one is the most recent
+        self._idle = []
+        self._nb = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        """
+        Returns the number of opened connections.
+        """
+        return self._nb
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()[1]
+                if self._nb < self.size:
+                    self._nb += 1
+                    break
+                self._cond.wait()
+        try:
+            conn = self.factory()
+        except Exception:
+            with self._cond:
+                self._nb -= 1
+                self._cond.notify()
+            raise
+        self._start_keepalive()
+        return conn
+
+    def _release(self, conn):
+        with self._cond:
+            self._idle.append((time.perf_counter(), conn))
+            self._cond.notify()
+
+    def _discard(self, conn):
+        with self._cond:
+            self._nb -= 1
+            self._cond.notify()
+        try:
+            conn.close()
+        except Exception as e:  # pragma: no cover
+            self.fLOG("[TransferFTPPool] unable to close a connection", e)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection, it waits if all of them are used.
+        The connection goes back to the pool if the block succeeds,
+        it is closed and removed from the pool if an exception is raised
+        as it may be left in an unknown state or if its attribute
+        *broken* is True (see method *transfer_files* of @see cl TransferFTP).
+
+        ::
+
+            with pool.connection() as ftp:
+                ftp.transfer(...)
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            self._discard(conn)
+            raise
+        if getattr(conn, "broken", False):
+            self._discard(conn)
+        else:
+            self._release(conn)
+
+    def add(self, conn):
+        """
+        Adds an existing connection to the pool.
+        """
+        with self._cond:
+            if self._nb >= self.size:
+                raise ValueError("the pool is full")
+            self._nb += 1
+            self._idle.append((time.perf_counter(), conn))
+            self._cond.notify()
+        self._start_keepalive()
+
+    def _start_keepalive(self):
+        if self.keepalive is None or self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._keepalive_loop, daemon=True)
+            self._thread.start()
+
+    def _keepalive_loop(self):
+        while not self._stop.wait(self.keepalive / 2):
+            self.ping(self.keepalive)
+
+    def ping(self, delay=0):
+        """
+        Sends a command to every connection unused
+        for *delay* seconds, closes the ones which fail.
+
+        @param      delay       delay in seconds
+        @return                 number of closed connections
+        """
+        limit = time.perf_counter() - delay
+        with self._cond:
+            old = [c for c in self._idle if c[0] <= limit]
+            self._idle = [c for c in self._idle if c[0] > limit]
+        nb = 0
+        for _, conn in old:
+            try:
+                conn.noop()
+            except Exception as e:
+                self.fLOG("[TransferFTPPool] connection lost", e)
+                self._discard(conn)
+                nb += 1
+                continue
+            self._release(conn)
+        return nb
+
+    def close(self, keep=None):
+        """
+        Stops the keepalive thread and closes the unused connections.
+
+        @param      keep        connection to leave opened
+                                (it is still removed from the pool)
+        """
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+        with self._cond:
+            idle = self._idle
+            self._idle = []
+        for _, conn in idle:
+            if conn is keep:
+                with self._cond:
+                    self._nb -= 1
+                continue
+            self._discard(conn)
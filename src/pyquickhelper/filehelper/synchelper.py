@@ -6,10 +6,14 @@
 import os
 import re
 import fnmatch
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
 from ..loghelper.flog import fLOG
 from .file_tree_node import FileTreeNode
-from .files_status import FilesStatus, checksum_md5
+from .file_scan_index import FileScanIndex
+from .files_status import FilesStatus
+from .file_hash import FileHasher
 from ..loghelper.pqh_exception import PQHException
 
 
@@ -188,7 +192,8 @@ def synchronize_folder(p1: str, p2: str, hash_size=1024 ** 2, repo1=False, repo2
                        filter_copy: [str, Callable[[str], str], None] = None,
                        avoid_copy=False, operations=None, file_date: str = None,
                        log1=False, copy_1to2=False, create_dest=False,
-                       fLOG=fLOG):
+                       scan_index1=None, scan_index2=None, workers=None,
+                       hash_algo="md5", fLOG=fLOG):
     """
     Synchronizes two folders (or copy if the second is empty),
     it only copies more recent files.
@@ -219,10 +224,22 @@ def synchronize_folder(p1: str, p2: str, hash_size=1024 ** 2, repo1=False, repo2
         which should be copied but does not do the copy
     :param operations: if None, this function is called the following way ``operations(op, n1, n2)``
         if should return True if the file was updated
-    :param file_date: (str) filename which contains information about when the last sync was done
+    :param file_date: (str) filename which contains information about when the last sync was done,
+        or an instance of @see cl FilesStatus to use another storage
     :param log1: @see cl FileTreeNode
     :param copy_1to2: (bool) only copy files from *p1* to *p2*
     :param create_dest: (bool) create destination directory if not exist
+    :param scan_index1: (str) filename or @see cl FileScanIndex, index
+        storing the scan of the first folder, the next scan only lists
+        the folders modified since the previous one
+    :param scan_index2: (str) same as *scan_index1* for the second folder
+    :param workers: (int) None or a number of threads, if > 1, files are compared,
+        hashed and copied in parallel, the status file is still saved every 50 copied files
+        and only contains the files already copied
+    :param hash_algo: (str) algorithm used to compare files
+        (see @see fn get_hash_constructor), every file is hashed
+        at most once, big files are first compared with a signature
+        (see @see cl FileHasher)
     :param fLOG: logging function
     :return: list of operations done by the function,
         list of 3-uple: action, source_file, dest_file
@@ -258,6 +275,9 @@ def synchronize_folder(p1: str, p2: str, hash_size=1024 ** 2, repo1=False, repo2
 
     .. versionchanged:: 1.7
         Parameter *create_dest* was added.
+
+    .. versionchanged:: 1.9
+        Parameters *scan_index1*, *scan_index2*, *workers*, *hash_algo* were added.
     """
 
     fLOG("[synchronize_folder] from '{0}'".format(p1))
@@ -267,7 +287,13 @@ def synchronize_folder(p1: str, p2: str, hash_size=1024 ** 2, repo1=False, repo2
         fLOG("[synchronize_folder] md   '{0}'".format(p2))
         os.makedirs(p2)
 
-    if file_date is not None and not os.path.exists(file_date):
+    if isinstance(file_date, FilesStatus):
+        status_given = file_date
+        file_date = file_date.fileKeep
+    else:
+        status_given = None
+
+    if status_given is None and file_date is not None and not os.path.exists(file_date):
         with open(file_date, "w", encoding="utf8") as f:
             f.write("")
 
@@ -304,128 +330,174 @@ def synchronize_folder(p1: str, p2: str, hash_size=1024 ** 2, repo1=False, repo2
 
         filter_copy = regtrue2
 
+    if isinstance(scan_index1, str):
+        scan_index1 = FileScanIndex(scan_index1, fLOG=fLOG)
+    if isinstance(scan_index2, str):
+        scan_index2 = FileScanIndex(scan_index2, fLOG=fLOG)
+
     f1 = p1
     f2 = p2
 
     fLOG("[synchronize_folder]   exploring f1='{0}'".format(f1))
     node1 = FileTreeNode(
-        f1, filter=pr_filter, repository=repo1, log=True, log1=log1)
+        f1, filter=pr_filter, repository=repo1, log=True, log1=log1,
+        scan_index=scan_index1)
     fLOG("[synchronize_folder]   number of found files (p1)",
          len(node1), node1.max_date())
     if file_date is not None:
         log1n = 1000 if log1 else None
-        status = FilesStatus(file_date, fLOG=fLOG)
-        res = list(status.difference(node1, u4=True, nlog=log1n))
+        status = FilesStatus(
+            file_date, fLOG=fLOG, hasher=FileHasher(hash_algo)) if status_given is None else status_given
+        res = list(status.difference(
+            node1, u4=True, nlog=log1n, workers=workers))
     else:
         fLOG("[synchronize_folder]   exploring f2='{0}'".format(f2))
         node2 = FileTreeNode(
-            f2, filter=pr_filter, repository=repo2, log=True, log1=log1)
+            f2, filter=pr_filter, repository=repo2, log=True, log1=log1,
+            scan_index=scan_index2)
         fLOG("[synchronize_folder]     number of found files (p2)",
              len(node2), node2.max_date())
-        res = node1.difference(node2, hash_size=hash_size)
+        res = node1.difference(node2, hash_size=hash_size, workers=workers,
+                               hasher=FileHasher(hash_algo))
         status = None
 
     action = []
     modif = 0
     report = {">": 0, ">+": 0, "<": 0, "<+": 0, "<=": 0, ">-": 0, "issue": 0}
 
+    executor = None
+    if workers is not None and workers > 1 and not avoid_copy:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+
+    def copy_file(n1):
+        "copies a file, runs in a thread if *workers* > 1"
+        n1.copy_to(f2, copy_1to2)
+        return None if status is None else status.get_file_info(n1.fullname)
+
+    def copied(n1, op, file, nbcur, info=None):
+        "updates the status once a file was copied"
+        nonlocal modif
+        if status is not None:
+            status.update_copied_file(n1.fullname, info=info)
+            modif += 1
+            report[op] += 1
+            if modif % 50 == 0:
+                fLOG(
+                    "[synchronize_folder] Processed {0}/{1} (current: '{2}')".format(nbcur, len(res), file))
+                status.save_dates()
+
+    def drain(size):
+        "waits for the oldest copies, the status is updated in the submission order"
+        while len(pending) > size or (len(pending) > 0 and pending[0][0].done()):
+            fut, args = pending.popleft()
+            copied(*args, info=fut.result())
+
     fLOG("[synchronize_folder] Starting synchronisation.")
     nbcur = 0
     nbprint = 0
-    for op, file, n1, n2 in res:
-        nbcur += 1
-        if (nbprint <= 50 or nbcur % 50 == 0) and \
-                op not in ("==", '<', '<=', '<+') and \
-                (n1 is None or not n1.isdir()):
-            fLOG(
-                "[synchronize_folder] ... {0}/{1} (current: '{2}' :: {3})".format(nbcur, len(res), file, op))
-            nbprint += 1
-        if filter_copy is not None and not filter_copy(file):
-            continue
-
-        if operations is not None:
-            r = operations(op, n1, n2)
-            if r and status is not None:
-                status.update_copied_file(n1.fullname)
-                modif += 1
-                report[op] += 1
-                if modif % 50 == 0:
-                    fLOG(
-                        "[synchronize_folder] Processed {0}/{1} (current: '{2}')".format(nbcur, len(res), file))
-                    status.save_dates()
-        else:
-
-            if op in [">", ">+"]:
-                if not n1.isdir():
-                    if file_date is not None or not size_different or n2 is None or n1._size != n2._size:
-                        if not avoid_copy:
-                            n1.copy_to(f2, copy_1to2)
-                        action.append((">+", n1, f2))
-                        if status is not None:
-                            status.update_copied_file(n1.fullname)
-                            modif += 1
-                            report[op] += 1
-                            if modif % 50 == 0:
-                                fLOG(
-                                    "[synchronize_folder] Processed {0}/{1} (current: '{2}')".format(nbcur, len(res), file))
-                                status.save_dates()
-                    else:
-                        pass
-
-            elif op in ["<+"]:
-                if not copy_1to2:
-                    if n2 is None:
-                        if not no_deletion:
-                            # this case happens when it does not know sideB (sideA is stored in a file)
-                            # it needs to remove file, file refers to this side
-                            filerel = os.path.relpath(file, start=p1)
-                            filerem = os.path.join(p2, filerel)
-                            try:
-                                ft = FileTreeNode(p2, filerel)
-                            except PQHException:
-                                ft = None  # probably already removed
-
-                            if ft is not None:
-                                action.append((">-", None, ft))
+    try:
+        for op, file, n1, n2 in res:
+            nbcur += 1
+            if (nbprint <= 50 or nbcur % 50 == 0) and \
+                    op not in ("==", '<', '<=', '<+') and \
+                    (n1 is None or not n1.isdir()):
+                fLOG(
+                    "[synchronize_folder] ... {0}/{1} (current: '{2}' :: {3})".format(nbcur, len(res), file, op))
+                nbprint += 1
+            if filter_copy is not None and not filter_copy(file):
+                continue
+
+            if operations is not None:
+                r = operations(op, n1, n2)
+                if r and status is not None:
+                    status.update_copied_file(n1.fullname)
+                    modif += 1
+                    report[op] += 1
+                    if modif % 50 == 0:
+                        fLOG(
+                            "[synchronize_folder] Processed {0}/{1} (current: '{2}')".format(nbcur, len(res), file))
+                        status.save_dates()
+            else:
+
+                if op in [">", ">+"]:
+                    if not n1.isdir():
+                        if file_date is not None or not size_different or n2 is None or n1._size != n2._size:
+                            if executor is not None:
+                                pending.append((executor.submit(copy_file, n1),
+                                                (n1, op, file, nbcur)))
+                                action.append((">+", n1, f2))
+                                drain(workers * 4)
+                            else:
                                 if not avoid_copy:
+                                    n1.copy_to(f2, copy_1to2)
+                                action.append((">+", n1, f2))
+                                copied(n1, op, file, nbcur)
+                        else:
+                            pass
+
+                elif op in ["<+"]:
+                    if not copy_1to2:
+                        if n2 is None:
+                            if not no_deletion:
+                                # this case happens when it does not know sideB (sideA is stored in a file)
+                                # it needs to remove file, file refers to this side
+                                filerel = os.path.relpath(file, start=p1)
+                                filerem = os.path.join(p2, filerel)
+                                try:
+                                    ft = FileTreeNode(p2, filerel)
+                                except PQHException:
+                                    ft = None  # probably already removed
+
+                                if ft is not None:
+                                    action.append((">-", None, ft))
+                                    if not avoid_copy:
+                                        fLOG(
+                                            "[synchronize_folder] - remove ", filerem)
+                                        os.remove(filerem)
+                                    if status is not None:
+                                        status.update_copied_file(
+                                            file, delete=True)
+                                        modif += 1
+                                        report[op] += 1
+                                        if modif % 50 == 0:
+                                            fLOG(
+                                                "[synchronize_folder] Processed {0}/{1} (current: '{2}')".format(nbcur, len(res), file))
+                                            status.save_dates()
+                                else:
                                     fLOG(
-                                        "[synchronize_folder] - remove ", filerem)
-                                    os.remove(filerem)
+                                        "[synchronize_folder] - skip (probably already removed) ", filerem)
+                        else:
+                            if not n2.isdir() and not no_deletion:
+                                if not avoid_copy:
+                                    n2.remove()
+                                action.append((">-", None, n2))
                                 if status is not None:
                                     status.update_copied_file(
-                                        file, delete=True)
+                                        n1.fullname, delete=True)
                                     modif += 1
-                                    report[op] += 1
+                                    report[">-"] += 1
                                     if modif % 50 == 0:
                                         fLOG(
                                             "[synchronize_folder] Processed {0}/{1} (current: '{2}')".format(nbcur, len(res), file))
                                         status.save_dates()
-                            else:
-                                fLOG(
-                                    "[synchronize_folder] - skip (probably already removed) ", filerem)
-                    else:
-                        if not n2.isdir() and not no_deletion:
-                            if not avoid_copy:
-                                n2.remove()
-                            action.append((">-", None, n2))
-                            if status is not None:
-                                status.update_copied_file(
-                                    n1.fullname, delete=True)
-                                modif += 1
-                                report[">-"] += 1
-                                if modif % 50 == 0:
-                                    fLOG(
-                                        "[synchronize_folder] Processed {0}/{1} (current: '{2}')".format(nbcur, len(res), file))
-                                    status.save_dates()
-            elif n2 is not None and n1._size != n2._size and not n1.isdir():
-                fLOG("[synchronize_folder] problem: size are different for file %s (%d != %d) dates (%s,%s) (op %s)" % (
-                    file, n1._size, n2._size, n1._date, n2._date, op))
-                report["issue"] += 1
-                # n1.copy_to(f2)
-                # raise Exception ("size are different for file %s (%d != %d) (op %s)" % (file, n1._size, n2._size, op))
+                elif n2 is not None and n1._size != n2._size and not n1.isdir():
+                    fLOG("[synchronize_folder] problem: size are different for file %s (%d != %d) dates (%s,%s) (op %s)" % (
+                        file, n1._size, n2._size, n1._date, n2._date, op))
+                    report["issue"] += 1
+                    # n1.copy_to(f2)
+                    # raise Exception ("size are different for file %s (%d != %d) (op %s)" % (file, n1._size, n2._size, op))
+        drain(0)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
 
     if status is not None:
-        status.save_dates(file_date)
+        status.save_dates()
+    if scan_index1 is not None and scan_index1.filename is not None:
+        scan_index1.save()
+    if scan_index2 is not None and scan_index2.filename is not None:
+        scan_index2.save()
 
     report = [(k, v) for k, v in sorted(report.items()) if v > 0]
     if len(report):
@@ -485,13 +557,14 @@ def remove_folder(top, remove_also_top=True, raise_exception=True):
     return res
 
 
-def has_been_updated(source, dest):
+def has_been_updated(source, dest, hasher=None):
     """
     It assumes *dest* is a copy of *source*, it wants to know
     if the copy is up to date or not.
 
     @param      source      filename
     @param      dest        copy
+    @param      hasher      @see cl FileHasher, None for MD5
     @return                 True,reason or False,None
     """
     if not os.path.exists(dest):
@@ -507,10 +580,9 @@ def has_been_updated(source, dest):
     if d1 > d2:
         return True, "date"
 
-    c1 = checksum_md5(source)
-    c2 = checksum_md5(dest)
-
-    if c1 != c2:
+    if hasher is None:
+        hasher = FileHasher(memo=False)
+    if not hasher.same_content(source, dest, st1, st2):
         return True, "md5"
 
     return False, None
@@ -3,10 +3,10 @@
 @brief API to move files
 """
 import json
-import hashlib
 from io import StringIO
 from ..loghelper.flog import noLOG
 from ..loghelper.convert_helper import str2datetime, datetime2str
+from .file_hash import hash_bytes
 
 
 class TransferAPI_FileInfo:
@@ -14,17 +14,20 @@ class TransferAPI_FileInfo:
     Keeps tracks of transferred files.
     """
 
-    def __init__(self, name, pieces, last_update):
+    def __init__(self, name, pieces, last_update, chunks=None):
         """
         Information about a transferred file.
 
         @param      name            name of the file
         @param      pieces          list of pieces contributing to the file
         @param      last_update     last_update
+        @param      chunks          None or list of chunk identifiers,
+                                    one per piece (see @see cl EncryptedBackup)
         """
         self.name = name
         self.pieces = pieces
         self.last_update = last_update
+        self.chunks = chunks
 
     def __str__(self):
         """
@@ -33,13 +36,17 @@ class TransferAPI_FileInfo:
         mes = "[%s,#%d,%s]" % (self.name, len(self.pieces), self.last_update)
         return mes
 
-    def add_piece(self, piece):
+    def add_piece(self, piece, chunk=None):
         """
         Adds a piece.
 
         @param      piece       add piece
+        @param      chunk       chunk identifier if the file
+                                keeps track of chunks
         """
         self.pieces.append(piece)
+        if self.chunks is not None:
+            self.chunks.append(chunk)
 
     @staticmethod
     def read_json(s):
@@ -56,6 +63,8 @@ class TransferAPI_FileInfo:
         Serializes this class info JSON.
         """
         li = [self.name, self.pieces, datetime2str(self.last_update)]
+        if self.chunks is not None:
+            li.append(self.chunks)
         return json.dumps(li)
 
 
@@ -64,11 +73,14 @@ class TransferAPI:
     Defines an API to transfer files over a remote location.
     """
 
-    def __init__(self, fLOG=noLOG):
+    def __init__(self, fLOG=noLOG, hash_algo="md5"):
         """
         @param      fLOG        logging function
+        @param      hash_algo   algorithm used to name the remote files
+                                (see @see fn get_hash_constructor)
         """
         self.fLOG = fLOG if fLOG else noLOG
+        self.hash_algo = hash_algo
 
     def transfer(self, path, data):
         """
@@ -91,6 +103,72 @@ class TransferAPI:
         """
         raise NotImplementedError()
 
+    def _map(self, fct, args, workers):
+        if workers is None or workers <= 1:
+            return [fct(*a) for a in args]
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda a: fct(*a), args))
+
+    def transfer_many(self, items, workers=None):
+        """
+        Transfers many files, the calls to @see me transfer
+        happen in parallel if *workers* is greater than 1,
+        the API must then accept concurrent calls.
+
+        @param      items       iterable on *(path, data)*
+        @param      workers     None or number of threads
+        @return                 list of booleans
+
+        .. versionadded:: 1.9
+        """
+        return self._map(self.transfer, list(items), workers)
+
+    def retrieve_many(self, paths, exc=True, workers=None):
+        """
+        Retrieves many files, see @see me transfer_many.
+
+        @param      paths       iterable on paths
+        @param      exc         keep exception
+        @param      workers     None or number of threads
+        @return                 list of data
+
+        .. versionadded:: 1.9
+        """
+        return self._map(self.retrieve, [(p, exc) for p in paths], workers)
+
+    def transfer_file(self, path, filename):
+        """
+        Transfers a local file to path.
+
+        @param      path        path to remove location
+        @param      filename    local file
+        @return                 boolean
+
+        .. versionadded:: 1.9
+        """
+        with open(filename, "rb") as f:
+            return self.transfer(path, f.read())
+
+    def retrieve_file(self, path, filename, exc=True):
+        """
+        Retrieves data from path and stores it into a local file.
+
+        @param      path        remove location
+        @param      filename    local file
+        @param      exc         keep exception
+        @return                 boolean, False if the file does not exist
+                                and *exc* is False
+
+        .. versionadded:: 1.9
+        """
+        data = self.retrieve(path, exc=exc)
+        if data is None:
+            return False
+        with open(filename, "wb") as f:
+            f.write(data)
+        return True
+
     def retrieve_mapping(self, decrypt):
         """
         Returns the mapping.
@@ -156,9 +234,16 @@ class TransferAPI:
         @param      data            some data
         @return                     string
         """
-        zero = hashlib.md5()
-        zero.update(data)
-        return zero.hexdigest()
+        return hash_bytes(data, "md5")
+
+    def checksum(self, data):
+        """
+        Computes the hash of some data with algorithm *hash_algo*.
+
+        @param      data            some data
+        @return                     string
+        """
+        return hash_bytes(data, self.hash_algo)
 
     def get_remote_path(self, data, name, piece=0):
         """
@@ -171,8 +256,8 @@ class TransferAPI:
 
         *~ hash of everything*
         """
-        m1 = TransferAPI.checksum_md5(name.encode() + str(piece).encode())
-        m2 = TransferAPI.checksum_md5(data)
+        m1 = self.checksum(name.encode() + str(piece).encode())
+        m2 = self.checksum(data)
         return m1 + "_" + m2
 
 
@@ -181,11 +266,16 @@ class MockTransferAPI(TransferAPI):
     Class used for unit test purposes, simple key, value storage.
     """
 
-    def __init__(self, fLOG=noLOG):
+    def __init__(self, fLOG=noLOG, hash_algo="md5"):
         """
         @param      fLOG        logging function
+        @param      hash_algo   algorithm used to name the remote files
+                                (see @see fn get_hash_constructor)
+
+        .. versionchanged:: 1.9
+            Parameter *hash_algo* was added.
         """
-        TransferAPI.__init__(self, fLOG)
+        TransferAPI.__init__(self, fLOG, hash_algo=hash_algo)
         self._storage = {}
 
     def transfer(self, path, data):
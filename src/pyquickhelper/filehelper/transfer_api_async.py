@@ -0,0 +1,107 @@
+"""
+@file
+@brief Asynchronous version of @see cl TransferAPI.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncTransferAPI:
+    """
+    Exposes the methods of a @see cl TransferAPI as coroutines
+    (:epkg:`*py:asyncio`). The blocking calls run in a pool
+    of *max_workers* threads, the API must accept concurrent calls
+    if *max_workers* is greater than 1 (@see cl TransferAPIFtp
+    with several connections, @see cl TransferAPIFile,
+    @see cl MockTransferAPI).
+
+    .. exref::
+        :title: Transfer files with asyncio
+
+        ::
+
+            import asyncio
+            from pyquickhelper.filehelper import TransferAPIFtp
+            from pyquickhelper.filehelper.transfer_api_async import AsyncTransferAPI
+
+            async def main():
+                api = TransferAPIFtp("ftp.website.fr", "login", "password",
+                                     pool_size=4)
+                async with AsyncTransferAPI(api, max_workers=4) as aapi:
+                    await aapi.transfer_many([("a.bin", b"a"), ("b.bin", b"b")])
+                    data = await aapi.retrieve("a.bin")
+
+            asyncio.run(main())
+    """
+
+    def __init__(self, api, max_workers=4):
+        """
+        @param      api             @see cl TransferAPI
+        @param      max_workers     maximum number of concurrent calls
+        """
+        self.api = api
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """
+        Waits for the running calls and stops the threads.
+        """
+        self._executor.shutdown()
+
+    async def _run(self, fct, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fct, *args)
+
+    async def transfer(self, path, data):
+        """
+        See method *transfer* of @see cl TransferAPI.
+        """
+        return await self._run(self.api.transfer, path, data)
+
+    async def retrieve(self, path, exc=True):
+        """
+        See method *retrieve* of @see cl TransferAPI.
+        """
+        return await self._run(self.api.retrieve, path, exc)
+
+    async def transfer_file(self, path, filename):
+        """
+        See method *transfer_file* of @see cl TransferAPI.
+        """
+        return await self._run(self.api.transfer_file, path, filename)
+
+    async def retrieve_file(self, path, filename, exc=True):
+        """
+        See method *retrieve_file* of @see cl TransferAPI.
+        """
+        return await self._run(self.api.retrieve_file, path, filename, exc)
+
+    async def transfer_many(self, items):
+        """
+        Transfers many files, at most *max_workers*
+        at the same time.
+
+        @param      items       iterable on *(path, data)*
+        @return                 list of booleans
+        """
+        return await asyncio.gather(
+            *[self.transfer(path, data) for path, data in items])
+
+    async def retrieve_many(self, paths, exc=True):
+        """
+        Retrieves many files, at most *max_workers*
+        at the same time.
+
+        @param      paths       iterable on paths
+        @param      exc         keep exception
+        @return                 list of data
+        """
+        return await asyncio.gather(
+            *[self.retrieve(path, exc) for path in paths])
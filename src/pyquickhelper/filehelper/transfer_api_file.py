@@ -3,21 +3,86 @@
 @brief API to move files using FTP
 """
 import os
+import shutil
 from ..loghelper import noLOG
 from .transfer_api import TransferAPI
 
 
+def _copy_fd(fct, fin, fout, size):
+    # returns the number of copied bytes
+    done = 0
+    while done < size:
+        n = fct(fin, fout, size - done, done)
+        if n == 0:
+            break
+        done += n
+    return done
+
+
+def copy_file_fast(src, dest):
+    """
+    Copies a file, the copy happens in the kernel when possible:
+    :epkg:`*py:os:copy_file_range` (it may only create a reference
+    to the same blocks on some file systems), :epkg:`*py:os:sendfile`,
+    and :epkg:`*py:shutil:copyfileobj` if none of them is available.
+
+    @param      src     source
+    @param      dest    destination
+    @return             method used: ``'copy_file_range'``,
+                        ``'sendfile'`` or ``'copyfileobj'``
+
+    .. versionadded:: 1.9
+    """
+    methods = []
+    if hasattr(os, "copy_file_range"):
+        methods.append(("copy_file_range",
+                        lambda fi, fo, n, offset: os.copy_file_range(fi, fo, n)))
+    if hasattr(os, "sendfile"):
+        methods.append(("sendfile",
+                        lambda fi, fo, n, offset: os.sendfile(fo, fi, offset, n)))
+    with open(src, "rb") as fin:
+        with open(dest, "wb") as fout:
+            size = os.fstat(fin.fileno()).st_size
+            done = 0
+            for name, fct in methods:
+                fin.seek(0)
+                fout.seek(0)
+                fout.truncate()
+                try:
+                    done = _copy_fd(fct, fin.fileno(), fout.fileno(), size)
+                except OSError:
+                    # not supported by this file system
+                    done = 0
+                    continue
+                if done == size:
+                    return name
+                # the file is shorter than expected
+                break
+            fin.seek(done)
+            fout.seek(done)
+            fout.truncate()
+            shutil.copyfileobj(fin, fout)
+            return "copyfileobj"
+
+
 class TransferAPIFile(TransferAPI):
     """
     Defines an API to transfer files over another location.
+    Methods @see me transfer_file and @see me retrieve_file
+    copy files without reading them in python (see @see fn copy_file_fast).
     """
 
-    def __init__(self, location, fLOG=noLOG):
+    def __init__(self, location, fLOG=noLOG, hash_algo="md5"):
         """
         @param      location    location
         @param      fLOG        logging function
+        @param      hash_algo   algorithm used to name the remote files
+                                (see @see fn get_hash_constructor)
+
+        .. versionchanged:: 1.9
+            Parameter *hash_algo* was added.
         """
-        TransferAPI.__init__(self, fLOG=fLOG)
+        TransferAPI.__init__(self, fLOG=fLOG, hash_algo=hash_algo)
         self._location = location
 
     def transfer(self, path, data):
@@ -31,8 +96,8 @@ class TransferAPIFile(TransferAPI):
         """
         src = os.path.join(self._location, path)
         fol = os.path.dirname(src)
-        if not os.path.exists(fol):
-            os.makedirs(fol)
+        # several threads may create the same folder
+        os.makedirs(fol, exist_ok=True)
         with open(src, "wb") as f:
             f.write(data)
         return True
@@ -53,3 +118,39 @@ class TransferAPIFile(TransferAPI):
             raise FileNotFoundError(path)
         else:
             return None
+
+    def transfer_file(self, path, filename):
+        """
+        Copies a local file to path, see @see fn copy_file_fast.
+
+        @param      path        path to remove location
+        @param      filename    local file
+        @return                 boolean
+
+        .. versionadded:: 1.9
+        """
+        dest = os.path.join(self._location, path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        copy_file_fast(filename, dest)
+        return True
+
+    def retrieve_file(self, path, filename, exc=True):
+        """
+        Copies a file stored in path into a local file,
+        see @see fn copy_file_fast.
+
+        @param      path        remove location
+        @param      filename    local file
+        @param      exc         keep exception
+        @return                 boolean, False if the file does not exist
+                                and *exc* is False
+
+        .. versionadded:: 1.9
+        """
+        src = os.path.join(self._location, path)
+        if not os.path.exists(src):
+            if exc:
+                raise FileNotFoundError(path)
+            return False
+        copy_file_fast(src, filename)
+        return True
@@ -8,16 +8,21 @@ from ..loghelper import noLOG
 from .transfer_api import TransferAPI
 from .ftp_transfer import TransferFTP
 from .ftp_mock import MockTransferFTP
+from .ftp_transfer_pool import TransferFTPPool
 
 
 class TransferAPIFtp(TransferAPI):
     """
     Defines an API to transfer files over a remote location
-    through :epkg:`FTP`.
+    through :epkg:`FTP`. The class keeps a pool of
+    *pool_size* connections (see @see cl TransferFTPPool),
+    it can be used by several threads at the same time
+    (see @see me transfer_many).
     """
 
     def __init__(self, site, login, password, root="backup",
-                 ftps='FTP', fLOG=noLOG):
+                 ftps='FTP', fLOG=noLOG, pool_size=1, keepalive=None,
+                 hash_algo="md5"):
         """
         @param      site        website
         @param      login       login
@@ -25,10 +30,25 @@ class TransferAPIFtp(TransferAPI):
         @param      root        root on the website
         @param      ftps        protocol, see @see cl TransferFTP
         @param      fLOG        logging function
+        @param      pool_size   maximum number of connections
+        @param      keepalive   None or a delay in seconds, unused connections
+                                receive a command every *keepalive* seconds
+        @param      hash_algo   algorithm used to name the remote files
+                                (see @see fn get_hash_constructor)
+
+        .. versionchanged:: 1.9
+            Parameters *pool_size*, *keepalive*, *hash_algo* were added.
         """
-        TransferAPI.__init__(self, fLOG=fLOG)
-        self._ftp = (TransferFTP(site, login, password, fLOG=fLOG, ftps=ftps)
-                     if site else MockTransferFTP(ftps=ftps, fLOG=fLOG))
+        TransferAPI.__init__(self, fLOG=fLOG, hash_algo=hash_algo)
+
+        def factory():
+            return (TransferFTP(site, login, password, fLOG=fLOG, ftps=ftps)
+                    if site else MockTransferFTP(ftps=ftps, fLOG=fLOG))
+
+        self._pool = TransferFTPPool(factory, size=pool_size,
+                                     keepalive=keepalive, fLOG=fLOG)
+        # the first connection is created now to fail early
+        self._pool.add(factory())
         self._root = root
 
     def connect(self):
@@ -40,10 +60,36 @@ class TransferAPIFtp(TransferAPI):
 
     def close(self):
         """
-        close the connection
+        close the unused connections
         """
-        pass
-        # self._ftp._close()
+        self._pool.close()
+
+    def transfer_many(self, items, workers=None):
+        """
+        Transfers many files, see @see me transfer.
+
+        @param      items       iterable on *(path, data)*
+        @param      workers     number of threads, *pool_size* by default
+        @return                 list of booleans
+
+        .. versionadded:: 1.9
+        """
+        return TransferAPI.transfer_many(
+            self, items, workers=workers or self._pool.size)
+
+    def retrieve_many(self, paths, exc=True, workers=None):
+        """
+        Retrieves many files, see @see me retrieve.
+
+        @param      paths       iterable on paths
+        @param      exc         keep exception
+        @param      workers     number of threads, *pool_size* by default
+        @return                 list of data
+
+        .. versionadded:: 1.9
+        """
+        return TransferAPI.retrieve_many(
+            self, paths, exc=exc, workers=workers or self._pool.size)
 
     def transfer(self, path, data):
         """
@@ -58,7 +104,8 @@ class TransferAPIFtp(TransferAPI):
         to = self._root + "/" + "/".join(spl[:-1])
         to = to.rstrip("/")
         byt = BytesIO(data)
-        r = self._ftp.transfer(byt, to, spl[-1])
+        with self._pool.connection() as ftp:
+            r = ftp.transfer(byt, to, spl[-1])
         return r
 
     def retrieve(self, path, exc=True):
@@ -72,11 +119,12 @@ class TransferAPIFtp(TransferAPI):
         spl = path.rsplit("/")
         src = self._root + "/" + "/".join(spl[:-1])
         src = src.rstrip("/")
-        if exc:
-            r = self._ftp.retrieve(src, spl[-1], None)
-        else:
-            try:
-                r = self._ftp.retrieve(src, spl[-1], None)
-            except ftplib.error_perm:
-                r = None
+        with self._pool.connection() as ftp:
+            if exc:
+                r = ftp.retrieve(src, spl[-1], None)
+            else:
+                try:
+                    r = ftp.retrieve(src, spl[-1], None)
+                except ftplib.error_perm:
+                    r = None
         return r
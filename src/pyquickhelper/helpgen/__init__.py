@@ -2,15 +2,26 @@
 @file
 @brief Subpart related to the documentation generation.
 """
-from .conf_path_tools import find_graphviz_dot
-from .default_conf import set_sphinx_variables, custom_setup
-from .helpgen_exceptions import HelpGenException, ImportErrorHelpGen, HelpGenConvertError
-from .help_usage import get_help_usage
-from .pandoc_helper import latex2rst
-from .process_notebook_api import nb2slides, nb2html, nb2rst
-from .rst_converters import rst2html, docstring2html, rst2rst_folder
-from .sphinx_helper import sphinx_add_scripts
-# Disable to speed up import time.
-# from .sphinx_main import generate_help_sphinx, process_notebooks
-from .utils_sphinx_config import NbImage
-from .utils_pywin32 import import_pywin32
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'find_graphviz_dot': '.conf_path_tools',
+    'set_sphinx_variables': '.default_conf',
+    'custom_setup': '.default_conf',
+    'HelpGenException': '.helpgen_exceptions',
+    'ImportErrorHelpGen': '.helpgen_exceptions',
+    'HelpGenConvertError': '.helpgen_exceptions',
+    'get_help_usage': '.help_usage',
+    'latex2rst': '.pandoc_helper',
+    'nb2slides': '.process_notebook_api',
+    'nb2html': '.process_notebook_api',
+    'nb2rst': '.process_notebook_api',
+    'rst2html': '.rst_converters',
+    'docstring2html': '.rst_converters',
+    'rst2rst_folder': '.rst_converters',
+    'sphinx_add_scripts': '.sphinx_helper',
+    'generate_help_sphinx': '.sphinx_main',
+    'process_notebooks': '.sphinx_main',
+    'NbImage': '.utils_sphinx_config',
+    'import_pywin32': '.utils_pywin32',
+})
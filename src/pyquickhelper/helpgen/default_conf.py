@@ -94,6 +94,7 @@ def get_epkg_dictionary():
         'django': 'https://www.djangoproject.com/',
         'docutils': 'http://docutils.sourceforge.net/',
         'dvipng': 'https://ctan.org/pkg/dvipng?lang=en',
+        'FastCDC': 'https://www.usenix.org/conference/atc16/technical-sessions/presentation/xia',
         'format style': 'https://pyformat.info/>`_',
         'FTP': 'https://en.wikipedia.org/wiki/File_Transfer_Protocol',
         'getsitepackages': 'https://docs.python.org/3/library/site.html#site.getsitepackages',
@@ -189,6 +190,7 @@ def get_epkg_dictionary():
         'rst': 'https://en.wikipedia.org/wiki/ReStructuredText',
         'RST': 'https://en.wikipedia.org/wiki/ReStructuredText',
         'scikit-learn': 'http://scikit-learn.org/',
+        'SQLite': 'https://www.sqlite.org/',
         'SciTe': 'https://www.scintilla.org/SciTE.html',
         'sklearn': ('http://scikit-learn.org/stable/',
                     ('http://scikit-learn.org/stable/modules/generated/{0}.html', 1),
@@ -217,6 +219,7 @@ def get_epkg_dictionary():
         'viz.js': 'https://github.com/mdaines/viz.js/',
         'Visual Studio Community Edition 2015': 'https://imagine.microsoft.com/en-us/Catalog/Product/101',
         'Windows': 'https://en.wikipedia.org/wiki/Microsoft_Windows',
+        'xxhash': 'https://github.com/ifduyue/python-xxhash',
         'xml': 'https://docs.python.org/3/library/xml.etree.elementtree.html#module-xml.etree.ElementTree',
         'yaml': 'https://en.wikipedia.org/wiki/YAML',
         'YAML': 'https://en.wikipedia.org/wiki/YAML',
@@ -6,6 +6,7 @@ for a module designed the same way as this one, @see fn generate_help_sphinx.
 
 """
 import datetime
+import hashlib
 import json
 import os
 import sys
@@ -85,7 +86,7 @@ def find_pdflatex(latex_path):
 def process_notebooks(notebooks, outfold, build, latex_path=None, pandoc_path=None,
                       formats="ipynb,html,python,rst,slides,pdf,github",
                       fLOG=fLOG, exc=True, remove_unicode_latex=False, nblinks=None,
-                      notebook_replacements=None):
+                      notebook_replacements=None, n_jobs=None, cache=False):
     """
     Converts notebooks into :epkg:`html`, :epkg:`rst`, :epkg:`latex`,
     :epkg:`pdf`, :epkg:`python`, :epkg:`docx` using
@@ -105,6 +106,10 @@ def process_notebooks(notebooks, outfold, build, latex_path=None, pandoc_path=No
     @param      remove_unicode_latex    remove unicode characters for latex (to avoid failing)
     @param      notebook_replacements   string replacement in a notebook before conversion
                                         or a string in :epkg:`json` format
+    @param      n_jobs                  number of processes converting notebooks,
+                                        None to convert them in this process
+    @param      cache                   skips the conversions already done
+                                        for the same notebook content and the same parameters
     @return                             list of tuple *[(file, created or skipped)]*
 
     This function relies on :epkg:`pandoc`.
@@ -149,6 +154,9 @@ def process_notebooks(notebooks, outfold, build, latex_path=None, pandoc_path=No
         For :epkg:`latex` and :epkg:`pdf`,
         the custom preprocessor is not taken into account.
         by function @see fn _process_notebooks_in_private.
+
+    .. versionchanged:: 1.9
+        Parameters *n_jobs*, *cache* were added.
     """
     if isinstance(notebooks, str):
         notebooks = notebooks.split(',')
@@ -165,7 +173,8 @@ def process_notebooks(notebooks, outfold, build, latex_path=None, pandoc_path=No
                                 latex_path=latex_path, pandoc_path=pandoc_path,
                                 formats=formats, fLOG=fLOG, exc=exc, nblinks=nblinks,
                                 remove_unicode_latex=remove_unicode_latex,
-                                notebook_replacements=notebook_replacements)
+                                notebook_replacements=notebook_replacements,
+                                n_jobs=n_jobs, cache=cache)
     if "slides" in formats:
         # we copy javascript dependencies, reveal.js
         reveal = os.path.join(outfold, "reveal.js")
@@ -271,11 +280,16 @@ def _preprocess_notebook(notebook_content):
     return new_content
 
 
+_notebook_extensions = {"ipynb": ".ipynb", "latex": ".tex", "elatex": ".tex", "pdf": ".pdf",
+                        "html": ".html", "rst": ".rst", "python": ".py", "docx": ".docx",
+                        "word": ".docx", "slides": ".slides.html"}
+
+
 def _process_notebooks_in(notebooks, outfold, build, latex_path=None, pandoc_path=None,
                           formats=("ipynb", "html", "python", "rst",
                                    "slides", "pdf", "github"),
                           fLOG=fLOG, exc=True, nblinks=None, remove_unicode_latex=False,
-                          notebook_replacements=None):
+                          notebook_replacements=None, n_jobs=None, cache=False):
     """
     The notebook conversion does not handle images from url
     for :epkg:`pdf` and :epkg:`docx`. They could be downloaded first
@@ -289,8 +303,18 @@ def _process_notebooks_in(notebooks, outfold, build, latex_path=None, pandoc_pat
         (see `PR 910 <https://github.com/jupyter/nbconvert/pull/910>`_).
 
     Use `xelatex <https://doc.ubuntu-fr.org/xelatex>`_ if possible.
+
+    Every conversion (a notebook, a format) is done by
+    @see fn _process_notebook_format. The conversions of the same
+    notebook are done one after another by @see fn _process_notebook_formats
+    as several formats share files (*pdf* and *latex* write the same
+    ``.tex`` file), different notebooks are converted on a process pool
+    if *n_jobs* > 1, the workers do not log. If *cache* is True, the function stores in
+    folder *build* the hash of every converted notebook
+    (file ``notebooks_cache.json``), a conversion is skipped
+    if the notebook, the format and the parameters did not change
+    and if the produced files still exist.
     """
-    from nbconvert.nbconvertapp import main as nbconvert_main
     if pandoc_path is None:
         pandoc_path = find_pandoc_path()
 
@@ -317,25 +341,28 @@ def _process_notebooks_in(notebooks, outfold, build, latex_path=None, pandoc_pat
                 warnings.warn(e)
         exe = os.path.split(sys.executable)[0]
 
-    extensions = {"ipynb": ".ipynb", "latex": ".tex", "elatex": ".tex", "pdf": ".pdf",
-                  "html": ".html", "rst": ".rst", "python": ".py", "docx": ".docx",
-                  "word": ".docx", "slides": ".slides.html"}
-
     files = []
     skipped = []
-
-    # main(argv=None, **kwargs)
-    fnbc = nbconvert_main
+    cached = []
 
     if "slides" in formats:
         build_slide = os.path.join(build, "bslides")
         if not os.path.exists(build_slide):
             os.mkdir(build_slide)
 
+    cache_file = os.path.join(build, "notebooks_cache.json")
+    cache_content = {}
+    if cache and os.path.exists(cache_file):
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache_content = json.load(f)
+    from .. import __version__ as pyq_version
+    params = json.dumps([list(formats), nblinks, notebook_replacements,
+                         remove_unicode_latex, pyq_version], sort_keys=True)
+
     copied_images = dict()
+    jobs = {}
 
     for notebook_in in notebooks:
-        thisfiles = []
 
         # we copy available images (only notebook folder)
         # in case they are used in latex
@@ -356,13 +383,20 @@ def _process_notebooks_in(notebooks, outfold, build, latex_path=None, pandoc_pat
         _name = os.path.splitext(os.path.split(notebook_in)[-1])[0]
         _name += '.ipynb'
         notebook = os.path.join(build, _name)
-        fLOG("[_process_notebooks_in] -- copy notebook '{}' to '{}'.".format(
-            notebook_in, notebook))
         with open(notebook_in, "r", encoding="utf-8") as _f:
             content = _f.read()
         content = _preprocess_notebook(content)
-        with open(notebook, "w", encoding="utf-8") as _f:
-            _f.write(content)
+        if cache and os.path.exists(notebook):
+            with open(notebook, "r", encoding="utf-8") as _f:
+                same = _f.read() == content
+        else:
+            same = False
+        if not same:
+            # the modification time must not change if the content is the same
+            fLOG("[_process_notebooks_in] -- copy notebook '{}' to '{}'.".format(
+                notebook_in, notebook))
+            with open(notebook, "w", encoding="utf-8") as _f:
+                _f.write(content)
 
         # next
         nbout = os.path.split(notebook)[-1]
@@ -370,318 +404,62 @@ def _process_notebooks_in(notebooks, outfold, build, latex_path=None, pandoc_pat
             raise HelpGenException(
                 "spaces are not allowed in notebooks file names: "
                 "{0}".format(notebook))
-        nbout = os.path.splitext(nbout)[0]
+        hnb = hashlib.sha256(
+            (content + params).encode("utf-8")).hexdigest()
+
         for format in formats:
 
             if format == "github":
                 # we add a link on the rst page in that case
                 continue
 
-            if format not in extensions:
+            if format not in _notebook_extensions:
                 raise NotebookConvertError(  # pragma: no cover
                     "Unable to find format: '{}' in {}".format(
-                        format, ", ".join(extensions.keys())))
-
-            # output
-            format_ = format
-            outputfile_noext = os.path.join(build, nbout)
-            if format == 'html':
-                outputfile = outputfile_noext + '2html' + extensions[format]
-                outputfile_noext_fixed = outputfile_noext + '2html'
-            else:
-                outputfile = outputfile_noext + extensions[format]
-                outputfile_noext_fixed = outputfile_noext
-            trueoutputfile = outputfile
-            pandoco = "docx" if format in ("word", "docx") else None
-
-            # The function checks it was not done before.
-            if os.path.exists(trueoutputfile):
-                dto = os.stat(trueoutputfile).st_mtime
-                dtnb = os.stat(notebook).st_mtime
-                if dtnb < dto:  # pragma: no cover
-                    fLOG("[_process_notebooks_in] -- skipping notebook", format,
-                         notebook, "(", trueoutputfile, ")")
-                    if trueoutputfile not in thisfiles:
-                        thisfiles.append(trueoutputfile)
-                    if pandoco is None:
-                        skipped.append(trueoutputfile)
-                        continue
-                    out2 = os.path.splitext(
-                        trueoutputfile)[0] + "." + pandoco
-                    if os.path.exists(out2):
-                        skipped.append(trueoutputfile)
-                        continue
-
-            # if the format is slides, we update the metadata
-            options_args = {}
-            if format == "slides":
-                nb_slide = add_tag_for_slideshow(notebook, build_slide)
-                fnbcexe = fnbc
-            else:
-                nb_slide = None
-                fnbcexe = fnbc
-
-            # compilation
-            list_args = []
-            custom_config = os.path.join(os.path.abspath(
-                os.path.dirname(__file__)), "_nbconvert_config.py")
-            if format == "pdf":
-                if not os.path.exists(custom_config):
-                    raise FileNotFoundError(custom_config)
-                title = os.path.splitext(
-                    os.path.split(notebook)[-1])[0].replace("_", " ")
-                list_args.extend(['--config', '"%s"' % custom_config,
-                                  '--SphinxTransformer.author=""',
-                                  '--SphinxTransformer.overridetitle="{0}"'.format(title)])
-                format = "latex"
-                compilation = True
-                thisfiles.append(os.path.splitext(outputfile)[0] + ".tex")
-            elif format in ("latex", "elatex"):
-                if not os.path.exists(custom_config):
-                    raise FileNotFoundError(custom_config)
-                list_args.extend(['--config', '"%s"' % custom_config])
-                compilation = False
-                format = "latex"
-            elif format in ("word", "docx"):
-                format = "html"
-                compilation = False
-            elif format in ("slides", ):
-                list_args.extend(["--reveal-prefix", "reveal.js"])
-                compilation = False
-            else:
-                compilation = False
-
-            # output
-            templ = {'html': 'full', 'latex': 'article',
-                     'elatex': 'article'}.get(format, format)
-            fLOG("[_process_notebooks_in] ### convert into '{}' (done: {}): '{}' -> '{}'".format(
-                format_, os.path.exists(outputfile), notebook, outputfile))
-
-            list_args.extend(["--output", outputfile_noext_fixed])
-            if templ is not None and format != "slides":
-                list_args.extend(["--template", templ])
-
-            # execution
-            if format not in ("ipynb", ):
-                # nbconvert is messing up with static variables in sphinx or
-                # docutils if format is slides, not sure about the others
-                if format in ('rst', ):
-                    fLOG("[_process_notebooks_in] NBcn:", format, options_args)
-                    nb2rst(notebook, outputfile, post_process=False)
-                    err = ""
-                    c = ""
-                elif nbconvert_main != fnbcexe or format not in ("slides", "elatex", "latex", "pdf"):
-                    if options_args:
-                        fLOG("[_process_notebooks_in] NBp*:",
-                             format, options_args)
-                    else:
-                        list_args.extend(["--to", format,
-                                          notebook if nb_slide is None else nb_slide])
-                        fLOG(
-                            "[_process_notebooks_in] NBc* format='{}' args={}".format(format, list_args))
-                        fLOG("[_process_notebooks_in] cwd='{}'".format(os.getcwd()))
-
-                    c = " ".join(list_args)
-                    out, err = _process_notebooks_in_private(
-                        fnbcexe, list_args, options_args)
-                else:
-                    # conversion into slides alter Jinja2 environment
-                    # jinja2.exceptions.TemplateNotFound: rst
-                    if options_args:
-                        fLOG("[_process_notebooks_in] NBp+:",
-                             format, options_args)
-                    else:
-                        list_args.extend(["--to", format,
-                                          notebook if nb_slide is None else nb_slide])
-                        fLOG("[_process_notebooks_in] NBc+:", format, list_args)
-                        fLOG("[_process_notebooks_in]", os.getcwd())
-
-                    c = " ".join(list_args)
-                    out, err = _process_notebooks_in_private_cmd(
-                        fnbcexe, list_args, options_args, fLOG)
-
-                if "raise ImportError" in err or "Unknown exporter" in err:
-                    raise ImportError(
-                        "cmd: {0} {1}\n--ERR--\n{2}".format(fnbcexe, list_args, err))
-                if len(err) > 0:
-                    if format in ("elatex", "latex"):
-                        # There might be some errors because the latex script needs to be post-processed
-                        # sometimes (wrong characters such as " or formulas not
-                        # captured as formulas).
-                        fLOG("[_process_notebooks_in] LATEX ERR\n" + err)
-                        fLOG("[_process_notebooks_in] LATEX OUT\n" + out)
-                    else:
-                        err = err.lower()
-                        if "critical" in err or "bad config" in err:
-                            raise HelpGenException(
-                                "CMD:\n{0}\n[nberror]\n{1}".format(list_args, err))
-            else:
-                # format ipynb
-                # we do nothing
-                pass
-
-            format = extensions[format].strip(".")
-
-            # we add the file to the list of generated files
-            if outputfile not in thisfiles:
-                thisfiles.append(outputfile)
-
-            fLOG("[_process_notebooks_in]    -",
-                 format, compilation, outputfile)
-
-            if compilation:
-                # compilation latex
-                if not sys.platform.startswith("win") or os.path.exists(latex_path):
-                    lat = find_pdflatex(latex_path)
-
-                    tex = set(_ for _ in thisfiles if os.path.splitext(
-                        _)[-1] == ".tex")
-                    if len(tex) != 1:
-                        raise FileNotFoundError(
-                            "No latex file was generated or more than one (={0}), nb={1}\nthisfile=\n{2}".format(
-                                len(tex), notebook, "\n".join(thisfiles)))
-                    tex = list(tex)[0]
-                    post_process_latex_output_any(
-                        tex, custom_latex_processing=None, nblinks=nblinks,
-                        remove_unicode=remove_unicode_latex, fLOG=fLOG)
-                    # -interaction=batchmode
-                    c = '"{0}" "{1}" -max-print-line=900 -output-directory="{2}"'.format(
-                        lat, tex, os.path.split(tex)[0])
-                    fLOG("[_process_notebooks_in]   ** LATEX compilation (b)", c)
-                    if not sys.platform.startswith("win"):
-                        c = c.replace('"', '')
-                    if sys.platform.startswith("win"):
-                        change_path = None
-                    else:
-                        # On Linux the parameter --output-directory is sometimes ignored.
-                        # And it only works from the current directory.
-                        change_path = os.path.split(tex)[0]
-                    out, err = run_cmd(
-                        c, wait=True, log_error=False, shell=sys.platform.startswith("win"),
-                        catch_exit=True, prefix_log="[latex] ", change_path=change_path)
-                    if out is not None and ("Output written" in out or 'bytes written' in out):
-                        # The output was produced. We ignore the return code.
-                        fLOG(
-                            "[_process_notebooks_in] WARNINGS: Latex compilation had warnings:", c)
-                        out += "\nERR\n" + err
-                        err = ""
-                    if len(err) > 0:
-                        raise HelpGenException(
-                            "CMD:\n{0}\n[nberror]\n{1}\nOUT:\n{2}------".format(c, err, out))
-                    f = os.path.join(build, nbout + ".pdf")
-                    if not os.path.exists(f):  # pragma: no cover
-                        # On Linux the parameter --output-directory is sometimes ignored.
-                        # And it only works from the current directory.
-                        # We check again.
-                        loc = os.path.split(f)[-1]
-                        if os.path.exists(loc):
-                            # We move the file.
-                            moved = True
-                            shutil.move(loc, f)
-                        else:
-                            moved = False
-                        if not os.path.exists(f):
-                            files = "\n".join(os.listdir(build))
-                            msg = "Content of '{0}':\n{1}\n----\n'{2}' moved? {3}\nCMD:\n{4}".format(
-                                build, files, loc, moved, c)
-                            raise HelpGenException(
-                                "Missing file: '{0}'\nCMD\n{4}nOUT:\n{2}\n[nberror]\n{1}\n-----\n{3}".format(f, err, out, msg, c))
-                    thisfiles.append(f)
-                else:
-                    fLOG("[_process_notebooks_in] unable to find latex in", latex_path)
-
-            elif pandoco is not None:  # pragma: no cover
-                # compilation pandoc
-                fLOG("[_process_notebooks_in]   ** pandoc compilation (b)", pandoco)
-                inputfile = os.path.splitext(outputfile)[0] + ".html"
-                outfilep = os.path.splitext(outputfile)[0] + "." + pandoco
-
-                # for some files, the following error might appear:
-                # Stack space overflow: current size 33692 bytes.
-                # Use `+RTS -Ksize -RTS' to increase it.
-                # it usually means there is something wrong (circular
-                # reference, ...)
-                if sys.platform.startswith("win"):
-                    c = '"{0}\\pandoc.exe" +RTS -K32m -RTS -f html -t {1} "{2}" -o "{3}"'.format(
-                        pandoc_path, pandoco, inputfile, outfilep)
-                else:
-                    c = 'pandoc +RTS -K32m -RTS -f html -t {0} "{1}" -o "{2}"'.format(
-                        pandoco, outputfile, outfilep)
-
-                if not sys.platform.startswith("win"):
-                    c = c.replace('"', '')
-                out, err = run_cmd(
-                    c, wait=True, log_error=False, shell=sys.platform.startswith("win"))
-                if len(err) > 0:
-                    lines = err.strip("\r\n").split("\n")
-                    # we filter out the message
-                    # pandoc.exe: Could not find image `https://
-                    left = [
-                        _ for _ in lines if _ and "Could not find image `http" not in _]
-                    if len(left) > 0:
-                        raise HelpGenException(
-                            "issue with cmd: %s\n[nberror]\n%s" % (c, err))
-                    for _ in lines:
-                        fLOG("[_process_notebooks_in] w, pandoc issue: {0}".format(
-                            _.strip("\n\r")))
-                outputfile = outfilep
-                format = "docx"
-
-            nb_replacements = notebook_replacements.get(
-                format, None) if notebook_replacements else None
-
-            if format == "html":
-                # we add a link to the notebook
-                if not os.path.exists(outputfile):
-                    raise FileNotFoundError(  # pragma: no cover
-                        outputfile + "\nCONTENT in " + os.path.dirname(outputfile) + ":\n" + "\n".join(
-                            os.listdir(os.path.dirname(outputfile))) + "\n[nberror]\n" + err + "\nOUT:\n" + out + "\nCMD:\n" + c)
-                thisfiles += add_link_to_notebook(outputfile, notebook, "pdf" in formats, False,
-                                                  "python" in formats, "slides" in formats,
-                                                  exc=exc, nblinks=nblinks, fLOG=fLOG,
-                                                  notebook_replacements=nb_replacements)
-
-            elif format == "slides.html":
-                # we add a link to the notebook
-                if not os.path.exists(outputfile):
-                    raise FileNotFoundError(  # pragma: no cover
-                        outputfile + "\nCONTENT in " + os.path.dirname(outputfile) + ":\n" + "\n".join(
-                            os.listdir(os.path.dirname(outputfile))) + "\n[nberror]\n" + err + "\nOUT:\n" + out + "\nCMD:\n" + str(list_args))
-                thisfiles += add_link_to_notebook(outputfile, notebook,
-                                                  "pdf" in formats, False, "python" in formats,
-                                                  "slides" in formats, exc=exc,
-                                                  nblinks=nblinks, fLOG=fLOG, notebook_replacements=nb_replacements)
-
-            elif format == "ipynb":
-                # we just copy the notebook
-                thisfiles += add_link_to_notebook(outputfile, notebook,
-                                                  "ipynb" in formats, False, "python" in formats,
-                                                  "slides" in formats, exc=exc,
-                                                  nblinks=nblinks, fLOG=fLOG, notebook_replacements=nb_replacements)
-
-            elif format == "rst":
-                # It adds a link to the notebook.
-                thisfiles += add_link_to_notebook(
-                    outputfile, notebook, "pdf" in formats, "html" in formats, "python" in formats,
-                    "slides" in formats, exc=exc, github="github" in formats,
-                    notebook=notebook, nblinks=nblinks, fLOG=fLOG)
-
-            elif format in ("tex", "elatex", "latex", "pdf"):
-                thisfiles += add_link_to_notebook(outputfile, notebook, False, False,
-                                                  False, False, exc=exc, nblinks=nblinks,
-                                                  fLOG=fLOG, notebook_replacements=nb_replacements)
-
-            elif format in ("py", "python"):
-                post_process_python_output(
-                    outputfile, True, nblinks=nblinks, fLOG=fLOG, notebook_replacements=nb_replacements)
-
-            elif format in ["docx", "word"]:
-                pass
-
-            else:
-                raise HelpGenException("unexpected format " + format)
-
-            files.extend(thisfiles)
+                        format, ", ".join(_notebook_extensions.keys())))
+
+            name = "{0}|{1}".format(_name, format)
+            done = cache_content.get(name, None)
+            if (done is not None and done["hash"] == hnb and
+                    all(map(os.path.exists, done["files"]))):
+                fLOG("[_process_notebooks_in] -- unchanged notebook", format,
+                     notebook)
+                cached.extend(done["files"])
+                continue
+            if notebook not in jobs:
+                jobs[notebook] = []
+            jobs[notebook].append((name, hnb, format))
+
+    # conversions, one job per notebook
+    kwargs = dict(formats=formats, build=build, latex_path=latex_path,
+                  pandoc_path=pandoc_path, exc=exc, nblinks=nblinks,
+                  remove_unicode_latex=remove_unicode_latex,
+                  notebook_replacements=notebook_replacements)
+    jobs = list(jobs.items())
+    if n_jobs is not None and n_jobs > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        fLOG("[_process_notebooks_in] convert {0} notebooks with {1} processes".format(
+            len(jobs), n_jobs))
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(_process_notebook_formats, notebook,
+                                       [job[2] for job in todo], fLOG=noLOG, **kwargs)
+                       for notebook, todo in jobs]
+            results = [f.result() for f in futures]
+    else:
+        results = [_process_notebook_formats(notebook, [job[2] for job in todo],
+                                             fLOG=fLOG, **kwargs)
+                   for notebook, todo in jobs]
+
+    for (notebook, todo), result in zip(jobs, results):
+        for (name, hnb, _), (thisfiles, thisskipped) in zip(todo, result):
+            for f in thisfiles:
+                if f not in files:
+                    files.append(f)
+            skipped.extend(thisskipped)
+            cache_content[name] = dict(hash=hnb, files=thisfiles)
+    if cache:
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(cache_content, f, indent=1, sort_keys=True)
 
     copy = []
     for f in files:
@@ -733,9 +511,358 @@ def _process_notebooks_in(notebooks, outfold, build, latex_path=None, pandoc_pat
                 raise FileNotFoundError(dest)  # pragma: no cover
             copy.append((dest, True))
 
+    # files produced by a previous run
+    for f in cached:
+        if f.endswith(".tex"):
+            continue
+        dest = os.path.join(outfold, os.path.split(f)[-1])
+        if not os.path.exists(dest):
+            shutil.copy(f, outfold)
+        copy.append((dest, False))
+
     return copy + [(_, False) for _ in skipped]
 
 
+def _process_notebook_formats(notebook, todo, **kwargs):
+    """
+    Converts a notebook into several formats one after another,
+    the function is called by @see fn _process_notebooks_in,
+    possibly in another process.
+
+    @param      notebook    notebook (a copy in folder *build*)
+    @param      todo        list of formats
+    @param      kwargs      see @see fn _process_notebook_format
+    @return                 list of results of @see fn _process_notebook_format,
+                            one per format
+    """
+    return [_process_notebook_format(notebook, format, **kwargs)
+            for format in todo]
+
+
+def _process_notebook_format(notebook, format, formats, build,
+                             latex_path, pandoc_path, fLOG=fLOG, exc=True,
+                             nblinks=None, remove_unicode_latex=False,
+                             notebook_replacements=None):
+    """
+    Converts a notebook into one format, the function is called by
+    @see fn _process_notebooks_in, possibly in another process.
+
+    @param      notebook    notebook (a copy in folder *build*)
+    @param      format      format
+    @return                 list of produced files, list of skipped files
+
+    Other parameters are described in @see fn _process_notebooks_in.
+    """
+    from nbconvert.nbconvertapp import main as nbconvert_main
+    fnbc = nbconvert_main
+    extensions = _notebook_extensions
+    build_slide = os.path.join(build, "bslides")
+    nbout = os.path.splitext(os.path.split(notebook)[-1])[0]
+    thisfiles = []
+    skipped = []
+
+    # output
+    format_ = format
+    outputfile_noext = os.path.join(build, nbout)
+    if format == 'html':
+        outputfile = outputfile_noext + '2html' + extensions[format]
+        outputfile_noext_fixed = outputfile_noext + '2html'
+    else:
+        outputfile = outputfile_noext + extensions[format]
+        outputfile_noext_fixed = outputfile_noext
+    trueoutputfile = outputfile
+    pandoco = "docx" if format in ("word", "docx") else None
+
+    # The function checks it was not done before.
+    if os.path.exists(trueoutputfile):
+        dto = os.stat(trueoutputfile).st_mtime
+        dtnb = os.stat(notebook).st_mtime
+        if dtnb < dto:  # pragma: no cover
+            fLOG("[_process_notebooks_in] -- skipping notebook", format,
+                 notebook, "(", trueoutputfile, ")")
+            if trueoutputfile not in thisfiles:
+                thisfiles.append(trueoutputfile)
+            if pandoco is None:
+                skipped.append(trueoutputfile)
+                return thisfiles, skipped
+            out2 = os.path.splitext(
+                trueoutputfile)[0] + "." + pandoco
+            if os.path.exists(out2):
+                skipped.append(trueoutputfile)
+                return thisfiles, skipped
+
+    # if the format is slides, we update the metadata
+    options_args = {}
+    if format == "slides":
+        nb_slide = add_tag_for_slideshow(notebook, build_slide)
+        fnbcexe = fnbc
+    else:
+        nb_slide = None
+        fnbcexe = fnbc
+
+    # compilation
+    list_args = []
+    custom_config = os.path.join(os.path.abspath(
+        os.path.dirname(__file__)), "_nbconvert_config.py")
+    if format == "pdf":
+        if not os.path.exists(custom_config):
+            raise FileNotFoundError(custom_config)
+        title = os.path.splitext(
+            os.path.split(notebook)[-1])[0].replace("_", " ")
+        list_args.extend(['--config', '"%s"' % custom_config,
+                          '--SphinxTransformer.author=""',
+                          '--SphinxTransformer.overridetitle="{0}"'.format(title)])
+        format = "latex"
+        compilation = True
+        thisfiles.append(os.path.splitext(outputfile)[0] + ".tex")
+    elif format in ("latex", "elatex"):
+        if not os.path.exists(custom_config):
+            raise FileNotFoundError(custom_config)
+        list_args.extend(['--config', '"%s"' % custom_config])
+        compilation = False
+        format = "latex"
+    elif format in ("word", "docx"):
+        format = "html"
+        compilation = False
+    elif format in ("slides", ):
+        list_args.extend(["--reveal-prefix", "reveal.js"])
+        compilation = False
+    else:
+        compilation = False
+
+    # output
+    templ = {'html': 'full', 'latex': 'article',
+             'elatex': 'article'}.get(format, format)
+    fLOG("[_process_notebooks_in] ### convert into '{}' (done: {}): '{}' -> '{}'".format(
+        format_, os.path.exists(outputfile), notebook, outputfile))
+
+    list_args.extend(["--output", outputfile_noext_fixed])
+    if templ is not None and format != "slides":
+        list_args.extend(["--template", templ])
+
+    # execution
+    if format not in ("ipynb", ):
+        # nbconvert is messing up with static variables in sphinx or
+        # docutils if format is slides, not sure about the others
+        if format in ('rst', ):
+            fLOG("[_process_notebooks_in] NBcn:", format, options_args)
+            nb2rst(notebook, outputfile, post_process=False)
+            err = ""
+            c = ""
+        elif nbconvert_main != fnbcexe or format not in ("slides", "elatex", "latex", "pdf"):
+            if options_args:
+                fLOG("[_process_notebooks_in] NBp*:",
+                     format, options_args)
+            else:
+                list_args.extend(["--to", format,
+                                  notebook if nb_slide is None else nb_slide])
+                fLOG(
+                    "[_process_notebooks_in] NBc* format='{}' args={}".format(format, list_args))
+                fLOG("[_process_notebooks_in] cwd='{}'".format(os.getcwd()))
+
+            c = " ".join(list_args)
+            out, err = _process_notebooks_in_private(
+                fnbcexe, list_args, options_args)
+        else:
+            # conversion into slides alter Jinja2 environment
+            # jinja2.exceptions.TemplateNotFound: rst
+            if options_args:
+                fLOG("[_process_notebooks_in] NBp+:",
+                     format, options_args)
+            else:
+                list_args.extend(["--to", format,
+                                  notebook if nb_slide is None else nb_slide])
+                fLOG("[_process_notebooks_in] NBc+:", format, list_args)
+                fLOG("[_process_notebooks_in]", os.getcwd())
+
+            c = " ".join(list_args)
+            out, err = _process_notebooks_in_private_cmd(
+                fnbcexe, list_args, options_args, fLOG)
+
+        if "raise ImportError" in err or "Unknown exporter" in err:
+            raise ImportError(
+                "cmd: {0} {1}\n--ERR--\n{2}".format(fnbcexe, list_args, err))
+        if len(err) > 0:
+            if format in ("elatex", "latex"):
+                # There might be some errors because the latex script needs to be post-processed
+                # sometimes (wrong characters such as " or formulas not
+                # captured as formulas).
+                fLOG("[_process_notebooks_in] LATEX ERR\n" + err)
+                fLOG("[_process_notebooks_in] LATEX OUT\n" + out)
+            else:
+                err = err.lower()
+                if "critical" in err or "bad config" in err:
+                    raise HelpGenException(
+                        "CMD:\n{0}\n[nberror]\n{1}".format(list_args, err))
+    else:
+        # format ipynb
+        # we do nothing
+        pass
+
+    format = extensions[format].strip(".")
+
+    # we add the file to the list of generated files
+    if outputfile not in thisfiles:
+        thisfiles.append(outputfile)
+
+    fLOG("[_process_notebooks_in]    -",
+         format, compilation, outputfile)
+
+    if compilation:
+        # compilation latex
+        if not sys.platform.startswith("win") or os.path.exists(latex_path):
+            lat = find_pdflatex(latex_path)
+
+            tex = set(_ for _ in thisfiles if os.path.splitext(
+                _)[-1] == ".tex")
+            if len(tex) != 1:
+                raise FileNotFoundError(
+                    "No latex file was generated or more than one (={0}), nb={1}\nthisfile=\n{2}".format(
+                        len(tex), notebook, "\n".join(thisfiles)))
+            tex = list(tex)[0]
+            post_process_latex_output_any(
+                tex, custom_latex_processing=None, nblinks=nblinks,
+                remove_unicode=remove_unicode_latex, fLOG=fLOG)
+            # -interaction=batchmode
+            c = '"{0}" "{1}" -max-print-line=900 -output-directory="{2}"'.format(
+                lat, tex, os.path.split(tex)[0])
+            fLOG("[_process_notebooks_in]   ** LATEX compilation (b)", c)
+            if not sys.platform.startswith("win"):
+                c = c.replace('"', '')
+            if sys.platform.startswith("win"):
+                change_path = None
+            else:
+                # On Linux the parameter --output-directory is sometimes ignored.
+                # And it only works from the current directory.
+                change_path = os.path.split(tex)[0]
+            out, err = run_cmd(
+                c, wait=True, log_error=False, shell=sys.platform.startswith("win"),
+                catch_exit=True, prefix_log="[latex] ", change_path=change_path)
+            if out is not None and ("Output written" in out or 'bytes written' in out):
+                # The output was produced. We ignore the return code.
+                fLOG(
+                    "[_process_notebooks_in] WARNINGS: Latex compilation had warnings:", c)
+                out += "\nERR\n" + err
+                err = ""
+            if len(err) > 0:
+                raise HelpGenException(
+                    "CMD:\n{0}\n[nberror]\n{1}\nOUT:\n{2}------".format(c, err, out))
+            f = os.path.join(build, nbout + ".pdf")
+            if not os.path.exists(f):  # pragma: no cover
+                # On Linux the parameter --output-directory is sometimes ignored.
+                # And it only works from the current directory.
+                # We check again.
+                loc = os.path.split(f)[-1]
+                if os.path.exists(loc):
+                    # We move the file.
+                    moved = True
+                    shutil.move(loc, f)
+                else:
+                    moved = False
+                if not os.path.exists(f):
+                    files = "\n".join(os.listdir(build))
+                    msg = "Content of '{0}':\n{1}\n----\n'{2}' moved? {3}\nCMD:\n{4}".format(
+                        build, files, loc, moved, c)
+                    raise HelpGenException(
+                        "Missing file: '{0}'\nCMD\n{4}nOUT:\n{2}\n[nberror]\n{1}\n-----\n{3}".format(f, err, out, msg, c))
+            thisfiles.append(f)
+        else:
+            fLOG("[_process_notebooks_in] unable to find latex in", latex_path)
+
+    elif pandoco is not None:  # pragma: no cover
+        # compilation pandoc
+        fLOG("[_process_notebooks_in]   ** pandoc compilation (b)", pandoco)
+        inputfile = os.path.splitext(outputfile)[0] + ".html"
+        outfilep = os.path.splitext(outputfile)[0] + "." + pandoco
+
+        # for some files, the following error might appear:
+        # Stack space overflow: current size 33692 bytes.
+        # Use `+RTS -Ksize -RTS' to increase it.
+        # it usually means there is something wrong (circular
+        # reference, ...)
+        if sys.platform.startswith("win"):
+            c = '"{0}\\pandoc.exe" +RTS -K32m -RTS -f html -t {1} "{2}" -o "{3}"'.format(
+                pandoc_path, pandoco, inputfile, outfilep)
+        else:
+            c = 'pandoc +RTS -K32m -RTS -f html -t {0} "{1}" -o "{2}"'.format(
+                pandoco, outputfile, outfilep)
+
+        if not sys.platform.startswith("win"):
+            c = c.replace('"', '')
+        out, err = run_cmd(
+            c, wait=True, log_error=False, shell=sys.platform.startswith("win"))
+        if len(err) > 0:
+            lines = err.strip("\r\n").split("\n")
+            # we filter out the message
+            # pandoc.exe: Could not find image `https://
+            left = [
+                _ for _ in lines if _ and "Could not find image `http" not in _]
+            if len(left) > 0:
+                raise HelpGenException(
+                    "issue with cmd: %s\n[nberror]\n%s" % (c, err))
+            for _ in lines:
+                fLOG("[_process_notebooks_in] w, pandoc issue: {0}".format(
+                    _.strip("\n\r")))
+        outputfile = outfilep
+        format = "docx"
+
+    nb_replacements = notebook_replacements.get(
+        format, None) if notebook_replacements else None
+
+    if format == "html":
+        # we add a link to the notebook
+        if not os.path.exists(outputfile):
+            raise FileNotFoundError(  # pragma: no cover
+                outputfile + "\nCONTENT in " + os.path.dirname(outputfile) + ":\n" + "\n".join(
+                    os.listdir(os.path.dirname(outputfile))) + "\n[nberror]\n" + err + "\nOUT:\n" + out + "\nCMD:\n" + c)
+        thisfiles += add_link_to_notebook(outputfile, notebook, "pdf" in formats, False,
+                                          "python" in formats, "slides" in formats,
+                                          exc=exc, nblinks=nblinks, fLOG=fLOG,
+                                          notebook_replacements=nb_replacements)
+
+    elif format == "slides.html":
+        # we add a link to the notebook
+        if not os.path.exists(outputfile):
+            raise FileNotFoundError(  # pragma: no cover
+                outputfile + "\nCONTENT in " + os.path.dirname(outputfile) + ":\n" + "\n".join(
+                    os.listdir(os.path.dirname(outputfile))) + "\n[nberror]\n" + err + "\nOUT:\n" + out + "\nCMD:\n" + str(list_args))
+        thisfiles += add_link_to_notebook(outputfile, notebook,
+                                          "pdf" in formats, False, "python" in formats,
+                                          "slides" in formats, exc=exc,
+                                          nblinks=nblinks, fLOG=fLOG, notebook_replacements=nb_replacements)
+
+    elif format == "ipynb":
+        # we just copy the notebook
+        thisfiles += add_link_to_notebook(outputfile, notebook,
+                                          "ipynb" in formats, False, "python" in formats,
+                                          "slides" in formats, exc=exc,
+                                          nblinks=nblinks, fLOG=fLOG, notebook_replacements=nb_replacements)
+
+    elif format == "rst":
+        # It adds a link to the notebook.
+        thisfiles += add_link_to_notebook(
+            outputfile, notebook, "pdf" in formats, "html" in formats, "python" in formats,
+            "slides" in formats, exc=exc, github="github" in formats,
+            notebook=notebook, nblinks=nblinks, fLOG=fLOG)
+
+    elif format in ("tex", "elatex", "latex", "pdf"):
+        thisfiles += add_link_to_notebook(outputfile, notebook, False, False,
+                                          False, False, exc=exc, nblinks=nblinks,
+                                          fLOG=fLOG, notebook_replacements=nb_replacements)
+
+    elif format in ("py", "python"):
+        post_process_python_output(
+            outputfile, True, nblinks=nblinks, fLOG=fLOG, notebook_replacements=nb_replacements)
+
+    elif format in ["docx", "word"]:
+        pass
+
+    else:
+        raise HelpGenException("unexpected format " + format)
+
+    return thisfiles, skipped
+
+
 def add_link_to_notebook(file, nb, pdf, html, python, slides, exc=True,
                          github=False, notebook=None, nblinks=None, fLOG=None,
                          notebook_replacements=None):
@@ -88,7 +88,7 @@ def rst2html(s, fLOG=noLOG, writer="html", keep_warnings=False,
              new_extensions=None, update_builder=None,
              ret_doctree=False, load_bokeh=False,
              destination=None, destination_path=None,
-             **options):
+             app_pool=None, cache=None, **options):
     """
     Converts a string from :epkg:`RST`
     into :epkg:`HTML` format or transformed :epkg:`RST`.
@@ -117,6 +117,14 @@ def rst2html(s, fLOG=noLOG, writer="html", keep_warnings=False,
                                     disabled by default as it takes a few seconds
     @param      destination         set a destination (requires for some extension)
     @param      destination_path    set a destination path (requires for some extension)
+    @param      app_pool            None to create a new :epkg:`Sphinx` application,
+                                    True to reuse one from the default pool,
+                                    or a @see cl MockSphinxAppPool, ignored if
+                                    *update_builder* is specified
+    @param      cache               None, True to use the default cache or a
+                                    @see cl Rst2HtmlCache, the results are cached
+                                    unless *filter_nodes* or *update_builder*
+                                    is specified or a doctree is returned
     @param      options             :epkg:`Sphinx` options see
                                     `Render math as images <http://www.sphinx-doc.org/en/stable/ext/math.html#module-sphinx.ext.imgmath>`_,
                                     a subset of options is used, see @see fn default_sphinx_options.
@@ -244,7 +252,36 @@ def rst2html(s, fLOG=noLOG, writer="html", keep_warnings=False,
         New nodes are now optional in *directives*.
         Markdown format was added.
         Parameters *ret_doctree*, *load_bokeh* were added.
+
+    .. versionchanged:: 1.9
+        Parameters *app_pool*, *cache* were added.
     """
+    if (cache is not None and cache is not False and filter_nodes is None and
+            update_builder is None and not ret_doctree and writer != 'doctree'):
+        if cache is True:
+            from .rst_converters_cache import get_default_rst_cache
+            cache = get_default_rst_cache()
+        key = cache.make_key(
+            s, new_extensions=new_extensions, writer=writer,
+            keep_warnings=keep_warnings, directives=directives,
+            language=language, layout=layout, document_name=document_name,
+            external_docnames=external_docnames, load_bokeh=load_bokeh,
+            destination=destination, destination_path=destination_path,
+            options=options)
+        res = cache.get(key)
+        if res is None:
+            res = rst2html(s, fLOG=fLOG, writer=writer, keep_warnings=keep_warnings,
+                           directives=directives, language=language,
+                           layout=layout, document_name=document_name,
+                           external_docnames=external_docnames,
+                           new_extensions=new_extensions, load_bokeh=load_bokeh,
+                           destination=destination,
+                           destination_path=destination_path,
+                           app_pool=app_pool, **options)
+            if isinstance(res, str):
+                cache.set(key, res)
+        return res
+
     # delayed import to speed up time
     def _get_MockSphinxApp():
         from .sphinxm_mock_app import MockSphinxApp
@@ -261,31 +298,61 @@ def rst2html(s, fLOG=noLOG, writer="html", keep_warnings=False,
         defopt['latex_documents'] = latex_documents
 
     if writer in ["custom", "sphinx", "HTMLWriterWithCustomDirectives", "html"]:
-        mockapp, writer, title_names = MockSphinxApp.create(
-            "sphinx", directives, confoverrides=defopt,
-            new_extensions=new_extensions,
-            load_bokeh=load_bokeh, fLOG=fLOG,
-            destination_path=destination_path)
+        app_writer = "sphinx"
         writer_name = "HTMLWriterWithCustomDirectives"
     elif writer in ("rst", "md", "latex", "elatex", 'text', 'doctree'):
+        app_writer = writer
         writer_name = writer
-        mockapp, writer, title_names = MockSphinxApp.create(
-            writer, directives, confoverrides=defopt,
-            new_extensions=new_extensions,
-            load_bokeh=load_bokeh, fLOG=fLOG,
-            destination_path=destination_path)
     elif isinstance(writer, tuple):
         # We extect something like ("builder_name", builder_class)
+        app_writer = writer
         writer_name = writer
-        mockapp, writer, title_names = MockSphinxApp.create(
-            writer, directives, confoverrides=defopt,
-            new_extensions=new_extensions,
-            load_bokeh=load_bokeh, fLOG=fLOG,
-            destination_path=destination_path)
     else:
         raise ValueError(
             "Unexpected writer '{0}', should be 'rst' or 'html' or 'md' or 'elatex' or 'text'.".format(writer))
 
+    def create_app():
+        "local function"
+        return MockSphinxApp.create(
+            app_writer, directives, confoverrides=defopt,
+            new_extensions=new_extensions,
+            load_bokeh=load_bokeh, fLOG=fLOG,
+            destination_path=destination_path)
+
+    kwargs = dict(fLOG=fLOG, keep_warnings=keep_warnings, directives=directives,
+                  language=language, layout=layout, document_name=document_name,
+                  external_docnames=external_docnames, filter_nodes=filter_nodes,
+                  update_builder=update_builder, ret_doctree=ret_doctree,
+                  destination=destination, destination_path=destination_path)
+
+    if app_pool is None or app_pool is False or update_builder is not None:
+        mockapp, writer, title_names = create_app()
+        return _rst2html_publish(s, mockapp, writer, writer_name, title_names,
+                                 defopt, **kwargs)
+
+    if app_pool is True:
+        from .sphinxm_app_pool import get_default_app_pool
+        app_pool = get_default_app_pool()
+    key = app_pool.make_key(
+        app_writer, directives=directives, confoverrides=defopt,
+        new_extensions=new_extensions, load_bokeh=load_bokeh,
+        destination_path=destination_path)
+    with app_pool.borrow(key, create_app) as (mockapp, writer, title_names):
+        return _rst2html_publish(s, mockapp, writer, writer_name, title_names,
+                                 defopt, **kwargs)
+
+
+def _rst2html_publish(s, mockapp, writer, writer_name, title_names, defopt,
+                      fLOG=noLOG, keep_warnings=False, directives=None,
+                      language="en", layout='docutils', document_name="<<string>>",
+                      external_docnames=None, filter_nodes=None,
+                      update_builder=None, ret_doctree=False,
+                      destination=None, destination_path=None):
+    """
+    Converts a string with an application created by
+    method *create* of @see cl MockSphinxApp,
+    parameters are described in @see fn rst2html.
+    """
     if writer is None and directives is not None and len(directives) > 0:
         raise NotImplementedError(
             "The writer must not be null if custom directives will be added, check the documentation of the fucntion.")
@@ -0,0 +1,231 @@
+"""
+@file
+@brief Cache for the conversions done by @see fn rst2html.
+"""
+import os
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def _stable_repr(obj):
+    """
+    Returns a string which does not depend on the process
+    for classes and functions (used to build cache keys).
+    """
+    if isinstance(obj, (list, tuple)):
+        return "({0})".format(", ".join(_stable_repr(o) for o in obj))
+    if isinstance(obj, dict):
+        return "{{{0}}}".format(", ".join(
+            "{0}: {1}".format(_stable_repr(k), _stable_repr(v))
+            for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))))
+    if isinstance(obj, type) or callable(obj):
+        return "{0}.{1}".format(getattr(obj, "__module__", ""),
+                                getattr(obj, "__qualname__", repr(obj)))
+    return repr(obj)
+
+
+def _versions(new_extensions=None):
+    """
+    Returns the versions of the modules
+    the conversion depends on.
+    """
+    from docutils import __version__ as docutils_version
+    from .. import __version__ as pyq_version
+    try:
+        from sphinx import __version__ as sphinx_version
+    except ImportError:  # pragma: no cover
+        sphinx_version = None
+    res = [("docutils", docutils_version), ("sphinx", sphinx_version),
+           ("pyquickhelper", pyq_version)]
+    if new_extensions:
+        for ext in new_extensions:
+            mod = sys.modules.get(ext, None)
+            res.append((ext, getattr(mod, "__version__", None)))
+    return res
+
+
+class Rst2HtmlCache:
+    """
+    Caches the conversions done by @see fn rst2html.
+    A conversion is identified by a hash of the string to convert,
+    the parameters, the options and the versions of
+    :epkg:`docutils`, :epkg:`Sphinx`, this module and
+    the additional extensions.
+    The cache keeps the most recently used results in memory,
+    it can also store the results in a folder.
+    The oldest files are removed when the folder
+    becomes bigger than *max_disk_size*.
+
+    .. exref::
+        :title: Cache the conversion of RST strings
+
+        ::
+
+            from pyquickhelper.helpgen import rst2html
+            from pyquickhelper.helpgen.rst_converters_cache import Rst2HtmlCache
+
+            cache = Rst2HtmlCache(cache_dir="rst_cache")
+            html = rst2html(content, layout="sphinx_body", cache=cache)
+            html = rst2html(content, layout="sphinx_body", cache=cache)
+            print(cache.hits, cache.misses)
+    """
+
+    def __init__(self, max_memory=256, cache_dir=None, max_disk_size=2 ** 28):
+        """
+        @param      max_memory      maximum number of results kept in memory
+        @param      cache_dir       None or a folder to store the results
+        @param      max_disk_size   maximum size of the folder (in bytes)
+        """
+        self.max_memory = max_memory
+        self.cache_dir = cache_dir
+        self.max_disk_size = max_disk_size
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_size = 0
+        if cache_dir is not None:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            for name in os.listdir(cache_dir):
+                if name.endswith(".cache"):
+                    self._disk_size += os.stat(
+                        os.path.join(cache_dir, name)).st_size
+
+    def __len__(self):
+        """
+        Returns the number of results kept in memory.
+        """
+        return len(self._memory)
+
+    @staticmethod
+    def make_key(s, new_extensions=None, **params):
+        """
+        Builds the key for a conversion.
+
+        @param      s               string to convert
+        @param      new_extensions  additional extensions, their versions
+                                    are part of the key
+        @param      params          parameters of @see fn rst2html
+        @return                     hexadecimal string
+        """
+        h = hashlib.sha256()
+        h.update(s.encode("utf-8"))
+        h.update(b"\0")
+        h.update(_stable_repr(params).encode("utf-8"))
+        h.update(b"\0")
+        h.update(_stable_repr(_versions(new_extensions)).encode("utf-8"))
+        return h.hexdigest()
+
+    def _filename(self, key):
+        return os.path.join(self.cache_dir, key + ".cache")
+
+    def get(self, key):
+        """
+        Returns the cached result or None.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+        if self.cache_dir is not None:
+            name = self._filename(key)
+            try:
+                with open(name, "r", encoding="utf-8") as f:
+                    value = f.read()
+            except FileNotFoundError:
+                value = None
+            if value is not None:
+                try:
+                    # the least recently used files are removed first
+                    os.utime(name)
+                except OSError:  # pragma: no cover
+                    pass
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._set_memory(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _set_memory(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def set(self, key, value):
+        """
+        Stores a result.
+
+        @param      key     key returned by @see me make_key
+        @param      value   string
+        """
+        with self._lock:
+            self._set_memory(key, value)
+        if self.cache_dir is None:
+            return
+        name = self._filename(key)
+        tmp = "{0}.{1}.tmp".format(name, threading.get_ident())
+        data = value.encode("utf-8")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, name)
+        with self._lock:
+            self._disk_size += len(data)
+            if self._disk_size > self.max_disk_size:
+                self._evict()
+
+    def _evict(self):
+        """
+        Removes the least recently used files until
+        the folder is smaller than *max_disk_size*.
+        """
+        files = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".cache"):
+                continue
+            st = entry.stat()
+            files.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # pragma: no cover
+                pass
+            total -= size
+        self._disk_size = total
+
+    def clear(self, disk=False):
+        """
+        Removes the results kept in memory,
+        and the files if *disk* is True.
+        """
+        with self._lock:
+            self._memory.clear()
+            if disk and self.cache_dir is not None:
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith(".cache"):
+                        os.remove(entry.path)
+                self._disk_size = 0
+
+
+_default_cache = Rst2HtmlCache()
+
+
+def get_default_rst_cache():
+    """
+    Returns the cache used by @see fn rst2html
+    when *cache* is True.
+    """
+    return _default_cache
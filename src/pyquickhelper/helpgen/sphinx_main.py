@@ -85,7 +85,8 @@ def generate_help_sphinx(project_var_name, clean=False, root=".",
                          layout=None,
                          module_name=None, from_repo=True, add_htmlhelp=False,
                          copy_add_ext=None, direct_call=False, fLOG=fLOG,
-                         parallel=1, extra_paths=None, fexclude=None):
+                         parallel=1, extra_paths=None, fexclude=None,
+                         nbcache=True):
     """
     Runs the help generation:
 
@@ -119,6 +120,9 @@ def generate_help_sphinx(project_var_name, clean=False, root=".",
     @param      extra_paths         extra paths when importing configuration
     @param      fexclude            function which tells which file not to copy in the folder
                                     used to build the documentation
+    @param      nbcache             skips the conversion of the notebooks which did
+                                    not change since the previous build
+                                    (see parameter *cache* of @see fn process_notebooks)
     @param      fLOG                logging function
 
     The result is stored in path: ``root/_doc/sphinxdoc/source``.
@@ -268,7 +272,7 @@ def generate_help_sphinx(project_var_name, clean=False, root=".",
     .. versionchanged:: 1.9
         Import ``conf.py`` in a separate process before running
         the generation of the documentation. Do not import it
-        directly.
+        directly. Parameter *nbcache* was added.
     """
     datetime_rows = [("begin", datetime.now())]
 
@@ -694,7 +698,9 @@ def generate_help_sphinx(project_var_name, clean=False, root=".",
             nbs_all = process_notebooks(notebooks, build=build, outfold=notebook_doc,
                                         formats=nbformats, latex_path=latex_path,
                                         pandoc_path=pandoc_path, fLOG=fLOG, nblinks=nblinks,
-                                        notebook_replacements=notebook_replacements)
+                                        notebook_replacements=notebook_replacements,
+                                        n_jobs=parallel if parallel > 1 else None,
+                                        cache=nbcache)
             nbs_all = set(_[0]
                           for _ in nbs_all if os.path.splitext(_[0])[-1] == ".rst")
             if len(nbs_all) != len(indexlistnote):  # pragma: no cover
@@ -0,0 +1,132 @@
+"""
+@file
+@brief Pool of in-memory :epkg:`Sphinx` applications used by
+@see fn rst2html.
+"""
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class MockSphinxAppPool:
+    """
+    Keeps in-memory :epkg:`Sphinx` applications
+    (@see cl MockSphinxApp) created by @see fn rst2html
+    to convert many strings without loading the extensions,
+    the domains and the configuration every time.
+    Applications are indexed by a key built from the writer,
+    the directives, the configuration and the extensions.
+    Only the data about the converted document is removed
+    when an application goes back into the pool
+    (see method *reset* of @see cl MockSphinxApp).
+
+    .. exref::
+        :title: Convert many docstrings
+
+        ::
+
+            from pyquickhelper.helpgen import rst2html
+
+            htmls = [rst2html(doc, layout="sphinx_body", app_pool=True)
+                     for doc in docs]
+    """
+
+    def __init__(self, max_size=16):
+        """
+        @param      max_size        maximum number of unused applications,
+                                    the least recently used ones are removed
+        """
+        self.max_size = max_size
+        self.created = 0
+        self.reused = 0
+        self._idle = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Returns the number of unused applications.
+        """
+        with self._lock:
+            return sum(map(len, self._idle.values()))
+
+    @staticmethod
+    def make_key(writer, directives=None, confoverrides=None,
+                 new_extensions=None, load_bokeh=False,
+                 destination_path=None):
+        """
+        Builds the key identifying an application,
+        parameters are the parameters of method *create*
+        of @see cl MockSphinxApp.
+        """
+        if directives is not None:
+            directives = tuple(tuple(d) for d in directives)
+        if confoverrides is not None:
+            confoverrides = repr(sorted(confoverrides.items()))
+        if new_extensions is not None:
+            new_extensions = tuple(new_extensions)
+        return (writer, directives, confoverrides, new_extensions,
+                load_bokeh, destination_path)
+
+    @contextmanager
+    def borrow(self, key, create):
+        """
+        Borrows an application, it is created if none
+        is available.
+
+        @param      key         key returned by @see me make_key
+        @param      create      function creating the application if needed,
+                                it returns *(mockapp, writer, title_names)*
+                                like method *create* of @see cl MockSphinxApp
+
+        ::
+
+            with pool.borrow(key, create) as (mockapp, writer, title_names):
+                # ...
+
+        An application is not given back if an exception was raised.
+        """
+        item = None
+        with self._lock:
+            items = self._idle.get(key, None)
+            if items:
+                item = items.pop()
+                if len(items) == 0:
+                    del self._idle[key]
+                self.reused += 1
+        if item is None:
+            item = create()
+            with self._lock:
+                self.created += 1
+
+        yield item
+
+        item[0].reset()
+        with self._lock:
+            self._idle.setdefault(key, []).append(item)
+            self._idle.move_to_end(key)
+            nb = sum(map(len, self._idle.values()))
+            while nb > self.max_size:
+                first = next(iter(self._idle))
+                items = self._idle[first]
+                items.pop(0)
+                if len(items) == 0:
+                    del self._idle[first]
+                nb -= 1
+
+    def clear(self):
+        """
+        Removes every unused application.
+        """
+        with self._lock:
+            self._idle.clear()
+
+
+_default_pool = MockSphinxAppPool()
+
+
+def get_default_app_pool():
+    """
+    Returns the pool used by @see fn rst2html
+    when *app_pool* is True.
+    """
+    return _default_pool
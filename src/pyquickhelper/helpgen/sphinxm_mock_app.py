@@ -129,6 +129,26 @@ class MockSphinxApp:
         """
         self.app.finalize(doctree, external_docnames=external_docnames)
 
+    def reset(self):
+        """
+        Removes everything related to the converted document
+        (environment, domains, pages) but keeps the extensions
+        and the configuration so that the application can
+        convert another document (see @see cl MockSphinxAppPool).
+        """
+        env = self.app.env
+        for docname in list(env.all_docs):
+            self.emit('env-purge-doc', env, docname)
+            env.clear_doc(docname)
+        env.all_docs = {}
+        env.temp_data.clear()
+        env.ref_context.clear()
+        if hasattr(env, "doctree_"):
+            env.doctree_.clear()
+        builder = self.writer.builder
+        if hasattr(builder, "built_pages"):
+            builder.built_pages.clear()
+
     def setup_extension(self, extname):
         """
         See :epkg:`class Sphinx`.
@@ -3,4 +3,9 @@
 @brief Shortcuts to *imghelper*.
 """
 
-from .img_helper import white_to_transparency, zoom_img
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'white_to_transparency': '.img_helper',
+    'zoom_img': '.img_helper',
+})
@@ -3,19 +3,42 @@
 @brief Shortcuts to ipythonhelper
 """
 
-from .html_forms import open_html_form
-from .interact import StaticInteract
-from .kindofcompletion import AutoCompletion, AutoCompletionFile
-from .magic_class import MagicClassWithHelpers
-from .magic_parser import MagicCommandParser
-from .notebook_exception import NotebookException, InNotebookException, JupyterException
-from .notebook_helper import upgrade_notebook, read_nb, read_nb_json, find_notebook_kernel, get_notebook_kernel
-from .notebook_helper import install_jupyter_kernel, install_python_kernel_for_unittest, remove_kernel
-from .notebook_helper import install_notebook_extension, get_installed_notebook_extension, get_jupyter_datadir
-from .notebook_helper import remove_execution_number
-from .notebook_runner import NotebookError, NotebookRunner
-from .run_notebook import execute_notebook_list, run_notebook, execute_notebook_list_finalize_ut, retrieve_notebooks_in_folder
-from .run_notebook import notebook_coverage, badge_notebook_coverage
-from .run_notebook import get_additional_paths
-from .unittest_notebook import test_notebook_execution_coverage
-from .widgets import RangeWidget, DropDownWidget, RadioWidget
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'open_html_form': '.html_forms',
+    'StaticInteract': '.interact',
+    'AutoCompletion': '.kindofcompletion',
+    'AutoCompletionFile': '.kindofcompletion',
+    'MagicClassWithHelpers': '.magic_class',
+    'MagicCommandParser': '.magic_parser',
+    'NotebookException': '.notebook_exception',
+    'InNotebookException': '.notebook_exception',
+    'JupyterException': '.notebook_exception',
+    'upgrade_notebook': '.notebook_helper',
+    'read_nb': '.notebook_helper',
+    'read_nb_json': '.notebook_helper',
+    'find_notebook_kernel': '.notebook_helper',
+    'get_notebook_kernel': '.notebook_helper',
+    'install_jupyter_kernel': '.notebook_helper',
+    'install_python_kernel_for_unittest': '.notebook_helper',
+    'remove_kernel': '.notebook_helper',
+    'install_notebook_extension': '.notebook_helper',
+    'get_installed_notebook_extension': '.notebook_helper',
+    'get_jupyter_datadir': '.notebook_helper',
+    'remove_execution_number': '.notebook_helper',
+    'NotebookError': '.notebook_runner',
+    'NotebookRunner': '.notebook_runner',
+    'execute_notebook_list': '.run_notebook',
+    'run_notebook': '.run_notebook',
+    'execute_notebook_list_finalize_ut': '.run_notebook',
+    'retrieve_notebooks_in_folder': '.run_notebook',
+    'NotebookKernelPool': '.run_notebook',
+    'notebook_coverage': '.run_notebook',
+    'badge_notebook_coverage': '.run_notebook',
+    'get_additional_paths': '.run_notebook',
+    'test_notebook_execution_coverage': '.unittest_notebook',
+    'RangeWidget': '.widgets',
+    'DropDownWidget': '.widgets',
+    'RadioWidget': '.widgets',
+})
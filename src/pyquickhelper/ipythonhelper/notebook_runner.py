@@ -3,11 +3,13 @@
 @brief Modified version of `runipy.notebook_runner <https://github.com/paulgb/runipy/blob/master/runipy/notebook_runner.py>`_.
 """
 
+import asyncio
 import base64
 import os
 import re
 import time
 import platform
+import threading
 import warnings
 from queue import Empty
 from time import sleep
@@ -19,6 +21,11 @@ from ..imghelper.svg_helper import svg2img, PYQImageException
 from ..loghelper.flog import noLOG
 
 
+# The current directory is shared by all threads,
+# it is changed while a kernel starts.
+_working_dir_lock = threading.Lock()
+
+
 class NotebookError(Exception):
     """
     Raised when the execution fails.
@@ -95,7 +102,9 @@ class NotebookRunner(object):
                                     (`--KernelManager.autorestar=True` for example),
                                     see :ref:`l-ipython_notebook_args` for a full list
         @param      kernel          *kernel* is True by default, the notebook can be run, if False,
-                                    the notebook can be read but not run
+                                    the notebook can be read but not run, it can also be a tuple
+                                    *(kernel manager, kernel client)* returned by @see me detach_kernel,
+                                    the kernel is then restarted instead of creating a new one
         @param      filename        to add the notebook file if there is one in error messages
         @param      replacements    replacements to make in every cell before running it,
                                     dictionary ``{ string: string }``
@@ -108,8 +117,16 @@ class NotebookRunner(object):
 
         .. versionchanged:: 1.8
             Parameter *startup_timeout* was added.
+
+        .. versionchanged:: 1.9
+            Parameter *kernel* can be a running kernel.
         """
-        if kernel:
+        self.akc = None
+        self._loop = None
+        self.cell_stats = []
+        if isinstance(kernel, tuple):
+            self.km, self.kc = kernel
+        elif kernel:
             try:
                 from jupyter_client import KernelManager
             except ImportError:  # pragma: no cover
@@ -130,7 +147,8 @@ class NotebookRunner(object):
         self.init_args = dict(profile_dir=profile_dir, working_dir=working_dir,
                               comment=comment, fLOG=fLOG, theNotebook=theNotebook, code_init=code_init,
                               kernel_name="python", log_level="30", extended_args=None,
-                              kernel=kernel, filename=filename, replacements=replacements)
+                              kernel=True if isinstance(kernel, tuple) else kernel,
+                              filename=filename, replacements=replacements)
         args = []
 
         if profile_dir:
@@ -148,33 +166,39 @@ class NotebookRunner(object):
                         "every option should be assigned a value: " + opt)
                 args.append(opt)
 
-        if kernel:
-            cwd = os.getcwd()
-
-            if working_dir:
-                os.chdir(working_dir)
-
-            if self.km is not None:
-                try:
-                    with warnings.catch_warnings():
-                        warnings.filterwarnings(
-                            "ignore", category=ResourceWarning)
-                        self.km.start_kernel(extra_arguments=args)
-                except Exception as e:  # pragma: no cover
-                    raise Exception(
-                        "Failure with args: {0}\nand error:\n{1}".format(args, str(e))) from e
-
-                if platform.system() == 'Darwin':
-                    # see http://www.pypedia.com/index.php/notebook_runner
-                    # There is sometimes a race condition where the first
-                    # execute command hits the kernel before it's ready.
-                    # It appears to happen only on Darwin (Mac OS) and an
-                    # easy (but clumsy) way to mitigate it is to sleep
-                    # for a second.
-                    sleep(1)
-
-            if working_dir:
-                os.chdir(cwd)
+        if isinstance(kernel, tuple):
+            self.nb = nb
+            self.comment = comment
+            self.restart_kernel(working_dir=working_dir,
+                                startup_timeout=startup_timeout)
+        elif kernel:
+            with _working_dir_lock:
+                cwd = os.getcwd()
+
+                if working_dir:
+                    os.chdir(working_dir)
+
+                if self.km is not None:
+                    try:
+                        with warnings.catch_warnings():
+                            warnings.filterwarnings(
+                                "ignore", category=ResourceWarning)
+                            self.km.start_kernel(extra_arguments=args)
+                    except Exception as e:  # pragma: no cover
+                        raise Exception(
+                            "Failure with args: {0}\nand error:\n{1}".format(args, str(e))) from e
+
+                    if platform.system() == 'Darwin':
+                        # see http://www.pypedia.com/index.php/notebook_runner
+                        # There is sometimes a race condition where the first
+                        # execute command hits the kernel before it's ready.
+                        # It appears to happen only on Darwin (Mac OS) and an
+                        # easy (but clumsy) way to mitigate it is to sleep
+                        # for a second.
+                        sleep(1)
+
+                if working_dir:
+                    os.chdir(cwd)
 
             self.kc = self.km.client()
             self.kc.start_channels(stdin=False)
@@ -261,9 +285,62 @@ class NotebookRunner(object):
         if self.kc is None:
             raise ValueError(  # pragma: no cover
                 "No kernel was started, specify kernel=True when initializing the instance.")
+        self._close_async_client()
         self.kc.stop_channels()
         self.km.shutdown_kernel(now=True)
 
+    def restart_kernel(self, working_dir=None, startup_timeout=300):
+        """
+        Restarts the kernel, the variables are lost but it is faster
+        than starting a new kernel.
+
+        @param      working_dir     working directory of the new kernel
+        @param      startup_timeout wait for this long for the kernel to be ready
+
+        .. versionadded:: 1.9
+        """
+        self.fLOG('-- restart kernel')
+        if self.kc is None:
+            raise ValueError(  # pragma: no cover
+                "No kernel was started, specify kernel=True when initializing the instance.")
+        with _working_dir_lock:
+            # the kernel is restarted in the current directory
+            cwd = os.getcwd()
+            if working_dir:
+                os.chdir(working_dir)
+            try:
+                with warnings.catch_warnings():
+                    warnings.filterwarnings("ignore", category=ResourceWarning)
+                    self.km.restart_kernel(now=True)
+            finally:
+                if working_dir:
+                    os.chdir(cwd)
+        try:
+            self.kc.wait_for_ready(timeout=startup_timeout)
+        except RuntimeError as e:  # pragma: no cover
+            raise NotebookKernelError(
+                "Wait_for_ready fails after a restart (timeout={0}).".format(
+                    startup_timeout)) from e
+
+    def detach_kernel(self):
+        """
+        Returns the running kernel and removes it from this instance
+        so that another instance can reuse it (see parameter *kernel*
+        of the constructor). The kernel is not shut down.
+
+        @return         tuple *(kernel manager, kernel client)*
+
+        .. versionadded:: 1.9
+        """
+        if self.kc is None:
+            raise ValueError(  # pragma: no cover
+                "No kernel was started, specify kernel=True when initializing the instance.")
+        self._close_async_client()
+        res = self.km, self.kc
+        self.km = None
+        self.kc = None
+        return res
+
     def clean_code(self, code):
         """
         Cleans the code before running it, the function comment out
@@ -313,15 +390,15 @@ class NotebookRunner(object):
         except AttributeError:  # pragma: no cover
             return iscell, cell.input
 
-    def run_cell(self, index_cell, cell, clean_function=None):
-        '''
-        Runs a notebook cell and update the output of that cell inplace.
+    def _prepare_cell(self, index_cell, cell, clean_function=None):
+        """
+        Returns the code to run for a cell.
 
         @param      index_cell          index of the cell
         @param      cell                cell to execute
         @param      clean_function      cleaning function to apply to the code before running it
-        @return                         output of the cell
-        '''
+        @return                         tuple *(iscell, code)*
+        """
         if self.detailed_log:
             self.detailed_log("[run_cell] index_cell={0} clean_function={1}".format(
                 index_cell, clean_function))
@@ -340,14 +417,18 @@ class NotebookRunner(object):
             self.detailed_log(
                 '    cleaned code=\n                        {0}'.format(
                     "\n                        ".join(code.split("\n"))))
-        if len(code) == 0:
-            return ""
-        if self.kc is None:
+        if len(code) > 0 and self.kc is None:
             raise ValueError(  # pragma: no cover
                 "No kernel was started, specify kernel=True when initializing the instance.")
-        self.kc.execute(code)
+        return iscell, code
 
-        reply = self.kc.get_shell_msg()
+    def _reply_status(self, reply):
+        """
+        Extracts the status of a shell reply.
+
+        @param      reply       reply
+        @return                 tuple *(status, reason, traceback)*
+        """
         reason = None
         try:
             status = reply['content']['status']
@@ -371,84 +452,103 @@ class NotebookRunner(object):
         else:
             traceback_text = ''
             self.fLOG('-- cell returned')
+        return status, reason, traceback_text
 
-        outs = list()
-        nbissue = 0
-        while True:
-            try:
-                msg = self.kc.get_iopub_msg(timeout=1)
-                if msg['msg_type'] == 'status':
-                    if msg['content']['execution_state'] == 'idle':
-                        break
-            except Empty:  # pragma: no cover
-                # execution state should return to idle before the queue becomes empty,
-                # if it doesn't, something bad has happened
-                status = "error"
-                reason = "exception Empty was raised"
-                nbissue += 1
-                if nbissue > 10:
-                    # the notebook is empty
-                    return ""
-                else:
-                    continue
+    def _msg_to_output(self, msg, cell, iscell):
+        """
+        Converts an iopub message into an output.
 
-            content = msg['content']
-            msg_type = msg['msg_type']
-            if self.detailed_log:
-                self.detailed_log('    msg_type={0}'.format(msg_type))
+        @param      msg         message
+        @param      cell        cell being executed
+        @param      iscell      *cell* is a cell and not a string
+        @return                 output or None if the message does not produce any
+        """
+        content = msg['content']
+        msg_type = msg['msg_type']
+        if self.detailed_log:
+            self.detailed_log('    msg_type={0}'.format(msg_type))
 
-            out = NotebookNode(output_type=msg_type, metadata=dict())
+        out = NotebookNode(output_type=msg_type, metadata=dict())
 
-            if 'execution_count' in content:
-                if iscell:
-                    cell['execution_count'] = content['execution_count']
-                out.execution_count = content['execution_count']
+        if 'execution_count' in content:
+            if iscell:
+                cell['execution_count'] = content['execution_count']
+            out.execution_count = content['execution_count']
 
-            if msg_type in ('status', 'pyin', 'execute_input'):
-                continue
-
-            if msg_type == 'stream':
-                out.name = content['name']
-                # in msgspec 5, this is name, text
-                # in msgspec 4, this is name, data
-                if 'text' in content:
-                    out.text = content['text']
-                else:
-                    out.data = content['data']
+        if msg_type in ('status', 'pyin', 'execute_input'):
+            return None
 
-            elif msg_type in ('display_data', 'pyout', 'execute_result'):
+        if msg_type == 'stream':
+            out.name = content['name']
+            # in msgspec 5, this is name, text
+            # in msgspec 4, this is name, data
+            if 'text' in content:
+                out.text = content['text']
+            else:
                 out.data = content['data']
 
-            elif msg_type in ('pyerr', 'error'):
-                out.ename = content['ename']
-                out.evalue = content['evalue']
-                out.traceback = content['traceback']
-                out.name = 'stderr'
+        elif msg_type in ('display_data', 'pyout', 'execute_result'):
+            out.data = content['data']
 
-            elif msg_type == 'clear_output':
-                outs = list()
-                continue
+        elif msg_type in ('pyerr', 'error'):
+            out.ename = content['ename']
+            out.evalue = content['evalue']
+            out.traceback = content['traceback']
+            out.name = 'stderr'
 
-            elif msg_type in ('comm_open', 'comm_msg', 'comm_close'):
-                # widgets in a notebook
-                out.data = content["data"]
-                out.comm_id = content["comm_id"]
+        elif msg_type in ('comm_open', 'comm_msg', 'comm_close'):
+            # widgets in a notebook
+            out.data = content["data"]
+            out.comm_id = content["comm_id"]
 
-            else:
-                dcontent = "\n".join("{0}={1}".format(k, v)
-                                     for k, v in sorted(content.items()))
-                raise NotImplementedError(  # pragma: no cover
-                    "Unhandled iopub message: '{0}'\n--CONTENT--\n{1}".format(msg_type, dcontent))
+        else:
+            dcontent = "\n".join("{0}={1}".format(k, v)
+                                 for k, v in sorted(content.items()))
+            raise NotImplementedError(  # pragma: no cover
+                "Unhandled iopub message: '{0}'\n--CONTENT--\n{1}".format(msg_type, dcontent))
 
-            outs.append(out)
-            if self.detailed_log:
-                self.detailed_log('    out={0}'.format(type(out)))
-                if hasattr(out, "data"):
-                    self.detailed_log('    out={0}'.format(out.data))
+        if self.detailed_log:
+            self.detailed_log('    out={0}'.format(type(out)))
+            if hasattr(out, "data"):
+                self.detailed_log('    out={0}'.format(out.data))
+        return out
 
+    @staticmethod
+    def _output_size(out):
+        """
+        Returns the number of bytes of an output.
+        """
+        size = 0
+        values = list(out.data.values()) if hasattr(out, "data") and isinstance(
+            out.data, dict) else [getattr(out, "data", None)]
+        values.append(getattr(out, "text", None))
+        for v in values:
+            if v is None:
+                continue
+            if isinstance(v, list):
+                v = "".join(map(str, v))
+            if isinstance(v, str):
+                size += len(v.encode("utf-8"))
+            elif isinstance(v, bytes):
+                size += len(v)
+            else:
+                size += len(str(v))
+        return size
+
+    def _finalize_cell(self, index_cell, cell, iscell, code, reply, status,
+                       reason, traceback_text, outs, begin):
+        """
+        Stores the outputs in the cell, records the statistics
+        and raises an exception if the execution failed.
+        """
         if iscell:
             cell['outputs'] = outs
 
+        self.cell_stats.append(dict(
+            index_cell=index_cell, status=status, nboutputs=len(outs),
+            nbytes=sum(map(NotebookRunner._output_size, outs)),
+            time=time.perf_counter() - begin))
+
         raw = []
         for _ in outs:
             try:
@@ -497,6 +597,217 @@ class NotebookRunner(object):
             self.detailed_log('[run_cell] status={0}'.format(status))
         return outs
 
+    def run_cell(self, index_cell, cell, clean_function=None):
+        '''
+        Runs a notebook cell and update the output of that cell inplace.
+
+        @param      index_cell          index of the cell
+        @param      cell                cell to execute
+        @param      clean_function      cleaning function to apply to the code before running it
+        @return                         output of the cell
+
+        .. versionchanged:: 1.9
+            The execution time and the size of the outputs
+            are appended to attribute *cell_stats*.
+        '''
+        begin = time.perf_counter()
+        iscell, code = self._prepare_cell(index_cell, cell, clean_function)
+        if len(code) == 0:
+            return ""
+        self.kc.execute(code)
+
+        reply = self.kc.get_shell_msg()
+        status, reason, traceback_text = self._reply_status(reply)
+
+        outs = list()
+        nbissue = 0
+        while True:
+            try:
+                msg = self.kc.get_iopub_msg(timeout=1)
+                if msg['msg_type'] == 'status':
+                    if msg['content']['execution_state'] == 'idle':
+                        break
+            except Empty:  # pragma: no cover
+                # execution state should return to idle before the queue becomes empty,
+                # if it doesn't, something bad has happened
+                status = "error"
+                reason = "exception Empty was raised"
+                nbissue += 1
+                if nbissue > 10:
+                    # the notebook is empty
+                    return ""
+                else:
+                    continue
+
+            if msg['msg_type'] == 'clear_output':
+                outs = list()
+                continue
+
+            out = self._msg_to_output(msg, cell, iscell)
+            if out is not None:
+                outs.append(out)
+
+        return self._finalize_cell(index_cell, cell, iscell, code, reply, status,
+                                   reason, traceback_text, outs, begin)
+
+    def _async_client(self):
+        """
+        Returns a client based on :epkg:`asyncio` connected
+        to the kernel, it must be called from a coroutine.
+        """
+        if self.akc is None:
+            from jupyter_client.asynchronous import AsyncKernelClient
+            akc = AsyncKernelClient()
+            # the connection information must contain the key,
+            # the kernel rejects unsigned messages
+            akc.load_connection_info(self.km.get_connection_info())
+            akc.start_channels(stdin=False)
+            self.akc = akc
+        return self.akc
+
+    def _close_async_client(self):
+        """
+        Stops the client created by @see me run_cell_async.
+        """
+        if self.akc is not None:
+            self.akc.stop_channels()
+            self.akc = None
+        if self._loop is not None:
+            self._loop.close()
+            self._loop = None
+
+    async def run_cell_async(self, index_cell, cell, clean_function=None, timeout=3600):
+        '''
+        Runs a notebook cell and update the output of that cell inplace
+        like @see me run_cell. The function waits for the shell reply
+        and the iopub messages at the same time, the outputs are added
+        to the cell as soon as they are received. Consecutive
+        messages from the same stream are merged into one output.
+
+        @param      index_cell          index of the cell
+        @param      cell                cell to execute
+        @param      clean_function      cleaning function to apply to the code before running it
+        @param      timeout             maximum time (seconds) to wait for the kernel,
+                                        @see cl NotebookKernelError is raised after that
+        @return                         output of the cell
+
+        The instance uses a second client connected to the same kernel,
+        both methods should not be mixed to run the cells of a notebook.
+
+        .. versionadded:: 1.9
+        '''
+        begin = time.perf_counter()
+        iscell, code = self._prepare_cell(index_cell, cell, clean_function)
+        if len(code) == 0:
+            return ""
+        akc = self._async_client()
+        msg_id = akc.execute(code)
+        state = dict(reply=None, status=None, reason=None,
+                     traceback='', outs=[])
+
+        deadline = begin + timeout
+
+        def check_deadline():
+            if time.perf_counter() > deadline:
+                raise NotebookKernelError(
+                    "No reply from the kernel after {0} seconds for cell {1} in '{2}'.".format(
+                        timeout, index_cell, self._filename))
+
+        async def shell():
+            while True:
+                check_deadline()
+                try:
+                    reply = await akc.get_shell_msg(
+                        timeout=max(deadline - time.perf_counter(), 0.01))
+                except Empty:
+                    check_deadline()
+                    continue
+                if reply['parent_header'].get('msg_id') == msg_id:
+                    state['reply'] = reply
+                    state['status'], state['reason'], state['traceback'] = \
+                        self._reply_status(reply)
+                    return
+
+        def flush_stream(stream):
+            if stream is not None:
+                stream[0].text = "".join(stream[1])
+
+        async def iopub():
+            outs = state['outs']
+            stream = None
+            nbissue = 0
+            while True:
+                try:
+                    msg = await akc.get_iopub_msg(timeout=1)
+                except Empty:  # pragma: no cover
+                    if state['reply'] is None:
+                        # the cell is still running
+                        check_deadline()
+                        continue
+                    # execution state should return to idle before the queue becomes empty,
+                    # if it doesn't, something bad has happened
+                    state['status'] = "error"
+                    state['reason'] = "exception Empty was raised"
+                    nbissue += 1
+                    if nbissue > 10:
+                        flush_stream(stream)
+                        return False
+                    continue
+                if msg['parent_header'].get('msg_id') != msg_id:
+                    continue
+                msg_type = msg['msg_type']
+                if msg_type == 'status':
+                    if msg['content']['execution_state'] == 'idle':
+                        break
+                    continue
+                if msg_type == 'clear_output':
+                    flush_stream(stream)
+                    stream = None
+                    del outs[:]
+                    continue
+
+                content = msg['content']
+                if (msg_type == 'stream' and stream is not None and
+                        'text' in content and stream[0].name == content['name']):
+                    # the text is joined only once
+                    stream[1].append(content['text'])
+                    continue
+
+                out = self._msg_to_output(msg, cell, iscell)
+                if out is None:
+                    continue
+                flush_stream(stream)
+                stream = ([out, [out.text]] if msg_type == 'stream' and
+                          hasattr(out, 'text') else None)
+                outs.append(out)
+                if iscell:
+                    cell['outputs'] = outs
+            flush_stream(stream)
+            return True
+
+        tasks = [asyncio.ensure_future(shell()), asyncio.ensure_future(iopub())]
+        try:
+            completed = (await asyncio.gather(*tasks))[1]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        if not completed:
+            return ""  # pragma: no cover
+        return self._finalize_cell(index_cell, cell, iscell, code, state['reply'],
+                                   state['status'], state['reason'],
+                                   state['traceback'], state['outs'], begin)
+
+    def _run_cell_in_loop(self, index_cell, cell, clean_function=None, timeout=3600):
+        """
+        Runs @see me run_cell_async in an event loop owned by the instance.
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(
+            self.run_cell_async(index_cell, cell, clean_function=clean_function,
+                                timeout=timeout))
+
     def to_python(self):
         """
         Converts the notebook into python.
@@ -903,7 +1214,7 @@ class NotebookRunner(object):
 
     def run_notebook(self, skip_exceptions=False, progress_callback=None,
                      additional_path=None, valid=None, clean_function=None,
-                     context=None):
+                     context=None, asynchronous=False):
         '''
         Runs all the cells of a notebook in order and update
         the outputs in-place.
@@ -919,13 +1230,19 @@ class NotebookRunner(object):
                                         returns None, the execution of the notebooks and skip the execution
                                         of the other cells
         @param      clean_function      function which cleans a cell's code before executing it (None for None)
+        @param      asynchronous        runs the cells with @see me run_cell_async
         @return                         dictionary with statistics
 
         The function adds the local variable ``theNotebook`` with
         the absolute file name of the notebook.
         Function *valid* can return *None* to stop the execution of the notebook
-        before this cell.
+        before this cell. Attribute *cell_stats* contains the execution time
+        and the size of the outputs of every executed cell.
+
+        .. versionchanged:: 1.9
+            Parameter *asynchronous* was added.
         '''
+        run_cell = self._run_cell_in_loop if asynchronous else self.run_cell
         if self.detailed_log:
             self.detailed_log(
                 "[run_notebook] Starting execution of '{0}'".format(self._filename))
@@ -938,16 +1255,16 @@ class NotebookRunner(object):
             for p in additional_path:
                 code.append("sys.path.append(r'{0}')".format(p))
             cell = "\n".join(code)
-            self.run_cell(-1, cell)
+            run_cell(-1, cell)
 
         # we add local variable theNotebook
         if self.theNotebook is not None:
             cell = "theNotebook = r'''{0}'''".format(self.theNotebook)
-            self.run_cell(-1, cell)
+            run_cell(-1, cell)
 
         # initialisation with a code not inside the notebook
         if self.code_init is not None:
-            self.run_cell(-1, self.code_init)
+            run_cell(-1, self.code_init)
 
         # execution of the notebook
         nbcell = 0
@@ -965,7 +1282,7 @@ class NotebookRunner(object):
                     continue
             try:
                 nbrun += 1
-                self.run_cell(i, cell, clean_function=clean_function)
+                run_cell(i, cell, clean_function=clean_function)
                 nbnerr += 1
             except Empty as er:
                 raise RuntimeError(  # pragma: no cover
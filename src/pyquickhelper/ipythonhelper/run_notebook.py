@@ -6,9 +6,11 @@ import time
 import os
 import warnings
 import re
+import threading
 from io import StringIO
 import urllib.request as urllib_request
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 from ..loghelper.flog import noLOG
 from ..filehelper import explore_folder
@@ -63,12 +65,92 @@ def _cache_url_to_file(cache_urls, folder, fLOG=noLOG):
     return res
 
 
+class NotebookKernelPool:
+    """
+    Keeps the kernels started by @see fn run_notebook
+    to restart them instead of starting new ones
+    (see method *restart_kernel* of @see cl NotebookRunner).
+    A kernel runs one notebook at a time, every notebook
+    starts with a fresh kernel.
+
+    .. versionadded:: 1.9
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.reused = 0
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Returns the number of unused kernels.
+        """
+        with self._lock:
+            return sum(map(len, self._idle.values()))
+
+    @staticmethod
+    def make_key(kernel_name="python", profile_dir=None, log_level="30",
+                 extended_args=None):
+        """
+        Builds the key identifying a kernel,
+        parameters are the parameters of @see fn run_notebook.
+        """
+        return (kernel_name, profile_dir, log_level,
+                tuple(extended_args) if extended_args else None)
+
+    def acquire(self, key):
+        """
+        Returns an unused kernel *(kernel manager, kernel client)*
+        or True if a new kernel must be started.
+        """
+        with self._lock:
+            kernels = self._idle.get(key, None)
+            if kernels:
+                self.reused += 1
+                return kernels.pop()
+            self.created += 1
+            return True
+
+    def release(self, key, kernel):
+        """
+        Gives back a kernel returned by method *detach_kernel*
+        of @see cl NotebookRunner.
+        """
+        with self._lock:
+            self._idle.setdefault(key, []).append(kernel)
+
+    @staticmethod
+    def discard(kernel):
+        """
+        Shuts down a kernel *(kernel manager, kernel client)*.
+        """
+        km, kc = kernel
+        try:
+            kc.stop_channels()
+            km.shutdown_kernel(now=True)
+        except Exception:  # pragma: no cover
+            # the kernel is already dead
+            pass
+
+    def shutdown(self):
+        """
+        Shuts down every unused kernel.
+        """
+        with self._lock:
+            kernels = [k for v in self._idle.values() for k in v]
+            self._idle.clear()
+        for kernel in kernels:
+            self.discard(kernel)
+
+
 def run_notebook(filename, profile_dir=None, working_dir=None, skip_exceptions=False,
                  outfilename=None, encoding="utf8", additional_path=None,
                  valid=None, clean_function=None, code_init=None,
                  fLOG=noLOG, kernel_name="python", log_level="30",
                  extended_args=None, cache_urls=None, replacements=None,
-                 detailed_log=None, startup_timeout=300):
+                 detailed_log=None, startup_timeout=300, kernel_pool=None,
+                 asynchronous=False):
     """
     Runs a notebook end to end,
     it is inspired from module `runipy <https://github.com/paulgb/runipy/>`_.
@@ -98,6 +180,11 @@ def run_notebook(filename, profile_dir=None, working_dir=None, skip_exceptions=F
     @param      startup_timeout     wait for this long for the kernel to be ready,
                                     see `wait_for_ready
                                     <https://github.com/jupyter/jupyter_client/blob/master/jupyter_client/blocking/client.py#L84>`_
+    @param      kernel_pool         None or @see cl NotebookKernelPool, the kernel is taken from the pool
+                                    and restarted if one is available, it is given back to the pool
+                                    instead of being shut down
+    @param      asynchronous        runs the cells with method *run_cell_async*
+                                    of @see cl NotebookRunner
     @return                         tuple (statistics, output)
 
     @warning The function calls `basicConfig
@@ -123,6 +210,9 @@ def run_notebook(filename, profile_dir=None, working_dir=None, skip_exceptions=F
 
     .. versionchanged:: 1.8
         Parameters *detailed_log*, *startup_timeout* were added.
+
+    .. versionchanged:: 1.9
+        Parameters *kernel_pool*, *asynchronous* were added.
     """
     cached_rep = _cache_url_to_file(cache_urls, working_dir, fLOG=fLOG)
     if replacements is None:
@@ -154,14 +244,24 @@ def run_notebook(filename, profile_dir=None, working_dir=None, skip_exceptions=F
         out.write("\n")
         fLOG(*args, **kwargs)
 
+    if kernel_pool is None:
+        kernel = True
+    else:
+        key = NotebookKernelPool.make_key(kernel_name=kernel_name, profile_dir=profile_dir,
+                                          log_level=log_level, extended_args=extended_args)
+        kernel = kernel_pool.acquire(key)
+
     try:
         nb_runner = NotebookRunner(nb, profile_dir, working_dir, fLOG=flogging, filename=filename,
                                    theNotebook=os.path.abspath(filename),
                                    code_init=code_init, log_level=log_level,
                                    extended_args=extended_args, kernel_name=kernel_name,
-                                   replacements=cached_rep, kernel=True, detailed_log=detailed_log,
+                                   replacements=cached_rep, kernel=kernel, detailed_log=detailed_log,
                                    startup_timeout=startup_timeout)
     except NotebookKernelError:  # pragma: no cover
+        if isinstance(kernel, tuple):
+            # The kernel could not be restarted.
+            NotebookKernelPool.discard(kernel)
         # It fails. We try again once.
         nb_runner = NotebookRunner(nb, profile_dir, working_dir, fLOG=flogging, filename=filename,
                                    theNotebook=os.path.abspath(filename),
@@ -172,7 +272,8 @@ def run_notebook(filename, profile_dir=None, working_dir=None, skip_exceptions=F
 
     try:
         stat = nb_runner.run_notebook(skip_exceptions=skip_exceptions, additional_path=additional_path,
-                                      valid=valid, clean_function=clean_function)
+                                      valid=valid, clean_function=clean_function,
+                                      asynchronous=asynchronous)
 
         if outfilename is not None:
             with open(outfilename, 'w', encoding=encoding) as f:
@@ -186,7 +287,10 @@ def run_notebook(filename, profile_dir=None, working_dir=None, skip_exceptions=F
                 f.write(s)
 
     finally:
-        nb_runner.shutdown_kernel()
+        if kernel_pool is None:
+            nb_runner.shutdown_kernel()
+        else:
+            kernel_pool.release(key, nb_runner.detach_kernel())
 
     return stat, out.getvalue()
 
@@ -194,7 +298,8 @@ def run_notebook(filename, profile_dir=None, working_dir=None, skip_exceptions=F
 def execute_notebook_list(folder, notebooks, clean_function=None, valid=None, fLOG=noLOG,
                           additional_path=None, deepfLOG=noLOG, kernel_name="python",
                           log_level="30", extended_args=None, cache_urls=None,
-                          replacements=None, detailed_log=None, startup_timeout=300):
+                          replacements=None, detailed_log=None, startup_timeout=300,
+                          n_jobs=None, reuse_kernel=False, dump=None):
     """
     Executes a list of notebooks.
 
@@ -218,6 +323,13 @@ def execute_notebook_list(folder, notebooks, clean_function=None, valid=None, fL
     @param      startup_timeout     wait for this long for the kernel to be ready,
                                     see `wait_for_ready
                                     <https://github.com/jupyter/jupyter_client/blob/master/jupyter_client/blocking/client.py#L84>`_
+    @param      n_jobs              number of notebooks executed at the same time,
+                                    every notebook runs in its own kernel
+    @param      reuse_kernel        restarts a kernel used by a previous notebook
+                                    instead of starting a new one
+    @param      dump                dump created by @see fn execute_notebook_list_finalize_ut
+                                    (a filename or a module), if *n_jobs > 1*, the longest notebooks
+                                    based on the previous execution times start first
     @return                         dictionary of dictionaries ``{ notebook_name: {  } }``
 
     If *isSuccess* is False, *statistics* contains the execution time, *output* is the exception
@@ -240,6 +352,9 @@ def execute_notebook_list(folder, notebooks, clean_function=None, valid=None, fL
 
     .. versionchanged:: 1.8
         Parameters *detailed_log*, *startup_timeout* were added.
+
+    .. versionchanged:: 1.9
+        Parameters *n_jobs*, *reuse_kernel*, *dump* were added.
     """
     if additional_path is None:
         additional_path = []
@@ -247,12 +362,18 @@ def execute_notebook_list(folder, notebooks, clean_function=None, valid=None, fL
     # we cache urls before running through the list of notebooks
     _cache_url_to_file(cache_urls, folder, fLOG=fLOG)
 
-    results = {}
-    for i, note in enumerate(notebooks):
-        if isinstance(note, tuple):
-            note, code_init = note
-        else:
-            code_init = None
+    notebooks = [note if isinstance(note, tuple) else (note, None)
+                 for note in notebooks]
+    order = list(range(len(notebooks)))
+    if n_jobs is not None and n_jobs > 1:
+        # the longest notebooks first, the unknown ones are assumed to be long
+        etimes = _past_execution_times(dump)
+        order.sort(key=lambda i: -etimes.get(
+            os.path.split(notebooks[i][0])[-1], float('inf')))
+    kernel_pool = NotebookKernelPool() if reuse_kernel else None
+
+    def run_one(i):
+        note, code_init = notebooks[i]
         fLOG("[execute_notebook_list] {0}/{1} - {2}".format(i + 1,
                                                             len(notebooks), os.path.split(note)[-1]))
         outfile = os.path.join(folder, "out_" + os.path.split(note)[-1])
@@ -264,20 +385,66 @@ def execute_notebook_list(folder, notebooks, clean_function=None, valid=None, fL
                                      code_init=code_init, kernel_name=kernel_name,
                                      log_level=log_level, extended_args=extended_args,
                                      cache_urls=cache_urls, replacements=replacements,
-                                     detailed_log=detailed_log, startup_timeout=startup_timeout)
+                                     detailed_log=detailed_log, startup_timeout=startup_timeout,
+                                     kernel_pool=kernel_pool)
             if not os.path.exists(outfile):
                 raise FileNotFoundError(outfile)  # pragma: no cover
             etime = time.perf_counter() - cl
-            results[note] = dict(success=True, output=out, name=note, etime=etime,
-                                 date=datetime.now())
-            results[note].update(stat)
+            res = dict(success=True, output=out, name=note, etime=etime,
+                       date=datetime.now())
+            res.update(stat)
         except Exception as e:
             etime = time.perf_counter() - cl
-            results[note] = dict(success=False, etime=etime, error=e, name=note,
-                                 date=datetime.now())
+            res = dict(success=False, etime=etime, error=e, name=note,
+                       date=datetime.now())
+        return res
+
+    try:
+        if n_jobs is None or n_jobs <= 1:
+            outputs = [run_one(i) for i in order]
+        else:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                outputs = list(executor.map(run_one, order))
+    finally:
+        if kernel_pool is not None:
+            kernel_pool.shutdown()
+
+    # the results follow the order of the notebooks
+    results = {}
+    for _, res in sorted(zip(order, outputs), key=lambda x: x[0]):
+        results[res["name"]] = res
     return results
 
 
+def _past_execution_times(dump):
+    """
+    Retrieves the execution times stored by
+    @see fn execute_notebook_list_finalize_ut.
+
+    @param      dump    location of the dump or module
+    @return             dictionary ``{ notebook filename without folder: last execution time }``
+    """
+    dump = _get_dump_default_path(dump)
+    if dump is None:
+        return {}
+    try:
+        df = _existing_dump(dump)
+    except (ImportError, RuntimeError):  # pragma: no cover
+        return {}
+    if df is None or "name" not in df.columns or "etime" not in df.columns:
+        return {}
+    res = {}
+    for name, etime in zip(df["name"], df["etime"]):
+        try:
+            etime = float(etime)
+        except (TypeError, ValueError):  # pragma: no cover
+            continue
+        if isinstance(name, str) and etime == etime:
+            # the last execution wins, the dump may come from another platform
+            res[os.path.split(name.replace("\\", "/"))[-1]] = etime
+    return res
+
+
 def _get_dump_default_path(dump):
     """
     Proposes a default location to dump results about notebooks execution.
@@ -2,5 +2,12 @@
 shortcuts to jenkinshelper
 """
 
-from .jenkins_server import JenkinsExt, JenkinsExtException
-from .jenkins_helper import default_engines, default_jenkins_jobs, setup_jenkins_server_yml
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'JenkinsExt': '.jenkins_server',
+    'JenkinsExtException': '.jenkins_server',
+    'default_engines': '.jenkins_helper',
+    'default_jenkins_jobs': '.jenkins_helper',
+    'setup_jenkins_server_yml': '.jenkins_helper',
+})
@@ -2,22 +2,40 @@
 @file
 @brief Shortcuts to loghelper functions
 """
-from .buffered_flog import BufferedPrint
-from .convert_helper import str2datetime, timestamp_to_datetime
-from .custom_log import CustomLog
-from .flog import fLOG, noLOG, fLOGFormat, PQHException, download, unzip, removedirs
-from .os_helper import get_machine, get_user
-from .process_helper import reap_children
-from .pypi_helper import enumerate_pypi_versions_date
-from .pyrepo_helper import SourceRepository
-from .repositories.pygit_helper import clone as git_clone
-from .run_cmd import run_cmd, decode_outerr, run_script, RunCmdException
-from .url_helper import get_url_content
-from .sys_helper import sys_path_append, python_path_append
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'BufferedPrint': '.buffered_flog',
+    'str2datetime': '.convert_helper',
+    'timestamp_to_datetime': '.convert_helper',
+    'CustomLog': '.custom_log',
+    'fLOG': '.flog',
+    'noLOG': '.flog',
+    'fLOGFormat': '.flog',
+    'PQHException': '.flog',
+    'download': '.flog',
+    'unzip': '.flog',
+    'removedirs': '.flog',
+    'get_machine': '.os_helper',
+    'get_user': '.os_helper',
+    'reap_children': '.process_helper',
+    'enumerate_pypi_versions_date': '.pypi_helper',
+    'SourceRepository': '.pyrepo_helper',
+    'git_clone': ('.repositories.pygit_helper', 'clone'),
+    'run_cmd': '.run_cmd',
+    'run_cmd_async': '.run_cmd',
+    'decode_outerr': '.run_cmd',
+    'run_script': '.run_cmd',
+    'RunCmdException': '.run_cmd',
+    'get_url_content': '.url_helper',
+    'sys_path_append': '.sys_helper',
+    'python_path_append': '.sys_helper',
+})
 
 
 def check_log():
     """
     check function noLOG
     """
+    from .flog import noLOG
     noLOG("try", 5, param=6)
@@ -0,0 +1,248 @@
+"""
+@file
+@brief Index of the last modification of every file in a :epkg:`git`
+repository built with a single ``git log`` command.
+"""
+import os
+import sys
+import threading
+from bisect import bisect_left
+from .pygit_helper import get_cmd_git, GitException, RepoFile
+from ..flog import run_cmd
+
+
+def find_git_root(path):
+    """
+    Returns the root of the repository containing *path*
+    by looking for folder (or file) ``.git`` in the parent folders,
+    None if there is none.
+
+    @param      path        file or folder
+    @return                 folder or None
+    """
+    path = os.path.realpath(os.path.abspath(path))
+    if not os.path.isdir(path):
+        path = os.path.dirname(path)
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _read_git_head(root):
+    """
+    Reads the commit *HEAD* points to without running :epkg:`git`,
+    returns None if it cannot be found (worktrees, unusual layouts).
+    """
+    gitdir = os.path.join(root, ".git")
+    if not os.path.isdir(gitdir):
+        return None
+    try:
+        with open(os.path.join(gitdir, "HEAD"), "r", encoding="utf-8") as f:
+            head = f.read().strip()
+        if not head.startswith("ref:"):
+            return head
+        ref = head[4:].strip()
+        name = os.path.join(gitdir, *ref.split("/"))
+        if os.path.exists(name):
+            with open(name, "r", encoding="utf-8") as f:
+                return f.read().strip()
+        with open(os.path.join(gitdir, "packed-refs"), "r", encoding="utf-8") as f:
+            for line in f:
+                spl = line.strip().split(" ")
+                if len(spl) == 2 and spl[1] == ref:
+                    return spl[0]
+    except OSError:  # pragma: no cover
+        return None
+    return None
+
+
+class GitMetadataIndex:
+    """
+    Stores the last commit, author and date of modification
+    of every file of a :epkg:`git` repository. The index is built
+    with one command ``git log --name-only`` instead of
+    one command per file and it is updated from the last
+    indexed commit when the repository changes
+    (see @see me refresh). It also stores the list of files in
+    *HEAD* to replace @see fn repo_ls.
+
+    .. exref::
+        :title: Last modification of many files
+
+        ::
+
+            from pyquickhelper.loghelper.repositories.git_index import get_git_index
+
+            index = get_git_index("README.rst")
+            for name in ["README.rst", "setup.py"]:
+                print(name, index.last_modification(name))
+    """
+
+    def __init__(self, root):
+        """
+        @param      root        root of the repository
+        """
+        self.root = os.path.realpath(os.path.abspath(root))
+        self.head = None
+        self.nb_commands = 0
+        self._seq = 0
+        self._files = {}
+        self._tracked = []
+        self._lock = threading.Lock()
+
+    def _git(self, args):
+        cmd = get_cmd_git() + " -c core.quotepath=off " + args
+        out, err = run_cmd(cmd, wait=True, encerror="strict", encoding="utf8",
+                           change_path=self.root, log_error=False,
+                           shell=sys.platform.startswith("win32"))
+        self.nb_commands += 1
+        if len(err) > 0:
+            raise GitException(
+                "Unable to run git in '{0}'\n[giterror]\n{1}\nCMD:\n{2}".format(
+                    self.root, err, cmd))
+        return out
+
+    def _current_head(self):
+        head = _read_git_head(self.root)
+        if head is None:
+            head = self._git("rev-parse HEAD").strip()
+        return head
+
+    def _index_log(self, revisions):
+        out = self._git(
+            "log --name-only --format=%x01%H%x02%an%x02%ad " + revisions)
+        commits = []
+        for chunk in out.split("\x01"):
+            lines = chunk.split("\n")
+            header = lines[0].split("\x02")
+            if len(header) != 3:
+                continue
+            files = [line.strip() for line in lines[1:] if line.strip()]
+            commits.append((header, files))
+        # git returns the most recent commits first
+        for (commit, author, date), files in reversed(commits):
+            self._seq += 1
+            for name in files:
+                self._files[name] = (self._seq, date, author, commit)
+
+    def refresh(self):
+        """
+        Updates the index if *HEAD* changed, only the new commits
+        are read unless the history was rewritten.
+
+        @return     True if the index was updated
+        """
+        with self._lock:
+            head = self._current_head()
+            if head == self.head:
+                return False
+            if self.head is not None:
+                base = None
+                try:
+                    base = self._git(
+                        "merge-base {0} {1}".format(self.head, head)).strip()
+                except GitException:
+                    # the previous commit does not exist anymore
+                    pass
+                if base == self.head:
+                    self._index_log("{0}..{1}".format(self.head, head))
+                else:
+                    self._files = {}
+                    self._index_log(head)
+            else:
+                self._index_log(head)
+            tracked = self._git("ls-tree -r --name-only HEAD")
+            self._tracked = sorted(
+                line.strip() for line in tracked.split("\n") if line.strip())
+            self.head = head
+            return True
+
+    def _relpath(self, path):
+        full = os.path.realpath(os.path.abspath(path))
+        rel = os.path.relpath(full, self.root).replace("\\", "/")
+        if rel == ".":
+            return ""
+        if rel.startswith(".."):
+            raise GitException(
+                "'{0}' is not in repository '{1}'.".format(path, self.root))
+        return rel
+
+    def get(self, path):
+        """
+        Returns the last commit modifying a file or a folder.
+
+        @param      path        file or folder
+        @return                 dictionary ``{'date', 'author', 'commit'}``
+                                or None if the file was never committed
+        """
+        rel = self._relpath(path)
+        if rel in self._files:
+            best = self._files[rel]
+        else:
+            prefix = rel + "/" if rel else ""
+            best = None
+            for name, value in self._files.items():
+                if name.startswith(prefix) and (best is None or value[0] > best[0]):
+                    best = value
+        if best is None:
+            return None
+        return dict(date=best[1], author=best[2], commit=best[3])
+
+    def last_modification(self, path):
+        """
+        Returns the date of the last modification of a file
+        in the same format as @see fn get_file_last_modification.
+
+        @param      path        file or folder
+        @return                 string (empty if the file was never committed)
+        """
+        res = self.get(path)
+        return "" if res is None else res["date"]
+
+    def ls(self, path):
+        """
+        Returns the files in *HEAD* below a folder,
+        it returns the same results as @see fn repo_ls.
+
+        @param      path        folder
+        @return                 list of @see cl RepoFile
+        """
+        rel = self._relpath(path)
+        prefix = rel + "/" if rel else ""
+        pos = bisect_left(self._tracked, prefix)
+        res = []
+        while pos < len(self._tracked) and self._tracked[pos].startswith(prefix):
+            name = self._tracked[pos][len(prefix):]
+            res.append(RepoFile(name=os.path.join(path, name)))
+            pos += 1
+        return res
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_git_index(path, refresh=True):
+    """
+    Returns the index of the repository containing *path*,
+    the same instance is shared by every caller.
+
+    @param      path        file or folder in the repository
+    @param      refresh     updates the index if the repository changed
+    @return                 @see cl GitMetadataIndex
+    """
+    root = find_git_root(path)
+    if root is None:
+        raise GitException(
+            "Unable to find a git repository for '{0}'.".format(path))
+    with _indexes_lock:
+        if root not in _indexes:
+            _indexes[root] = GitMetadataIndex(root)
+        index = _indexes[root]
+    if refresh:
+        index.refresh()
+    return index
@@ -4,9 +4,12 @@
 @brief  Uses git to get version number.
 """
 
+import io
 import os
 import sys
 import datetime
+import subprocess
+import tempfile
 import warnings
 import xml.etree.ElementTree as ET
 import re
@@ -138,14 +141,22 @@ def get_cmd_git():
     return cmd
 
 
-def repo_ls(full, commandline=True):
+def repo_ls(full, commandline=True, index=False):
     """
     Runs ``ls`` on a path.
 
     @param      full            full path
-    @param      commandline use command line instead of pysvn
+    @param      commandline     use command line instead of pysvn
+    @param      index           uses the index shared by all calls (see @see cl GitMetadataIndex)
+                                instead of running :epkg:`git`
     @return                     output of client.ls
+
+    .. versionchanged:: 1.9
+        Parameter *index* was added.
     """
+    if index:
+        from .git_index import get_git_index
+        return get_git_index(full).ls(full)
 
     if not commandline:  # pragma: no cover
         try:
@@ -560,6 +571,159 @@ def get_repo_log(path=None, file_detail=False, commandline=True, subset=None):
         return res
 
 
+def _iter_git_log_lines(path, args, since=None, paths=None):
+    """
+    Runs ``git log`` and returns the lines of the standard output
+    as soon as :epkg:`git` produces them.
+
+    @param      path        path to the repository
+    @param      args        additional arguments (list)
+    @param      since       None, a string or a datetime (``--since``)
+    @param      paths       None or a list of paths to restrict the log to
+    @return                 iterator on lines
+    """
+    if path is None:
+        path = os.path.normpath(
+            os.path.abspath(os.path.join(os.path.split(__file__)[0], "..", "..", "..")))
+    cmd = [get_cmd_git().strip('"'), "-c", "core.quotepath=off",
+           "--no-pager", "log"] + list(args)
+    if since is not None:
+        if isinstance(since, (datetime.datetime, datetime.date)):
+            since = since.isoformat()
+        cmd.append("--since=" + str(since))
+    cmd.append("--")
+    if paths:
+        cmd.extend(paths)
+
+    with tempfile.TemporaryFile() as ferr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=ferr,
+                                cwd=os.path.split(path)[0] if os.path.isfile(path) else path)
+        try:
+            with io.TextIOWrapper(proc.stdout, encoding="utf-8", errors="replace") as stdout:
+                for line in stdout:
+                    yield line.rstrip("\r\n")
+            code = proc.wait()
+        finally:
+            if proc.poll() is None:
+                # the caller stopped the iteration
+                proc.kill()
+                proc.wait()
+        if code != 0:
+            ferr.seek(0)
+            err = ferr.read().decode("utf-8", errors="replace")
+            raise GitException(
+                "Problem with '{0}'\n[giterror]\n{1}\nCMD:\n{2}".format(
+                    path, err, " ".join(cmd)))
+
+
+def _parse_stat_line(line):
+    """
+    Parses a line produced by ``git log --stat``,
+    returns None or a tuple *(name, net, bytes)*.
+    """
+    r1 = _reg_stat_net.search(line)
+    if r1:
+        return r1.groups()[0].strip(), int(r1.groups()[1]), 0
+    r2 = _reg_stat_bytes.search(line)
+    if r2:
+        return r2.groups()[0].strip(), 0, int(r2.groups()[2]) - int(r2.groups()[1])
+    return None
+
+
+def iter_file_details_all(path=None, since=None, paths=None):
+    """
+    Returns the same information as @see fn get_file_details_all
+    but reads the output of :epkg:`git` line by line
+    and yields the results while :epkg:`git` is running.
+
+    @param      path            path to repo
+    @param      since           only commits more recent than this date
+                                (a string :epkg:`git` understands or a datetime)
+    @param      paths           None or a list of paths to restrict the log to
+    @return                     iterator on tuple *(commit, name, net, bytes)*
+
+    .. versionadded:: 1.9
+    """
+    com = None
+    for line in _iter_git_log_lines(path, ["--stat=1000,900", "--format=commit %H"],
+                                    since=since, paths=paths):
+        if line.startswith("commit "):
+            com = line.split()[1]
+            continue
+        if com is None:
+            continue
+        r = _parse_stat_line(line)
+        if r is not None:
+            yield (com,) + r
+
+
+def iter_repo_log(path=None, file_detail=False, since=None, paths=None):
+    """
+    Returns the same information as @see fn get_repo_log
+    but reads the output of :epkg:`git` line by line
+    and yields the commits while :epkg:`git` is running,
+    the memory does not depend on the size of the history.
+
+    @param      path            path to look
+    @param      file_detail     if True, yields one row per modified file,
+                                the row ends with *(name, net, bytes)* like
+                                @see fn iter_file_details_all
+    @param      since           only commits more recent than this date
+                                (a string :epkg:`git` understands or a datetime)
+    @param      paths           None or a list of paths to restrict the log to
+    @return                     iterator on lists
+                                *[author, commit hash [:6], date, comment, full commit hash, link]*
+
+    .. exref::
+        :title: Browse the history of a big repository
+
+        ::
+
+            from pyquickhelper.loghelper.repositories.pygit_helper import iter_repo_log
+
+            for row in iter_repo_log(".", since="2 weeks ago", paths=["src"]):
+                print(row[2], row[0], row[3])
+
+    .. versionadded:: 1.9
+    """
+    try:
+        master = get_master_location(path)
+        if master.endswith(".git"):
+            master = master[:-4]
+    except (GitException, IndexError):
+        # no remote
+        master = ""
+
+    def make_row(header):
+        revision, author, sdate, hash, msg = header
+        row = [author.strip(), revision.strip(),
+               my_date_conversion(sdate.strip()), msg.strip() or "-", hash]
+        if master.startswith("http"):
+            row.append(master + "/commit/" + hash)
+        else:
+            row.append("{0}//{1}".format(master, hash))
+        return row
+
+    args = ["--format=%x01%h%x02%an%x02%ci%x02%H%x02%s"]
+    if file_detail:
+        args.insert(0, "--stat=1000,900")
+    row = None
+    for line in _iter_git_log_lines(path, args, since=since, paths=paths):
+        if line.startswith("\x01"):
+            header = line[1:].split("\x02")
+            if len(header) != 5:
+                raise GitException(  # pragma: no cover
+                    "Unable to parse '{0}'.".format(line))
+            row = make_row(header)
+            if not file_detail:
+                yield row
+            continue
+        if file_detail and row is not None:
+            r = _parse_stat_line(line)
+            if r is not None:
+                yield tuple(row) + r
+
+
 def get_repo_version(path=None, commandline=True, usedate=False, log=False):
     """
     Gets the latest check for a specific path or version number
@@ -719,18 +883,27 @@ def get_nb_commits(path=None, commandline=True):
         return nb
 
 
-def get_file_last_modification(path, commandline=True):
+def get_file_last_modification(path, commandline=True, index=False):
     """
     Returns the last modification of a file.
 
     @param      path            path to look
     @param      commandline     if True, use the command line to get the version number, otherwise it uses pysvn
+    @param      index           uses the index shared by all calls (see @see cl GitMetadataIndex)
+                                instead of running :epkg:`git` for every file
     @return                     integer
+
+    .. versionchanged:: 1.9
+        Parameter *index* was added.
     """
     if path is None:
         path = os.path.normpath(
             os.path.abspath(os.path.join(os.path.split(__file__)[0], "..", "..", "..")))
 
+    if index:
+        from .git_index import get_git_index
+        return get_git_index(path).last_modification(path)
+
     if not commandline:  # pragma: no cover
         try:
             raise NotImplementedError()
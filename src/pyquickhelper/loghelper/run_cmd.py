@@ -11,6 +11,7 @@ import threading
 import warnings
 import re
 import queue
+import selectors
 from .flog_fake_classes import PQHException
 
 
@@ -154,6 +155,12 @@ def run_cmd(cmd, sin="", shell=sys.platform.startswith("win"), wait=False, log_e
     If *wait* is False, the function returns the started process.
     ``__exit__`` should be called if wait if False.
     Parameter *prefix_log* was added.
+
+    .. versionchanged:: 1.9
+        When *communicate* is False, both pipes are read with a selector
+        (threads on :epkg:`Windows`) which waits for the next line
+        instead of checking the output every 50 ms.
+        See @see fn run_cmd_async to run commands with :epkg:`asyncio`.
     """
     if prefix_log is None:
         prefix_log = ""
@@ -242,58 +249,49 @@ def run_cmd(cmd, sin="", shell=sys.platform.startswith("win"), wait=False, log_e
 
             begin = time.perf_counter()
             last_update = begin
-            # with threads
-            (stdoutReader, stdoutQueue) = _AsyncLineReader.getForFd(
-                stdout, catch_exit=catch_exit)
-            (stderrReader, stderrQueue) = _AsyncLineReader.getForFd(
-                stderr, catch_exit=catch_exit)
             runloop = True
 
-            while (not stdoutReader.eof() or not stderrReader.eof()) and runloop:
-                while not stdoutQueue.empty():
-                    line = stdoutQueue.get()
-                    decol = decode_outerr(
-                        line, encoding, encerror, cmd)
-                    sdecol = decol.strip("\n\r")
-                    if fLOG is not None:
-                        fLOG(prefix_log + sdecol)
-                    out.append(sdecol)
-                    last_update = time.perf_counter()
-                    if stop_running_if is not None and stop_running_if(decol, None):
-                        runloop = False
-                        break
+            def next_wakeup():
+                return _next_wakeup(time.perf_counter(), begin, last_update,
+                                    timeout, tell_if_no_output)
+
+            if sys.platform.startswith("win"):
+                # pipes cannot be selected on Windows
+                lines = _iter_pipe_lines_threads(
+                    [stdout, stderr], next_wakeup, catch_exit=catch_exit)
+            else:
+                lines = _iter_pipe_lines([stdout, stderr], next_wakeup)
 
-                while not stderrQueue.empty():
-                    line = stderrQueue.get()
-                    decol = decode_outerr(
-                        line, encoding, encerror, cmd)
+            for index, line in lines:
+                if index is not None:
+                    decol = decode_outerr(line, encoding, encerror, cmd)
                     sdecol = decol.strip("\n\r")
                     if fLOG is not None:
                         fLOG(prefix_log + sdecol)
-                    err.append(sdecol)
+                    (out if index == 0 else err).append(sdecol)
                     last_update = time.perf_counter()
-                    if stop_running_if is not None and stop_running_if(None, decol):
+                    if stop_running_if is not None and (
+                            stop_running_if(decol, None) if index == 0
+                            else stop_running_if(None, decol)):
                         runloop = False
                         break
-                time.sleep(0.05)
 
-                delta = time.perf_counter() - last_update
-                if tell_if_no_output is not None and delta >= tell_if_no_output:
-                    fLOG(prefix_log + "[run_cmd] No update in {0} seconds for cmd: {1}".format(
-                        "%5.1f" % (last_update - begin), cmd))
-                    last_update = time.perf_counter()
-                full_delta = time.perf_counter() - begin
+                now = time.perf_counter()
+                if tell_if_no_output is not None and now - last_update >= tell_if_no_output:
+                    if fLOG is not None:
+                        fLOG(prefix_log + "[run_cmd] No update in {0} seconds for cmd: {1}".format(
+                            "%5.1f" % (last_update - begin), cmd))
+                    last_update = now
+                full_delta = now - begin
                 if timeout is not None and full_delta > timeout:
                     runloop = False
-                    fLOG(prefix_log + "[run_cmd] Timeout after {0} seconds for cmd: {1}".format(
-                        "%5.1f" % full_delta, cmd))
+                    if fLOG is not None:
+                        fLOG(prefix_log + "[run_cmd] Timeout after {0} seconds for cmd: {1}".format(
+                            "%5.1f" % full_delta, cmd))
                     break
+            lines.close()
 
             if runloop:
-                # Waiting for async readers to finish...
-                stdoutReader.join()
-                stderrReader.join()
-
                 # Waiting for process to exit...
                 returnCode = pproc.wait()
                 err_read = True
@@ -318,11 +316,14 @@ def run_cmd(cmd, sin="", shell=sys.platform.startswith("win"), wait=False, log_e
                     pproc.wait()
             else:
                 out.append("[run_cmd] killing process.")
-                fLOG(
-                    prefix_log + "[run_cmd] killing process because stop_running_if returned True.")
+                if fLOG is not None:
+                    fLOG(
+                        prefix_log + "[run_cmd] killing process because stop_running_if returned True.")
                 pproc.kill()
+                pproc.wait()
                 err_read = True
-                fLOG(prefix_log + "[run_cmd] process killed.")
+                if fLOG is not None:
+                    fLOG(prefix_log + "[run_cmd] process killed.")
                 skip_out_err = True
 
             out = "\n".join(out)
@@ -373,6 +374,165 @@ def run_cmd(cmd, sin="", shell=sys.platform.startswith("win"), wait=False, log_e
         return pproc, None
 
 
+async def run_cmd_async(cmd, sin="", shell=sys.platform.startswith("win"), log_error=True,
+                        stop_running_if=None, encerror="ignore", encoding="utf8",
+                        change_path=None, preprocess=True, timeout=None,
+                        catch_exit=False, fLOG=None, tell_if_no_output=None,
+                        prefix_log=None):
+    """
+    Runs a command line with :epkg:`asyncio` and returns the standard
+    output and the standard error. It behaves like
+    ``run_cmd(..., wait=True, communicate=False)`` (see @see fn run_cmd)
+    but the command does not block the event loop, several commands
+    can be awaited at the same time.
+
+    @param      cmd                 command line
+    @param      sin                 what must be written on the standard input
+    @param      shell               if True, cmd is a shell command
+    @param      log_error           if log_error, call fLOG (error)
+    @param      stop_running_if     the function stops waiting and kills the process
+                                    if ``stop_running_if(last_out, last_err)`` returns True
+    @param      encerror            encoding errors (ignore by default) while converting the output into a string
+    @param      encoding            encoding of the output
+    @param      change_path         current directory of the command (the current
+                                    directory of the process is not changed)
+    @param      preprocess          preprocess the command line if necessary (False to disable that option)
+    @param      timeout             the process is killed after *timeout* seconds
+    @param      catch_exit          raises @see cl RunCmdException instead of
+                                    *CalledProcessError* if the command fails
+    @param      fLOG                logging function
+    @param      tell_if_no_output   tells if there is no output every *tell_if_no_output* seconds
+    @param      prefix_log          add a prefix to a line before printing it
+    @return                         content of stdout, stderr
+
+    .. exref::
+        :title: Run several commands at the same time
+
+        ::
+
+            import asyncio
+            from pyquickhelper.loghelper import run_cmd_async
+
+            async def main():
+                return await asyncio.gather(
+                    run_cmd_async("git status"), run_cmd_async("git log -1"))
+
+            res = asyncio.run(main())
+
+    .. versionadded:: 1.9
+    """
+    import asyncio
+    if prefix_log is None:
+        prefix_log = ""
+    if isinstance(cmd, (list, tuple)):
+        scmd = " ".join(cmd)
+    else:
+        scmd = cmd
+    if fLOG is not None:
+        fLOG(prefix_log + "[run_cmd_async] execute", scmd)
+
+    stdin = asyncio.subprocess.PIPE if sin is not None and len(
+        sin) > 0 else None
+    if shell:
+        proc = await asyncio.create_subprocess_shell(
+            scmd, stdin=stdin, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE, cwd=change_path)
+    else:
+        cmdl = split_cmp_command(cmd) if preprocess else cmd
+        if isinstance(cmdl, str):
+            cmdl = [cmdl]
+        proc = await asyncio.create_subprocess_exec(
+            *cmdl, stdin=stdin, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE, cwd=change_path)
+
+    if stdin is not None:
+        proc.stdin.write(sin.encode())
+        await proc.stdin.drain()
+        proc.stdin.close()
+
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    state = dict(last_update=begin)
+    out = []
+    err = []
+
+    async def read_lines(stream, lines, index):
+        splitter = _LineSplitter()
+        while True:
+            data = await stream.read(2 ** 16)
+            chunk = splitter.feed(data) if data else splitter.flush()
+            for line in chunk:
+                decol = decode_outerr(line, encoding, encerror, scmd)
+                sdecol = decol.strip("\n\r")
+                if fLOG is not None:
+                    fLOG(prefix_log + sdecol)
+                lines.append(sdecol)
+                state["last_update"] = loop.time()
+                if stop_running_if is not None and (
+                        stop_running_if(decol, None) if index == 0
+                        else stop_running_if(None, decol)):
+                    return True
+            if not data:
+                return False
+
+    pending = {asyncio.ensure_future(read_lines(proc.stdout, out, 0)),
+               asyncio.ensure_future(read_lines(proc.stderr, err, 1))}
+    killed = False
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED,
+                timeout=_next_wakeup(loop.time(), begin, state["last_update"],
+                                     timeout, tell_if_no_output))
+            if any(task.result() for task in done):
+                killed = True
+                break
+            now = loop.time()
+            if tell_if_no_output is not None and now - state["last_update"] >= tell_if_no_output:
+                if fLOG is not None:
+                    fLOG(prefix_log + "[run_cmd_async] No update in {0} seconds for cmd: {1}".format(
+                        "%5.1f" % (state["last_update"] - begin), scmd))
+                state["last_update"] = now
+            if timeout is not None and now - begin > timeout:
+                if fLOG is not None:
+                    fLOG(prefix_log + "[run_cmd_async] Timeout after {0} seconds for cmd: {1}".format(
+                        "%5.1f" % (now - begin), scmd))
+                killed = True
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        if killed or pending:
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+
+    if killed:
+        out.append("[run_cmd] killing process.")
+        if fLOG is not None:
+            fLOG(prefix_log + "[run_cmd_async] process killed.")
+        return "\n".join(out), "Process killed."
+
+    returnCode = await proc.wait()
+    if returnCode != 0:
+        if catch_exit:
+            mes = "SystemExit raised with error code {0}\nCMD:\n{1}\nCWD:\n{2}\n#---OUT---#\n{3}\n#---ERR---#\n{4}"
+            raise RunCmdException(mes.format(
+                returnCode, scmd, change_path or os.getcwd(),
+                "\n".join(out), "\n".join(err)))
+        raise subprocess.CalledProcessError(returnCode, scmd)
+
+    out = "\n".join(out).replace("\r\n", "\n")
+    err = "\n".join(err).replace("\r\n", "\n").strip("\n\r\t ")
+    if fLOG is not None:
+        fLOG(prefix_log + "end of execution", scmd)
+        if len(err) > 0 and log_error:
+            fLOG(prefix_log + "[run_cmd_async] stderr (log)")
+            for eline in err.split("\n"):
+                fLOG(prefix_log + eline)
+    return out, err
+
+
 def parse_exception_message(exc):
     """
     Parses the message embedded in an exception and returns the standard output and error
@@ -415,37 +575,138 @@ def run_script(script, *args, **kwargs):
     return out, err
 
 
+def _next_wakeup(now, begin, last_update, timeout, tell_if_no_output):
+    """
+    Returns the number of seconds @see fn run_cmd can wait for
+    a new line before checking *timeout* and *tell_if_no_output*,
+    None to wait until a line comes.
+    """
+    delays = []
+    if timeout is not None:
+        delays.append(begin + timeout - now)
+    if tell_if_no_output is not None:
+        delays.append(last_update + tell_if_no_output - now)
+    if len(delays) == 0:
+        return None
+    return max(min(delays), 0)
+
+
+class _LineSplitter:
+    """
+    Cuts the bytes read from a pipe into lines,
+    every line keeps its end of line as ``readline`` does.
+    """
+
+    def __init__(self):
+        self.buffer = b''
+
+    def feed(self, data):
+        """
+        Adds *data* and returns the completed lines.
+        """
+        self.buffer += data
+        pos = self.buffer.rfind(b'\n')
+        if pos < 0:
+            return []
+        lines = self.buffer[:pos + 1].splitlines(True)
+        self.buffer = self.buffer[pos + 1:]
+        return lines
+
+    def flush(self):
+        """
+        Returns the last line if it does not end with an end of line.
+        """
+        lines = [self.buffer] if self.buffer else []
+        self.buffer = b''
+        return lines
+
+
+def _iter_pipe_lines(pipes, next_wakeup):
+    """
+    Reads lines from several pipes with a selector, no thread is needed.
+    It yields ``(index of the pipe, line)`` for every line and
+    ``(None, None)`` if nothing was received during
+    ``next_wakeup()`` seconds. The generator stops when
+    every pipe is closed.
+    """
+    sel = selectors.DefaultSelector()
+    splitters = {}
+    try:
+        for i, pipe in enumerate(pipes):
+            sel.register(pipe.fileno(), selectors.EVENT_READ, i)
+            splitters[i] = _LineSplitter()
+        while splitters:
+            events = sel.select(next_wakeup())
+            if len(events) == 0:
+                yield None, None
+                continue
+            for key, _ in events:
+                data = os.read(key.fd, 2 ** 16)
+                if data:
+                    lines = splitters[key.data].feed(data)
+                else:
+                    sel.unregister(key.fd)
+                    lines = splitters.pop(key.data).flush()
+                for line in lines:
+                    yield key.data, line
+    finally:
+        sel.close()
+
+
+def _iter_pipe_lines_threads(pipes, next_wakeup, catch_exit=False):
+    """
+    Same as @see fn _iter_pipe_lines but one thread reads every pipe,
+    :epkg:`Windows` cannot select pipes.
+    """
+    q = queue.Queue()
+    readers = [_AsyncLineReader.getForFd(pipe, index=i, outputQueue=q,
+                                         catch_exit=catch_exit)[0]
+               for i, pipe in enumerate(pipes)]
+    running = len(readers)
+    while running > 0:
+        try:
+            index, line = q.get(timeout=next_wakeup())
+        except queue.Empty:
+            yield None, None
+            continue
+        if line is None:
+            running -= 1
+        else:
+            yield index, line
+    for reader in readers:
+        reader.join()
+
+
 class _AsyncLineReader(threading.Thread):
 
-    def __init__(self, fd, outputQueue, catch_exit):
+    def __init__(self, fd, outputQueue, catch_exit, index=0):
         threading.Thread.__init__(self)
 
         assert isinstance(outputQueue, queue.Queue)
         assert callable(fd.readline)
 
         self.fd = fd
+        self.index = index
         self.catch_exit = catch_exit
         self.outputQueue = outputQueue
 
     def run(self):
-        if self.catch_exit:
-            try:
-                for _ in map(self.outputQueue.put, iter(self.fd.readline, b'')):
-                    pass
-            except SystemExit as e:
-                self.outputQueue.put(str(e))
-                raise RunCmdException("SystemExit raised (3)") from e
-        else:
-            for _ in map(self.outputQueue.put, iter(self.fd.readline, b'')):
-                pass
-
-    def eof(self):
-        return not self.is_alive() and self.outputQueue.empty()
+        try:
+            for line in iter(self.fd.readline, b''):
+                self.outputQueue.put((self.index, line))
+        except SystemExit as e:
+            if not self.catch_exit:
+                raise
+            self.outputQueue.put((self.index, str(e).encode()))
+            raise RunCmdException("SystemExit raised (3)") from e
+        finally:
+            # end of the stream
+            self.outputQueue.put((self.index, None))
 
     @classmethod
-    def getForFd(cls, fd, start=True, catch_exit=False):
-        q = queue.Queue()
-        reader = cls(fd, q, catch_exit)
+    def getForFd(cls, fd, start=True, catch_exit=False, index=0, outputQueue=None):
+        q = queue.Queue() if outputQueue is None else outputQueue
+        reader = cls(fd, q, catch_exit, index=index)
 
         if start:
             reader.start()
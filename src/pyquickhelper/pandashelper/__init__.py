@@ -2,6 +2,12 @@
 @file
 @bried shortcuts to pandashelper
 """
-from .readh import read_csv
-from .tblformat import df2rst, df2html
-from .tblfunction import isempty, isnan
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'read_csv': '.readh',
+    'df2rst': '.tblformat',
+    'df2html': '.tblformat',
+    'isempty': '.tblfunction',
+    'isnan': '.tblfunction',
+})
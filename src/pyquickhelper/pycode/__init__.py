@@ -2,27 +2,45 @@
 @file
 @brief shortcuts fror pycode
 """
-from .ci_helper import is_travis_or_appveyor
-from .clean_helper import clean_files
-from .code_helper import remove_extra_spaces_and_pep8, remove_extra_spaces_folder
-from .coverage_helper import publish_coverage_on_codecov, coverage_combine
-from .pip_helper import get_packages_list, get_package_info
-from .readme_helper import clean_readme
-from .setup_helper import process_standard_options_for_setup, write_version_for_setup, process_standard_options_for_setup_help
-from .setup_helper import available_commands_list
-from .tkinter_helper import fix_tkinter_issues_virtualenv
-from .trace_execution import get_call_stack
-from .unittestclass import (
-    ExtTestCase, skipif_appveyor, skipif_travis, skipif_circleci,
-    skipif_linux, skipif_vless, skipif_azure_macosx,
-    skipif_azure, skipif_azure_linux, unittest_require_at_least,
-    ignore_warnings
-)
-from .pytest_helper import run_test_function, TestExecutionError
-from .utils_tests import main_wrapper_tests
-from .utils_tests_helper import get_temp_folder, check_pep8, add_missing_development_version
-from .venv_helper import (
-    create_virtual_env, run_venv_script, run_base_script,
-    NotImplementedErrorFromVirtualEnvironment, is_virtual_environment,
-    check_readme_syntax
-)
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'is_travis_or_appveyor': '.ci_helper',
+    'clean_files': '.clean_helper',
+    'remove_extra_spaces_and_pep8': '.code_helper',
+    'remove_extra_spaces_folder': '.code_helper',
+    'publish_coverage_on_codecov': '.coverage_helper',
+    'coverage_combine': '.coverage_helper',
+    'get_packages_list': '.pip_helper',
+    'get_package_info': '.pip_helper',
+    'clean_readme': '.readme_helper',
+    'process_standard_options_for_setup': '.setup_helper',
+    'write_version_for_setup': '.setup_helper',
+    'process_standard_options_for_setup_help': '.setup_helper',
+    'available_commands_list': '.setup_helper',
+    'fix_tkinter_issues_virtualenv': '.tkinter_helper',
+    'get_call_stack': '.trace_execution',
+    'ExtTestCase': '.unittestclass',
+    'skipif_appveyor': '.unittestclass',
+    'skipif_travis': '.unittestclass',
+    'skipif_circleci': '.unittestclass',
+    'skipif_linux': '.unittestclass',
+    'skipif_vless': '.unittestclass',
+    'skipif_azure_macosx': '.unittestclass',
+    'skipif_azure': '.unittestclass',
+    'skipif_azure_linux': '.unittestclass',
+    'unittest_require_at_least': '.unittestclass',
+    'ignore_warnings': '.unittestclass',
+    'run_test_function': '.pytest_helper',
+    'TestExecutionError': '.pytest_helper',
+    'main_wrapper_tests': '.utils_tests',
+    'get_temp_folder': '.utils_tests_helper',
+    'check_pep8': '.utils_tests_helper',
+    'add_missing_development_version': '.utils_tests_helper',
+    'create_virtual_env': '.venv_helper',
+    'run_venv_script': '.venv_helper',
+    'run_base_script': '.venv_helper',
+    'NotImplementedErrorFromVirtualEnvironment': '.venv_helper',
+    'is_virtual_environment': '.venv_helper',
+    'check_readme_syntax': '.venv_helper',
+})
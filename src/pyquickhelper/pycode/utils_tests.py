@@ -50,7 +50,9 @@ def main_wrapper_tests(logfile, skip_list=None, processes=False, add_coverage=Fa
     @param      processes               to run the unit test in a separate process (with function @see fn run_cmd),
                                         however, to make that happen, you need to specify
                                         ``exit=False`` for each test file, see `unittest.main
-                                        <https://docs.python.org/3/library/unittest.html#unittest.main>`_
+                                        <https://docs.python.org/3/library/unittest.html#unittest.main>`_,
+                                        if it is an integer *N*, the test files run on *N* worker processes,
+                                        see @see fn main_run_test
     @param      add_coverage            (bool) run the unit tests and measure the coverage at the same time
     @param      report_folder           (str) folder where the coverage report will be stored
     @param      skip_function           *function(filename,content,duration) --> boolean* to skip a unit test
@@ -134,8 +136,16 @@ def main_wrapper_tests(logfile, skip_list=None, processes=False, add_coverage=Fa
     Parameter *covtoken*: used to post the coverage report to
     `codecov <https://codecov.io/>`_.
 
+    If *processes* is an integer, the durations of the test files are stored
+    in file ``.test_durations.json`` next to *logfile*, the next run
+    starts with the longest ones. With *add_coverage*, every worker records
+    its own coverage file, they are merged with @see fn coverage_combine.
+
     .. versionchanged:: 1.8
         Parameter *coverage_root* was added.
+
+    .. versionchanged:: 1.9
+        Parameter *processes* can be an integer.
     """
     # delayed import
     from ..loghelper.os_helper import get_user
@@ -165,13 +175,18 @@ def main_wrapper_tests(logfile, skip_list=None, processes=False, add_coverage=Fa
             exists = os.path.exists(os.path.join(fold, ".gitignore"))
         return os.path.normpath(os.path.abspath(fold))
 
-    def run_main():
+    parallel = not isinstance(processes, bool) and processes
+    durations = os.path.join(path, ".test_durations.json") if parallel else None
+
+    def run_main(coverage_options=None, coverage_exclude_lines=None):
         # delayed import to speed up import of pycode
         from .utils_tests_private import main_run_test
         res = main_run_test(runner, path_test=path, skip=-1, skip_list=skip_list,
                             processes=processes, skip_function=skip_function,
                             additional_ut_path=additional_ut_path, stdout=stdout, stderr=stderr,
-                            filter_warning=filter_warning, fLOG=fLOG)
+                            filter_warning=filter_warning, durations=durations,
+                            coverage_options=coverage_options,
+                            coverage_exclude_lines=coverage_exclude_lines, fLOG=fLOG)
         return res
 
     if "win" not in sys.platform and "DISPLAY" not in os.environ:
@@ -321,12 +336,42 @@ def main_wrapper_tests(logfile, skip_list=None, processes=False, add_coverage=Fa
                     cov.exclude(line)
             else:
                 cov.exclude("raise NotImplementedError")
-            stdout_this.write("[main_wrapper_tests] ENABLE COVERAGE\n")
-            cov.start()
+            if parallel:
+                # every worker records the coverage in its own file
+                import tempfile
+                worker_folder = tempfile.mkdtemp(prefix="coverage_workers_")
+                worker_options = coverage_options.copy()
+                worker_options["data_file"] = os.path.join(
+                    worker_folder, ".coverage")
+                stdout_this.write(
+                    "[main_wrapper_tests] ENABLE COVERAGE on {0} processes\n".format(processes))
+                res = run_main(coverage_options=worker_options,
+                               coverage_exclude_lines=cov.get_exclude_list())
+                worker_files = [os.path.join(worker_folder, name)
+                                for name in os.listdir(worker_folder)
+                                if name.startswith(".coverage.")]
+                if not os.path.exists(report_folder):
+                    os.makedirs(report_folder)
+                if worker_files:
+                    coverage_combine(worker_files, report_folder,
+                                     os.path.abspath(root_src))
+                    # the combined data is stored in report_folder,
+                    # not in coverage_options["data_file"]
+                    exclude_lines = cov.get_exclude_list()
+                    cov = coverage(**dict(coverage_options,
+                                          data_file=os.path.join(report_folder, ".coverage")))
+                    for line in exclude_lines:
+                        cov.exclude(line)
+                    cov.load()
+                from ..filehelper.synchelper import remove_folder
+                remove_folder(worker_folder)
+            else:
+                stdout_this.write("[main_wrapper_tests] ENABLE COVERAGE\n")
+                cov.start()
 
-            res = run_main()
+                res = run_main()
 
-            cov.stop()
+                cov.stop()
             stdout_this.write(
                 "[main_wrapper_tests] STOP COVERAGE + REPORT into '{0}\n'".format(report_folder))
 
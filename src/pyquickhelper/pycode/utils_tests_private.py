@@ -6,7 +6,10 @@ import os
 import sys
 import glob
 import re
+import json
+import time
 import unittest
+import traceback
 import warnings
 from io import StringIO
 from .utils_tests_stringio import StringIOAndFile
@@ -233,9 +236,364 @@ def clean(folder=None, fLOG=noLOG):
                 el, str(e).replace("\n", " ")))
 
 
+def _report_test_file(r, out, serr, list_warn, filename, i, cut,
+                      memout, fullstderr, allwarn, filter_warning):
+    """
+    Writes the errors and the warnings produced by the tests
+    of one file, used by @see fn main_run_test.
+
+    @return     1 if a test failed, 0 otherwise
+    """
+    name = os.path.split(filename)[-1]
+    if not r.wasSuccessful():
+        err = out.split("===========")
+        err = err[-1]
+        memout.write("\n")
+        try:
+            memout.write(err)
+        except UnicodeDecodeError:
+            err_e = err.decode("ascii", errors="ignore")
+            memout.write(err_e)
+        except UnicodeEncodeError:
+            try:
+                err_e = err.encode("ascii", errors="ignore")
+                memout.write(err_e)
+            except TypeError:
+                err_e = err.encode("ascii", errors="ignore").decode(
+                    'ascii', errors='ingore')
+                memout.write(err_e)
+
+        # stores the output in case of an error
+        with open(filename + ".err", "w", encoding="utf-8", errors="ignore") as f:
+            f.write(out)
+
+        fullstderr.write("\n#-----" + name + "\n")
+        fullstderr.write("OUT:\n")
+        fullstderr.write(out)
+
+        if err:
+            fullstderr.write("[pyqerror]o:\n")
+            try:
+                fullstderr.write(err)
+            except UnicodeDecodeError:
+                err_e = err.decode("ascii", errors="ignore")
+                fullstderr.write(err_e)
+            except UnicodeEncodeError:
+                err_e = err.encode("ascii", errors="ignore")
+                fullstderr.write(err_e)
+
+        list_warn = [(w, o) for w, o in list_warn if filter_warning(w)]
+        if len(list_warn) > 0:
+            fullstderr.write("*[pyqwarning]:\n")
+            warndone = set()
+            for w, slw in list_warn:
+                sw = str(slw)
+                if sw not in warndone:
+                    # we display only one time the same warning
+                    fullstderr.write("w{0}: {1}\n".format(i, sw))
+                    warndone.add(sw)
+        if serr.strip(" \n\r\t"):
+            fullstderr.write("ERRs:\n")
+            fullstderr.write(serr)
+        return 1
+    else:
+        list_warn = [(w, o) for w, o in list_warn if filter_warning(w)]
+        allwarn.append((name, list_warn))
+        val = serr
+        if val.strip(" \n\r\t"):
+            # Remove most of the Sphinx warnings (sphinx < 1.8)
+            lines = val.strip(" \n\r\t").split("\n")
+            lines = [
+                _ for _ in lines if _ and "is already registered, it will be overridden" not in _]
+            val = "\n".join(lines)
+        if len(val) > 0 and is_valid_error(val):
+            fullstderr.write("\n*-----" + name + "\n")
+            if len(list_warn) > 0:
+                fullstderr.write("[main_run_test] +WARN:\n")
+                for w, _ in list_warn:
+                    fullstderr.write(
+                        "[in:{2}] w{0}: {1}\n".format(i, str(w), cut))
+            if val.strip(" \n\r\t"):
+                fullstderr.write("[in:{0}] ERRv:\n".format(cut))
+                fullstderr.write(val)
+    return 0
+
+
+def _end_run_test(fullstderr, allwarn, fail, memout, memerr, on_stderr, fLOG):
+    """
+    Displays the errors and the warnings once every test ran,
+    used by @see fn main_run_test.
+
+    @return     content of the standard error
+    """
+    val = fullstderr.getvalue()
+
+    if len(val) > 0:
+        fLOG("[main_run_test] -- STDERR (from unittests) on STDOUT")
+        fLOG(val)
+        fLOG("[main_run_test] -- end STDERR on STDOUT")
+
+        if on_stderr:
+            memerr.write(
+                "[main_run_test] ##### STDERR (from unittests) #####\n")
+            memerr.write(val)
+            memerr.write("[main_run_test] ##### end STDERR #####\n")
+
+    if fail == 0:
+        clean(fLOG=fLOG)
+
+    fLOG("[main_run_test] printing warnings")
+
+    for fi, lw in allwarn:
+        if len(lw) > 0:
+            memout.write("[main_run_test] -WARN: {0}\n".format(fi))
+            wdone = {}
+            for i, (w, s) in enumerate(lw):
+                sw = str(w)
+                if sw in wdone:
+                    continue
+                wdone[sw] = w
+                try:
+                    sw = "  w{0}: {1}\n".format(i, w)
+                except UnicodeEncodeError:  # pragma: no cover
+                    sw = "  w{0}: Unable to convert a warnings of type {1} into a string (1)".format(
+                        i, type(w))
+                try:
+                    memout.write(sw)
+                except UnicodeEncodeError:  # pragma: no cover
+                    sw = "  w{0}: Unable to convert a warnings of type {1} into a string (2)".format(
+                        i, type(w))
+                    memout.write(sw)
+
+    fLOG("[main_run_test] END of unit tests")
+    memout.write("[main_run_test] END of unit tests\n")
+
+    return val
+
+
+def load_test_durations(filename):
+    """
+    Loads the durations of the test files measured by
+    previous runs of @see fn main_run_test.
+
+    @param      filename    json file, it may not exist
+    @return                 dictionary ``{ "folder/test_file.py": seconds }``
+    """
+    if filename is None or not os.path.exists(filename):
+        return {}
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        warnings.warn("Unable to read durations from '{0}' due to {1}".format(
+            filename, e), UserWarning)
+        return {}
+    return {k: float(v) for k, v in data.items()}
+
+
+def save_test_durations(filename, durations):
+    """
+    Saves the durations of the test files,
+    the file is replaced in a single operation.
+
+    @param      filename    json file
+    @param      durations   dictionary ``{ "folder/test_file.py": seconds }``
+    """
+    tmp = "{0}.{1}.tmp".format(filename, os.getpid())
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(durations, f, indent=0, sort_keys=True)
+    os.replace(tmp, filename)
+
+
+class ProcessTestResult:
+    """
+    Summary of the tests of one file run in another process
+    by @see fn main_run_test. It can be pickled
+    unlike :epkg:`unittest` results and it has the same
+    string representation.
+    """
+
+    def __init__(self, testsRun, errors, failures, skipped=0):
+        """
+        @param      testsRun    number of tests
+        @param      errors      number of errors
+        @param      failures    number of failures
+        @param      skipped     number of skipped tests
+        """
+        self.testsRun = testsRun
+        self.errors = errors
+        self.failures = failures
+        self.skipped = skipped
+
+    def wasSuccessful(self):
+        """
+        Tells if every test passed.
+        """
+        return self.errors == 0 and self.failures == 0
+
+    def __str__(self):
+        """
+        usual
+        """
+        return "<{0} run={1} errors={2} failures={3}>".format(
+            self.__class__.__name__, self.testsRun, self.errors, self.failures)
+
+
+def _picklable_warning(w):
+    """
+    Replaces the message of a warning by an instance of the first
+    builtin class it derives from, the warning class may be defined
+    in the test file and unknown in the main process.
+    """
+    cls = type(w.message) if isinstance(w.message, Warning) else w.category
+    base = [c for c in cls.__mro__ if c.__module__ == "builtins"][0]
+    return warnings.WarningMessage(base(str(w.message)), base,
+                                   w.filename, w.lineno)
+
+
+def _run_test_file_process(filename, additional_ut_path=None,
+                           coverage_options=None, coverage_exclude_lines=None):
+    """
+    Runs the tests of one file, it is called in a worker process
+    by @see fn main_run_test. If *coverage_options* is not None,
+    the coverage is recorded in file
+    ``coverage_options['data_file'] + '.<suffix>'``.
+    The standard output and error are captured, the standard output
+    is inserted before the output of the tests so that the workers
+    do not write into the same console.
+
+    @return     dictionary
+    """
+    cov = None
+    if coverage_options is not None:
+        from coverage import Coverage
+        cov = Coverage(data_suffix=True, **coverage_options)
+        for line in coverage_exclude_lines or []:
+            cov.exclude(line)
+        cov.start()
+
+    begin = time.perf_counter()
+    stream = StringIO()
+    runner = unittest.TextTestRunner(verbosity=0, stream=stream)
+    newstdo = StringIO()
+    keepstdo = sys.stdout
+    sys.stdout = newstdo
+    newstdr = StringIO()
+    keepstdr = sys.stderr
+    sys.stderr = newstdr
+    try:
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            try:
+                suite = import_files(
+                    [filename], additional_ut_path=additional_ut_path)
+                r = runner.run(unittest.TestSuite(t for t, _ in suite))
+                res = ProcessTestResult(r.testsRun, len(r.errors),
+                                        len(r.failures), len(r.skipped))
+            except Exception:  # pylint: disable=W0703
+                stream.write("===========\n")
+                stream.write(traceback.format_exc())
+                stream.write("\nRan 0 tests in 0.000s\n")
+                res = ProcessTestResult(0, 1, 0)
+            list_warn = [_picklable_warning(ww) for ww in w]
+    finally:
+        sys.stdout = keepstdo
+        sys.stderr = keepstdr
+        if cov is not None:
+            cov.stop()
+            cov.save()
+
+    return dict(result=res, out=newstdo.getvalue() + stream.getvalue(),
+                err=newstdr.getvalue(),
+                warnings=list_warn, duration=time.perf_counter() - begin)
+
+
+def _main_run_test_processes(co, processes, path_test, limit_max, skip, skip_list,
+                             skip_function, on_stderr, additional_ut_path, stdout,
+                             stderr, filter_warning, durations, coverage_options,
+                             coverage_exclude_lines, fLOG):
+    """
+    Runs the test files on *processes* processes,
+    see @see fn main_run_test.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    history = load_test_durations(durations)
+    files = []
+    for i, (e, cut, name) in enumerate(co):
+        if skip >= 0 and i < skip:
+            continue  # pragma: no cover
+        if i + 1 in skip_list:
+            continue  # pragma: no cover
+        est = history.get(cut, e)
+        if est > limit_max:
+            continue  # pragma: no cover
+        if skip_function is not None:
+            with open(name, "r") as f:
+                content = f.read()
+            if skip_function(name, content, e):
+                continue
+        files.append((est, i, cut, name))
+
+    # longest processing time first: the longest tests
+    # do not end up alone at the end of the run
+    files.sort(key=lambda t: (-t[0], t[1]))
+
+    memout = sys.stdout if stdout is None else stdout
+    memerr = sys.stderr if stderr is None else stderr
+    fullstderr = StringIO()
+    memout.write("[main_run_test] ---- JENKINS BEGIN UNIT TESTS ----")
+    memout.write(
+        "[main_run_test] ---- BEGIN UNIT TEST for {0}\n".format(path_test))
+    for est, i, cut, _ in files:
+        memout.write("\ntest % 3d (%04ds), %s" % (i + 1, est, cut))
+    memout.write("\n")
+    memout.write(
+        "[main_run_test] ---- RUN UT on {0} processes\n".format(processes))
+
+    exp = re.compile("Ran ([0-9]+) tests? in ([.0-9]+)s")
+    keep = []
+    allwarn = []
+    fail = 0
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {}
+        for _, i, cut, name in files:
+            fut = executor.submit(_run_test_file_process, name,
+                                  additional_ut_path=additional_ut_path,
+                                  coverage_options=coverage_options,
+                                  coverage_exclude_lines=coverage_exclude_lines)
+            futures[fut] = i, cut, name
+        for fut in as_completed(futures):
+            i, cut, name = futures[fut]
+            res = fut.result()
+            r = res["result"]
+            history[cut] = round(res["duration"], 3)
+            zzz = "running test % 3d, %s" % (i + 1, cut)
+            zzz += (60 - len(zzz)) * " "
+            memout.write(zzz)
+            ti = exp.findall(res["out"])
+            if ti:
+                memout.write(" ran %s tests in %ss" % ti[-1])
+            list_warn = [(w, name) for w in res["warnings"]]
+            fail += _report_test_file(r, res["out"], res["err"], list_warn, name, i, cut,
+                                      memout, fullstderr, allwarn, filter_warning)
+            memout.write("\n")
+            keep.append((name, r))
+
+    if durations is not None:
+        save_test_durations(durations, history)
+
+    memout.write("[main_run_test] ---- END UT\n")
+    memout.write("[main_run_test] ---- JENKINS END UNIT TESTS ----\n")
+    val = _end_run_test(fullstderr, allwarn, fail, memout,
+                        memerr, on_stderr, fLOG)
+    return dict(err=val, tests=keep)
+
+
 def main_run_test(runner, path_test=None, limit_max=1e9, log=False, skip=-1, skip_list=None,
                   on_stderr=False, processes=False, skip_function=None,
                   additional_ut_path=None, stdout=None, stderr=None, filter_warning=None,
+                  durations=None, coverage_options=None, coverage_exclude_lines=None,
                   fLOG=noLOG):
     """
     Runs all unit tests,
@@ -255,7 +613,9 @@ def main_run_test(runner, path_test=None, limit_max=1e9, log=False, skip=-1, ski
     @param      processes           to run the unit test in a separate process (with function @see fn run_cmd),
                                     however, to make that happen, you need to specify
                                     ``exit=False`` for each test file, see `unittest.main
-                                    <https://docs.python.org/3/library/unittest.html#unittest.main>`_
+                                    <https://docs.python.org/3/library/unittest.html#unittest.main>`_,
+                                    if it is an integer, the test files run on *processes*
+                                    worker processes (see below)
     @param      additional_ut_path  additional paths to add when running the unit tests
     @param      stdout              if not None, use this stream instead of *sys.stdout*
     @param      stderr              if not None, use this stream instead of *sys.stderr*
@@ -263,8 +623,26 @@ def main_run_test(runner, path_test=None, limit_max=1e9, log=False, skip=-1, ski
                                     if None, the function filters out some recurrent warnings
                                     in jupyter (signature: ``def filter_warning(w: warning) -> bool``),
                                     @see fn default_filter_warning
+    @param      durations           json file storing the measured duration of every test file
+                                    (only used if *processes* is an integer)
+    @param      coverage_options    if not None, every worker process records the coverage
+                                    with these options (only used if *processes* is an integer)
+    @param      coverage_exclude_lines  lines to exclude from the coverage
     @param      fLOG                logging function
     @return                         dictionnary: ``{ "err": err, "tests":list of couple (file, test results) }``
+
+    If *processes* is an integer, every test file runs in one of
+    the *processes* worker processes. The test files are sorted
+    by decreasing duration, the duration measured by the previous run
+    and stored in file *durations* or the one given in the
+    documentation (``(time=5s)``) for new files. Every worker records
+    the coverage in its own file ``coverage_options['data_file'] + '.<suffix>'``,
+    these files can be merged with @see fn coverage_combine.
+    The test results are instances of @see cl ProcessTestResult.
+
+    .. versionchanged:: 1.9
+        Parameters *durations*, *coverage_options*, *coverage_exclude_lines* were added,
+        *processes* can be an integer.
     """
     if skip_list is None:
         skip_list = set()
@@ -320,6 +698,12 @@ def main_run_test(runner, path_test=None, limit_max=1e9, log=False, skip=-1, ski
     else:
         fLOG("[main_run_test] found ", len(co), " test files")
 
+    if not isinstance(processes, bool) and processes:
+        return _main_run_test_processes(
+            co, processes, path_test, limit_max, skip, skip_list, skip_function,
+            on_stderr, additional_ut_path, stdout, stderr, filter_warning,
+            durations, coverage_options, coverage_exclude_lines, fLOG)
+
     # extract the test classes
     cco = []
     duration = {}
@@ -338,7 +722,6 @@ def main_run_test(runner, path_test=None, limit_max=1e9, log=False, skip=-1, ski
     # run the test
     li = [a[1] for a in cco]
     suite = import_files(li, additional_ut_path=additional_ut_path, fLOG=fLOG)
-    lis = [os.path.split(name)[-1] for _, name in suite]
     keep = []
 
     # redirect standard output, error
@@ -443,79 +826,8 @@ def main_run_test(runner, path_test=None, limit_max=1e9, log=False, skip=-1, ski
 
         memout.write(add)
 
-        if not r.wasSuccessful():
-            err = out.split("===========")
-            err = err[-1]
-            memout.write("\n")
-            try:
-                memout.write(err)
-            except UnicodeDecodeError:
-                err_e = err.decode("ascii", errors="ignore")
-                memout.write(err_e)
-            except UnicodeEncodeError:
-                try:
-                    err_e = err.encode("ascii", errors="ignore")
-                    memout.write(err_e)
-                except TypeError:
-                    err_e = err.encode("ascii", errors="ignore").decode(
-                        'ascii', errors='ingore')
-                    memout.write(err_e)
-
-            # stores the output in case of an error
-            with open(s[1] + ".err", "w", encoding="utf-8", errors="ignore") as f:
-                f.write(out)
-
-            fail += 1
-
-            fullstderr.write("\n#-----" + lis[i] + "\n")
-            fullstderr.write("OUT:\n")
-            fullstderr.write(out)
-
-            if err:
-                fullstderr.write("[pyqerror]o:\n")
-                try:
-                    fullstderr.write(err)
-                except UnicodeDecodeError:
-                    err_e = err.decode("ascii", errors="ignore")
-                    fullstderr.write(err_e)
-                except UnicodeEncodeError:
-                    err_e = err.encode("ascii", errors="ignore")
-                    fullstderr.write(err_e)
-
-            list_warn = [(w, s) for w, s in list_warn if filter_warning(w)]
-            if len(list_warn) > 0:
-                fullstderr.write("*[pyqwarning]:\n")
-                warndone = set()
-                for w, slw in list_warn:
-                    sw = str(slw)
-                    if sw not in warndone:
-                        # we display only one time the same warning
-                        fullstderr.write("w{0}: {1}\n".format(i, sw))
-                        warndone.add(sw)
-            serr = newstdr.getvalue()
-            if serr.strip(" \n\r\t"):
-                fullstderr.write("ERRs:\n")
-                fullstderr.write(serr)
-        else:
-            list_warn = [(w, s) for w, s in list_warn if filter_warning(w)]
-            allwarn.append((lis[i], list_warn))
-            val = newstdr.getvalue()
-            if val.strip(" \n\r\t"):
-                # Remove most of the Sphinx warnings (sphinx < 1.8)
-                lines = val.strip(" \n\r\t").split("\n")
-                lines = [
-                    _ for _ in lines if _ and "is already registered, it will be overridden" not in _]
-                val = "\n".join(lines)
-            if len(val) > 0 and is_valid_error(val):
-                fullstderr.write("\n*-----" + lis[i] + "\n")
-                if len(list_warn) > 0:
-                    fullstderr.write("[main_run_test] +WARN:\n")
-                    for w, _ in list_warn:
-                        fullstderr.write(
-                            "[in:{2}] w{0}: {1}\n".format(i, str(w), cut))
-                if val.strip(" \n\r\t"):
-                    fullstderr.write("[in:{0}] ERRv:\n".format(cut))
-                    fullstderr.write(val)
+        fail += _report_test_file(r, out, newstdr.getvalue(), list_warn, s[1], i, cut,
+                                  memout, fullstderr, allwarn, filter_warning)
 
         memout.write("\n")
         keep.append((last_s[1], r))
@@ -529,48 +841,7 @@ def main_run_test(runner, path_test=None, limit_max=1e9, log=False, skip=-1, ski
     # end, catch standard output and err
     sys.stderr = memo_stderr
     sys.stdout = memo_stdout
-    val = fullstderr.getvalue()
-
-    if len(val) > 0:
-        fLOG("[main_run_test] -- STDERR (from unittests) on STDOUT")
-        fLOG(val)
-        fLOG("[main_run_test] -- end STDERR on STDOUT")
-
-        if on_stderr:
-            memerr.write(
-                "[main_run_test] ##### STDERR (from unittests) #####\n")
-            memerr.write(val)
-            memerr.write("[main_run_test] ##### end STDERR #####\n")
-
-    if fail == 0:
-        clean(fLOG=fLOG)
-
-    fLOG("[main_run_test] printing warnings")
-
-    for fi, lw in allwarn:
-        if len(lw) > 0:
-            memout.write("[main_run_test] -WARN: {0}\n".format(fi))
-            wdone = {}
-            for i, (w, s) in enumerate(lw):
-                sw = str(w)
-                if sw in wdone:
-                    continue
-                wdone[sw] = w
-                try:
-                    sw = "  w{0}: {1}\n".format(i, w)
-                except UnicodeEncodeError:  # pragma: no cover
-                    sw = "  w{0}: Unable to convert a warnings of type {1} into a string (1)".format(
-                        i, type(w))
-                try:
-                    memout.write(sw)
-                except UnicodeEncodeError:  # pragma: no cover
-                    sw = "  w{0}: Unable to convert a warnings of type {1} into a string (2)".format(
-                        i, type(w))
-                    memout.write(sw)
-
-    fLOG("[main_run_test] END of unit tests")
-    memout.write("[main_run_test] END of unit tests\n")
-
+    val = _end_run_test(fullstderr, allwarn, fail, memout, memerr, on_stderr, fLOG)
     return dict(err=val, tests=keep)
 
 
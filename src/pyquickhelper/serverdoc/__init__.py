@@ -2,5 +2,9 @@
 shortcuts for documentation_server
 """
 
-from .documentation_server import run_doc_server
-from .server_helper import get_jenkins_mappings
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'run_doc_server': '.documentation_server',
+    'get_jenkins_mappings': '.server_helper',
+})
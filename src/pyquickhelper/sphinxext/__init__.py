@@ -9,72 +9,92 @@
 
     Based on `slickgrid <https://github.com/mleibman/SlickGrid/tree/master/examples>`_.
 """
+import sys
 import warnings
-from sphinx.ext.autodoc import setup as setup_autodoc
-from sphinx.ext.imgmath import setup as setup_imgmath
-from sphinxcontrib.imagesvg import setup as setup_imagesvg
-from sphinx.ext.graphviz import setup as setup_graphviz
-from sphinx.ext.todo import setup as setup_todo
-
-from .blog_post import BlogPost
-from .blog_post_list import BlogPostList
-from .sphinx_bigger_extension import bigger_node, bigger_role
-from .sphinx_blocref_extension import BlocRef, BlocRefList
-from .sphinx_blog_extension import BlogPostDirective, BlogPostDirectiveAgg
-from .sphinx_cmdref_extension import CmdRef, CmdRefList
-from .sphinx_epkg_extension import epkg_node
-from .sphinx_exref_extension import ExRef, ExRefList
-from .sphinx_faqref_extension import FaqRef, FaqRefList
-from .sphinx_githublink_extension import githublink_node, githublink_role
-from .sphinx_gitlog_extension import gitlog_node, gitlog_role
-from .sphinx_mathdef_extension import MathDef, MathDefList
-from .sphinx_quote_extension import QuoteNode
-from .sphinx_nbref_extension import NbRef, NbRefList
-from .sphinx_postcontents_extension import PostContentsDirective, postcontents_node
-from .sphinx_tocdelay_extension import TocDelayDirective, tocdelay_node
-from .sphinx_youtube_extension import YoutubeDirective, youtube_node
-from .sphinx_sharenet_extension import ShareNetDirective, sharenet_node
-from .sphinx_downloadlink_extension import process_downloadlink_role
-from .sphinx_video_extension import VideoDirective, video_node
-from .sphinx_image_extension import SimpleImageDirective, simpleimage_node
-from .sphinx_template_extension import tpl_node
-from .sphinx_todoext_extension import TodoExt, TodoExtList
-from .documentation_link import python_link_doc
-
-from ..sphinxext.sphinx_autosignature import setup as setup_signature
-from ..sphinxext.sphinx_bigger_extension import setup as setup_bigger
-from ..sphinxext.sphinx_blocref_extension import setup as setup_blocref
-from ..sphinxext.sphinx_blog_extension import setup as setup_blog
-from ..sphinxext.sphinx_collapse_extension import setup as setup_collapse
-from ..sphinxext.sphinx_gdot_extension import setup as setup_gdot
-from ..sphinxext.sphinx_cmdref_extension import setup as setup_cmdref
-from ..sphinxext.sphinx_docassert_extension import setup as setup_docassert
-from ..sphinxext.sphinx_epkg_extension import setup as setup_epkg
-from ..sphinxext.sphinx_exref_extension import setup as setup_exref
-from ..sphinxext.sphinx_faqref_extension import setup as setup_faqref
-from ..sphinxext.sphinx_githublink_extension import setup as setup_githublink
-from ..sphinxext.sphinx_gitlog_extension import setup as setup_gitlog
-from ..sphinxext.sphinx_image_extension import setup as setup_simpleimage
-from ..sphinxext.sphinx_mathdef_extension import setup as setup_mathdef
-from ..sphinxext.sphinx_quote_extension import setup as setup_quote
-from ..sphinxext.sphinx_nbref_extension import setup as setup_nbref
-from ..sphinxext.sphinx_postcontents_extension import setup as setup_postcontents
-from ..sphinxext.sphinx_runpython_extension import setup as setup_runpython
-from ..sphinxext.sphinx_runpython_extension import RunPythonDirective, runpython_node
-from ..sphinxext.sphinx_sharenet_extension import setup as setup_sharenet
-from ..sphinxext.sphinx_downloadlink_extension import setup as setup_downloadlink
-from ..sphinxext.sphinx_template_extension import setup as setup_tpl
-from ..sphinxext.sphinx_tocdelay_extension import setup as setup_tocdelay
-from ..sphinxext.sphinx_toctree_extension import setup as setup_toctree
-from ..sphinxext.sphinx_todoext_extension import setup as setup_todoext
-from ..sphinxext.sphinx_video_extension import setup as setup_video
-from ..sphinxext.sphinx_youtube_extension import setup as setup_youtube
-from ..sphinxext.sphinximages.sphinxtrib.images import setup as setup_image
-
-from ..sphinxext.sphinx_doctree_builder import setup as setup_doctree
-from ..sphinxext.sphinx_latex_builder import setup as setup_latex
-from ..sphinxext.sphinx_md_builder import setup as setup_md
-from ..sphinxext.sphinx_rst_builder import setup as setup_rst
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'setup_autodoc': ('sphinx.ext.autodoc', 'setup'),
+    'setup_imgmath': ('sphinx.ext.imgmath', 'setup'),
+    'setup_imagesvg': ('sphinxcontrib.imagesvg', 'setup'),
+    'setup_graphviz': ('sphinx.ext.graphviz', 'setup'),
+    'setup_todo': ('sphinx.ext.todo', 'setup'),
+    'BlogPost': '.blog_post',
+    'BlogPostList': '.blog_post_list',
+    'bigger_node': '.sphinx_bigger_extension',
+    'bigger_role': '.sphinx_bigger_extension',
+    'BlocRef': '.sphinx_blocref_extension',
+    'BlocRefList': '.sphinx_blocref_extension',
+    'BlogPostDirective': '.sphinx_blog_extension',
+    'BlogPostDirectiveAgg': '.sphinx_blog_extension',
+    'CmdRef': '.sphinx_cmdref_extension',
+    'CmdRefList': '.sphinx_cmdref_extension',
+    'epkg_node': '.sphinx_epkg_extension',
+    'ExRef': '.sphinx_exref_extension',
+    'ExRefList': '.sphinx_exref_extension',
+    'FaqRef': '.sphinx_faqref_extension',
+    'FaqRefList': '.sphinx_faqref_extension',
+    'githublink_node': '.sphinx_githublink_extension',
+    'githublink_role': '.sphinx_githublink_extension',
+    'gitlog_node': '.sphinx_gitlog_extension',
+    'gitlog_role': '.sphinx_gitlog_extension',
+    'MathDef': '.sphinx_mathdef_extension',
+    'MathDefList': '.sphinx_mathdef_extension',
+    'QuoteNode': '.sphinx_quote_extension',
+    'NbRef': '.sphinx_nbref_extension',
+    'NbRefList': '.sphinx_nbref_extension',
+    'PostContentsDirective': '.sphinx_postcontents_extension',
+    'postcontents_node': '.sphinx_postcontents_extension',
+    'TocDelayDirective': '.sphinx_tocdelay_extension',
+    'tocdelay_node': '.sphinx_tocdelay_extension',
+    'YoutubeDirective': '.sphinx_youtube_extension',
+    'youtube_node': '.sphinx_youtube_extension',
+    'ShareNetDirective': '.sphinx_sharenet_extension',
+    'sharenet_node': '.sphinx_sharenet_extension',
+    'process_downloadlink_role': '.sphinx_downloadlink_extension',
+    'VideoDirective': '.sphinx_video_extension',
+    'video_node': '.sphinx_video_extension',
+    'SimpleImageDirective': '.sphinx_image_extension',
+    'simpleimage_node': '.sphinx_image_extension',
+    'tpl_node': '.sphinx_template_extension',
+    'TodoExt': '.sphinx_todoext_extension',
+    'TodoExtList': '.sphinx_todoext_extension',
+    'python_link_doc': '.documentation_link',
+    'setup_signature': ('.sphinx_autosignature', 'setup'),
+    'setup_bigger': ('.sphinx_bigger_extension', 'setup'),
+    'setup_blocref': ('.sphinx_blocref_extension', 'setup'),
+    'setup_blog': ('.sphinx_blog_extension', 'setup'),
+    'setup_collapse': ('.sphinx_collapse_extension', 'setup'),
+    'setup_gdot': ('.sphinx_gdot_extension', 'setup'),
+    'setup_cmdref': ('.sphinx_cmdref_extension', 'setup'),
+    'setup_docassert': ('.sphinx_docassert_extension', 'setup'),
+    'setup_epkg': ('.sphinx_epkg_extension', 'setup'),
+    'setup_exref': ('.sphinx_exref_extension', 'setup'),
+    'setup_faqref': ('.sphinx_faqref_extension', 'setup'),
+    'setup_githublink': ('.sphinx_githublink_extension', 'setup'),
+    'setup_gitlog': ('.sphinx_gitlog_extension', 'setup'),
+    'setup_simpleimage': ('.sphinx_image_extension', 'setup'),
+    'setup_mathdef': ('.sphinx_mathdef_extension', 'setup'),
+    'setup_quote': ('.sphinx_quote_extension', 'setup'),
+    'setup_nbref': ('.sphinx_nbref_extension', 'setup'),
+    'setup_postcontents': ('.sphinx_postcontents_extension', 'setup'),
+    'setup_runpython': ('.sphinx_runpython_extension', 'setup'),
+    'RunPythonDirective': '.sphinx_runpython_extension',
+    'runpython_node': '.sphinx_runpython_extension',
+    'setup_sharenet': ('.sphinx_sharenet_extension', 'setup'),
+    'setup_downloadlink': ('.sphinx_downloadlink_extension', 'setup'),
+    'setup_tpl': ('.sphinx_template_extension', 'setup'),
+    'setup_tocdelay': ('.sphinx_tocdelay_extension', 'setup'),
+    'setup_toctree': ('.sphinx_toctree_extension', 'setup'),
+    'setup_todoext': ('.sphinx_todoext_extension', 'setup'),
+    'setup_video': ('.sphinx_video_extension', 'setup'),
+    'setup_youtube': ('.sphinx_youtube_extension', 'setup'),
+    'setup_image': ('.sphinximages.sphinxtrib.images', 'setup'),
+    'setup_doctree': ('.sphinx_doctree_builder', 'setup'),
+    'setup_latex': ('.sphinx_latex_builder', 'setup'),
+    'setup_md': ('.sphinx_md_builder', 'setup'),
+    'setup_rst': ('.sphinx_rst_builder', 'setup'),
+})
 
 
 def get_default_extensions(load_bokeh=False):
@@ -111,22 +131,25 @@ def get_default_extensions(load_bokeh=False):
             import matplotlib.pyplot as plt  # pylint: disable=W0611
             switch_backend("Agg")
 
-    default_setups = [setup_toctree,
-                      setup_blog, setup_runpython, setup_sharenet,
-                      setup_todoext, setup_bigger, setup_githublink,
-                      setup_runpython, setup_mathdef, setup_blocref,
-                      setup_faqref, setup_exref, setup_nbref,
-                      setup_docassert, setup_signature, setup_tpl,
-                      setup_cmdref, setup_epkg, setup_rst, setup_md,
-                      setup_latex, setup_doctree,
-                      setup_postcontents, setup_tocdelay, setup_youtube,
-                      # directives from sphinx
-                      setup_graphviz, setup_imgmath, setup_todo,
-                      # the rest of it
-                      setup_autodoc, setup_imagesvg,
-                      setup_plot, setup_image, setup_collapse, setup_gdot,
-                      setup_video, setup_simpleimage, setup_downloadlink,
-                      setup_quote, setup_gitlog]
+    names = ['setup_toctree',
+             'setup_blog', 'setup_runpython', 'setup_sharenet',
+             'setup_todoext', 'setup_bigger', 'setup_githublink',
+             'setup_runpython', 'setup_mathdef', 'setup_blocref',
+             'setup_faqref', 'setup_exref', 'setup_nbref',
+             'setup_docassert', 'setup_signature', 'setup_tpl',
+             'setup_cmdref', 'setup_epkg', 'setup_rst', 'setup_md',
+             'setup_latex', 'setup_doctree',
+             'setup_postcontents', 'setup_tocdelay', 'setup_youtube',
+             # directives from sphinx
+             'setup_graphviz', 'setup_imgmath', 'setup_todo',
+             # the rest of it
+             'setup_autodoc', 'setup_imagesvg',
+             'setup_plot', 'setup_image', 'setup_collapse', 'setup_gdot',
+             'setup_video', 'setup_simpleimage', 'setup_downloadlink',
+             'setup_quote', 'setup_gitlog']
+    this = sys.modules[__name__]
+    default_setups = [setup_plot if name == 'setup_plot' else getattr(this, name)
+                      for name in names]
 
     if load_bokeh:
         try:
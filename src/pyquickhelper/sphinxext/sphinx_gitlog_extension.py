@@ -46,12 +46,12 @@ def gitlog_role(role, rawtext, text, lineno, inliner, options=None, content=None
             value = str(datetime.now())
         else:
             from ..loghelper.repositories.pygit_helper import get_file_last_modification
-            value = get_file_last_modification(source)
+            value = get_file_last_modification(source, index=True)
         node['text'] = value
     elif text.startswith('date:'):
         source = text[5:]
         from ..loghelper.repositories.pygit_helper import get_file_last_modification
-        value = get_file_last_modification(source)
+        value = get_file_last_modification(source, index=True)
         node['text'] = value
     else:
         raise ValueError(  # pragma: no cover
@@ -0,0 +1,168 @@
+"""
+@file
+@brief Cache for the outputs of the directive ``runpython``.
+"""
+import os
+import sys
+import pickle
+import hashlib
+import threading
+
+
+def sources_fingerprint(roots):
+    """
+    Computes a fingerprint of the python files
+    in a list of folders based on their names, sizes and
+    modification times.
+
+    @param      roots       list of folders
+    @return                 hexadecimal string
+    """
+    h = hashlib.sha256()
+    for root in sorted(set(roots)):
+        if not os.path.isdir(root):
+            continue
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if not d.startswith(".")
+                             and d != "__pycache__")
+            for name in sorted(files):
+                if not name.endswith((".py", ".pyx", ".pyd", ".so")):
+                    continue
+                full = os.path.join(folder, name)
+                st = os.stat(full)
+                h.update("{0}|{1}|{2}\n".format(
+                    os.path.relpath(full, root), st.st_size,
+                    st.st_mtime_ns).encode("utf-8"))
+    return h.hexdigest()
+
+
+def default_source_roots(packages=None):
+    """
+    Returns the folders used to compute the fingerprint
+    of the sources. If *packages* is None, the function
+    returns the paths of *sys.path* ending with ``src`` or ``source``,
+    the folders the directive ``runpython`` adds to *sys.path*
+    when a script runs in a separate process.
+
+    @param      packages    None or list of package names
+    @return                 list of folders
+    """
+    if packages is None:
+        return [p for p in sys.path if os.path.split(
+            p.rstrip("/\\"))[-1] in ("src", "source")]
+    import importlib.util
+    roots = []
+    for name in packages:
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ImportError(  # pragma: no cover
+                "Unable to find package '{0}'.".format(name))
+        if spec.submodule_search_locations:
+            roots.extend(spec.submodule_search_locations)
+        elif spec.origin:
+            roots.append(os.path.dirname(spec.origin))
+    return roots
+
+
+class RunPythonCache:
+    """
+    Stores the outputs of the directive ``runpython``
+    (stdout, stderr, context) in a folder.
+    The key is a hash of the script, the options,
+    the restored context, the version of :epkg:`python` and
+    a fingerprint of the sources (see @see fn sources_fingerprint).
+    """
+
+    def __init__(self, cache_dir):
+        """
+        @param      cache_dir       folder
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    @staticmethod
+    def make_key(script, options, context=None, fingerprint=None):
+        """
+        Builds the key for a script.
+
+        @param      script          script to run
+        @param      options         dictionary of options
+        @param      context         context restored before running the script
+        @param      fingerprint     fingerprint of the sources
+        @return                     hexadecimal string or None if the
+                                    context cannot be pickled
+        """
+        h = hashlib.sha256()
+        for v in [script, repr(sorted(options.items())), sys.version,
+                  fingerprint or ""]:
+            h.update(v.encode("utf-8"))
+            h.update(b"\0")
+        if context:
+            try:
+                h.update(pickle.dumps(sorted(context.items())))
+            except Exception:  # pylint: disable=W0703
+                return None
+        return h.hexdigest()
+
+    def _filename(self, key):
+        return os.path.join(self.cache_dir, key + ".pkl")
+
+    def get(self, key):
+        """
+        Returns the cached tuple *(out, err, context)* or None.
+        """
+        try:
+            with open(self._filename(key), "rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError):
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """
+        Stores a tuple *(out, err, context)*.
+
+        @return     False if the value cannot be pickled
+        """
+        try:
+            data = pickle.dumps(value)
+        except Exception:  # pylint: disable=W0703
+            return False
+        name = self._filename(key)
+        tmp = "{0}.{1}.{2}.tmp".format(name, os.getpid(), threading.get_ident())
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, name)
+        return True
+
+    def clear(self):
+        """
+        Removes every cached output.
+        """
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".pkl"):
+                os.remove(entry.path)
+
+
+_caches = {}
+
+
+def get_runpython_cache(cache_dir):
+    """
+    Returns the cache stored in folder *cache_dir*,
+    the same instance is returned for the same folder.
+    """
+    cache_dir = os.path.abspath(cache_dir)
+    if cache_dir not in _caches:
+        _caches[cache_dir] = RunPythonCache(cache_dir)
+    return _caches[cache_dir]
@@ -19,6 +19,8 @@ from ..loghelper.flog import run_cmd
 from ..texthelper.texts_language import TITLES
 from ..pycode.code_helper import remove_extra_spaces_and_pep8
 from .sphinx_collapse_extension import collapse_node
+from .sphinx_runpython_pool import get_default_runpython_pool
+from .sphinx_runpython_cache import get_runpython_cache, default_source_roots, sources_fingerprint
 
 
 class RunPythonCompileError(Exception):
@@ -39,7 +41,7 @@ class RunPythonExecutionError(Exception):
 
 def run_python_script(script, params=None, comment=None, setsysvar=None, process=False,
                       exception=False, warningout=None, chdir=None, context=None,
-                      store_in_file=None):
+                      store_in_file=None, process_pool=None):
     """
     Executes a script :epkg:`python` as a string.
 
@@ -61,6 +63,9 @@ def run_python_script(script, params=None, comment=None, setsysvar=None, process
                                 that is useful is the script is using module
                                 ``inspect`` to retrieve the source which are not
                                 stored in memory
+    @param  process_pool        if *process* is True, runs the script in a process
+                                of a @see cl RunPythonWorkerPool (True for the default pool)
+                                instead of starting a new interpreter
     @return                     stdout, stderr, context
 
     If the execution throws an exception such as
@@ -96,7 +101,7 @@ def run_python_script(script, params=None, comment=None, setsysvar=None, process
     how to display an image with this directive.
 
     .. versionchanged:: 1.9
-        Parameter *store_in_file* was added.
+        Parameters *store_in_file*, *process_pool* were added.
     """
     def warning_filter(warningout):
         if warningout in (None, ''):
@@ -175,7 +180,14 @@ def run_python_script(script, params=None, comment=None, setsysvar=None, process
             script_arg = script
 
         try:
-            out, err = run_cmd(cmd, script_arg, wait=True, change_path=chdir)
+            if process_pool:
+                if process_pool is True:
+                    process_pool = get_default_runpython_pool()
+                out, err = process_pool.run(
+                    script, chdir=chdir, filename=store_in_file)
+            else:
+                out, err = run_cmd(
+                    cmd, script_arg, wait=True, change_path=chdir)
             return out, err, None
         except Exception as ee:
             if not exception:
@@ -271,6 +283,39 @@ class runpython_node(nodes.Structural, nodes.Element):
     pass
 
 
+# options changing the execution of a script
+_cached_options = {'setsysvar', 'process', 'exception', 'warningout', 'current',
+                   'store_in_file', 'store', 'restore', 'numpy_precision'}
+
+
+def _get_runpython_cache(env):
+    """
+    Returns the cache defined by the configuration and the
+    fingerprint of the sources, *(None, None)* if there is no cache.
+    """
+    config = getattr(env, "config", None) if env is not None else None
+    value = getattr(config, "runpython_cache", None)
+    if not value:
+        return None, None
+    if value is True:
+        doctreedir = getattr(env, "doctreedir", None)
+        if doctreedir is None:
+            return None, None
+        value = os.path.join(doctreedir, "runpython_cache")
+    cache = get_runpython_cache(value)
+
+    # the fingerprint is computed once per build
+    app = getattr(env, "app", None)
+    fingerprint = getattr(app, "_runpython_fingerprint", None)
+    if fingerprint is None:
+        roots = default_source_roots(
+            getattr(config, "runpython_cache_packages", None))
+        fingerprint = sources_fingerprint(roots)
+        if app is not None:
+            app._runpython_fingerprint = fingerprint
+    return cache, fingerprint
+
+
 class RunPythonDirective(Directive):
 
     """
@@ -309,11 +354,14 @@ class RunPythonDirective(Directive):
     * ``:indent:<int>`` to indent the output
     * ``:language:``: changes ``::`` into ``.. code-block:: language``
     * ``:linenos:`` to show line numbers
+    * ``:nocache:`` the script always runs even if the outputs are cached
     * ``:nopep8:`` if present, leaves the code as it is and does not apply pep8 by default,
       see @see fn remove_extra_spaces_and_pep8.
     * ``:numpy_precision: <precision>``, run ``numpy.set_printoptions(precision=...)``,
       precision is 3 by default
-    * ``:process:`` run the script in an another process
+    * ``:process:`` run the script in an another process, the process belongs
+      to a pool (@see cl RunPythonWorkerPool) if ``runpython_process_pool``
+      is True or a dictionary in the configuration
     * ``:restore:`` restore the local context stored in :epkg:`sphinx` application
       by the previous call to *runpython*
     * ``:rst:`` to interpret the output, otherwise, it is considered as raw text
@@ -381,8 +429,17 @@ class RunPythonDirective(Directive):
 
         print("Hide or unhide this output.")
 
+    The outputs can be cached if ``runpython_cache`` is True
+    (the cache is stored in the doctree folder) or a folder
+    in the configuration. The cache is keyed on the script, the options,
+    the restored context and a fingerprint of the sources
+    (see @see cl RunPythonCache). Configuration value
+    ``runpython_cache_packages`` defines the packages included in the
+    fingerprint, by default, the python files in the folders of *sys.path*
+    ending with ``src`` or ``source``.
+
     .. versionchanged:: 1.9
-        Options *store_in_file* was added.
+        Options *store_in_file*, *nocache* were added.
     """
     required_arguments = 0
     optional_arguments = 0
@@ -410,6 +467,7 @@ class RunPythonDirective(Directive):
         'numpy_precision': directives.unchanged,
         'store_in_file': directives.unchanged,
         'linenos': directives.unchanged,
+        'nocache': directives.unchanged,
     }
     has_content = True
     runpython_class = runpython_node
@@ -466,6 +524,7 @@ class RunPythonDirective(Directive):
             'numpy_precision': self.options.get('numpy_precision', '3').strip(),
             'store': 'store' in self.options and self.options['store'] in bool_set_,
             'restore': 'restore' in self.options and self.options['restore'] in bool_set_,
+            'nocache': 'nocache' in self.options and self.options['nocache'] in bool_set_,
         }
 
         if p['setsysvar'] is not None and len(p['setsysvar']) == 0:
@@ -562,11 +621,31 @@ class RunPythonDirective(Directive):
         script = script.replace(
             '## __WD__ ##', "__WD__ = '{0}'".format(cs_source_dir))
 
-        out, err, context = run_python_script(script, comment=comment, setsysvar=p['setsysvar'],
-                                              process=p["process"], exception=p['exception'],
-                                              warningout=p['warningout'],
-                                              chdir=cs_source_dir if p['current'] else None,
-                                              context=context, store_in_file=p['store_in_file'])
+        # pool of processes
+        process_pool = getattr(env.config, "runpython_process_pool", None) \
+            if env is not None and hasattr(env, "config") else None
+        if isinstance(process_pool, dict):
+            process_pool = get_default_runpython_pool(**process_pool)
+
+        # cache
+        cache, fingerprint = (None, None) if p['nocache'] else _get_runpython_cache(env)
+        key = None
+        if cache is not None:
+            key = cache.make_key(script, {k: v for k, v in p.items() if k in _cached_options},
+                                 context=context, fingerprint=fingerprint)
+        cached = cache.get(key) if key is not None else None
+
+        if cached is not None:
+            out, err, context = cached
+        else:
+            out, err, context = run_python_script(script, comment=comment, setsysvar=p['setsysvar'],
+                                                  process=p["process"], exception=p['exception'],
+                                                  warningout=p['warningout'],
+                                                  chdir=cs_source_dir if p['current'] else None,
+                                                  context=context, store_in_file=p['store_in_file'],
+                                                  process_pool=process_pool)
+            if key is not None:
+                cache.set(key, (out, err, context))
 
         if p['store']:
             # Stores modified local context.
@@ -753,6 +832,9 @@ def setup(app):
     setup for ``runpython`` (sphinx)
     """
     app.add_config_value('out_runpythonlist', [], 'env')
+    app.add_config_value('runpython_process_pool', False, 'env')
+    app.add_config_value('runpython_cache', False, 'env')
+    app.add_config_value('runpython_cache_packages', None, 'env')
     if hasattr(app, "add_mapping"):
         app.add_mapping('runpython', runpython_node)
 
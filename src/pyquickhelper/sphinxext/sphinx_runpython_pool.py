@@ -0,0 +1,280 @@
+"""
+@file
+@brief Pool of :epkg:`python` processes used by the directive
+``runpython`` when option ``:process:`` is enabled.
+"""
+import builtins
+import os
+import sys
+import tempfile
+import threading
+import traceback
+import warnings
+import multiprocessing
+
+# default values of numpy.set_printoptions
+_numpy_printoptions = dict(
+    edgeitems=3, threshold=1000, floatmode='maxprec', precision=8,
+    suppress=False, linewidth=75, nanstr='nan', infstr='inf', sign='-',
+    formatter=None, legacy=False)
+
+
+def _runpython_execute(script, filename):
+    """
+    Executes a script as ``python -`` or ``python <filename>`` would do,
+    the traceback is printed on the standard error if it fails.
+    """
+    globs = {"__name__": "__main__", "__builtins__": builtins}
+    if filename is not None:
+        globs["__file__"] = filename
+    sys.argv = [filename or '']
+    try:
+        obj = compile(script, filename or "<stdin>", "exec")
+        exec(obj, globs)
+    except SystemExit as e:
+        if e.code is not None and not isinstance(e.code, int):
+            print(e.code, file=sys.stderr)
+    except BaseException:  # pylint: disable=W0703
+        # the first frame belongs to this function
+        exc_type, exc_value, tb = sys.exc_info()
+        traceback.print_exception(exc_type, exc_value, tb.tb_next)
+
+
+def _runpython_worker(conn, preload):
+    """
+    Runs the scripts received from *conn* until it receives None
+    or the connection is closed. The standard output and the standard
+    error are redirected (file descriptors) into the files the parent
+    process gave. The current directory, *sys.path*, the attributes
+    added to module *sys*, the environment variables, the warnings filters
+    and the print options of :epkg:`numpy` are restored after every script.
+    """
+    for name in preload or []:
+        try:
+            __import__(name)
+        except ImportError:  # pragma: no cover
+            pass
+    cwd = os.getcwd()
+    sys_path = list(sys.path)
+    sys_keys = set(sys.__dict__)
+    environ = dict(os.environ)
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:  # pragma: no cover
+            break
+        if task is None:
+            break
+        script, chdir, filename, out_name, err_name = task
+
+        np_options = (sys.modules["numpy"].get_printoptions()
+                      if "numpy" in sys.modules else None)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved = os.dup(1), os.dup(2)
+        with open(out_name, "wb") as fout, open(err_name, "wb") as ferr:
+            os.dup2(fout.fileno(), 1)
+            os.dup2(ferr.fileno(), 2)
+            try:
+                if chdir is not None:
+                    os.chdir(chdir)
+                with warnings.catch_warnings():
+                    _runpython_execute(script, filename)
+            finally:
+                sys.stdout = sys.__stdout__
+                sys.stderr = sys.__stderr__
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os.dup2(saved[0], 1)
+                os.dup2(saved[1], 2)
+                os.close(saved[0])
+                os.close(saved[1])
+
+        os.chdir(cwd)
+        sys.path[:] = sys_path
+        for k in set(sys.__dict__) - sys_keys:
+            delattr(sys, k)
+        if os.environ != environ:
+            os.environ.clear()
+            os.environ.update(environ)
+        if "numpy" in sys.modules:
+            # numpy may have been imported by the script
+            np = sys.modules["numpy"]
+            if np_options is None:
+                np_options = {k: _numpy_printoptions.get(k, None)
+                              for k in np.get_printoptions()}
+            np.set_printoptions(**np_options)
+        if "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].close("all")
+        conn.send(True)
+
+
+class RunPythonWorkerPool:
+    """
+    Keeps :epkg:`python` processes alive to run the scripts of
+    the directive ``runpython`` when option ``:process:`` is enabled.
+    A new interpreter does not need to start and import
+    the same modules for every script. Every script runs
+    with its own global variables, the standard output and
+    the standard error are captured as if the script were run
+    by a new interpreter. A process is replaced after
+    *max_tasks* scripts or when it crashes.
+
+    The processes are forked from a server (*forkserver*)
+    when the platform allows it, the modules in *preload*
+    are then imported once by the server.
+
+    .. exref::
+        :title: Run scripts with a pool of processes
+
+        ::
+
+            from pyquickhelper.sphinxext.sphinx_runpython_pool import RunPythonWorkerPool
+
+            pool = RunPythonWorkerPool(preload=["pandas"])
+            out, err = pool.run("import pandas\\nprint(pandas.__version__)")
+            pool.close()
+
+        The pool can be enabled in the configuration of the documentation
+        with ``runpython_process_pool = True`` or a dictionary with
+        the parameters of the constructor.
+    """
+
+    def __init__(self, size=2, max_tasks=50, preload=None):
+        """
+        @param      size        maximum number of processes
+        @param      max_tasks   number of scripts a process runs before being replaced
+        @param      preload     modules to import when a process starts
+        """
+        self.size = size
+        self.max_tasks = max_tasks
+        self.preload = list(preload) if preload else None
+        self.created = 0
+        self._idle = []
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(size)
+        self._pid = os.getpid()
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context("forkserver")
+            if self.preload:
+                self._context.set_forkserver_preload(self.preload)
+        else:
+            self._context = multiprocessing.get_context(
+                "spawn")  # pragma: no cover
+
+    def __len__(self):
+        """
+        Returns the number of idle processes.
+        """
+        with self._lock:
+            return len(self._idle)
+
+    def _check_pid(self):
+        # The pool was copied into another process (fork),
+        # the processes belong to the parent process.
+        if os.getpid() != self._pid:
+            self._idle = []
+            self._lock = threading.Lock()
+            self._semaphore = threading.BoundedSemaphore(self.size)
+            self._pid = os.getpid()
+
+    def _start_worker(self):
+        parent, child = self._context.Pipe()
+        proc = self._context.Process(target=_runpython_worker,
+                                     args=(child, self.preload), daemon=True)
+        proc.start()
+        child.close()
+        with self._lock:
+            self.created += 1
+        return [proc, parent, 0]
+
+    @staticmethod
+    def _stop_worker(worker):
+        proc, conn, _ = worker
+        try:
+            conn.send(None)
+        except (OSError, ValueError):  # pragma: no cover
+            pass
+        conn.close()
+        proc.join(5)
+        if proc.is_alive():
+            proc.terminate()  # pragma: no cover
+
+    def run(self, script, chdir=None, filename=None):
+        """
+        Runs a script in one process of the pool.
+
+        @param      script      script
+        @param      chdir       current directory while the script runs
+        @param      filename    filename of the script (``__file__``), it is
+                                also used in the tracebacks
+        @return                 stdout, stderr
+        """
+        self._check_pid()
+        with self._semaphore:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                worker = self._start_worker()
+            proc, conn, _ = worker
+
+            fd, out_name = tempfile.mkstemp(suffix=".out.txt")
+            os.close(fd)
+            fd, err_name = tempfile.mkstemp(suffix=".err.txt")
+            os.close(fd)
+            try:
+                try:
+                    conn.send((script, chdir, filename, out_name, err_name))
+                    conn.recv()
+                    crashed = False
+                except (EOFError, OSError):
+                    crashed = True
+                with open(out_name, "rb") as f:
+                    out = f.read().decode("utf8", errors="ignore")
+                with open(err_name, "rb") as f:
+                    err = f.read().decode("utf8", errors="ignore")
+            finally:
+                os.remove(out_name)
+                os.remove(err_name)
+
+            if crashed:
+                conn.close()
+                proc.join(5)
+                err += "\n[RunPythonWorkerPool] the process ended with exit code {0}".format(
+                    proc.exitcode)
+                return out, err
+
+            worker[2] += 1
+            if worker[2] >= self.max_tasks:
+                self._stop_worker(worker)
+            else:
+                with self._lock:
+                    self._idle.append(worker)
+            return out, err
+
+    def close(self):
+        """
+        Stops every idle process.
+        """
+        self._check_pid()
+        with self._lock:
+            workers = self._idle
+            self._idle = []
+        for worker in workers:
+            self._stop_worker(worker)
+
+
+_default_pool = None
+
+
+def get_default_runpython_pool(**kwargs):
+    """
+    Returns the pool used by the directive ``runpython``,
+    it is created the first time with parameters *kwargs*
+    (see @see cl RunPythonWorkerPool).
+    """
+    global _default_pool  # pylint: disable=W0603
+    if _default_pool is None:
+        _default_pool = RunPythonWorkerPool(**kwargs)
+    return _default_pool
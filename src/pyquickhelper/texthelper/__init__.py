@@ -3,7 +3,13 @@
 @brief shortcuts to text
 """
 
-from .code_helper import change_style, add_rst_links
-from .diacritic_helper import remove_diacritics
-from .templating import CustomTemplateException, apply_template
-from .version_helper import compare_module_version
+from .._lazy_import import lazy_import_attributes
+
+__getattr__, __dir__ = lazy_import_attributes(__name__, {
+    'change_style': '.code_helper',
+    'add_rst_links': '.code_helper',
+    'remove_diacritics': '.diacritic_helper',
+    'CustomTemplateException': '.templating',
+    'apply_template': '.templating',
+    'compare_module_version': '.version_helper',
+})